@@ -1,8 +1,9 @@
-from app import create_app, db
+from app import create_app, db, iniciar_tareas_segundo_plano
 from flask_migrate import Migrate
 
 app = create_app()
 
 # Código para iniciar el servidor de desarrollo
 if __name__ == '__main__':
+    iniciar_tareas_segundo_plano(app)
     app.run(debug=True)
\ No newline at end of file
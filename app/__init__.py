@@ -76,6 +76,18 @@ def create_app(config_name=None):
     # Configurar seguridad
     _configure_security(app)
     
+    # Registrar comandos CLI
+    _register_commands(app)
+    
+    # Servicio PEP (los hilos de precarga se arrancan solo en el servidor)
+    _configure_pep(app)
+    
+    # Circuit breakers de dependencias externas (RENIEC, Flow)
+    _configure_resilience(app)
+    
+    # Pub/sub de eventos en vivo (cuadre de caja por SSE)
+    _configure_eventos(app)
+    
     # Log de inicialización
     app.logger.info(f'Aplicación iniciada en modo: {config_class.__name__}')
     
@@ -90,7 +102,10 @@ def _register_models(app):
         Cuota, 
         DeclaracionJurada,
         Pago,
-        Usuario
+        Usuario,
+        EjecucionProceso,
+        CajaResumenDiario,
+        CierreCaja
     )
     app.logger.info('Modelos registrados correctamente')
 
@@ -148,6 +163,81 @@ def _register_modules(app):
     """
     pass
 
+def _register_commands(app):
+    """
+    Registra los comandos CLI de mantenimiento (flask mora ...).
+    """
+    from app.common.commands import register_commands
+    register_commands(app)
+
+
+def _configure_pep(app):
+    """
+    Configura los tiempos del servicio PEP. No arranca hilos: create_app también se usa
+    en comandos CLI (flask db upgrade, flask pep compilar, ...) y scripts de corta
+    duración; la precarga y la vigilancia las arranca iniciar_tareas_segundo_plano.
+    """
+    from app.services.pep_service import PEPService
+    
+    PEPService.TIMEOUT_CONSULTA = app.config.get('PEP_TIMEOUT_CONSULTA', PEPService.TIMEOUT_CONSULTA)
+    PEPService.INTERVALO_RECARGA = app.config.get('PEP_INTERVALO_RECARGA', PEPService.INTERVALO_RECARGA)
+
+
+def iniciar_tareas_segundo_plano(app):
+    """
+    Arranca los hilos del proceso servidor (wsgi.py, app.py):
+    - Precarga del dataset PEP (PEP_PRECARGA). Las consultas que lleguen antes esperan
+      hasta PEP_TIMEOUT_CONSULTA segundos; sin precarga se carga con la primera consulta.
+    - Con PEP_INTERVALO_RECARGA > 0 vigila el archivo y recarga en caliente si cambia.
+    """
+    from app.services.pep_service import PEPService
+    
+    if app.config.get('PEP_PRECARGA', True):
+        PEPService.iniciar_precarga()
+        app.logger.info('Precarga del dataset PEP iniciada')
+    if PEPService.iniciar_vigilancia():
+        app.logger.info(f'Recarga en caliente del dataset PEP cada {PEPService.INTERVALO_RECARGA}s')
+
+
+def _configure_resilience(app):
+    """
+    Configura los circuit breakers / bulkheads de RENIEC y Flow.
+    Una dependencia lenta o caída ocupa como máximo *_MAX_CONCURRENTES workers;
+    el resto de consultas falla rápido con 503.
+    """
+    from app.common.resilience import configurar_circuito
+    
+    comunes = {
+        'umbral_fallos': app.config.get('CIRCUITO_UMBRAL_FALLOS', 5),
+        'tiempo_apertura': app.config.get('CIRCUITO_TIEMPO_APERTURA', 30),
+        'espera_cupo': app.config.get('CIRCUITO_ESPERA_CUPO', 0.5)
+    }
+    for dependencia in ('RENIEC', 'FLOW'):
+        configurar_circuito(
+            dependencia.lower(),
+            max_concurrentes=app.config.get(f'{dependencia}_MAX_CONCURRENTES', 4),
+            latencia_lenta=app.config.get(f'{dependencia}_LATENCIA_LENTA', 0),
+            **comunes
+        )
+
+
+def _configure_eventos(app):
+    """
+    Configura el broker de eventos en vivo que alimenta /caja/eventos.
+    'memoria' reparte solo dentro del proceso; con varios workers usar 'redis'.
+    """
+    from app.common.eventos import configurar_eventos
+    
+    backend = app.config.get('EVENTOS_BACKEND', 'memoria')
+    configurar_eventos(
+        backend,
+        redis_url=app.config.get('EVENTOS_REDIS_URL'),
+        historial=app.config.get('EVENTOS_HISTORIAL', 200),
+        max_pendientes=app.config.get('EVENTOS_MAX_PENDIENTES', 100)
+    )
+    app.logger.info(f'Eventos en vivo configurados (backend: {backend})')
+
+
 def _configure_security(app):
     """
     Configura las medidas de seguridad de la aplicación.
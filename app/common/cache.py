@@ -425,10 +425,9 @@ def configure_cache(app):
     Returns:
         Cache: Instancia del cache configurado
     """
-    from flask_caching import Cache
+    from app.common.extensions import cache
     
-    # Inicializar Flask-Caching
-    cache = Cache()
+    # Inicializar Flask-Caching (instancia compartida de extensions)
     cache.init_app(app)
     
     # Logging
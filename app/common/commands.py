@@ -0,0 +1,264 @@
+"""
+CLI Commands Module
+Comandos de mantenimiento disponibles desde `flask <grupo> <comando>`.
+Pensados para ejecutarse desde cron / jobs nocturnos fuera del ciclo de requests.
+"""
+
+import csv
+import io
+
+import click
+from flask.cli import AppGroup
+
+
+# ============================================================================
+# MORA
+# ============================================================================
+
+mora_cli = AppGroup('mora', help='Procesos de cálculo de mora de la cartera')
+
+
+def _mostrar_resultado_mora(resultado):
+    """Imprime el resumen de un recálculo de mora."""
+    if resultado.get('modo'):
+        desde = resultado['desde'] or 'sin marca de agua'
+        click.echo(f"Modo: {resultado['modo']} (desde {desde})")
+    click.echo(f"Fecha de evaluación: {resultado['fecha_evaluacion']}")
+    click.echo(f"Préstamos procesados: {resultado['prestamos']}")
+    click.echo(f"Cuotas evaluadas: {resultado['cuotas_evaluadas']}")
+    click.echo(f"Cuotas actualizadas: {resultado['cuotas_actualizadas']} ({resultado['lotes']} lote(s))")
+    click.echo(
+        f"Duración: {resultado['duracion_segundos']}s "
+        f"({resultado['filas_por_segundo']} filas/s)"
+    )
+
+
+@mora_cli.command('recalcular')
+@click.option('--tamano-lote', default=1000, show_default=True, type=click.IntRange(min=1),
+              help='Filas por UPDATE masivo')
+@click.option('--fecha', type=click.DateTime(formats=['%Y-%m-%d']), default=None,
+              help='Fecha de evaluación (YYYY-MM-DD). Por defecto hoy')
+def recalcular_mora_command(tamano_lote, fecha):
+    """Recalcula la mora de todas las cuotas de préstamos VIGENTES."""
+    from app.services.mora_service import MoraService
+
+    resultado = MoraService.recalcular_mora_cartera(
+        tamano_lote=tamano_lote,
+        as_of=fecha.date() if fecha else None
+    )
+    _mostrar_resultado_mora(resultado)
+
+
+@mora_cli.command('incremental')
+@click.option('--tamano-lote', default=1000, show_default=True, type=click.IntRange(min=1),
+              help='Filas por UPDATE masivo')
+@click.option('--fecha', type=click.DateTime(formats=['%Y-%m-%d']), default=None,
+              help='Fecha de evaluación (YYYY-MM-DD). Por defecto hoy')
+def mora_incremental_command(tamano_lote, fecha):
+    """Recalcula la mora solo de lo que cambió desde la última ejecución (job diario)."""
+    from app.services.mora_service import MoraService
+
+    resultado = MoraService.recalcular_mora_incremental(
+        tamano_lote=tamano_lote,
+        as_of=fecha.date() if fecha else None
+    )
+    _mostrar_resultado_mora(resultado)
+
+
+# ============================================================================
+# PEP
+# ============================================================================
+
+pep_cli = AppGroup('pep', help='Mantenimiento del dataset de Personas Expuestas Políticamente')
+
+
+@pep_cli.command('compilar')
+@click.option('--origen', type=click.Path(exists=True, dir_okay=False), default=None,
+              help='Excel PEP de origen. Por defecto dataset-pep/Autoridades_Electas.xls')
+@click.option('--destino', type=click.Path(dir_okay=False), default=None,
+              help='Índice .npy a generar. Por defecto junto al Excel')
+@click.option('--si-desactualizado', is_flag=True, default=False,
+              help='No recompilar si el índice ya corresponde al Excel')
+def compilar_pep_command(origen, destino, si_desactualizado):
+    """Compila el Excel PEP a un índice binario ordenado (uint32) para mmap."""
+    from app.services.pep_service import PEPService
+
+    if si_desactualizado and PEPService.indice_vigente(origen, destino):
+        click.echo("Índice PEP vigente, no se recompila")
+        return
+
+    try:
+        resultado = PEPService.compilar_indice(origen, destino)
+    except (OSError, ValueError) as e:
+        raise click.ClickException(f"No se pudo compilar el índice PEP: {e}")
+    click.echo(f"Índice PEP compilado: {resultado['total_registros']} DNIs -> {resultado['destino']}")
+
+
+@pep_cli.command('validar-lote')
+@click.argument('archivo', type=click.File('r', encoding='utf-8-sig'))
+@click.option('--solo-pep', is_flag=True, default=False, help='Imprimir solo los DNIs encontrados')
+def validar_lote_pep_command(archivo, solo_pep):
+    """Valida los DNIs de un CSV (primera columna; '-' para stdin). Imprime CSV dni,es_pep,valido."""
+    from app.services.pep_service import PEPService
+
+    resultado = PEPService.validar_pep_lote(PEPService.leer_dnis_csv(archivo), solo_pep=solo_pep)
+
+    click.echo('dni,es_pep,valido')
+    for fila in resultado['resultados']:
+        click.echo(f"{fila['dni']},{int(fila['es_pep'])},{int(fila['valido'])}")
+    click.echo(
+        f"{resultado['total']} DNIs, {resultado['total_pep']} PEP, {resultado['invalidos']} inválidos "
+        f"(dataset {resultado['version_dataset']})",
+        err=True
+    )
+
+
+@pep_cli.command('revalidar-clientes')
+@click.option('--desmarcar', is_flag=True, default=False,
+              help='Quitar el flag PEP a clientes que ya no están en el dataset')
+@click.option('--tamano-lote', default=1000, show_default=True, type=click.IntRange(min=1),
+              help='IDs por UPDATE masivo')
+def revalidar_clientes_pep_command(desmarcar, tamano_lote):
+    """Revalida el flag PEP de toda la tabla clientes contra el dataset vigente."""
+    from app.services.cliente_service import ClienteService
+
+    resumen, error = ClienteService.revalidar_pep_cartera(desmarcar=desmarcar, tamano_lote=tamano_lote)
+    if error:
+        raise click.ClickException(error)
+
+    click.echo(f"Dataset PEP versión: {resumen['version_dataset']}")
+    click.echo(f"Clientes revisados: {resumen['total_clientes']} ({resumen['en_dataset']} en el dataset)")
+    click.echo(f"Marcados como PEP: {resumen['marcados']}")
+    click.echo(f"Desmarcados: {resumen['desmarcados']}")
+    if resumen['pep_fuera_del_dataset']:
+        click.echo(f"PEP fuera del dataset (sin cambios): {resumen['pep_fuera_del_dataset']}")
+    click.echo(f"Duración: {resumen['duracion_segundos']}s")
+
+
+@pep_cli.command('screening-nombres')
+@click.option('--k', default=3, show_default=True, type=click.IntRange(min=1, max=50),
+              help='Máximo de candidatos por cliente')
+@click.option('--umbral', default=None, type=click.FloatRange(min=0, max=1, min_open=True),
+              help='Similitud mínima 0-1. Por defecto la del servicio')
+@click.option('--solo-no-pep', is_flag=True, default=False,
+              help='Revisar solo clientes que hoy no están marcados como PEP')
+def screening_nombres_pep_command(k, umbral, solo_no_pep):
+    """Busca coincidencias por nombre de todos los clientes en el dataset PEP. Imprime CSV."""
+    from app.services.cliente_service import ClienteService
+
+    resumen, error = ClienteService.buscar_coincidencias_nombre_pep(k=k, umbral=umbral, solo_no_pep=solo_no_pep)
+    if error:
+        raise click.ClickException(error)
+
+    salida = io.StringIO()
+    writer = csv.writer(salida, lineterminator='\n')
+    writer.writerow(['cliente_id', 'dni', 'nombre_completo', 'pep', 'nombre_pep', 'dni_pep',
+                     'cargo_pep', 'similitud', 'mismo_dni'])
+    for coincidencia in resumen['coincidencias']:
+        for candidato in coincidencia['candidatos']:
+            writer.writerow([
+                coincidencia['cliente_id'], coincidencia['dni'], coincidencia['nombre_completo'],
+                int(coincidencia['pep']), candidato['nombre'], candidato['dni'] or '',
+                candidato['cargo'] or '', candidato['similitud'], int(candidato['mismo_dni'])
+            ])
+    click.echo(salida.getvalue(), nl=False)
+    click.echo(
+        f"{resumen['clientes_con_coincidencias']} de {resumen['total_clientes']} clientes con coincidencias "
+        f"(umbral {resumen['umbral']}, {resumen['duracion_segundos']}s)",
+        err=True
+    )
+
+
+# ============================================================================
+# CLIENTES
+# ============================================================================
+
+clientes_cli = AppGroup('clientes', help='Procesos masivos sobre la cartera de clientes')
+
+
+@clientes_cli.command('enriquecer')
+@click.argument('archivo', type=click.File('r', encoding='utf-8-sig'))
+@click.option('--bitacora', required=True, type=click.Path(dir_okay=False),
+              help='Archivo JSONL de resultados; con uno existente se reanuda el trabajo')
+@click.option('--hilos', default=None, type=click.IntRange(min=1),
+              help='Consultas simultáneas. Por defecto RENIEC_MAX_CONCURRENTES')
+@click.option('--por-segundo', default=None, type=click.FloatRange(min=0),
+              help='Cuota de consultas por segundo (0 = sin límite). Por defecto RENIEC_CUOTA_POR_SEGUNDO')
+@click.option('--tamano-lote', default=100, show_default=True, type=click.IntRange(min=1),
+              help='Clientes por transacción')
+@click.option('--reintentos', default=2, show_default=True, type=click.IntRange(min=0),
+              help='Reintentos por DNI ante errores transitorios')
+def enriquecer_clientes_command(archivo, bitacora, hilos, por_segundo, tamano_lote, reintentos):
+    """Resuelve en RENIEC los DNIs de un CSV (dni[,correo]; '-' para stdin) y crea los clientes."""
+    from flask import current_app
+    from app.services.enriquecimiento_service import EnriquecimientoService
+
+    resumen, error = EnriquecimientoService.enriquecer_prospectos(
+        EnriquecimientoService.leer_prospectos_csv(archivo),
+        bitacora,
+        hilos=hilos or current_app.config.get('RENIEC_MAX_CONCURRENTES', 4),
+        por_segundo=current_app.config.get('RENIEC_CUOTA_POR_SEGUNDO', 5) if por_segundo is None else por_segundo,
+        tamano_lote=tamano_lote,
+        reintentos=reintentos
+    )
+    if error:
+        raise click.ClickException(error)
+
+    click.echo(f"DNIs: {resumen['total']} ({resumen['invalidos']} inválidos)")
+    click.echo(f"Ya registrados: {resumen['existentes']}")
+    click.echo(f"Resueltos en ejecuciones anteriores: {resumen['reanudados']}")
+    click.echo(f"Consultados: {resumen['consultados']} ({resumen['consultas_por_segundo']} consultas/s)")
+    click.echo(f"Clientes creados: {resumen['creados']}")
+    click.echo(f"No encontrados en RENIEC: {resumen['no_encontrados']}")
+    if resumen['errores']:
+        click.echo(f"Con error (se reintentan al reanudar): {resumen['errores']}")
+    click.echo(f"Duración: {resumen['duracion_segundos']}s")
+
+
+# ============================================================================
+# CAJA
+# ============================================================================
+
+caja_cli = AppGroup('caja', help='Mantenimiento de los agregados de caja')
+
+
+@caja_cli.command('reconstruir-resumen')
+@click.option('--desde', type=click.DateTime(formats=['%Y-%m-%d']), default=None,
+              help='Primer día a reconstruir (YYYY-MM-DD). Por defecto desde el primer movimiento')
+@click.option('--hasta', type=click.DateTime(formats=['%Y-%m-%d']), default=None,
+              help='Último día a reconstruir (YYYY-MM-DD). Por defecto hasta el último movimiento')
+def reconstruir_resumen_caja_command(desde, hasta):
+    """Recalcula caja_resumen_diario desde pagos y egresos (backfill o corrección)."""
+    from app.crud.caja_resumen_crud import reconstruir_resumen_caja
+
+    resumen, error = reconstruir_resumen_caja(
+        fecha_inicio=desde.date() if desde else None,
+        fecha_fin=hasta.date() if hasta else None
+    )
+    if error:
+        raise click.ClickException(error)
+
+    click.echo(f"Días reconstruidos: {resumen['dias']}")
+    click.echo(f"Filas (día, medio de pago): {resumen['filas']}")
+
+
+def register_commands(app):
+    """
+    Registra los grupos de comandos CLI en la aplicación.
+
+    Args:
+        app: Instancia de Flask
+    """
+    app.cli.add_command(mora_cli)
+    app.cli.add_command(pep_cli)
+    app.cli.add_command(clientes_cli)
+    app.cli.add_command(caja_cli)
+
+
+__all__ = [
+    'register_commands',
+    'mora_cli',
+    'pep_cli',
+    'clientes_cli',
+    'caja_cli'
+]
@@ -60,6 +60,20 @@ class Config:
     # API Externa DNI
     DNI_API_KEY = os.environ.get('DNI_API_KEY')
     DNI_API_URL = os.environ.get('DNI_API_URL', 'https://api.apis.net.pe/v2/reniec/dni')
+    RENIEC_TIMEOUT = float(os.environ.get('RENIEC_TIMEOUT', '10'))  # Segundos por consulta
+    RENIEC_CACHE_TTL = int(os.environ.get('RENIEC_CACHE_TTL', '3600'))  # Consultas exitosas: 1 hora
+    RENIEC_CACHE_TTL_NEGATIVO = int(os.environ.get('RENIEC_CACHE_TTL_NEGATIVO', '60'))  # "No encontrado": 1 minuto
+    RENIEC_CACHE_MAX_ENTRADAS = int(os.environ.get('RENIEC_CACHE_MAX_ENTRADAS', '10000'))
+    RENIEC_MAX_CONEXIONES = int(os.environ.get('RENIEC_MAX_CONEXIONES', '10'))  # Pool de conexiones persistentes
+    RENIEC_MAX_CONCURRENTES = int(os.environ.get('RENIEC_MAX_CONCURRENTES', '4'))  # Bulkhead: llamadas simultáneas
+    RENIEC_LATENCIA_LENTA = float(os.environ.get('RENIEC_LATENCIA_LENTA', '3'))  # Segundos: más lento cuenta como fallo
+    RENIEC_CUOTA_POR_SEGUNDO = float(os.environ.get('RENIEC_CUOTA_POR_SEGUNDO', '5'))  # Cuota del proveedor en trabajos masivos
+    
+    # Dataset PEP: precarga en segundo plano al crear la app
+    PEP_PRECARGA = _str_to_bool(os.environ.get('PEP_PRECARGA', 'true'))
+    PEP_TIMEOUT_CONSULTA = float(os.environ.get('PEP_TIMEOUT_CONSULTA', '10'))  # Segundos de espera por consulta
+    PEP_INTERVALO_RECARGA = float(os.environ.get('PEP_INTERVALO_RECARGA', '60'))  # Segundos entre revisiones (0 = sin recarga)
+    PEP_LOTE_MAX_DNIS = int(os.environ.get('PEP_LOTE_MAX_DNIS', '50000'))  # Tope de DNIs por validación en lote
     
     # Cache Configuration
     CACHE_TYPE = os.environ.get('CACHE_TYPE', 'SimpleCache')  # SimpleCache, RedisCache, FileSystemCache
@@ -73,6 +87,7 @@ class Config:
     COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', '1024'))  # 1KB
     SLOW_QUERY_THRESHOLD = float(os.environ.get('SLOW_QUERY_THRESHOLD', '0.1'))  # 100ms en segundos
     SLOW_REQUEST_THRESHOLD = int(os.environ.get('SLOW_REQUEST_THRESHOLD', '500'))  # 500ms
+    SIMULACION_LOTE_MAX_ESCENARIOS = int(os.environ.get('SIMULACION_LOTE_MAX_ESCENARIOS', '2000'))  # Tope por request
     
     # Flow Payment Gateway Configuration
     FLOW_API_KEY = os.environ.get('FLOW_API_KEY', '').strip()
@@ -81,6 +96,22 @@ class Config:
     FLOW_API_URL_PROD = os.environ.get('FLOW_API_URL_PROD', 'https://www.flow.cl/api')
     FLOW_SANDBOX_MODE = _str_to_bool(os.environ.get('FLOW_SANDBOX_MODE', 'true'))
     FLOW_BYPASS_MODE = _str_to_bool(os.environ.get('FLOW_BYPASS_MODE', 'false'))  # Procesar pagos sin Flow (testing)
+    FLOW_TIMEOUT = float(os.environ.get('FLOW_TIMEOUT', '15'))  # Segundos por llamada
+    FLOW_MAX_CONCURRENTES = int(os.environ.get('FLOW_MAX_CONCURRENTES', '4'))  # Bulkhead: llamadas simultáneas
+    FLOW_LATENCIA_LENTA = float(os.environ.get('FLOW_LATENCIA_LENTA', '8'))  # Segundos: más lento cuenta como fallo
+    
+    # Circuit breaker de dependencias externas (RENIEC, Flow)
+    CIRCUITO_UMBRAL_FALLOS = int(os.environ.get('CIRCUITO_UMBRAL_FALLOS', '5'))  # Fallos consecutivos que lo abren
+    CIRCUITO_TIEMPO_APERTURA = float(os.environ.get('CIRCUITO_TIEMPO_APERTURA', '30'))  # Segundos abierto antes de sondear
+    CIRCUITO_ESPERA_CUPO = float(os.environ.get('CIRCUITO_ESPERA_CUPO', '0.5'))  # Segundos esperando cupo del bulkhead
+    
+    # Eventos en vivo del cuadre de caja (SSE)
+    EVENTOS_BACKEND = os.environ.get('EVENTOS_BACKEND', 'memoria')  # memoria (un proceso) | redis (varios workers)
+    EVENTOS_REDIS_URL = os.environ.get('EVENTOS_REDIS_URL', CACHE_REDIS_URL)
+    EVENTOS_HISTORIAL = int(os.environ.get('EVENTOS_HISTORIAL', '200'))  # Eventos recientes para reanudar con Last-Event-ID
+    EVENTOS_MAX_PENDIENTES = int(os.environ.get('EVENTOS_MAX_PENDIENTES', '100'))  # Sin leer antes de forzar resincronización
+    CAJA_SSE_LATIDO = float(os.environ.get('CAJA_SSE_LATIDO', '15'))  # Segundos entre keep-alive
+    CAJA_SSE_DURACION_MAXIMA = float(os.environ.get('CAJA_SSE_DURACION_MAXIMA', '300'))  # El navegador se reconecta solo
     
     # Public URL for webhooks (use ngrok URL in development)
     PUBLIC_URL = os.environ.get('PUBLIC_URL', '').strip()
@@ -134,6 +165,9 @@ class ProductionConfig(Config):
     CACHE_TYPE = 'RedisCache'
     CACHE_DEFAULT_TIMEOUT = 600  # 10 minutos
     
+    # Varios workers de gunicorn: los eventos de caja deben pasar por Redis
+    EVENTOS_BACKEND = os.environ.get('EVENTOS_BACKEND', 'redis')
+    
     # Performance profiling deshabilitado (overhead mínimo)
     ENABLE_QUERY_PROFILING = False
     ENABLE_COMPRESSION = True
@@ -154,6 +188,10 @@ class TestingConfig(Config):
     # No enviar emails reales en tests
     MAIL_SUPPRESS_SEND = True
     
+    # El dataset PEP se carga bajo demanda en tests
+    PEP_PRECARGA = False
+    PEP_INTERVALO_RECARGA = 0
+    
     # Cookies sin HTTPS en tests
     SESSION_COOKIE_SECURE = False
 
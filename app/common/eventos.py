@@ -0,0 +1,226 @@
+"""
+Eventos en vivo (pub/sub) para pantallas conectadas por SSE
+- BrokerMemoria: pub/sub dentro del proceso; sirve con un solo worker
+- BrokerRedis: publica en Redis y reparte localmente; necesario con varios workers de gunicorn
+- Cada suscriptor tiene una cola acotada: un cliente lento no frena a los demás,
+  si se llena se marca para resincronizar (volver a pedir el estado completo)
+- Se guarda un historial corto por canal para reanudar con Last-Event-ID tras una reconexión
+"""
+
+import json
+import logging
+import queue
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Suscripcion:
+    """Cola de eventos pendientes de un cliente conectado"""
+
+    def __init__(self, canal: str, max_pendientes: int):
+        self.canal = canal
+        self._cola: queue.Queue = queue.Queue(maxsize=max_pendientes)
+        self.desincronizada = False
+
+    def entregar(self, evento: Dict[str, Any]) -> None:
+        """Encola el evento; si el cliente no da abasto se marca para resincronizar."""
+        if self.desincronizada:
+            return
+        try:
+            self._cola.put_nowait(evento)
+        except queue.Full:
+            self.desincronizada = True
+
+    def siguiente(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """Próximo evento, o None si no llegó ninguno en `timeout` segundos."""
+        try:
+            return self._cola.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def resincronizar(self) -> None:
+        """Descarta lo pendiente: el cliente va a recargar el estado completo."""
+        while True:
+            try:
+                self._cola.get_nowait()
+            except queue.Empty:
+                break
+        self.desincronizada = False
+
+
+class BrokerMemoria:
+    """Pub/sub en memoria del proceso con historial corto por canal"""
+
+    def __init__(self, historial: int = 200, max_pendientes: int = 100):
+        """
+        Args:
+            historial: Eventos recientes por canal que se guardan para reanudar con Last-Event-ID
+            max_pendientes: Eventos sin leer por suscriptor antes de pedirle resincronizar
+        """
+        self.historial = historial
+        self.max_pendientes = max_pendientes
+        self._lock = threading.Lock()
+        self._suscripciones: Dict[str, List[Suscripcion]] = {}
+        self._recientes: Dict[str, deque] = {}
+        self._ultimo_id = 0
+
+    def publicar(self, canal: str, tipo: str, datos: Dict[str, Any]) -> Dict[str, Any]:
+        """Publica un evento en el canal y lo devuelve con su id."""
+        with self._lock:
+            self._ultimo_id += 1
+            evento = {'id': self._ultimo_id, 'tipo': tipo, 'datos': datos}
+        self._distribuir(canal, evento)
+        return evento
+
+    def _distribuir(self, canal: str, evento: Dict[str, Any]) -> None:
+        with self._lock:
+            self._ultimo_id = max(self._ultimo_id, evento['id'])
+            self._recientes.setdefault(canal, deque(maxlen=self.historial)).append(evento)
+            suscripciones = list(self._suscripciones.get(canal, ()))
+        for suscripcion in suscripciones:
+            suscripcion.entregar(evento)
+
+    def suscribir(self, canal: str, ultimo_id: Optional[int] = None) -> Suscripcion:
+        """
+        Registra un suscriptor. Con `ultimo_id` (Last-Event-ID) reenvía lo que se perdió
+        durante la reconexión; si ya salió del historial, la suscripción nace desincronizada.
+        """
+        suscripcion = Suscripcion(canal, self.max_pendientes)
+        with self._lock:
+            if ultimo_id is not None:
+                recientes = self._recientes.get(canal, ())
+                perdidos = [evento for evento in recientes if evento['id'] > ultimo_id]
+                hueco = bool(recientes) and recientes[0]['id'] > ultimo_id + 1
+                if ultimo_id > self._ultimo_id or hueco:
+                    # Historial insuficiente o ids de otro proceso/reinicio
+                    suscripcion.desincronizada = True
+                else:
+                    for evento in perdidos:
+                        suscripcion.entregar(evento)
+            self._suscripciones.setdefault(canal, []).append(suscripcion)
+        return suscripcion
+
+    def cancelar(self, suscripcion: Suscripcion) -> None:
+        with self._lock:
+            suscripciones = self._suscripciones.get(suscripcion.canal, [])
+            if suscripcion in suscripciones:
+                suscripciones.remove(suscripcion)
+
+    def ultimo_id(self) -> int:
+        with self._lock:
+            return self._ultimo_id
+
+    def conectados(self, canal: str) -> int:
+        with self._lock:
+            return len(self._suscripciones.get(canal, ()))
+
+
+class BrokerRedis(BrokerMemoria):
+    """
+    Publica en Redis (PUBLISH) y un hilo por proceso reparte lo recibido a los
+    suscriptores locales. Los ids salen de un contador en Redis (INCR), así que
+    Last-Event-ID sirve aunque la reconexión caiga en otro worker.
+    """
+
+    PREFIJO = 'eventos'
+
+    def __init__(self, url: str, **parametros):
+        super().__init__(**parametros)
+        import redis
+        self._redis = redis.Redis.from_url(url)
+        self._oyente: Optional[threading.Thread] = None
+        self._lock_oyente = threading.Lock()
+
+    def publicar(self, canal: str, tipo: str, datos: Dict[str, Any]) -> Dict[str, Any]:
+        evento = {'id': int(self._redis.incr(f'{self.PREFIJO}:{canal}:id')), 'tipo': tipo, 'datos': datos}
+        self._redis.publish(f'{self.PREFIJO}:{canal}', json.dumps(evento, default=str))
+        return evento
+
+    def suscribir(self, canal: str, ultimo_id: Optional[int] = None) -> Suscripcion:
+        self._iniciar_oyente()
+        if ultimo_id is not None and ultimo_id > self.ultimo_id():
+            # Proceso recién iniciado: el contador de Redis sabe si el cliente está al día
+            actual = int(self._redis.get(f'{self.PREFIJO}:{canal}:id') or 0)
+            with self._lock:
+                self._ultimo_id = max(self._ultimo_id, actual)
+        return super().suscribir(canal, ultimo_id)
+
+    def _iniciar_oyente(self) -> None:
+        with self._lock_oyente:
+            if self._oyente and self._oyente.is_alive():
+                return
+            self._oyente = threading.Thread(target=self._escuchar, name='eventos-redis', daemon=True)
+            self._oyente.start()
+
+    def _escuchar(self) -> None:
+        pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        try:
+            pubsub.psubscribe(f'{self.PREFIJO}:*')
+            for mensaje in pubsub.listen():
+                canal = mensaje['channel'].decode().split(':', 1)[1]
+                try:
+                    self._distribuir(canal, json.loads(mensaje['data']))
+                except (ValueError, KeyError) as exc:
+                    logger.warning(f"Evento inválido en {mensaje['channel']!r}: {exc}")
+        except Exception as exc:
+            # Las pantallas se reconectan solas; la próxima suscripción levanta otro oyente
+            logger.error(f"Oyente de eventos Redis detenido: {exc}", exc_info=True)
+        finally:
+            pubsub.close()
+
+
+# ==================== BROKER DE LA APLICACIÓN ====================
+
+_broker: Optional[BrokerMemoria] = None
+
+
+def configurar_eventos(backend: str = 'memoria', redis_url: Optional[str] = None, **parametros) -> BrokerMemoria:
+    """Crea el broker de eventos del proceso ('memoria' | 'redis')."""
+    global _broker
+    if backend == 'redis':
+        _broker = BrokerRedis(redis_url, **parametros)
+    elif backend == 'memoria':
+        _broker = BrokerMemoria(**parametros)
+    else:
+        raise ValueError(f"Backend de eventos desconocido: {backend}")
+    return _broker
+
+
+def obtener_broker() -> BrokerMemoria:
+    """Devuelve el broker configurado (en memoria si no se configuró)."""
+    global _broker
+    if _broker is None:
+        _broker = BrokerMemoria()
+    return _broker
+
+
+def publicar_evento(canal: str, tipo: str, datos: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Publica sin propagar errores: se llama después del commit y una falla del
+    broker no debe deshacer ni fallar la operación que ya se guardó.
+    """
+    try:
+        return obtener_broker().publicar(canal, tipo, datos)
+    except Exception as exc:
+        logger.warning(f"No se pudo publicar el evento {tipo} en {canal}: {exc}")
+        return None
+
+
+def formatear_sse(evento: Dict[str, Any]) -> str:
+    """Serializa un evento en el formato de text/event-stream."""
+    datos = json.dumps(evento['datos'], default=str)
+    return f"id: {evento['id']}\nevent: {evento['tipo']}\ndata: {datos}\n\n"
+
+
+__all__ = [
+    'Suscripcion',
+    'BrokerMemoria',
+    'BrokerRedis',
+    'configurar_eventos',
+    'obtener_broker',
+    'publicar_evento',
+    'formatear_sse'
+]
@@ -7,8 +7,10 @@ y facilitar la configuración de la aplicación.
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_mail import Mail
+from flask_caching import Cache
 
 # Inicializar extensiones sin app (se vinculan en create_app)
 db = SQLAlchemy()
 migrate = Migrate()
 mail = Mail()
+cache = Cache()
@@ -0,0 +1,204 @@
+"""
+Paginación por cursor (keyset)
+En lugar de OFFSET, cada página continúa desde la clave de orden de la última fila
+mostrada: WHERE (fecha, id) < (:fecha, :id) ORDER BY fecha DESC, id DESC LIMIT n.
+Con un índice sobre esas columnas la página N cuesta lo mismo que la primera.
+
+- Cursores opacos y firmados (SECRET_KEY): el cliente no puede fabricarlos ni alterarlos
+- Navegación hacia adelante y hacia atrás
+- Total opcional: exacto (COUNT) o estimado por el planificador de PostgreSQL
+"""
+
+import json
+import logging
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from flask import current_app
+from itsdangerous import BadSignature, URLSafeSerializer
+from sqlalchemy import func, select, text, tuple_
+
+from app.common.errors import ValidationError
+from app.common.extensions import db
+
+logger = logging.getLogger(__name__)
+
+SIGUIENTE = 's'
+ANTERIOR = 'a'
+MODOS_TOTAL = ('exacto', 'estimado')
+
+
+class PaginaCursor:
+    """Página de resultados con los cursores para moverse a la siguiente / anterior"""
+
+    def __init__(self, items: List[Any], siguiente_cursor: Optional[str] = None,
+                 anterior_cursor: Optional[str] = None, total: Optional[int] = None,
+                 total_estimado: bool = False, por_pagina: int = 20):
+        self.items = items
+        self.siguiente_cursor = siguiente_cursor
+        self.anterior_cursor = anterior_cursor
+        self.total = total
+        self.total_estimado = total_estimado
+        self.por_pagina = por_pagina
+
+    @property
+    def has_next(self) -> bool:
+        return self.siguiente_cursor is not None
+
+    @property
+    def has_prev(self) -> bool:
+        return self.anterior_cursor is not None
+
+    def to_dict(self, serializar: Callable[[Any], Any] = lambda item: item.to_dict()) -> dict:
+        return {
+            'items': [serializar(item) for item in self.items],
+            'siguiente_cursor': self.siguiente_cursor,
+            'anterior_cursor': self.anterior_cursor,
+            'por_pagina': self.por_pagina,
+            'total': self.total,
+            'total_estimado': self.total_estimado
+        }
+
+
+# ==================== CURSORES ====================
+
+def _serializador() -> URLSafeSerializer:
+    return URLSafeSerializer(current_app.config['SECRET_KEY'], salt='cursor-paginacion')
+
+
+def _a_json(valor):
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    if isinstance(valor, Decimal):
+        return str(valor)
+    return valor
+
+
+def _desde_json(valor, columna):
+    if valor is None:
+        return None
+    tipo = columna.type.python_type
+    if tipo is datetime:
+        return datetime.fromisoformat(valor)
+    if tipo is date:
+        return date.fromisoformat(valor)
+    return tipo(valor)
+
+
+def codificar_cursor(valores: Sequence[Any], direccion: str = SIGUIENTE) -> str:
+    """Cursor opaco con la clave de orden de una fila y la dirección de avance."""
+    return _serializador().dumps([direccion, [_a_json(v) for v in valores]])
+
+
+def decodificar_cursor(cursor: str, columnas: Sequence[Any]) -> Tuple[str, Tuple[Any, ...]]:
+    """
+    Returns:
+        tuple: (dirección, valores de la clave tipados según las columnas)
+
+    Raises:
+        ValidationError: Cursor alterado, de otra clave de orden o mal formado
+    """
+    try:
+        direccion, valores = _serializador().loads(cursor)
+        if direccion not in (SIGUIENTE, ANTERIOR) or len(valores) != len(columnas):
+            raise ValueError('estructura inválida')
+        return direccion, tuple(_desde_json(v, c) for v, c in zip(valores, columnas))
+    except (BadSignature, ValueError, TypeError) as exc:
+        logger.warning(f"Cursor de paginación inválido: {exc}")
+        raise ValidationError('Cursor de paginación inválido')
+
+
+# ==================== PAGINACIÓN ====================
+
+def paginar_por_cursor(query, columnas: Sequence[Any], clave: Callable[[Any], Sequence[Any]],
+                       cursor: Optional[str] = None, por_pagina: int = 20) -> PaginaCursor:
+    """
+    Pagina una query ORM en orden descendente por `columnas` (la última debe ser única).
+
+    Args:
+        query: Query sin ORDER BY ni LIMIT
+        columnas: Columnas de la clave de orden, p. ej. (Cliente.fecha_registro, Cliente.cliente_id)
+        clave: Extrae de un item los valores de esas columnas
+        cursor: Cursor recibido de una página anterior (None = primera página)
+        por_pagina: Filas por página
+
+    Returns:
+        PaginaCursor (sin total; ver contar_filas)
+    """
+    direccion, valores = (SIGUIENTE, None) if not cursor else decodificar_cursor(cursor, columnas)
+
+    if direccion == SIGUIENTE:
+        if valores is not None:
+            query = query.filter(tuple_(*columnas) < tuple_(*valores))
+        query = query.order_by(*[c.desc() for c in columnas])
+    else:
+        query = query.filter(tuple_(*columnas) > tuple_(*valores))
+        query = query.order_by(*[c.asc() for c in columnas])
+
+    filas = query.limit(por_pagina + 1).all()
+    hay_mas = len(filas) > por_pagina
+    items = filas[:por_pagina]
+
+    if direccion == SIGUIENTE:
+        siguiente = codificar_cursor(clave(items[-1]), SIGUIENTE) if hay_mas else None
+        anterior = codificar_cursor(clave(items[0]), ANTERIOR) if valores is not None and items else None
+    else:
+        items.reverse()
+        anterior = codificar_cursor(clave(items[0]), ANTERIOR) if hay_mas else None
+        siguiente = codificar_cursor(clave(items[-1]), SIGUIENTE) if items else None
+
+    return PaginaCursor(items, siguiente, anterior, por_pagina=por_pagina)
+
+
+def contar_filas(query, modo: Optional[str], tabla: Optional[str] = None) -> Tuple[Optional[int], bool]:
+    """
+    Total de filas de una query según el modo pedido.
+
+    Args:
+        query: Query ORM sin ORDER BY ni LIMIT
+        modo: None (no contar), 'exacto' (COUNT) o 'estimado'
+        tabla: Si la query no tiene filtros, nombre de la tabla para leer pg_class.reltuples
+
+    Returns:
+        tuple: (total o None, True si es una estimación)
+    """
+    if not modo:
+        return None, False
+
+    if modo == 'estimado' and db.engine.dialect.name == 'postgresql':
+        try:
+            with db.session.begin_nested():  # Un error de EXPLAIN no invalida la transacción
+                return _estimar_filas(query, tabla), True
+        except Exception as exc:
+            logger.warning(f"No se pudo estimar el total, se usa COUNT: {exc}")
+
+    total = db.session.execute(
+        select(func.count()).select_from(query.order_by(None).subquery())
+    ).scalar()
+    return total, False
+
+
+def _estimar_filas(query, tabla):
+    """Filas estimadas: pg_class.reltuples de la tabla o, con filtros, las del plan de EXPLAIN."""
+    if tabla:
+        reltuples = db.session.execute(
+            text('SELECT reltuples FROM pg_class WHERE oid = to_regclass(:tabla)'), {'tabla': tabla}
+        ).scalar()
+        if reltuples is not None and reltuples >= 0:
+            return int(reltuples)
+    conexion = db.session.connection()
+    sql = query.statement.compile(dialect=conexion.dialect)
+    plan = conexion.exec_driver_sql(f'EXPLAIN (FORMAT JSON) {sql}', sql.params).scalar()
+    plan = plan if isinstance(plan, list) else json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+__all__ = [
+    'PaginaCursor',
+    'codificar_cursor',
+    'decodificar_cursor',
+    'paginar_por_cursor',
+    'contar_filas',
+    'MODOS_TOTAL'
+]
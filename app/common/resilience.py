@@ -0,0 +1,338 @@
+"""
+Resiliencia de dependencias externas
+Circuit breaker + bulkhead por dependencia (RENIEC, Flow):
+- Bulkhead: tope de llamadas simultáneas; si no hay cupo se rechaza en vez de bloquear un worker
+- Circuit breaker: tras N fallos consecutivos se abre y falla rápido durante tiempo_apertura
+- Semiabierto: pasado ese tiempo deja pasar sondeos; un éxito lo cierra, un fallo lo reabre
+- Llamadas más lentas que latencia_lenta cuentan como fallo aunque respondan
+- LimitadorTasa: token bucket para respetar la cuota de llamadas por segundo del proveedor
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from app.common.errors import ServiceUnavailableError
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitoAbiertoError(ServiceUnavailableError):
+    """La dependencia está fallando: el circuito rechaza llamadas sin intentarlas"""
+
+    def __init__(self, nombre: str, reintento_en: float):
+        super().__init__(
+            f"Servicio {nombre} no disponible temporalmente, reintente en {max(reintento_en, 0):.0f}s",
+            payload={'dependencia': nombre, 'reintento_en': round(max(reintento_en, 0), 1)}
+        )
+
+
+class CapacidadAgotadaError(ServiceUnavailableError):
+    """Todas las llamadas permitidas a la dependencia están en curso"""
+
+    def __init__(self, nombre: str):
+        super().__init__(
+            f"Servicio {nombre} saturado, demasiadas consultas simultáneas",
+            payload={'dependencia': nombre}
+        )
+
+
+class CircuitBreaker:
+    """Circuit breaker con bulkhead (semáforo de concurrencia) para una dependencia"""
+
+    CERRADO = 'cerrado'
+    ABIERTO = 'abierto'
+    SEMIABIERTO = 'semiabierto'
+
+    def __init__(
+        self,
+        nombre: str,
+        max_concurrentes: int = 4,
+        espera_cupo: float = 0.0,
+        umbral_fallos: int = 5,
+        tiempo_apertura: float = 30.0,
+        sondeos_semiabierto: int = 1,
+        latencia_lenta: Optional[float] = None,
+        excepciones: tuple = (Exception,)
+    ):
+        """
+        Args:
+            nombre: Nombre de la dependencia (para logs y métricas)
+            max_concurrentes: Llamadas simultáneas permitidas
+            espera_cupo: Segundos que se espera un cupo libre antes de rechazar
+            umbral_fallos: Fallos consecutivos que abren el circuito
+            tiempo_apertura: Segundos que el circuito permanece abierto
+            sondeos_semiabierto: Llamadas de prueba simultáneas en estado semiabierto
+            latencia_lenta: Segundos a partir de los cuales una llamada cuenta como fallo (None = sin límite)
+            excepciones: Excepciones que cuentan como fallo de la dependencia
+        """
+        self.nombre = nombre
+        self._lock = threading.Lock()
+        self._estado = self.CERRADO
+        self._fallos_consecutivos = 0
+        self._abierto_hasta = 0.0
+        self._sondeos_en_curso = 0
+        self._metricas = {
+            'llamadas': 0, 'exitos': 0, 'fallos': 0, 'lentas': 0,
+            'rechazadas_abierto': 0, 'rechazadas_capacidad': 0, 'aperturas': 0
+        }
+        self._latencia_total = 0.0
+        self._latencia_max = 0.0
+        self._en_curso = 0
+        self.max_concurrentes = None
+        self.latencia_lenta = None
+        self.configurar(
+            max_concurrentes=max_concurrentes,
+            espera_cupo=espera_cupo,
+            umbral_fallos=umbral_fallos,
+            tiempo_apertura=tiempo_apertura,
+            sondeos_semiabierto=sondeos_semiabierto,
+            latencia_lenta=latencia_lenta,
+            excepciones=excepciones
+        )
+
+    def configurar(self, max_concurrentes=None, espera_cupo=None, umbral_fallos=None, tiempo_apertura=None,
+                   sondeos_semiabierto=None, latencia_lenta=None, excepciones=None) -> None:
+        """Actualiza los parámetros sin perder estado ni métricas (None = sin cambio, latencia_lenta 0 = sin límite)."""
+        with self._lock:
+            if max_concurrentes is not None and max(int(max_concurrentes), 1) != self.max_concurrentes:
+                # Las llamadas en curso liberan el semáforo anterior
+                self.max_concurrentes = max(int(max_concurrentes), 1)
+                self._cupos = threading.BoundedSemaphore(self.max_concurrentes)
+            if espera_cupo is not None:
+                self.espera_cupo = max(float(espera_cupo), 0.0)
+            if umbral_fallos is not None:
+                self.umbral_fallos = max(int(umbral_fallos), 1)
+            if tiempo_apertura is not None:
+                self.tiempo_apertura = max(float(tiempo_apertura), 0.0)
+            if sondeos_semiabierto is not None:
+                self.sondeos_semiabierto = max(int(sondeos_semiabierto), 1)
+            if latencia_lenta is not None:
+                self.latencia_lenta = float(latencia_lenta) if latencia_lenta > 0 else None
+            if excepciones is not None:
+                self.excepciones = tuple(excepciones)
+
+    # ==================== API PÚBLICA ====================
+
+    def ejecutar(self, funcion: Callable, *args, es_fallo: Optional[Callable[[Any], bool]] = None, **kwargs) -> Any:
+        """
+        Ejecuta funcion(*args, **kwargs) protegida por el circuito y el bulkhead.
+
+        Args:
+            funcion: Llamada a la dependencia
+            es_fallo: Clasifica un resultado devuelto como fallo (p. ej. HTTP 5xx)
+
+        Returns:
+            El resultado de la función
+
+        Raises:
+            CircuitoAbiertoError: El circuito está abierto o sin cupo de sondeo
+            CapacidadAgotadaError: No hay cupo de concurrencia disponible
+            Las excepciones de la propia función (contadas como fallo si están en `excepciones`)
+        """
+        sondeo = self._admitir()
+
+        cupos = self._cupos
+        if self.espera_cupo:
+            adquirido = cupos.acquire(timeout=self.espera_cupo)
+        else:
+            adquirido = cupos.acquire(blocking=False)
+        if not adquirido:
+            with self._lock:
+                self._metricas['rechazadas_capacidad'] += 1
+                if sondeo:
+                    self._sondeos_en_curso -= 1
+            logger.warning(f"Bulkhead {self.nombre}: sin cupo ({self.max_concurrentes} llamadas en curso)")
+            raise CapacidadAgotadaError(self.nombre)
+
+        with self._lock:
+            self._en_curso += 1
+        inicio = time.monotonic()
+        try:
+            resultado = funcion(*args, **kwargs)
+        except self.excepciones:
+            self._registrar(False, time.monotonic() - inicio, sondeo)
+            raise
+        except BaseException:
+            self._registrar(None, time.monotonic() - inicio, sondeo)
+            raise
+        else:
+            fallido = bool(es_fallo(resultado)) if es_fallo else False
+            self._registrar(not fallido, time.monotonic() - inicio, sondeo)
+            return resultado
+        finally:
+            with self._lock:
+                self._en_curso -= 1
+            cupos.release()
+
+    @property
+    def estado(self) -> str:
+        with self._lock:
+            return self._estado_actual()
+
+    def metricas(self) -> Dict[str, Any]:
+        with self._lock:
+            estado = self._estado_actual()
+            completadas = self._metricas['exitos'] + self._metricas['fallos']
+            return {
+                'estado': estado,
+                **self._metricas,
+                'en_curso': self._en_curso,
+                'max_concurrentes': self.max_concurrentes,
+                'fallos_consecutivos': self._fallos_consecutivos,
+                'reintento_en': round(max(self._abierto_hasta - time.monotonic(), 0), 1)
+                                if estado == self.ABIERTO else 0,
+                'latencia_promedio_ms': round(self._latencia_total / completadas * 1000, 1) if completadas else 0,
+                'latencia_max_ms': round(self._latencia_max * 1000, 1)
+            }
+
+    def reiniciar(self) -> None:
+        """Cierra el circuito y pone a cero las métricas."""
+        with self._lock:
+            self._estado = self.CERRADO
+            self._fallos_consecutivos = 0
+            self._abierto_hasta = 0.0
+            self._sondeos_en_curso = 0
+            for clave in self._metricas:
+                self._metricas[clave] = 0
+            self._latencia_total = 0.0
+            self._latencia_max = 0.0
+
+    # ==================== ESTADO ====================
+
+    def _estado_actual(self) -> str:
+        """Pasa de abierto a semiabierto cuando vence tiempo_apertura (llamar con el lock tomado)."""
+        if self._estado == self.ABIERTO and time.monotonic() >= self._abierto_hasta:
+            self._estado = self.SEMIABIERTO
+            self._sondeos_en_curso = 0
+            logger.info(f"Circuito {self.nombre}: semiabierto, probando la dependencia")
+        return self._estado
+
+    def _admitir(self) -> bool:
+        """Decide si la llamada pasa. Devuelve True si es un sondeo del estado semiabierto."""
+        with self._lock:
+            estado = self._estado_actual()
+            if estado == self.ABIERTO:
+                self._metricas['rechazadas_abierto'] += 1
+                raise CircuitoAbiertoError(self.nombre, self._abierto_hasta - time.monotonic())
+            if estado == self.SEMIABIERTO:
+                if self._sondeos_en_curso >= self.sondeos_semiabierto:
+                    self._metricas['rechazadas_abierto'] += 1
+                    raise CircuitoAbiertoError(self.nombre, 0)
+                self._sondeos_en_curso += 1
+                return True
+            return False
+
+    def _registrar(self, exito: Optional[bool], duracion: float, sondeo: bool) -> None:
+        """Actualiza métricas y estado. exito None = interrupción ajena a la dependencia."""
+        with self._lock:
+            if sondeo:
+                self._sondeos_en_curso = max(self._sondeos_en_curso - 1, 0)
+            if exito is None:
+                return
+
+            self._metricas['llamadas'] += 1
+            self._latencia_total += duracion
+            self._latencia_max = max(self._latencia_max, duracion)
+            if exito and self.latencia_lenta is not None and duracion > self.latencia_lenta:
+                self._metricas['lentas'] += 1
+                exito = False
+
+            if exito:
+                self._metricas['exitos'] += 1
+                self._fallos_consecutivos = 0
+                if self._estado == self.SEMIABIERTO:
+                    self._estado = self.CERRADO
+                    logger.info(f"Circuito {self.nombre}: cerrado, la dependencia se recuperó")
+                return
+
+            self._metricas['fallos'] += 1
+            self._fallos_consecutivos += 1
+            if self._estado == self.SEMIABIERTO or (
+                self._estado == self.CERRADO and self._fallos_consecutivos >= self.umbral_fallos
+            ):
+                self._estado = self.ABIERTO
+                self._abierto_hasta = time.monotonic() + self.tiempo_apertura
+                self._metricas['aperturas'] += 1
+                logger.warning(
+                    f"Circuito {self.nombre}: abierto por {self.tiempo_apertura}s "
+                    f"tras {self._fallos_consecutivos} fallos consecutivos"
+                )
+
+
+class LimitadorTasa:
+    """
+    Token bucket thread-safe: como máximo `por_segundo` llamadas por segundo,
+    con ráfagas de hasta `rafaga`. Para ajustarse a la cuota del proveedor.
+    """
+
+    def __init__(self, por_segundo: float, rafaga: int = 1):
+        self.por_segundo = float(por_segundo)
+        self.rafaga = max(int(rafaga), 1)
+        self._lock = threading.Lock()
+        self._fichas = float(self.rafaga)
+        self._ultima = time.monotonic()
+
+    def adquirir(self) -> float:
+        """Bloquea hasta que haya una ficha libre. Devuelve los segundos esperados."""
+        if self.por_segundo <= 0:
+            return 0.0
+        esperado = 0.0
+        while True:
+            with self._lock:
+                ahora = time.monotonic()
+                self._fichas = min(self.rafaga, self._fichas + (ahora - self._ultima) * self.por_segundo)
+                self._ultima = ahora
+                if self._fichas >= 1:
+                    self._fichas -= 1
+                    return esperado
+                espera = (1 - self._fichas) / self.por_segundo
+            time.sleep(espera)
+            esperado += espera
+
+
+# ==================== REGISTRO POR DEPENDENCIA ====================
+
+_circuitos: Dict[str, CircuitBreaker] = {}
+_lock_registro = threading.Lock()
+
+
+def configurar_circuito(nombre: str, **parametros) -> CircuitBreaker:
+    """Crea el circuito de una dependencia o actualiza sus parámetros si ya existe."""
+    with _lock_registro:
+        circuito = _circuitos.get(nombre)
+        if circuito is None:
+            circuito = CircuitBreaker(nombre, **parametros)
+            _circuitos[nombre] = circuito
+        else:
+            circuito.configurar(**parametros)
+        return circuito
+
+
+def obtener_circuito(nombre: str) -> CircuitBreaker:
+    """Devuelve el circuito de la dependencia (con parámetros por defecto si no se configuró)."""
+    with _lock_registro:
+        circuito = _circuitos.get(nombre)
+        if circuito is None:
+            circuito = CircuitBreaker(nombre)
+            _circuitos[nombre] = circuito
+        return circuito
+
+
+def metricas_circuitos() -> Dict[str, Dict[str, Any]]:
+    """Métricas de todos los circuitos registrados."""
+    with _lock_registro:
+        circuitos = list(_circuitos.values())
+    return {circuito.nombre: circuito.metricas() for circuito in circuitos}
+
+
+__all__ = [
+    'CircuitBreaker',
+    'CircuitoAbiertoError',
+    'CapacidadAgotadaError',
+    'LimitadorTasa',
+    'configurar_circuito',
+    'obtener_circuito',
+    'metricas_circuitos'
+]
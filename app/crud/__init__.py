@@ -7,3 +7,4 @@ from app.crud.prestamo_crud import *
 from app.crud.cuota_crud import *
 from app.crud.declaracion_crud import *
 from app.crud.pago_crud import *
+from app.crud.caja_resumen_crud import *
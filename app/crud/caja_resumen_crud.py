@@ -0,0 +1,209 @@
+"""
+Resumen diario de caja (tabla caja_resumen_diario)
+Los acumuladores se llaman dentro de la transacción que registra el pago / egreso,
+antes del commit: el agregado y el movimiento se confirman (o se revierten) juntos.
+"""
+import logging
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import DateTime, func
+
+from app.common.extensions import db
+from app.models import Pago, Egreso, MedioPagoEnum, CajaResumenDiario, CierreCaja
+
+logger = logging.getLogger(__name__)
+
+CAMPOS_RESUMEN = (
+    'cantidad_pagos', 'monto_pagado', 'monto_mora', 'ajuste_redondeo', 'vuelto',
+    'cantidad_egresos', 'monto_egresos'
+)
+
+# Los egresos salen del efectivo de la caja
+MEDIO_EGRESOS = MedioPagoEnum.EFECTIVO
+
+
+def filtro_rango_fechas(columna, fecha_inicio: Optional[date] = None,
+                        fecha_fin: Optional[date] = None) -> List:
+    """
+    Condiciones del rango de días [fecha_inicio, fecha_fin] como intervalo semiabierto
+    columna >= inicio AND columna < fin + 1 día, sobre una columna DATE o TIMESTAMP.
+    La columna se compara tal cual (nunca func.date(columna)) para que su índice btree
+    resuelva el rango en lugar de recorrer toda la tabla.
+    """
+    es_timestamp = isinstance(columna.type, DateTime)
+
+    def limite(dia: date):
+        return datetime.combine(dia, time.min) if es_timestamp else dia
+
+    condiciones = []
+    if fecha_inicio:
+        condiciones.append(columna >= limite(fecha_inicio))
+    if fecha_fin:
+        condiciones.append(columna < limite(fecha_fin + timedelta(days=1)))
+    return condiciones
+
+
+def _insert_con_upsert():
+    """INSERT ... ON CONFLICT del dialecto activo, o None si no lo soporta."""
+    dialecto = db.session.get_bind().dialect.name
+    if dialecto == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialecto == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+    return insert
+
+
+def acumular_resumen_caja(fecha: date, medio_pago: MedioPagoEnum, **incrementos) -> None:
+    """
+    Suma los incrementos a la fila (fecha, medio_pago), creándola si no existe.
+    Es un único UPSERT atómico: dos cajeros registrando a la vez no pierden montos.
+    No hace commit.
+    """
+    valores = {campo: incrementos.get(campo) or 0 for campo in CAMPOS_RESUMEN}
+    insert = _insert_con_upsert()
+
+    if insert is None:
+        fila = db.session.query(CajaResumenDiario).filter_by(
+            fecha=fecha, medio_pago=medio_pago
+        ).with_for_update().first()
+        if not fila:
+            fila = CajaResumenDiario(fecha=fecha, medio_pago=medio_pago, **{c: 0 for c in CAMPOS_RESUMEN})
+            db.session.add(fila)
+        for campo, valor in valores.items():
+            setattr(fila, campo, (getattr(fila, campo) or 0) + valor)
+        return
+
+    tabla = CajaResumenDiario.__table__
+    sentencia = insert(tabla).values(fecha=fecha, medio_pago=medio_pago, fecha_actualizacion=func.now(), **valores)
+    sentencia = sentencia.on_conflict_do_update(
+        index_elements=[tabla.c.fecha, tabla.c.medio_pago],
+        set_={
+            **{campo: tabla.c[campo] + sentencia.excluded[campo] for campo in CAMPOS_RESUMEN},
+            'fecha_actualizacion': func.now()
+        }
+    )
+    db.session.execute(sentencia)
+
+
+def acumular_pago(pago: Pago, signo: int = 1) -> None:
+    """Suma (signo=1) o descuenta (signo=-1) un pago del resumen de su día."""
+    acumular_resumen_caja(
+        pago.fecha_pago,
+        pago.medio_pago,
+        cantidad_pagos=signo,
+        monto_pagado=signo * Decimal(pago.monto_pagado or 0),
+        monto_mora=signo * Decimal(pago.monto_mora or 0),
+        ajuste_redondeo=signo * Decimal(pago.ajuste_redondeo or 0),
+        vuelto=signo * Decimal(pago.vuelto or 0)
+    )
+
+
+def acumular_egreso(egreso: Egreso, signo: int = 1) -> None:
+    """Suma (signo=1) o descuenta (signo=-1) un egreso del resumen de su día."""
+    acumular_resumen_caja(
+        egreso.fecha_registro.date(),
+        MEDIO_EGRESOS,
+        cantidad_egresos=signo,
+        monto_egresos=signo * Decimal(egreso.monto or 0)
+    )
+
+
+def obtener_cierre_vigente(fecha: date) -> Optional[CierreCaja]:
+    """Cierre de la fecha que no fue reabierto, si existe."""
+    return db.session.query(CierreCaja).filter(
+        CierreCaja.fecha == fecha,
+        CierreCaja.fecha_reapertura.is_(None)
+    ).first()
+
+
+def error_caja_cerrada(fecha: date) -> Optional[str]:
+    """
+    Mensaje de error si el día tiene un cierre vigente, None si admite movimientos.
+    Un día cerrado se reporta con la foto del cierre: un pago o egreso posterior
+    quedaría fuera del cuadre, así que hay que reabrir la caja antes.
+    """
+    if obtener_cierre_vigente(fecha):
+        return f"La caja del {fecha.isoformat()} está cerrada; reábrala para registrar movimientos"
+    return None
+
+
+def listar_resumen_caja(fecha_inicio: date, fecha_fin: Optional[date] = None) -> List[CajaResumenDiario]:
+    """Filas del resumen entre dos fechas (inclusive), ordenadas por fecha y medio."""
+    return db.session.query(CajaResumenDiario).filter(
+        *filtro_rango_fechas(CajaResumenDiario.fecha, fecha_inicio, fecha_fin)
+    ).order_by(CajaResumenDiario.fecha, CajaResumenDiario.medio_pago).all()
+
+
+def consulta_pagos_por_dia(fecha_inicio: Optional[date] = None, fecha_fin: Optional[date] = None):
+    """Totales de pagos por (fecha_pago, medio_pago); usa ix_pagos_fecha_pago_medio."""
+    return db.session.query(
+        Pago.fecha_pago,
+        Pago.medio_pago,
+        func.count(Pago.pago_id),
+        func.coalesce(func.sum(Pago.monto_pagado), 0),
+        func.coalesce(func.sum(Pago.monto_mora), 0),
+        func.coalesce(func.sum(Pago.ajuste_redondeo), 0),
+        func.coalesce(func.sum(Pago.vuelto), 0)
+    ).filter(
+        *filtro_rango_fechas(Pago.fecha_pago, fecha_inicio, fecha_fin)
+    ).group_by(Pago.fecha_pago, Pago.medio_pago)
+
+
+def consulta_egresos_por_dia(fecha_inicio: Optional[date] = None, fecha_fin: Optional[date] = None):
+    """Totales de egresos por día; el rango se filtra sobre ix_egresos_fecha_registro."""
+    dia = func.date(Egreso.fecha_registro, type_=db.Date)
+    return db.session.query(
+        dia,
+        func.count(Egreso.egreso_id),
+        func.coalesce(func.sum(Egreso.monto), 0)
+    ).filter(
+        *filtro_rango_fechas(Egreso.fecha_registro, fecha_inicio, fecha_fin)
+    ).group_by(dia)
+
+
+def reconstruir_resumen_caja(fecha_inicio: Optional[date] = None,
+                             fecha_fin: Optional[date] = None) -> Tuple[Optional[Dict], Optional[str]]:
+    """
+    Recalcula el resumen desde pagos y egresos (backfill o corrección).
+    Reemplaza las filas del rango en una sola transacción.
+
+    Args:
+        fecha_inicio: Primer día a reconstruir (None = desde el primer movimiento)
+        fecha_fin: Último día a reconstruir (None = hasta el último movimiento)
+
+    Returns:
+        Tuple[resumen {'dias', 'filas'}, error]
+    """
+    try:
+        filas = defaultdict(lambda: {campo: 0 for campo in CAMPOS_RESUMEN})
+        for fecha, medio, cantidad, pagado, mora, ajuste, vuelto in consulta_pagos_por_dia(fecha_inicio, fecha_fin):
+            filas[(fecha, medio)].update(
+                cantidad_pagos=cantidad, monto_pagado=pagado, monto_mora=mora,
+                ajuste_redondeo=ajuste, vuelto=vuelto
+            )
+        for fecha, cantidad, monto in consulta_egresos_por_dia(fecha_inicio, fecha_fin):
+            filas[(fecha, MEDIO_EGRESOS)].update(cantidad_egresos=cantidad, monto_egresos=monto)
+
+        db.session.query(CajaResumenDiario).filter(
+            *filtro_rango_fechas(CajaResumenDiario.fecha, fecha_inicio, fecha_fin)
+        ).delete(synchronize_session=False)
+        db.session.add_all(
+            CajaResumenDiario(fecha=fecha, medio_pago=medio, **valores)
+            for (fecha, medio), valores in filas.items()
+        )
+        db.session.commit()
+
+        resumen = {'dias': len({fecha for fecha, _ in filas}), 'filas': len(filas)}
+        logger.info(f"Resumen de caja reconstruido ({fecha_inicio or 'inicio'} → {fecha_fin or 'fin'}): {resumen}")
+        return resumen, None
+
+    except Exception as exc:
+        db.session.rollback()
+        logger.error(f"Error al reconstruir resumen de caja: {exc}", exc_info=True)
+        return None, str(exc)
+
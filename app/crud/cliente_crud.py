@@ -2,7 +2,10 @@
 CRUD de Clientes
 Operaciones de base de datos para el modelo Cliente
 """
+from sqlalchemy import and_, func
+
 from app.common.extensions import db
+from app.common.pagination import paginar_por_cursor, contar_filas
 from app.models import Cliente, Prestamo
 from app.services.cliente_service import ClienteService
 from app.services.pep_service import PEPService
@@ -100,24 +103,78 @@ def obtener_clientes_por_estado_prestamo():
     ).scalars().all()
 
 
+# ==================== BÚSQUEDA ====================
+# En PostgreSQL los ILIKE '%...%' usan los índices GIN de pg_trgm de la
+# migración 003 (ix_clientes_dni_trgm, ix_clientes_busqueda_trgm) en vez de
+# recorrer toda la tabla. pg_trgm necesita al menos 3 caracteres para filtrar
+# por índice; con menos la consulta sigue siendo correcta, solo más lenta.
+
+def texto_busqueda_cliente():
+    """
+    Nombre y apellidos concatenados. Debe coincidir exactamente con la expresión
+    del índice ix_clientes_busqueda_trgm para que PostgreSQL lo use.
+    """
+    return Cliente.nombre_completo + ' ' + Cliente.apellido_paterno + ' ' + \
+        func.coalesce(Cliente.apellido_materno, '')
+
+
+def _escapar_like(texto):
+    """Escapa los comodines de LIKE para buscar el texto literal."""
+    return texto.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def filtro_dni(dni):
+    """
+    DNI que contiene el texto buscado. Un DNI completo (8 dígitos) se resuelve
+    por igualdad con el índice único ix_clientes_dni.
+    """
+    dni = (dni or '').strip()
+    if not dni:
+        return None
+    if len(dni) == 8 and dni.isdigit():
+        return Cliente.dni == dni
+    return Cliente.dni.ilike(f'%{_escapar_like(dni)}%', escape='\\')
+
+
+def filtro_busqueda_clientes(termino):
+    """
+    Filtro de la caja de búsqueda de clientes: solo dígitos busca por DNI;
+    cualquier otro texto busca cada palabra en nombre y apellidos.
+    
+    Returns:
+        Expresión SQLAlchemy para .filter(), o None si no hay nada que buscar
+    """
+    termino = (termino or '').strip()
+    if not termino:
+        return None
+    if termino.isdigit():
+        return filtro_dni(termino)
+    texto = texto_busqueda_cliente()
+    return and_(*[
+        texto.ilike(f'%{_escapar_like(palabra)}%', escape='\\') for palabra in termino.split()
+    ])
+
+
 # ==================== PAGINACIÓN ====================
 
-def paginar_clientes(page=1, per_page=5, dni=None):
+def paginar_clientes(page=1, per_page=5, dni=None, busqueda=None):
     """
-    Pagina clientes con búsqueda opcional por DNI.
+    Pagina clientes con búsqueda opcional por DNI o por nombre.
     
     Args:
         page: Número de página
         per_page: Elementos por página
-        dni: DNI para filtrar (opcional)
+        dni: DNI (o parte) para filtrar (opcional)
+        busqueda: DNI o nombre/apellidos, ver filtro_busqueda_clientes (opcional)
         
     Returns:
         Pagination: Objeto de paginación de Flask-SQLAlchemy
     """
     query = Cliente.query
     
-    if dni:
-        query = query.filter(Cliente.dni.ilike(f'%{dni}%'))
+    for filtro in (filtro_dni(dni), filtro_busqueda_clientes(busqueda)):
+        if filtro is not None:
+            query = query.filter(filtro)
     
     return query.order_by(Cliente.fecha_registro.desc()).paginate(
         page=page,
@@ -126,25 +183,12 @@ def paginar_clientes(page=1, per_page=5, dni=None):
     )
 
 
-def obtener_clientes_con_prestamos_info(page=1, per_page=5, dni=None):
+def _consulta_clientes_con_prestamos():
     """
-    Obtiene clientes con información agregada de sus préstamos.
-    
-    Incluye:
-    - Monto total prestado (suma correcta sin duplicados)
-    - Total de préstamos
-    - Total de cuotas
-    - Préstamos vigentes
-    
-    Args:
-        page: Número de página
-        per_page: Elementos por página
-        dni: DNI para filtrar (opcional)
-        
-    Returns:
-        Pagination: Objeto de paginación con datos agregados
+    Clientes con agregados de sus préstamos: (cliente, monto_total_prestado,
+    total_prestamos, total_cuotas, prestamos_vigentes), agrupado por cliente.
     """
-    from sqlalchemy import func, case, select
+    from sqlalchemy import case, select
     from app.models import Cuota, EstadoPrestamoEnum
     
     # Subconsulta para contar cuotas por préstamo (evita multiplicación)
@@ -158,7 +202,7 @@ def obtener_clientes_con_prestamos_info(page=1, per_page=5, dni=None):
     )
     
     # Query principal con LEFT JOIN a la subconsulta
-    query = db.session.query(
+    return db.session.query(
         Cliente,
         func.coalesce(func.sum(Prestamo.monto_total), 0).label('monto_total_prestado'),
         func.count(Prestamo.prestamo_id).label('total_prestamos'),
@@ -171,10 +215,92 @@ def obtener_clientes_con_prestamos_info(page=1, per_page=5, dni=None):
     ).outerjoin(
         cuotas_subquery, Prestamo.prestamo_id == cuotas_subquery.c.prestamo_id
     ).group_by(Cliente.cliente_id)
+
+
+def obtener_clientes_con_prestamos_info(page=1, per_page=5, dni=None, busqueda=None):
+    """
+    Obtiene clientes con información agregada de sus préstamos.
+    Paginación por OFFSET; para listados grandes usar listar_clientes_con_prestamos_cursor.
     
-    if dni:
-        query = query.filter(Cliente.dni.ilike(f'%{dni}%'))
+    Incluye:
+    - Monto total prestado (suma correcta sin duplicados)
+    - Total de préstamos
+    - Total de cuotas
+    - Préstamos vigentes
+    
+    Args:
+        page: Número de página
+        per_page: Elementos por página
+        dni: DNI (o parte) para filtrar (opcional)
+        busqueda: DNI o nombre/apellidos, ver filtro_busqueda_clientes (opcional)
+        
+    Returns:
+        Pagination: Objeto de paginación con datos agregados
+    """
+    query = _consulta_clientes_con_prestamos()
+    
+    for filtro in (filtro_dni(dni), filtro_busqueda_clientes(busqueda)):
+        if filtro is not None:
+            query = query.filter(filtro)
     
     query = query.order_by(Cliente.fecha_registro.desc())
     
-    return query.paginate(page=page, per_page=per_page, error_out=False)
\ No newline at end of file
+    return query.paginate(page=page, per_page=per_page, error_out=False)
+
+
+# ==================== PAGINACIÓN POR CURSOR ====================
+# Keyset sobre (fecha_registro, cliente_id), índice ix_clientes_fecha_registro_id
+# (migración 004): la página N cuesta lo mismo que la primera y el total es opcional.
+
+COLUMNAS_ORDEN_CLIENTES = (Cliente.fecha_registro, Cliente.cliente_id)
+
+
+def _clave_cliente(cliente):
+    return cliente.fecha_registro, cliente.cliente_id
+
+
+def listar_clientes_cursor(cursor=None, por_pagina=20, busqueda=None, total=None):
+    """
+    Lista clientes del más reciente al más antiguo, paginando por cursor.
+    
+    Args:
+        cursor: Cursor opaco de la página anterior (None = primera página)
+        por_pagina: Clientes por página
+        busqueda: DNI o nombre/apellidos, ver filtro_busqueda_clientes (opcional)
+        total: None (sin total), 'exacto' o 'estimado'
+        
+    Returns:
+        PaginaCursor: items = [Cliente], con siguiente_cursor / anterior_cursor
+        
+    Raises:
+        ValidationError: Si el cursor no es válido
+    """
+    query = Cliente.query
+    filtro = filtro_busqueda_clientes(busqueda)
+    if filtro is not None:
+        query = query.filter(filtro)
+    
+    pagina = paginar_por_cursor(query, COLUMNAS_ORDEN_CLIENTES, _clave_cliente, cursor, por_pagina)
+    pagina.total, pagina.total_estimado = contar_filas(
+        query, total, tabla=Cliente.__tablename__ if filtro is None else None
+    )
+    return pagina
+
+
+def listar_clientes_con_prestamos_cursor(cursor=None, por_pagina=5, busqueda=None, total=None):
+    """
+    Como listar_clientes_cursor, con los agregados de préstamos de obtener_clientes_con_prestamos_info.
+    Los agregados se calculan solo para los clientes de la página.
+    
+    Returns:
+        PaginaCursor: items = [(cliente, monto_total_prestado, total_prestamos, total_cuotas, prestamos_vigentes)]
+    """
+    pagina = listar_clientes_cursor(cursor, por_pagina, busqueda, total)
+    if pagina.items:
+        ids = [cliente.cliente_id for cliente in pagina.items]
+        agregados = {
+            fila[0].cliente_id: fila
+            for fila in _consulta_clientes_con_prestamos().filter(Cliente.cliente_id.in_(ids)).all()
+        }
+        pagina.items = [agregados[cliente_id] for cliente_id in ids]
+    return pagina
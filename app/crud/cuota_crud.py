@@ -1,15 +1,13 @@
 from app.common.extensions import db
 from app.models import Cuota
 from datetime import date
+from sqlalchemy import insert
 
-def crear_cuotas_bulk(cuotas_lista): # → Crear múltiples cuotas en una sola transacción
-    try:
-        db.session.add_all(cuotas_lista)
-        db.session.commit()
-        return cuotas_lista
-    except Exception as e:
-        db.session.rollback()
-        raise Exception(f"Error al crear cuotas: {str(e)}")
+def insertar_cuotas_bulk(filas): # → INSERT multi-fila de cuotas (sin commit: la transacción la controla quien llama)
+    if not filas:
+        return 0
+    db.session.execute(insert(Cuota), filas)
+    return len(filas)
 
 def listar_cuotas_por_prestamo(prestamo_id): # → Listar todas las cuotas de un préstamo ordenadas por número
     return db.session.execute(
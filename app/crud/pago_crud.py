@@ -5,6 +5,7 @@ from decimal import Decimal
 
 from app.common.extensions import db
 from app.models import Pago, Cuota, MedioPagoEnum
+from app.crud.caja_resumen_crud import acumular_pago, error_caja_cerrada
 
 logger = logging.getLogger(__name__)
 
@@ -49,6 +50,9 @@ def registrar_pago(
             return None, f"Cuota {cuota_id} no encontrada"
 
         fecha_pago = fecha_pago or date.today()
+        error = error_caja_cerrada(fecha_pago)
+        if error:
+            return None, error
 
         # Asegurar que medio_pago es un enum
         if isinstance(medio_pago, str):
@@ -70,6 +74,7 @@ def registrar_pago(
         )
 
         db.session.add(pago)
+        acumular_pago(pago)  # Mismo commit que el pago
         db.session.commit()
 
         logger.info(f"Pago registrado: ID={pago.pago_id}, Cuota={cuota_id}, Monto={monto_pagado}, Mora={monto_mora}")
@@ -135,9 +140,17 @@ def actualizar_pago(
         if not pago:
             return None, f"Pago {pago_id} no encontrado"
 
+        nueva_fecha = campos.get('fecha_pago', pago.fecha_pago)
+        for fecha in {pago.fecha_pago, nueva_fecha}:
+            error = error_caja_cerrada(fecha)
+            if error:
+                return None, error
+
+        acumular_pago(pago, signo=-1)  # Se descuenta con los valores previos y se vuelve a sumar
         for campo, valor in campos.items():
             if hasattr(pago, campo):
                 setattr(pago, campo, valor)
+        acumular_pago(pago)
 
         db.session.commit()
         logger.info(f"Pago {pago_id} actualizado")
@@ -155,6 +168,10 @@ def devolver_pago(pago_id: int) -> Tuple[bool, Optional[str]]:
         if not pago:
             return False, f"Pago {pago_id} no encontrado"
 
+        error = error_caja_cerrada(pago.fecha_pago)
+        if error:
+            return False, error
+
         cuota = Cuota.query.get(pago.cuota_id)
         if not cuota:
             return False, f"Cuota {pago.cuota_id} no encontrada"
@@ -168,6 +185,7 @@ def devolver_pago(pago_id: int) -> Tuple[bool, Optional[str]]:
         # Restaurar mora
         cuota.mora_acumulada = (cuota.mora_acumulada or 0) + pago.monto_mora
 
+        acumular_pago(pago, signo=-1)
         db.session.delete(pago)
         db.session.commit()
 
@@ -1,11 +1,15 @@
 from app.common.extensions import db
 from app.models import Prestamo
+from app.crud.cuota_crud import insertar_cuotas_bulk
 
-def crear_prestamo(prestamo): # → Crear un nuevo préstamo
+def crear_prestamo_con_cuotas(prestamo, filas_cuotas): # → Crear préstamo y cronograma en una sola transacción
     try:
         db.session.add(prestamo)
+        db.session.flush()  # Obtener el ID generado sin confirmar todavía
+        for fila in filas_cuotas:
+            fila['prestamo_id'] = prestamo.prestamo_id
+        insertar_cuotas_bulk(filas_cuotas)
         db.session.commit()
-        db.session.refresh(prestamo)  # Refrescar para obtener el ID generado
         return prestamo
     except Exception as e:
         db.session.rollback()
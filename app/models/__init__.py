@@ -7,6 +7,9 @@ from app.models.pago import Pago, MedioPagoEnum
 from app.models.usuario import Usuario
 from app.models.egreso import Egreso
 from app.models.apertura_caja import AperturaCaja
+from app.models.ejecucion_proceso import EjecucionProceso
+from app.models.caja_resumen_diario import CajaResumenDiario
+from app.models.cierre_caja import CierreCaja
 
 __all__ = [
     'Cliente',
@@ -19,5 +22,8 @@ __all__ = [
     'MedioPagoEnum',
     'Usuario',
     'Egreso',
-    'AperturaCaja'
+    'AperturaCaja',
+    'EjecucionProceso',
+    'CajaResumenDiario',
+    'CierreCaja'
 ]
@@ -9,7 +9,7 @@ class AperturaCaja(db.Model):
     fecha = db.Column(db.Date, nullable=False)
     monto = db.Column(db.Numeric(12, 2), nullable=False)
     usuario_id = db.Column(db.Integer, nullable=True)
-    fecha_registro = db.Column(db.DateTime, server_default=db.text('now()'), nullable=False)
+    fecha_registro = db.Column(db.DateTime, server_default=db.func.now(), nullable=False)
 
     def to_dict(self):
         return {
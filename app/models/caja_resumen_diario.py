@@ -0,0 +1,43 @@
+from datetime import datetime
+from sqlalchemy import Enum as SQLAlchemyEnum
+from app.common.extensions import db
+from app.models.pago import MedioPagoEnum
+
+
+class CajaResumenDiario(db.Model):
+    """
+    Agregado diario de caja por medio de pago.
+    Se actualiza en la misma transacción que registra cada pago / egreso, así los
+    reportes de caja leen a lo sumo una fila por día y medio en lugar de recorrer pagos.
+    Los egresos (vueltos, retiros) salen del efectivo: se acumulan en la fila EFECTIVO.
+    """
+    __tablename__ = 'caja_resumen_diario'
+
+    fecha = db.Column(db.Date, primary_key=True)
+    medio_pago = db.Column(SQLAlchemyEnum(MedioPagoEnum), primary_key=True)
+
+    cantidad_pagos = db.Column(db.Integer, default=0, nullable=False)
+    monto_pagado = db.Column(db.Numeric(14, 2), default=0, nullable=False)
+    monto_mora = db.Column(db.Numeric(14, 2), default=0, nullable=False)
+    ajuste_redondeo = db.Column(db.Numeric(14, 2), default=0, nullable=False)
+    vuelto = db.Column(db.Numeric(14, 2), default=0, nullable=False)
+    cantidad_egresos = db.Column(db.Integer, default=0, nullable=False)
+    monto_egresos = db.Column(db.Numeric(14, 2), default=0, nullable=False)
+
+    fecha_actualizacion = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now, nullable=False)
+
+    def to_dict(self):
+        return {
+            'fecha': self.fecha.isoformat() if self.fecha else None,
+            'medio_pago': self.medio_pago.value if self.medio_pago else None,
+            'cantidad_pagos': self.cantidad_pagos,
+            'monto_pagado': float(self.monto_pagado or 0),
+            'monto_mora': float(self.monto_mora or 0),
+            'ajuste_redondeo': float(self.ajuste_redondeo or 0),
+            'vuelto': float(self.vuelto or 0),
+            'cantidad_egresos': self.cantidad_egresos,
+            'monto_egresos': float(self.monto_egresos or 0)
+        }
+
+    def __repr__(self):
+        return f"<CajaResumenDiario {self.fecha} {self.medio_pago} - S/ {self.monto_pagado}>"
@@ -0,0 +1,50 @@
+from datetime import datetime
+from app.common.extensions import db
+
+
+class CierreCaja(db.Model):
+    """
+    Foto inmutable de la caja al momento del cierre de un día.
+    Los montos no se modifican después de creada: al reabrir la caja solo se marca
+    fecha_reapertura y un nuevo cierre crea otra fila. El cierre vigente de una fecha
+    es el que no tiene fecha_reapertura.
+    """
+    __tablename__ = 'cierres_caja'
+
+    cierre_id = db.Column(db.Integer, primary_key=True)
+    fecha = db.Column(db.Date, nullable=False)
+
+    monto_apertura = db.Column(db.Numeric(12, 2), nullable=False)
+    total_recaudado = db.Column(db.Numeric(14, 2), nullable=False)
+    total_egresos = db.Column(db.Numeric(14, 2), nullable=False)
+    monto_esperado = db.Column(db.Numeric(14, 2), nullable=False)
+    monto_real = db.Column(db.Numeric(14, 2), nullable=False)
+    diferencia = db.Column(db.Numeric(14, 2), nullable=False)
+    incidencia = db.Column(db.String(10), nullable=True)  # None | 'SOBRA' | 'FALTA'
+
+    # Resumen diario completo al cierre (detalle por medio de pago y totales)
+    resumen = db.Column(db.JSON, nullable=False)
+
+    usuario_id = db.Column(db.Integer, nullable=True)
+    fecha_registro = db.Column(db.DateTime, default=datetime.now, nullable=False)
+    fecha_reapertura = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        return {
+            'cierre_id': self.cierre_id,
+            'fecha': self.fecha.isoformat() if self.fecha else None,
+            'monto_apertura': float(self.monto_apertura),
+            'total_recaudado': float(self.total_recaudado),
+            'total_egresos': float(self.total_egresos),
+            'monto_esperado': float(self.monto_esperado),
+            'monto_real': float(self.monto_real),
+            'diferencia': float(self.diferencia),
+            'incidencia': self.incidencia,
+            'detalle_por_medio': (self.resumen or {}).get('detalle_por_medio', []),
+            'usuario_id': self.usuario_id,
+            'fecha_registro': self.fecha_registro.isoformat() if self.fecha_registro else None,
+            'fecha_reapertura': self.fecha_reapertura.isoformat() if self.fecha_reapertura else None
+        }
+
+    def __repr__(self):
+        return f"<CierreCaja {self.cierre_id} Fecha {self.fecha} Diferencia {self.diferencia}>"
@@ -11,7 +11,7 @@ class Cliente(db.Model):
     apellido_materno = db.Column(db.String(100))
     correo_electronico = db.Column(db.String(100), nullable=False)
     pep = db.Column(db.Boolean, default=False, nullable=False)
-    fecha_registro = db.Column(db.DateTime, server_default=db.func.now())
+    fecha_registro = db.Column(db.DateTime, server_default=db.func.now(), nullable=False)  # Clave del cursor de paginación
 
     prestamos = relationship("Prestamo", back_populates="cliente")
     declaraciones_juradas = relationship("DeclaracionJurada", back_populates="cliente")
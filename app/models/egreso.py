@@ -10,7 +10,7 @@ class Egreso(db.Model):
     monto = db.Column(db.Numeric(12, 2), nullable=False)
     concepto = db.Column(db.String(255), nullable=False)
     usuario_id = db.Column(db.Integer, nullable=True)
-    fecha_registro = db.Column(db.DateTime, server_default=db.text('now()'), nullable=False)
+    fecha_registro = db.Column(db.DateTime, server_default=db.func.now(), nullable=False)
 
     def to_dict(self):
         return {
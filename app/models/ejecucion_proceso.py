@@ -0,0 +1,24 @@
+from datetime import datetime
+from app.common.extensions import db
+
+
+class EjecucionProceso(db.Model):
+    """
+    Marca de agua (watermark) de los procesos batch.
+    Guarda la última fecha evaluada por cada proceso (p. ej. 'mora_incremental').
+    """
+    __tablename__ = 'ejecuciones_proceso'
+
+    proceso = db.Column(db.String(50), primary_key=True)
+    fecha_corte = db.Column(db.Date, nullable=False)  # Última fecha de evaluación completada
+    fecha_registro = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now, nullable=False)
+
+    def to_dict(self):
+        return {
+            'proceso': self.proceso,
+            'fecha_corte': self.fecha_corte.isoformat() if self.fecha_corte else None,
+            'fecha_registro': self.fecha_registro.isoformat() if self.fecha_registro else None
+        }
+
+    def __repr__(self):
+        return f"<EjecucionProceso {self.proceso} corte {self.fecha_corte}>"
@@ -2,12 +2,14 @@
 API v1 - Endpoints de Clientes
 Endpoints REST que retornan JSON
 """
-from flask import jsonify, request
+from flask import jsonify, request, current_app
+from itertools import islice
+import io
 import logging
 
 from app.routes import api_v1_bp
 from app.crud import (
-    listar_clientes,
+    listar_clientes_cursor,
     obtener_cliente_por_id,
     obtener_cliente_por_dni,
     actualizar_cliente,
@@ -19,6 +21,9 @@ from app.crud import (
 )
 from app.models import EstadoPrestamoEnum
 from app.common.error_handler import ErrorHandler
+from app.common.pagination import MODOS_TOTAL
+from app.common.errors import ValidationError
+from app.services.pep_service import PEPService
 
 logger = logging.getLogger(__name__)
 error_handler = ErrorHandler(logger)
@@ -58,9 +63,40 @@ def crear_cliente_api():
 
 @api_v1_bp.route('/clientes', methods=['GET'])
 def listar_clientes_api():
-    """Lista todos los clientes"""
-    clientes = listar_clientes()
-    return jsonify([c.to_dict() for c in clientes]), 200
+    """
+    Lista clientes del más reciente al más antiguo, paginando por cursor.
+    
+    Query params:
+        limite: Clientes por página (1-200, por defecto 50)
+        cursor: siguiente_cursor / anterior_cursor de una respuesta anterior
+        busqueda: DNI o nombre/apellidos (opcional)
+        total: 'exacto' o 'estimado' para incluir el total (por defecto no se cuenta)
+    
+    Response:
+    {
+        "items": [{...cliente...}],
+        "siguiente_cursor": "WyJzIiwgWy...", "anterior_cursor": null,
+        "por_pagina": 50, "total": null, "total_estimado": false
+    }
+    """
+    limite = request.args.get('limite', 50, type=int)
+    total = request.args.get('total') or None
+    if not 1 <= limite <= 200:
+        return error_handler.respond("'limite' debe estar entre 1 y 200", 400)
+    if total and total not in MODOS_TOTAL:
+        return error_handler.respond(f"'total' debe ser uno de: {', '.join(MODOS_TOTAL)}", 400)
+    
+    try:
+        pagina = listar_clientes_cursor(
+            cursor=request.args.get('cursor') or None,
+            por_pagina=limite,
+            busqueda=request.args.get('busqueda'),
+            total=total
+        )
+    except ValidationError as e:
+        return error_handler.respond(e.message, 400)
+    
+    return jsonify(pagina.to_dict()), 200
 
 
 @api_v1_bp.route('/clientes/<int:cliente_id>', methods=['GET'])
@@ -163,6 +199,71 @@ def consultar_dni_reniec_api(dni):
     return jsonify(info), 200
 
 
+@api_v1_bp.route('/clientes/pep/estado', methods=['GET'])
+def estado_dataset_pep_api():
+    """Readiness del dataset PEP: 200 si está listo, 503 mientras carga o si falló"""
+    estadisticas = PEPService.get_estadisticas()
+    return jsonify(estadisticas), 200 if estadisticas['cargado'] else 503
+
+
+@api_v1_bp.route('/clientes/pep/buscar-nombre', methods=['GET'])
+def buscar_nombre_pep_api():
+    """Coincidencias aproximadas por nombre en el dataset PEP (?nombre=...&k=5&umbral=0.5)"""
+    nombre = request.args.get('nombre', '').strip()
+    if not nombre:
+        return error_handler.respond("Se requiere el parámetro 'nombre'", 400)
+    
+    try:
+        k = int(request.args.get('k', 5))
+        umbral = float(request.args.get('umbral', PEPService.UMBRAL_SIMILITUD))
+    except ValueError:
+        return error_handler.respond("'k' y 'umbral' deben ser numéricos", 400)
+    if not (1 <= k <= 50) or not (0 < umbral <= 1):
+        return error_handler.respond("'k' debe estar entre 1 y 50 y 'umbral' entre 0 y 1", 400)
+    
+    return jsonify({
+        'nombre': nombre,
+        'umbral': umbral,
+        'coincidencias': PEPService.buscar_por_nombre(nombre, k=k, umbral=umbral)
+    }), 200
+
+
+@api_v1_bp.route('/clientes/validar-pep/lote', methods=['POST'])
+def validar_pep_lote_api():
+    """
+    Valida un lote de DNIs contra el dataset PEP en una sola pasada.
+    
+    Acepta:
+        - JSON: {"dnis": ["12345678", ...], "solo_pep": false}
+        - CSV (primera columna = DNI) como cuerpo text/csv o archivo multipart 'archivo'.
+          Se lee en streaming; ?solo_pep=true devuelve solo las coincidencias.
+    """
+    maximo = current_app.config.get('PEP_LOTE_MAX_DNIS', 50000)
+    solo_pep = request.args.get('solo_pep', 'false').lower() in ('1', 'true', 'si')
+    
+    if request.is_json:
+        data = request.get_json(silent=True) or {}
+        dnis = data.get('dnis')
+        if not isinstance(dnis, list):
+            return error_handler.respond("Se requiere 'dnis' como lista", 400)
+        solo_pep = bool(data.get('solo_pep', solo_pep))
+    else:
+        if 'archivo' in request.files:
+            stream = request.files['archivo'].stream
+        elif request.mimetype == 'text/csv':
+            stream = request.stream
+        else:
+            return error_handler.respond("Envíe JSON con 'dnis' o un archivo CSV", 415)
+        
+        lineas = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+        dnis = list(islice(PEPService.leer_dnis_csv(lineas), maximo + 1))
+    
+    if len(dnis) > maximo:
+        return error_handler.respond(f"Máximo {maximo} DNIs por solicitud", 413, maximo=maximo)
+    
+    return jsonify(PEPService.validar_pep_lote(dnis, solo_pep=solo_pep)), 200
+
+
 @api_v1_bp.route('/clientes/validar-pep/<string:dni>', methods=['GET'])
 @api_v1_bp.route('/clientes/test/pep/<string:dni>', methods=['GET'])
 def validar_pep_api(dni):
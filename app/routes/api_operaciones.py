@@ -0,0 +1,14 @@
+"""
+API v1 - Endpoints operativos
+Estado de las dependencias externas para monitoreo (no exponen datos de negocio)
+"""
+from flask import jsonify
+
+from app.routes import api_v1_bp
+from app.common.resilience import metricas_circuitos
+
+
+@api_v1_bp.route('/dependencias/circuitos', methods=['GET'])
+def estado_circuitos_api():
+    """Estado y métricas de los circuit breakers de dependencias externas (RENIEC, Flow)"""
+    return jsonify(metricas_circuitos()), 200
@@ -1,11 +1,13 @@
 # → Rutas para caja_routes.py   
 
 import logging
+import time
 from datetime import date, datetime
-from flask import jsonify, request, render_template, session
+from flask import jsonify, request, render_template, session, Response, stream_with_context, current_app
 from app.common.auth_decorators import login_required
+from app.common.eventos import obtener_broker, formatear_sse
 from app.routes import caja_bp
-from app.services.caja_service import CajaService
+from app.services.caja_service import CajaService, CajaCerradaError, CANAL_EVENTOS
 from decimal import Decimal
 
 logger = logging.getLogger(__name__)
@@ -118,20 +120,9 @@ def obtener_resumen_periodo():
     }
     """
     try:
-        fecha_inicio_str = request.args.get('fecha_inicio')
-        fecha_fin_str = request.args.get('fecha_fin')
-        
-        if not fecha_inicio_str or not fecha_fin_str:
-            return jsonify({'error': 'Debe proporcionar fecha_inicio y fecha_fin'}), 400
-        
-        try:
-            fecha_inicio = datetime.strptime(fecha_inicio_str, '%Y-%m-%d').date()
-            fecha_fin = datetime.strptime(fecha_fin_str, '%Y-%m-%d').date()
-        except ValueError:
-            return jsonify({'error': 'Formato de fecha inválido. Use YYYY-MM-DD'}), 400
-        
-        if fecha_inicio > fecha_fin:
-            return jsonify({'error': 'La fecha_inicio no puede ser mayor que fecha_fin'}), 400
+        fecha_inicio, fecha_fin, error = _leer_periodo()
+        if error:
+            return jsonify({'error': error}), 400
         
         resumen = CajaService.obtener_resumen_periodo(fecha_inicio, fecha_fin)
         return jsonify(resumen), 200
@@ -140,6 +131,77 @@ def obtener_resumen_periodo():
         logger.error(f"Error en obtener_resumen_periodo: {exc}", exc_info=True)
         return jsonify({'error': 'Error interno del servidor'}), 500
 
+
+def _leer_periodo():
+    """Lee y valida fecha_inicio / fecha_fin de la query string.
+
+    Returns: (fecha_inicio, fecha_fin, error)
+    """
+    fecha_inicio_str = request.args.get('fecha_inicio')
+    fecha_fin_str = request.args.get('fecha_fin')
+    
+    if not fecha_inicio_str or not fecha_fin_str:
+        return None, None, 'Debe proporcionar fecha_inicio y fecha_fin'
+    
+    try:
+        fecha_inicio = datetime.strptime(fecha_inicio_str, '%Y-%m-%d').date()
+        fecha_fin = datetime.strptime(fecha_fin_str, '%Y-%m-%d').date()
+    except ValueError:
+        return None, None, 'Formato de fecha inválido. Use YYYY-MM-DD'
+    
+    if fecha_inicio > fecha_fin:
+        return None, None, 'La fecha_inicio no puede ser mayor que fecha_fin'
+    
+    return fecha_inicio, fecha_fin, None
+
+
+# Formato → (generador, mimetype)
+FORMATOS_EXPORTACION = {
+    'csv': (CajaService.exportar_periodo_csv, 'text/csv; charset=utf-8'),
+    'xlsx': (CajaService.exportar_periodo_xlsx, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+}
+
+# → Exporta el detalle de pagos de un periodo (CSV / XLSX) en streaming
+@caja_bp.route('/resumen/periodo/exportar', methods=['GET'])
+@login_required
+def exportar_resumen_periodo():
+    """
+    Query params:
+        fecha_inicio (requerido): Fecha inicial YYYY-MM-DD
+        fecha_fin (requerido): Fecha final YYYY-MM-DD
+        formato (opcional): csv (por defecto) | xlsx
+        
+    Response: archivo adjunto con una fila por pago (CajaService.COLUMNAS_EXPORTACION).
+    Se envía por partes mientras se lee la base: la memoria no depende del periodo.
+    """
+    fecha_inicio, fecha_fin, error = _leer_periodo()
+    if error:
+        return jsonify({'error': error}), 400
+    
+    formato = request.args.get('formato', 'csv').lower()
+    if formato not in FORMATOS_EXPORTACION:
+        return jsonify({'error': f"Formato inválido: {formato}. Use {' o '.join(FORMATOS_EXPORTACION)}"}), 400
+    
+    generador, mimetype = FORMATOS_EXPORTACION[formato]
+    
+    def _generar():
+        try:
+            yield from generador(fecha_inicio, fecha_fin)
+        except Exception as exc:
+            # Los encabezados ya se enviaron: solo queda cortar la descarga
+            logger.error(f"Error exportando caja {fecha_inicio} → {fecha_fin}: {exc}", exc_info=True)
+            raise
+    
+    nombre = f"caja_{fecha_inicio.isoformat()}_{fecha_fin.isoformat()}.{formato}"
+    return Response(
+        stream_with_context(_generar()),
+        mimetype=mimetype,
+        headers={
+            'Content-Disposition': f'attachment; filename="{nombre}"',
+            'X-Accel-Buffering': 'no'  # nginx no debe acumular la respuesta
+        }
+    )
+
 # → Obtiene el detalle de pagos por fecha
 @caja_bp.route('/detalle/diario', methods=['GET'])
 @login_required
@@ -188,6 +250,63 @@ def obtener_detalle_diario():
         logger.error(f"Error en obtener_detalle_diario: {exc}", exc_info=True)
         return jsonify({'error': 'Error interno del servidor'}), 500
 
+# → Canal en vivo (SSE) con los movimientos de caja para las pantallas de cuadre
+@caja_bp.route('/eventos', methods=['GET'])
+@login_required
+def eventos_caja():
+    """
+    Server-sent events con los cambios de caja, en lugar de consultar el resumen y el detalle.
+    
+    Headers / query params:
+        Last-Event-ID o ultimo_id (opcional): último evento recibido, para reanudar sin pérdidas
+        
+    Eventos:
+        pago: {fecha, pago: fila de /caja/detalle/diario, delta: {medio_pago, cantidad_pagos, monto_pagado, ...}}
+        egreso: {fecha, egreso, delta: {monto_egresos}}
+        cierre / reapertura: {fecha, cierre?}
+        resync: se perdieron eventos; el cliente debe recargar resumen y detalle
+    
+    La conexión se corta tras CAJA_SSE_DURACION_MAXIMA segundos y el navegador se
+    reconecta solo (EventSource) enviando Last-Event-ID.
+    """
+    ultimo_id = request.headers.get('Last-Event-ID') or request.args.get('ultimo_id')
+    try:
+        ultimo_id = int(ultimo_id) if ultimo_id else None
+    except ValueError:
+        ultimo_id = -1  # Id ilegible: se fuerza la resincronización
+    
+    latido = current_app.config.get('CAJA_SSE_LATIDO', 15)
+    duracion = current_app.config.get('CAJA_SSE_DURACION_MAXIMA', 300)
+    broker = obtener_broker()
+    suscripcion = broker.suscribir(CANAL_EVENTOS, ultimo_id)
+    
+    def _generar():
+        # No usa la sesión de base de datos: la conexión puede quedar abierta varios minutos
+        limite = time.monotonic() + duracion
+        try:
+            yield 'retry: 3000\n\n'
+            while True:
+                if suscripcion.desincronizada:
+                    suscripcion.resincronizar()
+                    yield formatear_sse({'id': broker.ultimo_id(), 'tipo': 'resync', 'datos': {}})
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    break
+                evento = suscripcion.siguiente(timeout=min(latido, restante))
+                # Comentario SSE como latido: mantiene vivos los proxies y detecta clientes desconectados
+                yield formatear_sse(evento) if evento else ': latido\n\n'
+        finally:
+            broker.cancelar(suscripcion)
+    
+    return Response(
+        _generar(),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'  # nginx no debe acumular los eventos
+        }
+    )
+
 # → Obtiene estadísticas generales de caja - últimos 30 días
 @caja_bp.route('/estadisticas', methods=['GET'])
 @login_required
@@ -211,6 +330,55 @@ def obtener_estadisticas():
         logger.error(f"Error en obtener_estadisticas: {exc}", exc_info=True)
         return jsonify({'error': 'Error interno del servidor'}), 500
 
+# → Proyección de ingresos esperados de la cartera VIGENTE
+@caja_bp.route('/proyeccion', methods=['GET'])
+@login_required
+def obtener_proyeccion_flujo():
+    """
+    Query params:
+        meses (opcional): Horizonte en meses (1-36). Por defecto: 6
+        agrupacion (opcional): 'mes' o 'semana'. Por defecto: 'mes'
+        
+    Response:
+    {
+        "fecha_base": "2025-12-08",
+        "fecha_fin": "2026-06-07",
+        "meses": 6,
+        "agrupacion": "mes",
+        "vencido": {"cuotas": 3, "saldo_pendiente": 1500.00, "mora_esperada": 45.00, "total": 1545.00},
+        "periodos": [
+            {
+                "periodo": "2025-12",
+                "desde": "2025-12-08",
+                "hasta": "2025-12-31",
+                "cuotas": 40,
+                "saldo_pendiente": 20000.00,
+                "mora_esperada": 0.00,
+                "total": 20000.00
+            }
+        ],
+        "totales": {...}
+    }
+    """
+    try:
+        try:
+            meses = int(request.args.get('meses', 6))
+        except ValueError:
+            return jsonify({'error': 'El parámetro meses debe ser un número entero'}), 400
+        
+        agrupacion = request.args.get('agrupacion', 'mes')
+        
+        from app.services.proyeccion_service import ProyeccionService
+        proyeccion, error, status = ProyeccionService.obtener_proyeccion(meses, agrupacion)
+        if error:
+            return jsonify({'error': error}), status
+        
+        return jsonify(proyeccion), 200
+        
+    except Exception as exc:
+        logger.error(f"Error en obtener_proyeccion_flujo: {exc}", exc_info=True)
+        return jsonify({'error': 'Error interno del servidor'}), 500
+
 # → DEBUG: Obtiene TODOS los pagos para verificar fechas
 @caja_bp.route('/debug/todos-pagos', methods=['GET'])
 @login_required
@@ -269,6 +437,9 @@ def registrar_egreso_route():
         egreso = CajaService.registrar_egreso(monto_dec, concepto, pago_id=pago_id, usuario_id=usuario_id)
         return jsonify({'success': True, 'egreso': egreso}), 201
 
+    except CajaCerradaError as exc:
+        # Hay que reabrir la caja del día (POST /caja/abrir) antes de registrar egresos
+        return jsonify(exc.to_dict()), 409
     except Exception as exc:
         logger.error(f"Error en registrar_egreso_route: {exc}", exc_info=True)
         return jsonify({'error': 'Error interno al registrar egreso'}), 500
@@ -322,11 +493,31 @@ def cerrar_caja_route():
         resultado = CajaService.cerrar_caja(fecha, monto_dec, usuario_id=usuario_id)
         return jsonify({'success': True, 'cierre': resultado}), 200
 
+    except ValueError as exc:
+        # Ya existe un cierre vigente para la fecha (hay que reabrir antes)
+        return jsonify({'error': str(exc)}), 409
     except Exception as exc:
         logger.error(f"Error en cerrar_caja_route: {exc}", exc_info=True)
         return jsonify({'error': 'Error interno al cerrar caja'}), 500
 
 
+@caja_bp.route('/cierres', methods=['GET'])
+@login_required
+def obtener_cierres_periodo_route():
+    """Conciliación de un periodo desde los cierres guardados.
+    Query params: fecha_inicio, fecha_fin (YYYY-MM-DD)
+    """
+    try:
+        fecha_inicio, fecha_fin, error = _leer_periodo()
+        if error:
+            return jsonify({'error': error}), 400
+
+        return jsonify(CajaService.obtener_cierres_periodo(fecha_inicio, fecha_fin)), 200
+    except Exception as exc:
+        logger.error(f"Error en obtener_cierres_periodo_route: {exc}", exc_info=True)
+        return jsonify({'error': 'Error interno del servidor'}), 500
+
+
 @caja_bp.route('/abrir', methods=['POST'])
 @login_required
 def abrir_caja_route():
@@ -3,6 +3,7 @@ import os
 from app.models import Cliente, EstadoPrestamoEnum
 from app.routes import clientes_bp
 from app import crud
+from app.common.errors import ValidationError
 
 # → Guardamos la API Key en variables de entorno
 API_KEY = os.environ.get('DNI_API_KEY')
@@ -145,9 +146,15 @@ def test_validar_pep(dni): # → Endpoint de prueba para validar PEP
     
 @clientes_bp.route('/list', methods=['GET'])
 def listar_clientes_view():
-    page = request.args.get('page', 1, type=int)
-    dni = request.args.get('dni', '')
-    
-    clientes_paginados = crud.obtener_clientes_con_prestamos_info(page=page, per_page=5, dni=dni)
-    print(list(clientes_paginados))
+    busqueda = request.args.get('dni', '')  # DNI o nombre
+    
+    try:
+        clientes_paginados = crud.listar_clientes_con_prestamos_cursor(
+            cursor=request.args.get('cursor') or None, por_pagina=5, busqueda=busqueda, total='estimado'
+        )
+    except ValidationError:
+        # Cursor alterado o de una versión anterior: volver a la primera página
+        clientes_paginados = crud.listar_clientes_con_prestamos_cursor(
+            por_pagina=5, busqueda=busqueda, total='estimado'
+        )
     return render_template('pages/clientes/lista_clientes.html', clientes=clientes_paginados)
\ No newline at end of file
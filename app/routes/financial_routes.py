@@ -2,9 +2,10 @@
 Financial Routes - Endpoints para servicios financieros
 Endpoints para simulaciones y cálculos financieros
 """
-from flask import jsonify, request
+from flask import jsonify, request, current_app, Response, stream_with_context
 from datetime import datetime
 from decimal import Decimal
+import json
 import logging
 
 from app.routes import api_v1_bp
@@ -15,6 +16,62 @@ logger = logging.getLogger(__name__)
 error_handler = ErrorHandler(logger)
 
 
+def _cronograma_a_json(cronograma):
+    """Serializa un cronograma de FinancialService para las respuestas JSON."""
+    return [
+        {
+            'numero_cuota': cuota['numero_cuota'],
+            'fecha_vencimiento': cuota['fecha_vencimiento'].strftime('%d/%m/%Y'),  # Formato: 09/01/2026
+            'monto_cuota': str(cuota['monto_cuota']),
+            'monto_capital': str(cuota['monto_capital']),
+            'monto_interes': str(cuota['monto_interes']),
+            'saldo_capital': str(cuota['saldo_capital']),
+            'dias': cuota.get('dias', 30),
+            'es_cuota_ajuste': cuota.get('es_cuota_ajuste', False)
+        }
+        for cuota in cronograma
+    ]
+
+
+def _validar_escenario(escenario):
+    """
+    Valida y convierte un escenario {monto, plazo, tea} con las reglas de
+    /financial/simular-cronograma, más una propia del lote: el monto no puede
+    tener más de 2 decimales, porque generar_cronogramas_lote calcula en
+    céntimos enteros y rechaza las fracciones de céntimo.
+
+    Returns:
+        tuple: ((monto, plazo, tea) | None, mensaje_error | None)
+    """
+    if not isinstance(escenario, dict):
+        return None, 'Formato de escenario inválido'
+
+    monto = escenario.get('monto')
+    plazo = escenario.get('plazo')
+    tea = escenario.get('tea', 10.0)
+
+    if not monto or not plazo:
+        return None, 'Monto y plazo son requeridos'
+
+    try:
+        monto_decimal = Decimal(str(monto))
+        plazo_int = int(plazo)
+        tea_decimal = Decimal(str(tea))
+    except (ValueError, TypeError, ArithmeticError) as e:
+        return None, f'Formato de datos inválido: {str(e)}'
+
+    if monto_decimal <= 0:
+        return None, 'El monto debe ser mayor a 0'
+    if monto_decimal != monto_decimal.quantize(Decimal('0.01')):
+        return None, 'El monto no puede tener más de 2 decimales'
+    if plazo_int <= 0 or plazo_int > 60:
+        return None, 'El plazo debe estar entre 1 y 60 meses'
+    if tea_decimal < 0 or tea_decimal > 100:
+        return None, 'La TEA debe estar entre 0% y 100%'
+
+    return (monto_decimal, plazo_int, tea_decimal), None
+
+
 @api_v1_bp.route('/financial/simular-cronograma', methods=['POST'])
 def simular_cronograma():
     """
@@ -104,18 +161,7 @@ def simular_cronograma():
         tem = FinancialService.tea_to_tem(tea_decimal)
         
         # Preparar respuesta
-        cronograma_json = []
-        for cuota in cronograma:
-            cronograma_json.append({
-                'numero_cuota': cuota['numero_cuota'],
-                'fecha_vencimiento': cuota['fecha_vencimiento'].strftime('%d/%m/%Y'),  # Formato: 09/01/2026
-                'monto_cuota': str(cuota['monto_cuota']),
-                'monto_capital': str(cuota['monto_capital']),
-                'monto_interes': str(cuota['monto_interes']),
-                'saldo_capital': str(cuota['saldo_capital']),
-                'dias': cuota.get('dias', 30),
-                'es_cuota_ajuste': cuota.get('es_cuota_ajuste', False)
-            })
+        cronograma_json = _cronograma_a_json(cronograma)
         
         resumen = {
             'monto_prestado': str(monto_decimal),
@@ -137,6 +183,117 @@ def simular_cronograma():
         return error_handler.respond(f'Error interno al simular cronograma: {str(e)}', 500)
 
 
+@api_v1_bp.route('/financial/simular-cronogramas', methods=['POST'])
+def simular_cronogramas_lote():
+    """
+    Simula varios escenarios de préstamo en una sola llamada (grilla comparativa).
+    
+    Los escenarios se calculan en una sola pasada con
+    FinancialService.generar_cronogramas_lote, compartiendo TEM y factores.
+    Máximo SIMULACION_LOTE_MAX_ESCENARIOS escenarios por request.
+    
+    Request body:
+    {
+        "escenarios": [
+            {"monto": 12000.00, "plazo": 12, "tea": 10.0},
+            {"monto": 12000.00, "plazo": 24, "tea": 10.0}
+        ],
+        "incluir_cronograma": false,   // opcional: cronograma completo por escenario
+        "stream": false                // opcional: respuesta NDJSON (una línea por escenario)
+    }
+    
+    Response (stream = false):
+    {
+        "escenarios": [
+            {
+                "indice": 0,
+                "resumen": {
+                    "monto_prestado": "12000.00",
+                    "total_intereses": "...",
+                    "total_a_pagar": "...",
+                    "cuota_regular": "...",
+                    "plazo": 12,
+                    "tea": "10.0",
+                    "tem": "0.7974"
+                }
+            },
+            ...
+        ],
+        "total": 2
+    }
+    """
+    try:
+        data = request.get_json(silent=True)
+        
+        if not data or not isinstance(data.get('escenarios'), list):
+            return error_handler.respond('Se requiere la lista "escenarios"', 400)
+        
+        escenarios = data['escenarios']
+        maximo = current_app.config.get('SIMULACION_LOTE_MAX_ESCENARIOS', 2000)
+        
+        if not escenarios:
+            return error_handler.respond('La lista de escenarios está vacía', 400)
+        
+        if len(escenarios) > maximo:
+            return error_handler.respond(
+                f'Máximo {maximo} escenarios por solicitud (recibidos: {len(escenarios)})', 413
+            )
+        
+        validados = []
+        for indice, escenario in enumerate(escenarios):
+            valores, error = _validar_escenario(escenario)
+            if error:
+                return error_handler.respond(f'Escenario {indice}: {error}', 400, indice=indice)
+            validados.append(valores)
+        
+        incluir_cronograma = bool(data.get('incluir_cronograma', False))
+        fecha_otorgamiento = datetime.now().date()
+        
+        montos, plazos, teas = zip(*validados)
+        lote = FinancialService.generar_cronogramas_lote(
+            montos=montos,
+            teas=teas,
+            plazos=plazos,
+            fechas_otorgamiento=[fecha_otorgamiento] * len(validados)
+        )
+        
+        def _resultado(indice):
+            monto, plazo, tea = validados[indice]
+            totales = lote.resumen(indice) or {}
+            resultado = {
+                'indice': indice,
+                'resumen': {
+                    'monto_prestado': str(monto),
+                    'total_intereses': str(totales.get('total_interes', '0.00')),
+                    'total_a_pagar': str(totales.get('total_pagar', '0.00')),
+                    'cuota_regular': str(totales.get('primera_cuota', '0.00')),
+                    'plazo': plazo,
+                    'tea': str(tea),
+                    'tem': f"{(FinancialService.tea_to_tem(tea) * 100):.4f}"
+                }
+            }
+            if incluir_cronograma:
+                resultado['cronograma'] = _cronograma_a_json(lote.cronograma(indice))
+            return resultado
+        
+        if data.get('stream'):
+            def _generar():
+                for indice in range(len(validados)):
+                    yield json.dumps(_resultado(indice), ensure_ascii=False) + '\n'
+            
+            return Response(stream_with_context(_generar()), mimetype='application/x-ndjson')
+        
+        return jsonify({
+            'escenarios': [_resultado(indice) for indice in range(len(validados))],
+            'total': len(validados),
+            'mensaje': f'{len(validados)} escenarios simulados exitosamente'
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"Error al simular cronogramas en lote: {str(e)}", exc_info=True)
+        return error_handler.respond(f'Error interno al simular cronogramas: {str(e)}', 500)
+
+
 @api_v1_bp.route('/financial/calcular-cuota', methods=['POST'])
 def calcular_cuota():
     """
@@ -187,3 +344,22 @@ def calcular_cuota():
     except Exception as e:
         logger.error(f"Error al calcular cuota: {str(e)}")
         return error_handler.respond(str(e), 500)
+
+
+@api_v1_bp.route('/financial/cache-tasas', methods=['GET'])
+def estadisticas_cache_tasas():
+    """
+    Contadores de las tablas memoizadas de TEM y factores de anualidad.
+    
+    Response:
+    {
+        "tem": {"hits": 120, "misses": 3, "tamano": 3, "maximo": 1024, "tasa_acierto": 0.9756},
+        "factor_capitalizacion": {...},
+        "factor_anualidad": {...}
+    }
+    """
+    try:
+        return jsonify(FinancialService.estadisticas_cache_tasas()), 200
+    except Exception as e:
+        logger.error(f"Error al obtener estadísticas de cache de tasas: {str(e)}")
+        return error_handler.respond(str(e), 500)
@@ -10,5 +10,6 @@ from .prestamo_service import PrestamoService
 from .cliente_service import ClienteService
 from .pago_service import PagoService
 from .caja_service import CajaService
+from .enriquecimiento_service import EnriquecimientoService
 
-__all__ = ['EmailService', 'PDFService', 'FinancialService', 'PEPService', 'PrestamoService', 'ClienteService', 'PagoService']
\ No newline at end of file
+__all__ = ['EmailService', 'PDFService', 'FinancialService', 'PEPService', 'PrestamoService', 'ClienteService', 'PagoService', 'EnriquecimientoService']
\ No newline at end of file
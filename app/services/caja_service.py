@@ -1,19 +1,52 @@
 # → Servicio para gestión de cuadre de caja
+import csv
+import io
 import logging
+import tempfile
 from datetime import datetime, date
 from decimal import Decimal
-from typing import Dict, List, Optional
-from sqlalchemy import func, and_
+from typing import Dict, Iterator, List, Optional
+from sqlalchemy.exc import IntegrityError
 from app.common.extensions import db
 from app.models.pago import Pago, MedioPagoEnum
 from app.models.prestamo import Prestamo
+from app.models.cuota import Cuota
+from app.models.cliente import Cliente
 from app.models.egreso import Egreso
 from app.models.apertura_caja import AperturaCaja
+from app.models.cierre_caja import CierreCaja
+from app.crud.caja_resumen_crud import (
+    acumular_egreso,
+    listar_resumen_caja,
+    filtro_rango_fechas,
+    obtener_cierre_vigente,
+    error_caja_cerrada
+)
+from app.common.errors import ConflictError
+from app.common.eventos import publicar_evento
 
 logger = logging.getLogger(__name__)
 
+# Canal de eventos en vivo que escuchan las pantallas de cuadre (/caja/eventos)
+CANAL_EVENTOS = 'caja'
+
+
+class CajaCerradaError(ConflictError):
+    """Movimiento en un día con cierre vigente: hay que reabrir la caja antes"""
+
+    def __init__(self, fecha: date):
+        super().__init__(error_caja_cerrada(fecha), payload={'fecha': fecha.isoformat()})
+
 # → Servicio para gestión de cuadre de caja
 class CajaService:
+
+    # Columnas de la exportación del detalle de pagos de un periodo
+    COLUMNAS_EXPORTACION = [
+        'fecha_pago', 'hora_pago', 'pago_id', 'comprobante', 'dni_cliente', 'cliente',
+        'prestamo_id', 'cuota_numero', 'medio_pago', 'monto_contable', 'monto_pagado',
+        'monto_mora', 'monto_capital', 'ajuste_redondeo', 'vuelto'
+    ]
+
 # → Obtiene el resumen diario de caja para una fecha específica
     @staticmethod
     def obtener_resumen_diario(fecha: date) -> Dict:
@@ -21,17 +54,14 @@ class CajaService:
         try:
             logger.info(f"Obteniendo resumen de caja para fecha: {fecha}")
             
-            # Pagos del día agrupados por medio de pago
-            pagos_dia = db.session.query(
-                Pago.medio_pago,
-                func.count(Pago.pago_id).label('cantidad'),
-                func.sum(Pago.monto_pagado).label('total'),
-                func.sum(Pago.monto_mora).label('total_mora'),
-                func.sum(Pago.monto_pagado - Pago.monto_mora).label('total_capital'),
-                func.sum(Pago.ajuste_redondeo).label('total_ajuste')
-            ).filter(
-                Pago.fecha_pago == fecha
-            ).group_by(Pago.medio_pago).all()
+            # Día cerrado: se devuelve la foto guardada en el cierre, sin recalcular
+            cierre = CajaService._cierre_vigente(fecha)
+            if cierre:
+                return {**cierre.resumen, 'cierre_id': cierre.cierre_id}
+            
+            # Resumen precalculado del día: una fila por medio de pago
+            filas = listar_resumen_caja(fecha, fecha)
+            pagos_dia = [fila for fila in filas if fila.cantidad_pagos]
             
             logger.info(f"Pagos encontrados: {len(pagos_dia)} grupos de medios de pago")
             
@@ -43,33 +73,27 @@ class CajaService:
             total_ajuste_general = Decimal('0')
             cantidad_total = 0
             
-            for medio, cantidad, total, mora, capital, ajuste in pagos_dia:
-                logger.info(f"  {medio.value}: {cantidad} pagos, Total: S/ {total}, Ajuste: S/ {ajuste}")
+            for fila in pagos_dia:
+                total, mora, ajuste = fila.monto_pagado, fila.monto_mora, fila.ajuste_redondeo
+                capital = total - mora
+                logger.info(f"  {fila.medio_pago.value}: {fila.cantidad_pagos} pagos, Total: S/ {total}, Ajuste: S/ {ajuste}")
                 detalle_medios.append({
-                    'medio_pago': medio.value,
-                    'cantidad_pagos': cantidad,
-                    'total': float(total or 0),
-                    'total_mora': float(mora or 0),
-                    'total_capital': float(capital or 0),
-                    'ajuste_redondeo': float(ajuste or 0)
+                    'medio_pago': fila.medio_pago.value,
+                    'cantidad_pagos': fila.cantidad_pagos,
+                    'total': float(total),
+                    'total_mora': float(mora),
+                    'total_capital': float(capital),
+                    'ajuste_redondeo': float(ajuste)
                 })
-                total_general += (total or Decimal('0'))
-                total_mora_general += (mora or Decimal('0'))
-                total_capital_general += (capital or Decimal('0'))
-                total_ajuste_general += (ajuste or Decimal('0'))
-                cantidad_total += cantidad
-            # Total egresos del día (incluyendo vueltos)
-            from datetime import datetime as dt
-            total_egresos = db.session.query(func.sum(Egreso.monto)).filter(
-                db.and_(
-                    func.date(Egreso.fecha_registro) == fecha
-                )
-            ).scalar() or Decimal('0')
-            
-            # También sumar vueltos directamente de la tabla pagos
-            total_vueltos = db.session.query(func.sum(Pago.vuelto)).filter(
-                Pago.fecha_pago == fecha
-            ).scalar() or Decimal('0')
+                total_general += total
+                total_mora_general += mora
+                total_capital_general += capital
+                total_ajuste_general += ajuste
+                cantidad_total += fila.cantidad_pagos
+
+            # Total egresos del día (incluyendo vueltos) y vueltos registrados en los pagos
+            total_egresos = sum((fila.monto_egresos for fila in filas), Decimal('0'))
+            total_vueltos = sum((fila.vuelto for fila in filas), Decimal('0'))
 
             # Calcular efectivo neto en caja (ingresos - vueltos)
             efectivo_neto = total_general - total_vueltos
@@ -101,23 +125,11 @@ class CajaService:
         Returns:
             Dict con totales del periodo y detalle por día  """
         try:
-            # Pagos del periodo agrupados por fecha y medio de pago
-            pagos_periodo = db.session.query(
-                func.date(Pago.fecha_pago).label('fecha'),
-                Pago.medio_pago,
-                func.count(Pago.pago_id).label('cantidad'),
-                func.sum(Pago.monto_pagado).label('total'),
-                func.sum(Pago.monto_mora).label('total_mora'),
-                func.sum(Pago.ajuste_redondeo).label('total_ajuste')
-            ).filter(
-                and_(
-                    func.date(Pago.fecha_pago) >= fecha_inicio,
-                    func.date(Pago.fecha_pago) <= fecha_fin
-                )
-            ).group_by(
-                func.date(Pago.fecha_pago),
-                Pago.medio_pago
-            ).order_by(func.date(Pago.fecha_pago)).all()
+            # Resumen precalculado: a lo sumo una fila por día y medio de pago
+            pagos_periodo = [
+                (fila.fecha, fila.medio_pago, fila.cantidad_pagos, fila.monto_pagado, fila.monto_mora, fila.ajuste_redondeo)
+                for fila in listar_resumen_caja(fecha_inicio, fecha_fin) if fila.cantidad_pagos
+            ]
             
             # Organizar por fecha
             detalle_por_dia = {}
@@ -195,38 +207,7 @@ class CajaService:
             
             logger.info(f"Pagos detallados encontrados: {len(pagos)}")
             
-            detalle = []
-            for pago in pagos:
-                cuota = pago.cuota
-                prestamo = cuota.prestamo
-                cliente = prestamo.cliente
-                
-                # Usar hora real si existe, sino hora ficticia
-                if hasattr(pago, 'hora_pago') and pago.hora_pago:
-                    hora_display = pago.hora_pago.strftime('%H:%M:%S')
-                else:
-                    hora_display = f"{8 + (pago.pago_id % 12):02d}:{(pago.pago_id * 15) % 60:02d}:00"
-                
-                detalle.append({
-                    'pago_id': pago.pago_id,
-                    'hora': hora_display,
-                    'comprobante': pago.comprobante_referencia,
-                    'cliente': {
-                        'nombre': cliente.nombre_completo,
-                        'dni': cliente.dni
-                    },
-                    'prestamo_id': prestamo.prestamo_id,
-                    'cuota_numero': cuota.numero_cuota,
-                    'medio_pago': pago.medio_pago.value,
-                    'monto_contable': float(pago.monto_contable) if pago.monto_contable else float(pago.monto_pagado),
-                    'monto_pagado': float(pago.monto_pagado),
-                    'monto_dado': float(pago.monto_dado) if hasattr(pago, 'monto_dado') and pago.monto_dado else None,
-                    'vuelto': float(pago.vuelto) if hasattr(pago, 'vuelto') and pago.vuelto else 0,
-                    'ajuste_redondeo': float(pago.ajuste_redondeo),
-                    'monto_mora': float(pago.monto_mora),
-                    'monto_capital': float(pago.monto_pagado - pago.monto_mora),
-                    'observaciones': pago.observaciones
-                })
+            detalle = [CajaService._detalle_pago(pago) for pago in pagos]
             
             return detalle
             
@@ -234,6 +215,159 @@ class CajaService:
             logger.error(f"Error en obtener_detalle_pagos_dia: {exc}", exc_info=True)
             raise
 
+    @staticmethod
+    def _detalle_pago(pago: Pago) -> Dict:
+        """Fila del detalle de movimientos del día para un pago (cliente, préstamo, montos)."""
+        cuota = pago.cuota
+        prestamo = cuota.prestamo
+        cliente = prestamo.cliente
+        
+        # Usar hora real si existe, sino hora ficticia
+        if hasattr(pago, 'hora_pago') and pago.hora_pago:
+            hora_display = pago.hora_pago.strftime('%H:%M:%S')
+        else:
+            hora_display = f"{8 + (pago.pago_id % 12):02d}:{(pago.pago_id * 15) % 60:02d}:00"
+        
+        return {
+            'pago_id': pago.pago_id,
+            'hora': hora_display,
+            'comprobante': pago.comprobante_referencia,
+            'cliente': {
+                'nombre': cliente.nombre_completo,
+                'dni': cliente.dni
+            },
+            'prestamo_id': prestamo.prestamo_id,
+            'cuota_numero': cuota.numero_cuota,
+            'medio_pago': pago.medio_pago.value,
+            'monto_contable': float(pago.monto_contable) if pago.monto_contable else float(pago.monto_pagado),
+            'monto_pagado': float(pago.monto_pagado),
+            'monto_dado': float(pago.monto_dado) if hasattr(pago, 'monto_dado') and pago.monto_dado else None,
+            'vuelto': float(pago.vuelto) if hasattr(pago, 'vuelto') and pago.vuelto else 0,
+            'ajuste_redondeo': float(pago.ajuste_redondeo),
+            'monto_mora': float(pago.monto_mora),
+            'monto_capital': float(pago.monto_pagado - pago.monto_mora),
+            'observaciones': pago.observaciones
+        }
+
+# → Eventos en vivo para las pantallas de cuadre (se publican después del commit)
+    @staticmethod
+    def notificar_pago(pago: Pago) -> None:
+        """Publica el pago recién registrado: fila del detalle y lo que suma al resumen del día."""
+        publicar_evento(CANAL_EVENTOS, 'pago', {
+            'fecha': pago.fecha_pago.isoformat(),
+            'pago': CajaService._detalle_pago(pago),
+            'delta': {
+                'medio_pago': pago.medio_pago.value,
+                'cantidad_pagos': 1,
+                'monto_pagado': float(pago.monto_pagado),
+                'monto_mora': float(pago.monto_mora),
+                'ajuste_redondeo': float(pago.ajuste_redondeo or 0),
+                'vuelto': float(pago.vuelto or 0)
+            }
+        })
+
+# → Detalle de pagos de un periodo para exportar (auditorías)
+    @staticmethod
+    def iterar_pagos_periodo(fecha_inicio: date, fecha_fin: date, tamano_lote: int = 1000) -> Iterator[tuple]:
+        """
+        Recorre los pagos del periodo fila por fila, en el orden de COLUMNAS_EXPORTACION.
+        yield_per lee con un cursor del servidor de a `tamano_lote` filas: la memoria no
+        crece con la longitud del periodo. Solo se seleccionan columnas (sin entidades ORM).
+        """
+        consulta = db.session.query(
+            Pago.fecha_pago,
+            Pago.hora_pago,
+            Pago.pago_id,
+            Pago.comprobante_referencia,
+            Cliente.dni,
+            Cliente.nombre_completo,
+            Prestamo.prestamo_id,
+            Cuota.numero_cuota,
+            Pago.medio_pago,
+            Pago.monto_contable,
+            Pago.monto_pagado,
+            Pago.monto_mora,
+            Pago.ajuste_redondeo,
+            Pago.vuelto
+        ).join(
+            Cuota, Pago.cuota_id == Cuota.cuota_id
+        ).join(
+            Prestamo, Cuota.prestamo_id == Prestamo.prestamo_id
+        ).join(
+            Cliente, Prestamo.cliente_id == Cliente.cliente_id
+        ).filter(
+            *filtro_rango_fechas(Pago.fecha_pago, fecha_inicio, fecha_fin)
+        ).order_by(Pago.fecha_pago, Pago.pago_id).yield_per(tamano_lote)
+
+        for (fecha, hora, pago_id, comprobante, dni, cliente, prestamo_id, cuota_numero,
+             medio, contable, pagado, mora, ajuste, vuelto) in consulta:
+            yield (
+                fecha, hora, pago_id, comprobante, dni, cliente, prestamo_id, cuota_numero,
+                medio.value, contable if contable is not None else pagado, pagado, mora,
+                pagado - mora, ajuste, vuelto
+            )
+
+    @staticmethod
+    def exportar_periodo_csv(fecha_inicio: date, fecha_fin: date, filas_por_bloque: int = 500) -> Iterator[str]:
+        """
+        Genera el CSV del periodo por bloques de texto.
+        La cabecera sale antes de ejecutar la consulta (primer byte inmediato); luego
+        se emite un bloque cada `filas_por_bloque` filas.
+        """
+        buffer = io.StringIO()
+        escritor = csv.writer(buffer)
+
+        def vaciar():
+            bloque = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+            return bloque
+
+        # BOM: Excel abre el archivo como UTF-8 (tildes y ñ en nombres)
+        buffer.write('\ufeff')
+        escritor.writerow(CajaService.COLUMNAS_EXPORTACION)
+        yield vaciar()
+
+        filas = 0
+        for fila in CajaService.iterar_pagos_periodo(fecha_inicio, fecha_fin):
+            escritor.writerow(fila)
+            filas += 1
+            if filas % filas_por_bloque == 0:
+                yield vaciar()
+
+        resto = vaciar()
+        if resto:
+            yield resto
+        logger.info(f"Exportación CSV de caja {fecha_inicio} → {fecha_fin}: {filas} pagos")
+
+    @staticmethod
+    def exportar_periodo_xlsx(fecha_inicio: date, fecha_fin: date, tamano_bloque: int = 64 * 1024) -> Iterator[bytes]:
+        """
+        Genera el XLSX del periodo por bloques de bytes.
+        openpyxl en modo write-only vuelca cada fila a disco al agregarla (memoria plana),
+        pero un XLSX es un zip: los bytes solo existen al cerrar el libro, después de
+        recorrer todos los pagos. El archivo temporal se envía por bloques y se elimina.
+        """
+        from openpyxl import Workbook
+
+        libro = Workbook(write_only=True)
+        hoja = libro.create_sheet('Pagos')
+        hoja.append(CajaService.COLUMNAS_EXPORTACION)
+        filas = 0
+        for fila in CajaService.iterar_pagos_periodo(fecha_inicio, fecha_fin):
+            hoja.append(fila)
+            filas += 1
+
+        with tempfile.TemporaryFile() as archivo:
+            libro.save(archivo)
+            archivo.seek(0)
+            logger.info(f"Exportación XLSX de caja {fecha_inicio} → {fecha_fin}: {filas} pagos")
+            while True:
+                bloque = archivo.read(tamano_bloque)
+                if not bloque:
+                    break
+                yield bloque
+
 # → Obtiene estadísticas generales de caja - últimos 30 días    
     @staticmethod
     def obtener_estadisticas_caja() -> Dict:
@@ -244,29 +378,22 @@ class CajaService:
             hoy = date.today()
             hace_30_dias = hoy - timedelta(days=30)
             
+            # Resumen precalculado de los últimos 30 días
+            filas = [fila for fila in listar_resumen_caja(hace_30_dias) if fila.cantidad_pagos]
+            
             # Total últimos 30 días
-            total_30d = db.session.query(
-                func.sum(Pago.monto_pagado)
-            ).filter(
-                func.date(Pago.fecha_pago) >= hace_30_dias
-            ).scalar() or Decimal('0')
+            total_30d = sum((fila.monto_pagado for fila in filas), Decimal('0'))
             
             # Promedio diario
-            dias_con_pagos = db.session.query(
-                func.count(func.distinct(func.date(Pago.fecha_pago)))
-            ).filter(
-                func.date(Pago.fecha_pago) >= hace_30_dias
-            ).scalar() or 1
+            dias_con_pagos = len({fila.fecha for fila in filas}) or 1
             
             promedio_diario = total_30d / dias_con_pagos
             
             # Medio de pago más usado
-            medio_mas_usado = db.session.query(
-                Pago.medio_pago,
-                func.count(Pago.pago_id).label('cantidad')
-            ).filter(
-                func.date(Pago.fecha_pago) >= hace_30_dias
-            ).group_by(Pago.medio_pago).order_by(func.count(Pago.pago_id).desc()).first()
+            usos_por_medio = {}
+            for fila in filas:
+                usos_por_medio[fila.medio_pago] = usos_por_medio.get(fila.medio_pago, 0) + fila.cantidad_pagos
+            medio_mas_usado = max(usos_por_medio.items(), key=lambda item: item[1]) if usos_por_medio else None
             
             return {
                 'periodo_analisis': '30 días',
@@ -293,7 +420,13 @@ class CajaService:
 
         Returns:
             Diccionario con el egreso registrado
+
+        Raises:
+            CajaCerradaError: la caja del día ya está cerrada
         """
+        ahora = datetime.now()  # Se necesita el día para el resumen diario
+        CajaService.verificar_caja_abierta(ahora.date())
+
         try:
             from app.models import Egreso
 
@@ -304,14 +437,22 @@ class CajaService:
                 pago_id=pago_id,
                 monto=monto,
                 concepto=concepto,
-                usuario_id=usuario_id
+                usuario_id=usuario_id,
+                fecha_registro=ahora
             )
             db.session.add(nuevo)
+            acumular_egreso(nuevo)  # Mismo commit que el egreso
             db.session.commit()
 
             logger.info(f"Egreso registrado: ID={nuevo.egreso_id}, Monto={monto}, Pago={pago_id}")
 
-            return nuevo.to_dict()
+            egreso = nuevo.to_dict()
+            publicar_evento(CANAL_EVENTOS, 'egreso', {
+                'fecha': nuevo.fecha_registro.date().isoformat(),
+                'egreso': egreso,
+                'delta': {'monto_egresos': float(monto)}
+            })
+            return egreso
 
         except Exception as exc:
             db.session.rollback()
@@ -355,30 +496,48 @@ class CajaService:
             logger.error(f"Error en obtener_apertura_por_fecha: {exc}", exc_info=True)
             raise
 
+    @staticmethod
+    def _cierre_vigente(fecha: date) -> Optional[CierreCaja]:
+        """Cierre de la fecha que no fue reabierto, si existe."""
+        return obtener_cierre_vigente(fecha)
+
+    @staticmethod
+    def verificar_caja_abierta(fecha: date) -> None:
+        """Raises: CajaCerradaError si la fecha tiene un cierre vigente (no admite movimientos)."""
+        if CajaService._cierre_vigente(fecha):
+            raise CajaCerradaError(fecha)
+
     @staticmethod
     def esta_caja_abierta(fecha: date) -> bool:
-        """True si existe una apertura para la fecha y no está marcada como cerrada."""
+        """True si existe una apertura para la fecha y no tiene un cierre vigente."""
         try:
             apertura = db.session.query(AperturaCaja).filter(AperturaCaja.fecha == fecha).first()
             if not apertura:
                 return False
-            # Verificar estado en memoria de cierre
-            return fecha.isoformat() not in CERRADAS
+            return CajaService._cierre_vigente(fecha) is None
         except Exception as exc:
             logger.error(f"Error en esta_caja_abierta: {exc}", exc_info=True)
             return False
 
     @staticmethod
     def cerrar_caja(fecha: date, monto_real: Decimal, usuario_id: Optional[int] = None) -> Dict:
-        """Cierra la caja para la fecha dada. Calcula diferencia y registra una incidencia en memoria si aplica.
+        """Cierra la caja para la fecha dada: calcula la diferencia y guarda la foto del día (CierreCaja).
+
+        Los totales se calculan una sola vez, aquí; después el cierre se lee tal cual se guardó.
 
         Returns: dict con detalles: fecha, monto_esperado, monto_real, diferencia, incidencia (None|'SOBRA'|'FALTA')
+        Raises: ValueError si la caja ya tiene un cierre vigente para la fecha
         """
+        if CajaService._cierre_vigente(fecha):
+            raise ValueError(f'La caja del {fecha.isoformat()} ya está cerrada')
+
         try:
             resumen = CajaService.obtener_resumen_diario(fecha)
             apertura = db.session.query(AperturaCaja).filter(AperturaCaja.fecha == fecha).first()
             monto_inicial = Decimal(str(apertura.monto)) if apertura else Decimal('0')
-            monto_esperado = Decimal(str(resumen['resumen']['total_recaudado'] or 0)) + monto_inicial - Decimal(str(resumen['resumen'].get('total_egresos', 0) or 0))
+            total_recaudado = Decimal(str(resumen['resumen']['total_recaudado'] or 0))
+            total_egresos = Decimal(str(resumen['resumen'].get('total_egresos', 0) or 0))
+            monto_esperado = total_recaudado + monto_inicial - total_egresos
 
             diferencia = Decimal(str(monto_real)) - Decimal(str(monto_esperado))
 
@@ -386,49 +545,101 @@ class CajaService:
             if abs(diferencia) >= Decimal('0.01'):
                 incidencia = 'SOBRA' if diferencia > 0 else 'FALTA'
 
-            CERRADAS[fecha.isoformat()] = {
-                'fecha': fecha.isoformat(),
-                'monto_esperado': float(monto_esperado),
-                'monto_real': float(monto_real),
-                'diferencia': float(diferencia),
-                'incidencia': incidencia,
-                'usuario_id': usuario_id
-            }
+            cierre = CierreCaja(
+                fecha=fecha,
+                monto_apertura=monto_inicial,
+                total_recaudado=total_recaudado,
+                total_egresos=total_egresos,
+                monto_esperado=monto_esperado,
+                monto_real=Decimal(str(monto_real)),
+                diferencia=diferencia,
+                incidencia=incidencia,
+                resumen=resumen,
+                usuario_id=usuario_id
+            )
+            db.session.add(cierre)
+            db.session.commit()
 
-            return CERRADAS[fecha.isoformat()]
+            logger.info(f"Caja cerrada para {fecha}: esperado S/ {monto_esperado}, real S/ {monto_real}, incidencia {incidencia}")
+            resultado = cierre.to_dict()
+            publicar_evento(CANAL_EVENTOS, 'cierre', {'fecha': fecha.isoformat(), 'cierre': resultado})
+            return resultado
 
+        except IntegrityError:
+            # Otro usuario cerró la misma fecha en paralelo (índice único del cierre vigente)
+            db.session.rollback()
+            raise ValueError(f'La caja del {fecha.isoformat()} ya está cerrada')
         except Exception as exc:
+            db.session.rollback()
             logger.error(f"Error en cerrar_caja: {exc}", exc_info=True)
             raise
 
     @staticmethod
     def obtener_estado_cierre(fecha: date) -> Optional[Dict]:
-        """Devuelve el estado de cierre en memoria para la fecha si existe."""
-        return CERRADAS.get(fecha.isoformat())
+        """Devuelve el cierre vigente guardado para la fecha, o None si la caja está abierta."""
+        cierre = CajaService._cierre_vigente(fecha)
+        return cierre.to_dict() if cierre else None
+
+    @staticmethod
+    def obtener_cierres_periodo(fecha_inicio: date, fecha_fin: date) -> Dict:
+        """Conciliación de un periodo a partir de los cierres guardados (sin recorrer pagos).
+
+        Returns: Dict con los cierres vigentes del periodo y los totales de diferencias
+        """
+        try:
+            cierres = db.session.query(CierreCaja).filter(
+                CierreCaja.fecha_reapertura.is_(None),
+                *filtro_rango_fechas(CierreCaja.fecha, fecha_inicio, fecha_fin)
+            ).order_by(CierreCaja.fecha).all()
+
+            sobrantes = sum((c.diferencia for c in cierres if c.diferencia > 0), Decimal('0'))
+            faltantes = sum((c.diferencia for c in cierres if c.diferencia < 0), Decimal('0'))
+
+            return {
+                'periodo': {
+                    'fecha_inicio': fecha_inicio.isoformat(),
+                    'fecha_fin': fecha_fin.isoformat()
+                },
+                'cierres': [cierre.to_dict() for cierre in cierres],
+                'resumen_periodo': {
+                    'dias_cerrados': len(cierres),
+                    'dias_con_incidencia': sum(1 for c in cierres if c.incidencia),
+                    'total_recaudado': float(sum((c.total_recaudado for c in cierres), Decimal('0'))),
+                    'total_egresos': float(sum((c.total_egresos for c in cierres), Decimal('0'))),
+                    'total_sobrantes': float(sobrantes),
+                    'total_faltantes': float(faltantes),
+                    'diferencia_neta': float(sobrantes + faltantes)
+                }
+            }
+
+        except Exception as exc:
+            logger.error(f"Error en obtener_cierres_periodo: {exc}", exc_info=True)
+            raise
 
     @staticmethod
     def abrir_caja(fecha: date) -> bool:
-        """Reabre la caja (elimina el estado de cierre en memoria) y SIEMPRE registra apertura de 400.
+        """Reabre la caja (marca el cierre vigente como reabierto) y SIEMPRE registra apertura de 400.
+        
+        La foto del cierre se conserva como histórico; un nuevo cierre crea otra.
         
         Returns:
             True siempre - la caja queda abierta después de esta operación
         """
         try:
-            key = fecha.isoformat()
-            estaba_cerrada = key in CERRADAS
-            if estaba_cerrada:
-                del CERRADAS[key]
-                logger.info(f"Caja abierta para fecha {fecha} - estaba cerrada")
+            cierre = CajaService._cierre_vigente(fecha)
+            if cierre:
+                cierre.fecha_reapertura = datetime.now()
+                logger.info(f"Caja abierta para fecha {fecha} - estaba cerrada (cierre {cierre.cierre_id})")
             else:
                 logger.info(f"Caja abierta para fecha {fecha} - ya estaba abierta")
             
-            # SIEMPRE registrar o actualizar apertura con monto 400
+            # SIEMPRE registrar o actualizar apertura con monto 400 (confirma también la reapertura)
             CajaService.registrar_apertura(fecha, Decimal(  '400'), usuario_id=None)
             logger.info(f"Apertura de S/ 400 registrada/actualizada para {fecha}")
+            publicar_evento(CANAL_EVENTOS, 'reapertura', {'fecha': fecha.isoformat()})
             
             return True
             
         except Exception as exc:
             logger.error(f"Error en abrir_caja: {exc}", exc_info=True)
             raise
-
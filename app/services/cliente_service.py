@@ -4,12 +4,18 @@ Maneja la lógica de negocio relacionada con clientes
 """
 import os
 import logging
+import threading
+import time
 from typing import Tuple, Optional, Dict, Any
-import requests
+import numpy as np
+from flask import current_app, has_app_context
+from sqlalchemy import select, update
 
 from app.common.extensions import db
+from app.common.resilience import obtener_circuito
 from app.models import Cliente
 from app.services.pep_service import PEPService
+from app.services.reniec_service import ReniecClient
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +27,37 @@ class ClienteService:
     API_URL = os.environ.get('DNI_API_URL')
     API_KEY = os.environ.get('DNI_API_KEY')
     
+    # Cliente RENIEC compartido por el proceso (pool de conexiones + cache)
+    _cliente_reniec = None
+    _lock_cliente_reniec = threading.Lock()
+    
+    @staticmethod
+    def obtener_cliente_reniec() -> ReniecClient:
+        """
+        Devuelve el cliente RENIEC del proceso, creándolo con la configuración actual.
+        Se recrea si cambian DNI_API_URL / DNI_API_KEY.
+        """
+        with ClienteService._lock_cliente_reniec:
+            cliente = ClienteService._cliente_reniec
+            if cliente is None or (cliente.api_url, cliente.api_key) != (
+                ClienteService.API_URL.rstrip('/'), ClienteService.API_KEY
+            ):
+                config = current_app.config if has_app_context() else {}
+                if cliente is not None:
+                    cliente.cerrar()
+                cliente = ReniecClient(
+                    ClienteService.API_URL,
+                    ClienteService.API_KEY,
+                    timeout=config.get('RENIEC_TIMEOUT', 10),
+                    ttl_cache=config.get('RENIEC_CACHE_TTL', 3600),
+                    ttl_negativo=config.get('RENIEC_CACHE_TTL_NEGATIVO', 60),
+                    max_entradas=config.get('RENIEC_CACHE_MAX_ENTRADAS', 10000),
+                    max_conexiones=config.get('RENIEC_MAX_CONEXIONES', 10),
+                    circuito=obtener_circuito('reniec')
+                )
+                ClienteService._cliente_reniec = cliente
+            return cliente
+    
     @staticmethod
     def validar_configuracion_api() -> Tuple[bool, Optional[str]]:
         """
@@ -60,49 +97,21 @@ class ClienteService:
         if not es_valido:
             return None, error
         
-        try:
-            url_completa = f"{ClienteService.API_URL}/{dni}"
-            headers = {
-                "Authorization": f"Bearer {ClienteService.API_KEY}",
-                "Accept": "application/json",
-                "Content-Type": "application/json"
-            }
-            
-            respuesta = requests.get(url_completa, headers=headers, timeout=10)
-            
-            # Verificar tipo de contenido
-            content_type = respuesta.headers.get('Content-Type', '')
-            if 'application/json' not in content_type:
-                return None, "DNI no encontrado en RENIEC"
-            
-            respuesta.raise_for_status()
-            api_data = respuesta.json()
-            
-            # Verificar éxito de la consulta
-            if not api_data.get("success", False):
-                mensaje = api_data.get("message", "DNI no encontrado en RENIEC")
-                return None, mensaje
-            
-            # Normalizar datos
-            data = api_data.get('data', {})
-            datos_normalizados = {
-                'nombres': data.get('nombres', ''),
-                'apellido_paterno': data.get('apellido_paterno', ''),
-                'apellido_materno': data.get('apellido_materno', ''),
-                'nombre_completo': data.get('nombre_completo', ''),
-                'numero': data.get('numero', dni)
-            }
-            
-            return datos_normalizados, None
-            
-        except requests.exceptions.Timeout:
-            return None, "Tiempo de espera agotado al consultar RENIEC"
-        except requests.exceptions.RequestException as exc:
-            logger.error(f"Error de conexión con RENIEC: {exc}", exc_info=True)
-            return None, f"Error de conexión con RENIEC: {str(exc)}"
-        except Exception as exc:
-            logger.error(f"Error al consultar DNI: {exc}", exc_info=True)
-            return None, f"Error al consultar DNI: {str(exc)}"
+        return ClienteService.obtener_cliente_reniec().consultar(dni)
+
+    @staticmethod
+    def consultar_dni_reniec_con_estado(dni: str) -> Tuple[Optional[Dict[str, Any]], Optional[str], bool]:
+        """
+        Consulta RENIEC indicando si el error es definitivo (DNI inexistente) o transitorio.
+        
+        Returns:
+            Tuple[datos, error, permanente]: ver ReniecClient.consultar_con_estado
+        """
+        es_valido, error = ClienteService.validar_configuracion_api()
+        if not es_valido:
+            return None, error, False
+        
+        return ClienteService.obtener_cliente_reniec().consultar_con_estado(dni)
     
     @staticmethod
     def validar_pep_cliente(dni: str, pep_declarado: bool) -> Tuple[bool, bool, Optional[str]]:
@@ -307,3 +316,124 @@ class ClienteService:
             db.session.rollback()
             logger.error(f"Error al actualizar cliente {cliente_id}: {exc}", exc_info=True)
             return None, f"Error al actualizar: {str(exc)}"
+    
+    @staticmethod
+    def revalidar_pep_cartera(
+        desmarcar: bool = False,
+        tamano_lote: int = 1000
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Revalida el flag PEP de todos los clientes contra el dataset vigente.
+        
+        Lee solo (cliente_id, dni, pep), calcula las diferencias con NumPy contra el
+        índice PEP y aplica los cambios con UPDATE masivos por lotes de IDs.
+        
+        Args:
+            desmarcar: Si True, también pone pep=False a quienes ya no están en el dataset.
+                       Por defecto no, porque el flag puede venir de una autodeclaración.
+            tamano_lote: IDs por sentencia UPDATE
+            
+        Returns:
+            Tuple[resumen, error]: Resumen de la revalidación o mensaje de error
+        """
+        inicio = time.perf_counter()
+        filas = db.session.execute(
+            select(Cliente.cliente_id, Cliente.dni, Cliente.pep)
+        ).all()
+        
+        if not PEPService.esperar_dataset():
+            return None, "Dataset PEP no disponible"
+        
+        ids = np.array([fila.cliente_id for fila in filas], dtype=np.int64)
+        pep_actual = np.array([bool(fila.pep) for fila in filas], dtype=bool)
+        en_dataset, _ = PEPService.marcar_pep_lote([fila.dni for fila in filas])
+        
+        por_marcar = ids[en_dataset & ~pep_actual].tolist()
+        por_desmarcar = ids[~en_dataset & pep_actual].tolist() if desmarcar else []
+        
+        try:
+            for valor, cambios in ((True, por_marcar), (False, por_desmarcar)):
+                for i in range(0, len(cambios), tamano_lote):
+                    db.session.execute(
+                        update(Cliente)
+                        .where(Cliente.cliente_id.in_(cambios[i:i + tamano_lote]))
+                        .values(pep=valor)
+                        .execution_options(synchronize_session=False)
+                    )
+            db.session.commit()
+        except Exception as exc:
+            db.session.rollback()
+            logger.error(f"Error al revalidar PEP de clientes: {exc}", exc_info=True)
+            return None, f"Error al revalidar PEP: {str(exc)}"
+        
+        resumen = {
+            'total_clientes': len(filas),
+            'en_dataset': int(en_dataset.sum()),
+            'marcados': len(por_marcar),
+            'desmarcados': len(por_desmarcar),
+            'pep_fuera_del_dataset': int((~en_dataset & pep_actual).sum()) - len(por_desmarcar),
+            'version_dataset': PEPService.get_estadisticas()['version'],
+            'duracion_segundos': round(time.perf_counter() - inicio, 3)
+        }
+        logger.info(
+            f"Revalidación PEP: {resumen['marcados']} marcados, {resumen['desmarcados']} desmarcados "
+            f"de {resumen['total_clientes']} clientes"
+        )
+        return resumen, None
+    
+    @staticmethod
+    def buscar_coincidencias_nombre_pep(
+        k: int = 3,
+        umbral: Optional[float] = None,
+        solo_no_pep: bool = False
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Screening por nombre de toda la cartera contra el índice de nombres PEP.
+        Complementa la validación por DNI para registros del dataset sin DNI válido.
+        
+        Args:
+            k: Máximo de candidatos por cliente
+            umbral: Similitud mínima 0-1 (por defecto PEPService.UMBRAL_SIMILITUD)
+            solo_no_pep: Revisar solo clientes que hoy no están marcados como PEP
+            
+        Returns:
+            Tuple[resumen, error]: Clientes con candidatos y totales, o mensaje de error
+        """
+        inicio = time.perf_counter()
+        consulta = select(Cliente.cliente_id, Cliente.dni, Cliente.nombre_completo, Cliente.pep)
+        if solo_no_pep:
+            consulta = consulta.where(Cliente.pep.is_(False))
+        filas = db.session.execute(consulta.order_by(Cliente.cliente_id)).all()
+        
+        if not PEPService.esperar_dataset():
+            return None, "Dataset PEP no disponible"
+        indice = PEPService.obtener_indice_nombres()
+        umbral = PEPService.UMBRAL_SIMILITUD if umbral is None else umbral
+        
+        coincidencias = []
+        for fila in filas:
+            candidatos = indice.buscar(fila.nombre_completo, k=k, umbral=umbral) if indice else []
+            if candidatos:
+                for candidato in candidatos:
+                    candidato['mismo_dni'] = candidato['dni'] is not None and \
+                        PEPService._normalizar_dni(candidato['dni']) == PEPService._normalizar_dni(fila.dni)
+                coincidencias.append({
+                    'cliente_id': fila.cliente_id,
+                    'dni': fila.dni,
+                    'nombre_completo': fila.nombre_completo,
+                    'pep': fila.pep,
+                    'candidatos': candidatos
+                })
+        
+        resumen = {
+            'total_clientes': len(filas),
+            'clientes_con_coincidencias': len(coincidencias),
+            'umbral': umbral,
+            'version_dataset': PEPService.get_estadisticas()['version'],
+            'duracion_segundos': round(time.perf_counter() - inicio, 3),
+            'coincidencias': coincidencias
+        }
+        logger.info(
+            f"Screening de nombres PEP: {len(coincidencias)} de {len(filas)} clientes con coincidencias"
+        )
+        return resumen, None
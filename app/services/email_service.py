@@ -106,17 +106,10 @@ Financiera Demo S.A.
             
             # Adjuntar PDF detallado del cronograma
             try:
-                pdf_buffer = PDFService.generar_cronograma(
+                pdf_buffer = PDFService.generar_cronograma_detallado_pdf(
                     nombre_completo,
                     prestamo,
-                    [{
-                        'numero': c['numero_cuota'],
-                        'fecha_vencimiento': c['fecha_vencimiento'].strftime('%d/%m/%Y'),
-                        'monto_cuota': float(c['monto_cuota']),
-                        'capital': float(c['monto_capital']),
-                        'interes': float(c['monto_interes']),
-                        'saldo': float(c['saldo_capital'])
-                    } for c in cronograma]
+                    cronograma
                 )
                 pdf_buffer.seek(0)
                 pdf_bytes = pdf_buffer.read()
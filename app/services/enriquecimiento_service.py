@@ -0,0 +1,311 @@
+"""
+Servicio de Enriquecimiento de DNIs
+Alta masiva de prospectos: resuelve sus DNIs en RENIEC de forma concurrente y crea los clientes.
+
+- Pool de hilos acotado + limitador de tasa ajustado a la cuota del proveedor
+- Bitácora JSONL incremental: un trabajo interrumpido se reanuda sin repetir consultas
+- Clientes creados con INSERT multi-fila por lotes, una transacción por lote
+"""
+
+import csv
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+
+from app.common.extensions import db
+from app.common.resilience import LimitadorTasa, CircuitBreaker, obtener_circuito
+from app.models import Cliente
+from app.services.pep_service import PEPService
+from app.services.cliente_service import ClienteService
+
+logger = logging.getLogger(__name__)
+
+
+class EnriquecimientoService:
+    """Enriquecimiento concurrente y reanudable de DNIs con RENIEC"""
+
+    # Estados que no se vuelven a consultar al reanudar ('error' sí se reintenta)
+    ESTADOS_FINALES = {'ok', 'no_encontrado', 'invalido', 'existente'}
+
+    # ==================== ENTRADA / BITÁCORA ====================
+
+    @staticmethod
+    def normalizar_dni(dni) -> Optional[str]:
+        """DNI de 8 dígitos con ceros a la izquierda, o None si no es válido."""
+        numero = PEPService._normalizar_dni(dni)
+        return None if numero is None else f"{numero:08d}"
+
+    @staticmethod
+    def leer_prospectos_csv(lineas: Iterable[str]) -> Iterator[Tuple[str, Optional[str]]]:
+        """
+        Lee prospectos de un CSV: DNI en la primera columna y correo opcional en la segunda.
+        Omite filas vacías y una cabecera no numérica en la primera fila.
+
+        Yields:
+            tuple: (dni tal como viene, correo o None)
+        """
+        for numero, fila in enumerate(csv.reader(lineas)):
+            if not fila or not fila[0].strip():
+                continue
+            valor = fila[0].strip().lstrip('\ufeff')
+            if numero == 0 and not valor.isdigit():
+                continue
+            correo = fila[1].strip() if len(fila) > 1 and fila[1].strip() else None
+            yield valor, correo
+
+    @staticmethod
+    def leer_bitacora(ruta: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Último registro de cada DNI en una bitácora JSONL de un trabajo anterior.
+        Ignora una última línea truncada (trabajo cortado a mitad de escritura).
+        """
+        registros = {}
+        if not os.path.exists(ruta):
+            return registros
+        with open(ruta, encoding='utf-8') as archivo:
+            for linea in archivo:
+                try:
+                    registro = json.loads(linea)
+                except ValueError:
+                    continue
+                if registro.get('dni'):
+                    registros[registro['dni']] = registro
+        return registros
+
+    @staticmethod
+    def _dnis_existentes(dnis: List[str], tamano_lote: int = 1000) -> set:
+        """DNIs que ya están registrados como clientes."""
+        existentes = set()
+        for i in range(0, len(dnis), tamano_lote):
+            existentes.update(db.session.execute(
+                select(Cliente.dni).where(Cliente.dni.in_(dnis[i:i + tamano_lote]))
+            ).scalars())
+        return existentes
+
+    # ==================== CONSULTA ====================
+
+    @staticmethod
+    def _consultar(dni: str, limitador: LimitadorTasa, circuito: CircuitBreaker, reintentos: int):
+        """
+        Consulta un DNI respetando la cuota; reintenta errores transitorios esperando
+        a que el circuito de RENIEC deje de estar abierto.
+
+        Returns:
+            tuple: (estado, datos, error) con estado 'ok', 'no_encontrado' o 'error'
+        """
+        error = None
+        for intento in range(reintentos + 1):
+            if intento:
+                reintento_en = circuito.metricas()['reintento_en']
+                time.sleep(max(reintento_en, float(intento)))
+            limitador.adquirir()
+            datos, error, permanente = ClienteService.consultar_dni_reniec_con_estado(dni)
+            if not error:
+                return 'ok', datos, None
+            if permanente:
+                return 'no_encontrado', None, error
+        return 'error', None, error
+
+    # ==================== ALTA DE CLIENTES ====================
+
+    @classmethod
+    def _filas_clientes(cls, pendientes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Filas para INSERT de clientes, con el flag PEP calculado en bloque."""
+        es_pep, _ = PEPService.marcar_pep_lote([p['dni'] for p in pendientes])
+        filas = []
+        for pendiente, pep in zip(pendientes, es_pep.tolist()):
+            datos = pendiente['datos']
+            nombre = datos.get('nombre_completo') or ' '.join(
+                parte for parte in (datos.get('nombres'), datos.get('apellido_paterno'),
+                                    datos.get('apellido_materno')) if parte
+            )
+            filas.append({
+                'dni': pendiente['dni'],
+                'nombre_completo': nombre,
+                'apellido_paterno': datos.get('apellido_paterno', ''),
+                'apellido_materno': datos.get('apellido_materno', ''),
+                'correo_electronico': pendiente.get('correo') or f"{pendiente['dni']}@pendiente.com",
+                'pep': bool(pep)
+            })
+        return filas
+
+    @classmethod
+    def _insertar_clientes(cls, pendientes: List[Dict[str, Any]]) -> int:
+        """
+        Inserta un lote de clientes en una transacción. Si otro proceso registró alguno
+        mientras tanto, se descartan los ya existentes y se reintenta una vez.
+
+        Returns:
+            int: Clientes creados
+
+        Raises:
+            Exception: Si el lote no se pudo guardar
+        """
+        if not pendientes:
+            return 0
+        for intento in range(2):
+            existentes = cls._dnis_existentes([p['dni'] for p in pendientes])
+            filas = cls._filas_clientes([p for p in pendientes if p['dni'] not in existentes])
+            if not filas:
+                return 0
+            try:
+                db.session.execute(insert(Cliente), filas)
+                db.session.commit()
+                return len(filas)
+            except IntegrityError:
+                db.session.rollback()
+                if intento:
+                    raise
+            except Exception:
+                db.session.rollback()
+                raise
+        return 0
+
+    # ==================== TRABAJO ====================
+
+    @classmethod
+    def enriquecer_prospectos(
+        cls,
+        prospectos: Iterable[Tuple[str, Optional[str]]],
+        ruta_bitacora: str,
+        hilos: int = 4,
+        por_segundo: float = 5,
+        tamano_lote: int = 100,
+        reintentos: int = 2
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Resuelve en RENIEC una lista de prospectos y crea los clientes encontrados.
+
+        Cada resultado se agrega a la bitácora JSONL apenas llega; al volver a ejecutar
+        con la misma bitácora se omiten los DNIs ya resueltos y se insertan los
+        resueltos que no llegaron a guardarse.
+
+        Args:
+            prospectos: Iterable de (dni, correo o None)
+            ruta_bitacora: Archivo JSONL de resultados (se crea o se continúa)
+            hilos: Consultas simultáneas (acotadas por el bulkhead de RENIEC)
+            por_segundo: Cuota de consultas por segundo del proveedor (0 = sin límite)
+            tamano_lote: Clientes por transacción
+            reintentos: Reintentos por DNI ante errores transitorios
+
+        Returns:
+            Tuple[resumen, error]: Totales del trabajo o mensaje de error
+        """
+        inicio = time.perf_counter()
+        es_valido, error = ClienteService.validar_configuracion_api()
+        if not es_valido:
+            return None, error
+
+        circuito = obtener_circuito('reniec')
+        if hilos > circuito.max_concurrentes:
+            logger.warning(f"Enriquecimiento: {hilos} hilos reducidos al bulkhead de RENIEC ({circuito.max_concurrentes})")
+            hilos = circuito.max_concurrentes
+        ClienteService.obtener_cliente_reniec()  # Se crea con la configuración de la app, no en los hilos
+
+        # Deduplicar y normalizar la entrada
+        correos, invalidos = {}, []
+        for valor, correo in prospectos:
+            dni = cls.normalizar_dni(valor)
+            if dni is None:
+                invalidos.append(str(valor))
+            elif dni not in correos or (correo and not correos[dni]):
+                correos[dni] = correo
+
+        bitacora_previa = cls.leer_bitacora(ruta_bitacora)
+        existentes = cls._dnis_existentes(list(correos))
+
+        resumen = {
+            'total': len(correos) + len(invalidos), 'consultados': 0, 'creados': 0,
+            'existentes': 0, 'no_encontrados': 0, 'invalidos': len(invalidos),
+            'errores': 0, 'reanudados': 0
+        }
+        por_consultar, por_insertar, nuevos_registros = [], [], []
+        for valor in invalidos:
+            if valor not in bitacora_previa:
+                nuevos_registros.append({'dni': valor, 'estado': 'invalido', 'error': 'DNI inválido'})
+        for dni, correo in correos.items():
+            previo = bitacora_previa.get(dni)
+            if dni in existentes:
+                resumen['existentes'] += 1
+                if not previo or previo['estado'] != 'ok':
+                    nuevos_registros.append({'dni': dni, 'estado': 'existente'})
+            elif previo and previo['estado'] in cls.ESTADOS_FINALES:
+                resumen['reanudados'] += 1
+                if previo['estado'] == 'ok':
+                    por_insertar.append({'dni': dni, 'correo': correo, 'datos': previo['datos']})
+                elif previo['estado'] == 'no_encontrado':
+                    resumen['no_encontrados'] += 1
+            else:
+                por_consultar.append(dni)
+
+        limitador = LimitadorTasa(por_segundo, rafaga=hilos)
+        try:
+            with open(ruta_bitacora, 'a', encoding='utf-8') as bitacora, \
+                    ThreadPoolExecutor(max_workers=hilos, thread_name_prefix='enriquecer-dni') as pool:
+
+                def _anotar(registro):
+                    bitacora.write(json.dumps(registro, ensure_ascii=False) + '\n')
+
+                for registro in nuevos_registros:
+                    _anotar(registro)
+                bitacora.flush()
+
+                # Ventana acotada de tareas: no se encolan todos los DNIs de golpe
+                cola = iter(por_consultar)
+                en_vuelo = {}
+
+                def _llenar():
+                    for dni in cola:
+                        futuro = pool.submit(cls._consultar, dni, limitador, circuito, reintentos)
+                        en_vuelo[futuro] = dni
+                        if len(en_vuelo) >= hilos * 4:
+                            break
+
+                _llenar()
+                while en_vuelo:
+                    hechos, _ = wait(en_vuelo, return_when=FIRST_COMPLETED)
+                    for futuro in hechos:
+                        dni = en_vuelo.pop(futuro)
+                        estado, datos, error = futuro.result()
+                        resumen['consultados'] += 1
+                        _anotar({'dni': dni, 'estado': estado, 'datos': datos, 'error': error})
+                        if estado == 'ok':
+                            por_insertar.append({'dni': dni, 'correo': correos[dni], 'datos': datos})
+                        elif estado == 'no_encontrado':
+                            resumen['no_encontrados'] += 1
+                        else:
+                            resumen['errores'] += 1
+                    bitacora.flush()
+
+                    if len(por_insertar) >= tamano_lote:
+                        resumen['creados'] += cls._insertar_clientes(por_insertar)
+                        por_insertar = []
+                        logger.info(
+                            f"Enriquecimiento: {resumen['consultados']}/{len(por_consultar)} consultados, "
+                            f"{resumen['creados']} clientes creados"
+                        )
+                    _llenar()
+
+                for i in range(0, len(por_insertar), tamano_lote):
+                    resumen['creados'] += cls._insertar_clientes(por_insertar[i:i + tamano_lote])
+        except Exception as exc:
+            logger.error(f"Error en enriquecimiento de DNIs: {exc}", exc_info=True)
+            return None, f"Error en el enriquecimiento (reanudable con la misma bitácora): {str(exc)}"
+
+        duracion = time.perf_counter() - inicio
+        resumen['duracion_segundos'] = round(duracion, 3)
+        resumen['consultas_por_segundo'] = round(resumen['consultados'] / duracion, 2) if duracion else 0
+        logger.info(
+            f"Enriquecimiento terminado: {resumen['creados']} creados, {resumen['no_encontrados']} no encontrados, "
+            f"{resumen['errores']} errores de {resumen['total']} DNIs"
+        )
+        return resumen, None
+
+
+__all__ = ['EnriquecimientoService']
@@ -5,11 +5,143 @@ Centraliza fórmulas de TEA, TEM, cronogramas y sistema francés.
 """
 
 import logging
-from datetime import timedelta
+from datetime import date, timedelta
+from functools import lru_cache, cached_property
 from decimal import Decimal, ROUND_HALF_UP, InvalidOperation
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
+_ORDINAL_EPOCH = date(1970, 1, 1).toordinal()  # Día 0 de datetime64[D]
+
+
+# ============================================================================
+# TABLAS MEMOIZADAS DE TASAS
+# ============================================================================
+# La TEA viene de un conjunto discreto (Numeric(5,2)) y el plazo es un entero
+# pequeño, así que TEM y los factores de anualidad se repiten entre requests.
+# lru_cache es thread-safe y acotado; las operaciones Decimal conservan el
+# mismo orden que el cálculo original para no alterar ningún redondeo.
+
+@lru_cache(maxsize=1024)
+def _tem_por_tea(tea_porcentaje):
+    """TEM = (1 + TEA)^(1/12) - 1, con TEA en porcentaje (Decimal)."""
+    tea_decimal = tea_porcentaje / Decimal('100')
+    return ((Decimal('1') + tea_decimal) ** (Decimal('1') / Decimal('12'))) - Decimal('1')
+
+
+@lru_cache(maxsize=8192)
+def _factor_capitalizacion(tea_porcentaje, plazo):
+    """(1 + TEM)^n para la TEA (porcentaje) y plazo dados."""
+    return (Decimal('1') + _tem_por_tea(tea_porcentaje)) ** plazo
+
+
+@lru_cache(maxsize=8192)
+def _factor_anualidad(tea_porcentaje, plazo):
+    """
+    [TEM * (1 + TEM)^n] / [(1 + TEM)^n - 1] para la TEA (porcentaje) y plazo dados.
+    Retorna None si el denominador es 0.
+    """
+    tem = _tem_por_tea(tea_porcentaje)
+    factor_num = tem * (Decimal('1') + tem) ** plazo
+    factor_den = (Decimal('1') + tem) ** plazo - Decimal('1')
+    if factor_den == Decimal('0'):
+        return None
+    return factor_num / factor_den
+
+
+def _redondear_centimos(valores, exactos):
+    """
+    Redondea a céntimos enteros (HALF_UP, alejándose de cero) un arreglo float.
+
+    Los valores que quedan a menos de la tolerancia de un x.5 se recalculan con
+    `exactos(indices)` (Decimal), para que el resultado sea idéntico al escalar.
+    """
+    magnitud = np.abs(valores)
+    redondeado = np.sign(valores) * np.floor(magnitud + 0.5)
+    fraccion = magnitud - np.floor(magnitud)
+    dudosos = np.nonzero(np.abs(fraccion - 0.5) < 1e-6 + magnitud * 1e-13)[0]
+    if dudosos.size:
+        redondeado[dudosos] = exactos(dudosos)
+    return redondeado.astype(np.int64)
+
+
+class LoteCronogramas:
+    """
+    Resultado de FinancialService.generar_cronogramas_lote.
+
+    Los montos se guardan en céntimos enteros (int64) en matrices de forma
+    (escenarios, plazo máximo); las columnas posteriores al plazo de cada
+    escenario quedan en 0. Los escenarios inválidos tienen `validos[k] = False`
+    y cronograma vacío, igual que generar_cronograma_pagos. Las fechas se guardan
+    como datetime64[D] y se convierten a date al pedir cada cronograma.
+    """
+
+    def __init__(self, plazos, validos, cuota_regular, monto_cuota, monto_capital,
+                 monto_interes, saldo_capital, fechas_vencimiento):
+        self.plazos = plazos
+        self.validos = validos
+        self.cuota_regular = cuota_regular
+        self.monto_cuota = monto_cuota
+        self.monto_capital = monto_capital
+        self.monto_interes = monto_interes
+        self.saldo_capital = saldo_capital
+        self.fechas_vencimiento = fechas_vencimiento
+
+    def __len__(self):
+        return len(self.plazos)
+
+    @cached_property
+    def total_pagar(self):
+        """Total a pagar por escenario (céntimos)."""
+        return self.monto_cuota.sum(axis=1)
+
+    @cached_property
+    def total_interes(self):
+        """Total de intereses por escenario (céntimos)."""
+        return self.monto_interes.sum(axis=1)
+
+    @staticmethod
+    def _soles(centimos):
+        return Decimal(int(centimos)).scaleb(-2)
+
+    def resumen(self, indice):
+        """
+        Totales del escenario en soles (Decimal), sin construir el cronograma.
+        'primera_cuota' coincide con la cuota regular salvo en plazos de 1 mes.
+        """
+        if not self.validos[indice]:
+            return None
+        return {
+            'cuota_regular': self._soles(self.cuota_regular[indice]),
+            'primera_cuota': self._soles(self.monto_cuota[indice, 0]),
+            'plazo': int(self.plazos[indice]),
+            'total_pagar': self._soles(self.total_pagar[indice]),
+            'total_interes': self._soles(self.total_interes[indice])
+        }
+
+    def cronograma(self, indice):
+        """Cronograma del escenario con el mismo formato que generar_cronograma_pagos."""
+        if not self.validos[indice]:
+            return []
+
+        plazo = int(self.plazos[indice])
+        fechas = self.fechas_vencimiento[indice, :plazo].astype(object)
+        return [
+            {
+                'numero_cuota': i + 1,
+                'fecha_vencimiento': fechas[i],
+                'monto_cuota': self._soles(self.monto_cuota[indice, i]),
+                'monto_capital': self._soles(self.monto_capital[indice, i]),
+                'monto_interes': self._soles(self.monto_interes[indice, i]),
+                'saldo_capital': self._soles(self.saldo_capital[indice, i]),
+                'es_cuota_ajuste': i + 1 == plazo,
+                'dias': 30
+            }
+            for i in range(plazo)
+        ]
+
 
 class FinancialService:
     """Servicio para cálculos financieros"""
@@ -30,9 +162,7 @@ class FinancialService:
             Decimal: Tasa Efectiva Mensual (como decimal, ej: 0.00797)
         """
         try:
-            tea_decimal = Decimal(str(tea)) / Decimal('100.00')
-            tem = ((Decimal('1') + tea_decimal) ** (Decimal('1') / Decimal('12'))) - Decimal('1')
-            return tem
+            return _tem_por_tea(Decimal(str(tea)))
         except (InvalidOperation, Exception) as e:
             logger.error(f"Error al convertir TEA a TEM: {e}")
             return Decimal('0')
@@ -67,15 +197,14 @@ class FinancialService:
             if tem == Decimal('0'):
                 return (monto / plazo_meses).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
             
-            # Aplicar fórmula sistema francés
-            factor_num = tem * (Decimal('1') + tem) ** plazo_meses
-            factor_den = (Decimal('1') + tem) ** plazo_meses - Decimal('1')
+            # Aplicar fórmula sistema francés (factor memoizado por TEA y plazo)
+            factor = _factor_anualidad(Decimal(str(tea)), int(plazo_meses))
             
-            if factor_den == Decimal('0'):
+            if factor is None:
                 logger.error(f"División por cero: TEM={tem}, Plazo={plazo_meses}")
                 return Decimal('0.00')
             
-            cuota = monto * (factor_num / factor_den)
+            cuota = monto * factor
             return cuota.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
             
         except InvalidOperation as e:
@@ -86,147 +215,371 @@ class FinancialService:
             return Decimal('0.00')
     
     @staticmethod
-    def generar_cronograma_pagos(monto_total, interes_tea, plazo, f_otorgamiento):
+    def iterar_cronograma_pagos(monto_total, interes_tea, plazo, f_otorgamiento, totales=None):
         """
-        Genera el cronograma completo de pagos usando Sistema Francés con ajuste en última cuota.
+        Genera el cronograma de pagos cuota por cuota (generador), usando Sistema Francés
+        con ajuste en última cuota.
         
         CARACTERÍSTICAS:
         - Sistema Francés: Cuota fija mensual (capital + interés)
-        - Fechas: Cada 30 días exactos desde el otorgamiento
-        - TEA correcta: 10% TEA sobre S/12000 = S/13200 total al año
+        - Fechas: Mismo día de cada mes desde el otorgamiento
         - Última cuota ajusta residuos para cuadre exacto
+        - Totales acumulados sobre la marcha (sin recorrer de nuevo el cronograma)
         
         Args:
             monto_total: Monto del préstamo (Decimal)
             interes_tea: TEA en porcentaje (Decimal) - ej: 10.00 para 10%
             plazo: Número de cuotas/meses (int)
             f_otorgamiento: Fecha de otorgamiento del préstamo (date)
+            totales: dict opcional que se actualiza en cada cuota con
+                     'cuotas', 'total_capital', 'total_interes' y 'total_pagado'
             
-        Returns:
-            list: Lista de diccionarios con el cronograma detallado
+        Yields:
+            dict: Cuota del cronograma (mismo formato que generar_cronograma_pagos)
         """
-        try:
-            cronograma = []
+        if totales is None:
+            totales = {}
+        totales.update({
+            'cuotas': 0,
+            'total_capital': Decimal('0'),
+            'total_interes': Decimal('0'),
+            'total_pagado': Decimal('0')
+        })
+        
+        # Convertir a Decimal para precisión
+        P = Decimal(str(monto_total))
+        N = int(plazo)
+        tea_porcentaje = Decimal(str(interes_tea))
+        
+        # Calcular TEM (Tasa Efectiva Mensual) correctamente
+        # TEM = (1 + TEA)^(1/12) - 1
+        tem = _tem_por_tea(tea_porcentaje)
+        
+        # Calcular cuota regular usando sistema francés
+        # Cuota = P * [TEM * (1 + TEM)^N] / [(1 + TEM)^N - 1]
+        if tem == Decimal('0'):
+            cuota_regular = (P / N).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        else:
+            factor = _factor_capitalizacion(tea_porcentaje, N)
+            cuota_regular = (P * tem * factor / (factor - Decimal('1'))).quantize(
+                Decimal('0.01'), rounding=ROUND_HALF_UP
+            )
+        
+        if cuota_regular == Decimal('0'):
+            logger.error("Cuota calculada es 0")
+            return
+        
+        # Variables para el cálculo iterativo
+        saldo = P
+        
+        # Generar cada cuota
+        for i in range(1, N + 1):
+            # Fecha: mismo día del mes, sumando meses
+            # Si el mes siguiente no tiene el mismo día, Python ajusta al último día del mes automáticamente
+            year = f_otorgamiento.year
+            month = f_otorgamiento.month + i
+            day = f_otorgamiento.day
+            # Ajustar año y mes
+            while month > 12:
+                year += 1
+                month -= 12
+            try:
+                fecha_vencimiento = f_otorgamiento.replace(year=year, month=month, day=day)
+            except ValueError:
+                # Si el mes no tiene ese día (ej: 31 de febrero), usar el último día del mes
+                from calendar import monthrange
+                last_day = monthrange(year, month)[1]
+                fecha_vencimiento = f_otorgamiento.replace(year=year, month=month, day=last_day)
             
-            # Convertir a Decimal para precisión
-            P = Decimal(str(monto_total))
-            N = int(plazo)
-            tea_porcentaje = Decimal(str(interes_tea))
+            # Calcular interés sobre saldo pendiente
+            interes = (saldo * tem).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
             
-            # Calcular TEM (Tasa Efectiva Mensual) correctamente
-            # TEM = (1 + TEA)^(1/12) - 1
-            tea_decimal = tea_porcentaje / Decimal('100')
-            tem = ((Decimal('1') + tea_decimal) ** (Decimal('1') / Decimal('12'))) - Decimal('1')
+            # Determinar si es la última cuota (cuota de ajuste)
+            es_cuota_ajuste = (i == N)
             
-            # Calcular cuota regular usando sistema francés
-            # Cuota = P * [TEM * (1 + TEM)^N] / [(1 + TEM)^N - 1]
-            if tem == Decimal('0'):
-                cuota_regular = (P / N).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+            if es_cuota_ajuste:
+                # ÚLTIMA CUOTA: Absorbe todo el saldo restante
+                capital = saldo
+                monto_cuota = capital + interes
+                nuevo_saldo = Decimal('0.00')
             else:
-                factor = (Decimal('1') + tem) ** N
-                cuota_regular = (P * tem * factor / (factor - Decimal('1'))).quantize(
-                    Decimal('0.01'), rounding=ROUND_HALF_UP
-                )
-            
-            if cuota_regular == Decimal('0'):
-                logger.error("Cuota calculada es 0")
-                return []
-            
-            # Variables para el cálculo iterativo
-            saldo = P
-            total_pagado = Decimal('0')
-            
-            # Generar cada cuota
-            for i in range(1, N + 1):
-                # Fecha: mismo día del mes, sumando meses
-                # Si el mes siguiente no tiene el mismo día, Python ajusta al último día del mes automáticamente
-                year = f_otorgamiento.year
-                month = f_otorgamiento.month + i
-                day = f_otorgamiento.day
-                # Ajustar año y mes
-                while month > 12:
-                    year += 1
-                    month -= 12
-                try:
-                    fecha_vencimiento = f_otorgamiento.replace(year=year, month=month, day=day)
-                except ValueError:
-                    # Si el mes no tiene ese día (ej: 31 de febrero), usar el último día del mes
-                    from calendar import monthrange
-                    last_day = monthrange(year, month)[1]
-                    fecha_vencimiento = f_otorgamiento.replace(year=year, month=month, day=last_day)
-                
-                # Calcular interés sobre saldo pendiente
-                interes = (saldo * tem).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+                # CUOTAS REGULARES: Cuota fija
+                monto_cuota = cuota_regular
+                capital = cuota_regular - interes
                 
-                # Determinar si es la última cuota (cuota de ajuste)
-                es_cuota_ajuste = (i == N)
-                
-                if es_cuota_ajuste:
-                    # ÚLTIMA CUOTA: Absorbe todo el saldo restante
-                    capital = saldo
-                    monto_cuota = capital + interes
-                    nuevo_saldo = Decimal('0.00')
-                else:
-                    # CUOTAS REGULARES: Cuota fija
-                    monto_cuota = cuota_regular
-                    capital = cuota_regular - interes
-                    
-                    # Protección: capital no puede ser negativo
-                    if capital < Decimal('0'):
-                        capital = Decimal('0.01')
-                    
-                    nuevo_saldo = saldo - capital
+                # Protección: capital no puede ser negativo
+                if capital < Decimal('0'):
+                    capital = Decimal('0.01')
                 
-                # Agregar al cronograma
-                cronograma.append({
-                    'numero_cuota': i,
-                    'fecha_vencimiento': fecha_vencimiento,
-                    'monto_cuota': monto_cuota,
-                    'monto_capital': capital,
-                    'monto_interes': interes,
-                    'saldo_capital': nuevo_saldo,
-                    'es_cuota_ajuste': es_cuota_ajuste,
-                    'dias': 30  # Siempre 30 días entre cuotas
-                })
-                
-                # Actualizar acumuladores
-                total_pagado += monto_cuota
-                saldo = nuevo_saldo
-            
-            # Validaciones finales
-            total_capital = sum(c['monto_capital'] for c in cronograma)
-            total_interes = sum(c['monto_interes'] for c in cronograma)
-            total_cuotas = sum(c['monto_cuota'] for c in cronograma)
-            
-            # Verificar que el capital pagado coincide con el préstamo
-            diferencia_capital = abs(total_capital - P)
-            if diferencia_capital > Decimal('0.02'):  # Tolerancia de 2 céntimos
-                logger.warning(
-                    f"Diferencia en capital: Esperado S/ {P}, Calculado S/ {total_capital}, "
-                    f"Diferencia: S/ {diferencia_capital}"
-                )
+                nuevo_saldo = saldo - capital
             
-            # Calcular el total esperado con TEA (solo para referencia informativa)
-            # Nota: El total real depende del sistema francés y puede variar ligeramente
-            total_esperado_simple = P * (Decimal('1') + tea_decimal)
-            porcentaje_interes_real = ((total_cuotas / P) - Decimal('1')) * Decimal('100')
-            
-            logger.info(
-                f"Cronograma generado: {N} cuotas de 30 días\n"
-                f"TEA Nominal: {tea_porcentaje}% | TEM Efectiva: {(tem * 100).quantize(Decimal('0.0001'))}%\n"
-                f"Cuota Regular: S/ {cuota_regular}\n"
-                f"Capital Prestado: S/ {P}\n"
-                f"Total Intereses: S/ {total_interes} ({porcentaje_interes_real.quantize(Decimal('0.01'))}% efectivo)\n"
-                f"Total a Pagar: S/ {total_cuotas}\n"
-                f"Nota: TEA {tea_porcentaje}% aplicada mensualmente genera {porcentaje_interes_real.quantize(Decimal('0.01'))}% de interés total"
-            )
+            # Actualizar acumuladores
+            totales['cuotas'] += 1
+            totales['total_capital'] += capital
+            totales['total_interes'] += interes
+            totales['total_pagado'] += monto_cuota
+            saldo = nuevo_saldo
             
-            return cronograma
+            yield {
+                'numero_cuota': i,
+                'fecha_vencimiento': fecha_vencimiento,
+                'monto_cuota': monto_cuota,
+                'monto_capital': capital,
+                'monto_interes': interes,
+                'saldo_capital': nuevo_saldo,
+                'es_cuota_ajuste': es_cuota_ajuste,
+                'dias': 30  # Siempre 30 días entre cuotas
+            }
+        
+        # Validaciones finales (con los totales acumulados)
+        total_capital = totales['total_capital']
+        total_interes = totales['total_interes']
+        total_cuotas = totales['total_pagado']
+        
+        # Verificar que el capital pagado coincide con el préstamo
+        diferencia_capital = abs(total_capital - P)
+        if diferencia_capital > Decimal('0.02'):  # Tolerancia de 2 céntimos
+            logger.warning(
+                f"Diferencia en capital: Esperado S/ {P}, Calculado S/ {total_capital}, "
+                f"Diferencia: S/ {diferencia_capital}"
+            )
+        
+        # Nota: El total real depende del sistema francés y puede variar ligeramente
+        porcentaje_interes_real = ((total_cuotas / P) - Decimal('1')) * Decimal('100')
+        
+        logger.info(
+            f"Cronograma generado: {N} cuotas de 30 días\n"
+            f"TEA Nominal: {tea_porcentaje}% | TEM Efectiva: {(tem * 100).quantize(Decimal('0.0001'))}%\n"
+            f"Cuota Regular: S/ {cuota_regular}\n"
+            f"Capital Prestado: S/ {P}\n"
+            f"Total Intereses: S/ {total_interes} ({porcentaje_interes_real.quantize(Decimal('0.01'))}% efectivo)\n"
+            f"Total a Pagar: S/ {total_cuotas}\n"
+            f"Nota: TEA {tea_porcentaje}% aplicada mensualmente genera {porcentaje_interes_real.quantize(Decimal('0.01'))}% de interés total"
+        )
+    
+    @staticmethod
+    def generar_cronograma_pagos(monto_total, interes_tea, plazo, f_otorgamiento):
+        """
+        Genera el cronograma completo de pagos como lista.
+        Envoltorio de iterar_cronograma_pagos para quien necesita el cronograma materializado.
+        
+        Args:
+            monto_total: Monto del préstamo (Decimal)
+            interes_tea: TEA en porcentaje (Decimal) - ej: 10.00 para 10%
+            plazo: Número de cuotas/meses (int)
+            f_otorgamiento: Fecha de otorgamiento del préstamo (date)
             
+        Returns:
+            list: Lista de diccionarios con el cronograma detallado ([] si hay error)
+        """
+        try:
+            return list(FinancialService.iterar_cronograma_pagos(
+                monto_total, interes_tea, plazo, f_otorgamiento
+            ))
         except Exception as e:
             logger.error(f"Error generando cronograma: {e}")
             return []
     
+    @staticmethod
+    def generar_cronogramas_lote(montos, teas, plazos, fechas_otorgamiento):
+        """
+        Genera cronogramas (sistema francés) para muchos escenarios a la vez.
+
+        Vectoriza con NumPy en céntimos enteros el mismo algoritmo de
+        generar_cronograma_pagos: TEM y factor (1 + TEM)^N se calculan en Decimal
+        una vez por combinación distinta de (TEA, plazo); interés y cuota se
+        redondean HALF_UP y los casos a menos de la tolerancia de un medio céntimo
+        se recalculan en Decimal. La última cuota absorbe el saldo restante.
+        El resultado es idéntico, cuota por cuota, al de la versión escalar.
+
+        Args:
+            montos: Montos de los préstamos (secuencia)
+            teas: TEA en porcentaje por escenario (secuencia)
+            plazos: Número de cuotas por escenario (secuencia de int)
+            fechas_otorgamiento: Fechas de otorgamiento (secuencia de date)
+
+        Returns:
+            LoteCronogramas
+
+        Raises:
+            ValueError: Si las secuencias tienen distinta longitud o algún monto
+                        tiene más de 2 decimales
+        """
+        total = len(montos)
+        if not (len(teas) == len(plazos) == len(fechas_otorgamiento) == total):
+            raise ValueError("montos, teas, plazos y fechas_otorgamiento deben tener la misma longitud")
+
+        centimo = Decimal('0.01')
+        montos_dec = [Decimal(str(m)) for m in montos]
+        teas_dec = [Decimal(str(t)) for t in teas]
+        plazos_arr = np.array([int(n) for n in plazos], dtype=np.int64)
+
+        # La versión escalar arrastra las fracciones de céntimo hasta la última cuota;
+        # en céntimos enteros no se pueden reproducir, así que se rechazan
+        fraccionarios = [k for k, m in enumerate(montos_dec) if m != m.quantize(centimo)]
+        if fraccionarios:
+            raise ValueError(
+                f"Los montos deben estar en céntimos exactos (máximo 2 decimales); "
+                f"escenarios {fraccionarios[:10]}: {[str(montos_dec[k]) for k in fraccionarios[:10]]}"
+            )
+
+        # Escenarios calculables: TEA > -100 %, plazo >= 1
+        validos = np.array([
+            t > Decimal('-100') and n >= 1
+            for t, n in zip(teas_dec, plazos_arr)
+        ], dtype=bool)
+        montos_c = np.array([
+            int(m.scaleb(2)) if ok else 0 for m, ok in zip(montos_dec, validos)
+        ], dtype=np.int64)
+        plazos_arr = np.where(validos, plazos_arr, 0)
+
+        # TEM y factor de anualidad en Decimal, una vez por combinación distinta
+        tem_por_tea = {}
+        factor_por_par = {}
+        for t, n, ok in zip(teas_dec, plazos_arr, validos):
+            if not ok:
+                continue
+            if t not in tem_por_tea:
+                tem_por_tea[t] = _tem_por_tea(t)
+            if (t, int(n)) not in factor_por_par:
+                factor_por_par[(t, int(n))] = _factor_capitalizacion(t, int(n))
+
+        tems_dec = [tem_por_tea.get(t, Decimal('0')) for t in teas_dec]
+        tems = np.array([float(tem) for tem in tems_dec], dtype=np.float64)
+
+        # Cuota regular (céntimos): ratio TEM·f / (f - 1) por combinación (TEA, plazo)
+        ratio_por_par = {
+            (t, n): float(tem_por_tea[t] * factor / (factor - Decimal('1'))) if tem_por_tea[t] != Decimal('0') else 0.0
+            for (t, n), factor in factor_por_par.items()
+        }
+        ratios = np.array([
+            ratio_por_par[(t, int(n))] if ok else 0.0
+            for t, n, ok in zip(teas_dec, plazos_arr, validos)
+        ], dtype=np.float64)
+
+        def _cuota_exacta(indices):
+            resultado = []
+            for k in indices:
+                tem = tems_dec[k]
+                if tem == Decimal('0'):
+                    cuota = (montos_dec[k] / int(plazos_arr[k])).quantize(centimo, rounding=ROUND_HALF_UP)
+                else:
+                    factor = factor_por_par[(teas_dec[k], int(plazos_arr[k]))]
+                    cuota = (montos_dec[k] * tem * factor / (factor - Decimal('1'))).quantize(
+                        centimo, rounding=ROUND_HALF_UP
+                    )
+                resultado.append(int(cuota.scaleb(2)))
+            return resultado
+
+        sin_interes = validos & (tems == 0.0)
+        estimada = np.where(
+            sin_interes,
+            montos_c / np.maximum(plazos_arr, 1),
+            montos_c * ratios
+        )
+        cuota_regular = _redondear_centimos(estimada, _cuota_exacta)
+        cuota_regular[~validos] = 0
+
+        # Igual que la versión escalar: cuota 0 → cronograma vacío
+        validos &= cuota_regular != 0
+
+        plazo_max = int(plazos_arr[validos].max()) if validos.any() else 0
+        forma = (total, plazo_max)
+        monto_cuota = np.zeros(forma, dtype=np.int64)
+        monto_capital = np.zeros(forma, dtype=np.int64)
+        monto_interes = np.zeros(forma, dtype=np.int64)
+        saldo_capital = np.zeros(forma, dtype=np.int64)
+
+        # Fechas: mismo día del mes sumando meses; si no existe, último día del mes
+        otorgamiento = (
+            np.array([f.toordinal() for f in fechas_otorgamiento], dtype=np.int64) - _ORDINAL_EPOCH
+        ).astype('datetime64[D]')
+        mes_base = otorgamiento.astype('datetime64[M]')
+        dia_base = (otorgamiento - mes_base.astype('datetime64[D]')).astype(np.int64)
+        meses = mes_base[:, None] + np.arange(1, plazo_max + 1)
+        inicio_mes = meses.astype('datetime64[D]')
+        dias_mes = ((meses + 1).astype('datetime64[D]') - inicio_mes).astype(np.int64)
+        fechas_vencimiento = inicio_mes + np.minimum(dia_base[:, None], dias_mes - 1)
+
+        saldo = montos_c.copy()
+
+        for i in range(1, plazo_max + 1):
+            activos = np.nonzero(validos & (plazos_arr >= i))[0]
+            saldo_act = saldo[activos]
+
+            def _interes_exacto(indices, _activos=activos, _saldo=saldo_act):
+                return [
+                    int((Decimal(int(_saldo[j])).scaleb(-2) * tems_dec[_activos[j]]).quantize(
+                        centimo, rounding=ROUND_HALF_UP
+                    ).scaleb(2))
+                    for j in indices
+                ]
+
+            interes = _redondear_centimos(saldo_act * tems[activos], _interes_exacto)
+
+            es_ultima = plazos_arr[activos] == i
+            capital = np.where(es_ultima, saldo_act, cuota_regular[activos] - interes)
+            # Protección: capital no puede ser negativo
+            capital = np.where(~es_ultima & (capital < 0), 1, capital)
+            cuota = np.where(es_ultima, capital + interes, cuota_regular[activos])
+            nuevo_saldo = np.where(es_ultima, 0, saldo_act - capital)
+
+            columna = i - 1
+            monto_cuota[activos, columna] = cuota
+            monto_capital[activos, columna] = capital
+            monto_interes[activos, columna] = interes
+            saldo_capital[activos, columna] = nuevo_saldo
+            saldo[activos] = nuevo_saldo
+
+        logger.info(
+            f"Cronogramas en lote: {int(validos.sum())}/{total} escenarios válidos, "
+            f"{int(plazos_arr[validos].sum())} cuotas generadas"
+        )
+
+        return LoteCronogramas(
+            plazos=plazos_arr,
+            validos=validos,
+            cuota_regular=cuota_regular,
+            monto_cuota=monto_cuota,
+            monto_capital=monto_capital,
+            monto_interes=monto_interes,
+            saldo_capital=saldo_capital,
+            fechas_vencimiento=fechas_vencimiento
+        )
+
+    @staticmethod
+    def estadisticas_cache_tasas():
+        """
+        Contadores de las tablas memoizadas de TEM y factores de anualidad.
+
+        Returns:
+            dict: {tabla: {hits, misses, tamano, maximo, tasa_acierto}}
+        """
+        tablas = {
+            'tem': _tem_por_tea,
+            'factor_capitalizacion': _factor_capitalizacion,
+            'factor_anualidad': _factor_anualidad
+        }
+        estadisticas = {}
+        for nombre, funcion in tablas.items():
+            info = funcion.cache_info()
+            consultas = info.hits + info.misses
+            estadisticas[nombre] = {
+                'hits': info.hits,
+                'misses': info.misses,
+                'tamano': info.currsize,
+                'maximo': info.maxsize,
+                'tasa_acierto': round(info.hits / consultas, 4) if consultas else 0.0
+            }
+        return estadisticas
+
+    @staticmethod
+    def limpiar_cache_tasas():
+        """Vacía las tablas memoizadas y reinicia sus contadores."""
+        _tem_por_tea.cache_clear()
+        _factor_capitalizacion.cache_clear()
+        _factor_anualidad.cache_clear()
+
     @staticmethod
     def validar_monto_maximo_pep(es_pep, monto):
         """
@@ -10,6 +10,8 @@ from decimal import Decimal
 from flask import current_app
 import logging
 
+from app.common.resilience import obtener_circuito, CircuitoAbiertoError, CapacidadAgotadaError
+
 logger = logging.getLogger(__name__)
 
 class FlowService:
@@ -46,6 +48,24 @@ class FlowService:
         env = current_app.config.get('FLASK_ENV', 'production')
         return cls.SANDBOX_URL if env == 'development' else cls.PROD_URL
     
+    @classmethod
+    def _get_timeout(cls) -> float:
+        """Segundos de espera por llamada a Flow (FLOW_TIMEOUT)"""
+        return current_app.config.get('FLOW_TIMEOUT', 15)
+    
+    @classmethod
+    def _llamar_flow(cls, metodo, url: str, **kwargs):
+        """
+        Llama a Flow a través del circuito 'flow': con la API caída o lenta
+        se falla de inmediato en lugar de ocupar un worker hasta el timeout.
+        Las respuestas 5xx cuentan como fallo de la dependencia.
+        """
+        return obtener_circuito('flow').ejecutar(
+            metodo, url, timeout=cls._get_timeout(),
+            es_fallo=lambda response: response.status_code >= 500,
+            **kwargs
+        )
+    
     @classmethod
     def _sign_params(cls, params: Dict) -> str:
         """
@@ -140,7 +160,7 @@ class FlowService:
             logger.info(f"Creando orden Flow: {commerce_order} - Monto: {amount} - Medio: {medio_pago}")
             
             # Hacer request POST
-            response = requests.post(url, data=params, timeout=30)
+            response = cls._llamar_flow(requests.post, url, data=params)
             
             if response.status_code == 200:
                 data = response.json()
@@ -163,6 +183,9 @@ class FlowService:
                 logger.error(f"Error Flow API: {response.status_code} - {error_msg}")
                 return None, error_msg, response.status_code
                 
+        except (CircuitoAbiertoError, CapacidadAgotadaError) as e:
+            logger.warning(f"Flow no disponible: {e.message}")
+            return None, e.message, 503
         except requests.exceptions.Timeout:
             logger.error("Timeout al conectar con Flow API")
             return None, "Timeout de conexión con Flow", 504
@@ -203,7 +226,7 @@ class FlowService:
             logger.info(f"Consultando estado de pago Flow: token={token}")
             
             # Hacer request GET
-            response = requests.get(url, params=params, timeout=30)
+            response = cls._llamar_flow(requests.get, url, params=params)
             
             if response.status_code == 200:
                 data = response.json()
@@ -228,6 +251,15 @@ class FlowService:
                 logger.error(f"Error Flow API getStatus: {response.status_code} - {error_msg}")
                 return None, error_msg, response.status_code
                 
+        except (CircuitoAbiertoError, CapacidadAgotadaError) as e:
+            logger.warning(f"Flow no disponible: {e.message}")
+            return None, e.message, 503
+        except requests.exceptions.Timeout:
+            logger.error("Timeout al consultar estado en Flow API")
+            return None, "Timeout de conexión con Flow", 504
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Error de conexión con Flow: {e}")
+            return None, f"Error de conexión: {str(e)}", 503
         except Exception as e:
             logger.error(f"Error al obtener estado de pago: {e}", exc_info=True)
             return None, f"Error interno: {str(e)}", 500
@@ -1,177 +1,242 @@
 import logging
+import time
 from datetime import date, timedelta
 from decimal import Decimal
-from typing import Tuple, Optional, Dict, Any, List
+from itertools import groupby
+from typing import Tuple, Optional, Dict, Any, List, Iterable, Iterator
+from sqlalchemy import update, func
 from app.common.extensions import db
-from app.models import Cuota, Prestamo
+from app.models import Cuota, Prestamo, EstadoPrestamoEnum, Pago, EjecucionProceso
 
 logger = logging.getLogger(__name__)
 
+
+class CuotaLedger:
+    """
+    Cuotas de un préstamo cargadas una sola vez y ordenadas por numero_cuota.
+
+    Permite resolver "siguiente cuota" y "cuotas desde" por índice, sin volver
+    a consultar la BD. Acepta instancias de Cuota o filas con los mismos atributos
+    (cuota_id, numero_cuota, fecha_vencimiento, monto_pagado, saldo_pendiente, ...).
+    """
+
+    def __init__(self, cuotas: Iterable[Any]):
+        self._cuotas = sorted(cuotas, key=lambda c: c.numero_cuota)
+        self._indice_por_numero = {c.numero_cuota: i for i, c in enumerate(self._cuotas)}
+        self._por_id = {c.cuota_id: c for c in self._cuotas}
+
+    @classmethod
+    def cargar(cls, prestamo_id: int) -> 'CuotaLedger':
+        """Carga todas las cuotas del préstamo en una sola consulta."""
+        cuotas = db.session.execute(
+            db.select(Cuota)
+            .where(Cuota.prestamo_id == prestamo_id)
+            .order_by(Cuota.numero_cuota)
+        ).scalars().all()
+        return cls(cuotas)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._cuotas)
+
+    def __len__(self) -> int:
+        return len(self._cuotas)
+
+    def obtener(self, cuota_id: int) -> Optional[Any]:
+        """Cuota por ID, o None si no pertenece al préstamo."""
+        return self._por_id.get(cuota_id)
+
+    def siguiente(self, cuota: Any) -> Optional[Any]:
+        """Cuota con numero_cuota + 1, o None si es la última."""
+        indice = self._indice_por_numero.get(cuota.numero_cuota + 1)
+        return self._cuotas[indice] if indice is not None else None
+
+    def desde(self, cuota: Any) -> List[Any]:
+        """Cuotas desde la cuota dada hasta la última (inclusive)."""
+        indice = self._indice_por_numero.get(cuota.numero_cuota)
+        if indice is None:
+            return [c for c in self._cuotas if c.numero_cuota >= cuota.numero_cuota]
+        return self._cuotas[indice:]
+
+
 class MoraService:
     """Servicio para calcular y aplicar mora a las cuotas"""
 
     TASA_MORA_MENSUAL = Decimal('0.01')  # 1% mensual
     DIAS_POR_MES = 30  # Solo para última cuota (fallback)
+    TAMANO_LOTE_ACTUALIZACION = 1000  # Filas por UPDATE masivo en el recálculo de cartera
+    PROCESO_MORA_INCREMENTAL = 'mora_incremental'  # Clave de la marca de agua en ejecuciones_proceso
 
     @staticmethod
-    def esta_vencida(fecha_vencimiento: date) -> bool:
+    def esta_vencida(fecha_vencimiento: date, as_of: Optional[date] = None) -> bool:
         """
-        Verifica si una cuota está vencida.
-        
+        Verifica si una cuota está vencida a la fecha de evaluación (por defecto hoy).
+
         REGLA: La cuota vence DESPUÉS del día de vencimiento, no el mismo día.
         Ejemplo: Si vence 09/01:
         - 08/01: NO vencida
         - 09/01: NO vencida (mismo día)
         - 10/01: SÍ vencida
         """
-        return date.today() > fecha_vencimiento
+        return (as_of or date.today()) > fecha_vencimiento
 
     @staticmethod
-    def calcular_dias_atraso(fecha_vencimiento: date) -> int:
+    def calcular_dias_atraso(fecha_vencimiento: date, as_of: Optional[date] = None) -> int:
         """
-        Calcula los días de atraso desde la fecha de vencimiento.
-        Solo cuenta si ya pasó el día de vencimiento.
+        Calcula los días de atraso desde la fecha de vencimiento hasta la fecha
+        de evaluación (por defecto hoy). Solo cuenta si ya pasó el día de vencimiento.
         """
-        if not MoraService.esta_vencida(fecha_vencimiento):
+        as_of = as_of or date.today()
+        if not MoraService.esta_vencida(fecha_vencimiento, as_of):
             return 0
-        return (date.today() - fecha_vencimiento).days
+        return (as_of - fecha_vencimiento).days
 
     @staticmethod
-    def obtener_siguiente_cuota(cuota: 'Cuota') -> Optional['Cuota']:
+    def obtener_siguiente_cuota(cuota: 'Cuota', ledger: Optional[CuotaLedger] = None) -> Optional['Cuota']:
         """
         Obtiene la siguiente cuota del mismo préstamo.
+        Si se pasa un ledger, se resuelve en memoria.
         """
+        if ledger is not None:
+            return ledger.siguiente(cuota)
         return Cuota.query.filter_by(
             prestamo_id=cuota.prestamo_id,
             numero_cuota=cuota.numero_cuota + 1
         ).first()
 
     @staticmethod
-    def obtener_cuotas_desde(cuota: 'Cuota') -> List['Cuota']:
+    def obtener_cuotas_desde(cuota: 'Cuota', ledger: Optional[CuotaLedger] = None) -> List['Cuota']:
         """
         Obtiene todas las cuotas desde la cuota dada hasta la última (inclusive).
+        Si se pasa un ledger, se resuelve en memoria.
         """
+        if ledger is not None:
+            return ledger.desde(cuota)
         return Cuota.query.filter(
             Cuota.prestamo_id == cuota.prestamo_id,
             Cuota.numero_cuota >= cuota.numero_cuota
         ).order_by(Cuota.numero_cuota).all()
 
     @staticmethod
-    def calcular_meses_atraso_por_cuotas(cuota: 'Cuota', desde_cuota: 'Cuota' = None) -> int:
+    def calcular_meses_atraso_por_cuotas(cuota: 'Cuota', desde_cuota: 'Cuota' = None,
+                                         ledger: Optional[CuotaLedger] = None,
+                                         as_of: Optional[date] = None) -> int:
         """
         Calcula los meses de atraso basándose en las fechas de vencimiento de cuotas.
-        
+
         LÓGICA:
         - Un "mes" = cuando pasa una fecha de vencimiento de cuota (hoy > fecha_vencimiento).
         - Meses de atraso = cuántas fechas de vencimiento (desde la cuota de referencia) ya pasaron.
-        
+
         Args:
             cuota: Cuota a evaluar
             desde_cuota: Cuota desde donde empezar a contar (para pagos parciales).
                          Si es None, se usa la misma cuota.
-        
+            ledger: Cuotas del préstamo ya cargadas (evita consultar la BD)
+            as_of: Fecha de evaluación (por defecto hoy)
+
         Ejemplo SIN pago parcial:
         - Cuota 1 vence 09/Ene, Cuota 2 vence 09/Feb, Cuota 3 vence 09/Mar
         - Hoy = 10/Ene: Cuota 1 → 1 mes (solo su fecha venció)
         - Hoy = 10/Feb: Cuota 1 → 2 meses (vencieron 09/Ene y 09/Feb)
-        
+
         Ejemplo CON pago parcial (desde_cuota = Cuota 2):
         - Hoy = 10/Feb: Cuota 1 → 1 mes (cuenta desde Cuota 2)
         - Hoy = 10/Mar: Cuota 1 → 2 meses (vencieron 09/Feb y 09/Mar)
         """
-        hoy = date.today()
+        hoy = as_of or date.today()
         cuota_referencia = desde_cuota or cuota
-        
+
         # Si la cuota de referencia no está vencida, no hay atraso
-        if not MoraService.esta_vencida(cuota_referencia.fecha_vencimiento):
+        if not MoraService.esta_vencida(cuota_referencia.fecha_vencimiento, hoy):
             return 0
-        
+
         # Obtener todas las cuotas desde la cuota de referencia
-        cuotas_desde_referencia = MoraService.obtener_cuotas_desde(cuota_referencia)
-        
+        cuotas_desde_referencia = MoraService.obtener_cuotas_desde(cuota_referencia, ledger)
+
         if not cuotas_desde_referencia:
             return 0
-        
+
         # Contar cuántas fechas de vencimiento ya pasaron (hoy > fecha_vencimiento)
         meses_atraso = 0
-        
+
         for c in cuotas_desde_referencia:
             if hoy > c.fecha_vencimiento:
                 meses_atraso += 1
             else:
                 break
-        
+
         # Si es la última cuota y ya pasó su vencimiento, calcular meses adicionales
         # basándose en 30 días desde la última fecha de vencimiento
         if meses_atraso == len(cuotas_desde_referencia) and meses_atraso > 0:
             ultima_cuota = cuotas_desde_referencia[-1]
             dias_extra = (hoy - ultima_cuota.fecha_vencimiento).days
-            
+
             if dias_extra > 0:
                 # Meses adicionales después de la última cuota
                 meses_extra = (dias_extra - 1) // MoraService.DIAS_POR_MES
                 meses_atraso += meses_extra
-        
+
         logger.debug(
-            f"Cuota {cuota.cuota_id} (#{cuota.numero_cuota}): "
-            f"{meses_atraso} mes(es) de atraso (desde cuota #{cuota_referencia.numero_cuota})"
+            "Cuota %s (#%s): %s mes(es) de atraso (desde cuota #%s)",
+            cuota.cuota_id, cuota.numero_cuota, meses_atraso, cuota_referencia.numero_cuota
         )
-        
+
         return meses_atraso
 
     @staticmethod
     def es_pago_parcial(cuota: 'Cuota') -> bool:
         """
         Verifica si una cuota tiene un pago parcial.
-        
+
         Pago parcial = hay algún monto pagado PERO aún queda saldo pendiente
         """
         monto_pagado = cuota.monto_pagado or Decimal('0.00')
         saldo_pendiente = cuota.saldo_pendiente or Decimal('0.00')
-        
+
         return monto_pagado > 0 and saldo_pendiente > 0
 
     @staticmethod
-    def mora_congelada_por_pago_parcial(cuota: 'Cuota') -> bool:
+    def mora_congelada_por_pago_parcial(cuota: 'Cuota', ledger: Optional[CuotaLedger] = None,
+                                        as_of: Optional[date] = None) -> bool:
         """
         Verifica si la mora está congelada debido a un pago parcial.
-        
+
         REGLA DE NEGOCIO:
-        - Si hay pago parcial, la mora se congela HASTA que pase la fecha 
+        - Si hay pago parcial, la mora se congela HASTA que pase la fecha
           de vencimiento de la SIGUIENTE cuota (hoy > siguiente.fecha_vencimiento).
         - Si ya pasó, la mora se aplica desde la siguiente cuota.
-        
+
         Returns:
             True si la mora está congelada, False si debe aplicarse
         """
         # Si no es pago parcial, la mora no está congelada
         if not MoraService.es_pago_parcial(cuota):
             return False
-        
+
         # Buscar la siguiente cuota
-        siguiente_cuota = MoraService.obtener_siguiente_cuota(cuota)
-        
+        siguiente_cuota = MoraService.obtener_siguiente_cuota(cuota, ledger)
+
         if siguiente_cuota:
-            hoy = date.today()
-            
+            hoy = as_of or date.today()
+
             # Mora congelada si hoy <= fecha de vencimiento de la siguiente cuota
             if hoy <= siguiente_cuota.fecha_vencimiento:
-                logger.info(
-                    f"Mora CONGELADA para cuota {cuota.cuota_id} (pago parcial): "
-                    f"Hoy={hoy} <= Venc. siguiente cuota={siguiente_cuota.fecha_vencimiento}"
+                logger.debug(
+                    "Mora CONGELADA para cuota %s (pago parcial): Hoy=%s <= Venc. siguiente cuota=%s",
+                    cuota.cuota_id, hoy, siguiente_cuota.fecha_vencimiento
                 )
                 return True
             else:
-                logger.info(
-                    f"Mora ACTIVA para cuota {cuota.cuota_id} (pago parcial): "
-                    f"Hoy={hoy} > Venc. siguiente cuota={siguiente_cuota.fecha_vencimiento}"
+                logger.debug(
+                    "Mora ACTIVA para cuota %s (pago parcial): Hoy=%s > Venc. siguiente cuota=%s",
+                    cuota.cuota_id, hoy, siguiente_cuota.fecha_vencimiento
                 )
                 return False
         else:
             # Es la última cuota: aplicar lógica normal de 30 días
-            logger.info(
-                f"Cuota {cuota.cuota_id} es la última del préstamo. "
-                f"Aplicando lógica normal de mora."
+            logger.debug(
+                "Cuota %s es la última del préstamo. Aplicando lógica normal de mora.",
+                cuota.cuota_id
             )
             return False
 
@@ -179,133 +244,450 @@ class MoraService:
     def calcular_mora_cuota(monto_a_aplicar: Decimal, numero_meses_atraso: int) -> Decimal:
         """
         Calcula la mora de una cuota.
-        
+
         Mora = monto × 1% × número de meses de atraso
         """
         if numero_meses_atraso <= 0:
             return Decimal('0.00')
-        
+
         mora = monto_a_aplicar * MoraService.TASA_MORA_MENSUAL * numero_meses_atraso
         return mora.quantize(Decimal('0.01'))
 
     @staticmethod
-    def actualizar_mora_cuota(cuota_id: int) -> Tuple[Decimal, str]:
+    def evaluar_mora_cuota(cuota: 'Cuota', ledger: CuotaLedger,
+                           as_of: Optional[date] = None) -> Tuple[Decimal, Decimal, Decimal, str]:
         """
-        Actualiza la mora de una cuota basada en su estado.
-        
+        Evalúa la mora de una cuota SIN modificarla.
+
         REGLAS:
         1. Si la cuota NO está vencida (hoy <= fecha_vencimiento) → mora = 0
         2. Si tiene pago parcial Y hoy <= venc. siguiente cuota → mora = 0 (CONGELADA)
         3. Si tiene pago parcial Y hoy > venc. siguiente cuota → mora = 1% × meses DESDE la siguiente cuota
         4. Si NO tiene pago parcial y está vencida → mora = 1% × meses desde esta cuota
+
+        Args:
+            cuota: Cuota a evaluar (debe pertenecer al ledger)
+            ledger: Cuotas del préstamo ya cargadas
+            as_of: Fecha de evaluación (por defecto hoy)
+
+        Returns:
+            Tuple[mora_generada, mora_acumulada, mora_reportada, mensaje]
+        """
+        as_of = as_of or date.today()
+        mora_generada = cuota.mora_generada
+
+        # REGLA 1: Si no está vencida, no hay mora
+        if not MoraService.esta_vencida(cuota.fecha_vencimiento, as_of):
+            return mora_generada, Decimal('0.00'), Decimal('0.00'), "Cuota no está vencida"
+
+        # REGLA 2: Verificar si la mora está CONGELADA por pago parcial
+        if MoraService.mora_congelada_por_pago_parcial(cuota, ledger, as_of):
+            return mora_generada, Decimal('0.00'), Decimal('0.00'), "Mora congelada por pago parcial"
+
+        # REGLA 3 y 4: Calcular mora sobre saldo pendiente
+        if cuota.saldo_pendiente and cuota.saldo_pendiente > 0:
+
+            # Determinar desde qué cuota contar los meses
+            desde_cuota = cuota  # Por defecto, desde esta cuota
+
+            if MoraService.es_pago_parcial(cuota):
+                # REGLA 3: Pago parcial descongelado → contar desde la siguiente cuota
+                siguiente_cuota = MoraService.obtener_siguiente_cuota(cuota, ledger)
+                if siguiente_cuota:
+                    desde_cuota = siguiente_cuota
+
+            # Calcular meses de atraso desde la cuota de referencia
+            meses_atraso = MoraService.calcular_meses_atraso_por_cuotas(cuota, desde_cuota, ledger, as_of)
+
+            if meses_atraso <= 0:
+                return mora_generada, Decimal('0.00'), Decimal('0.00'), "Sin meses de atraso"
+
+            mora_nueva = MoraService.calcular_mora_cuota(cuota.saldo_pendiente, meses_atraso)
+            return mora_nueva, mora_nueva, mora_nueva, f"Mora: {mora_nueva} ({meses_atraso} mes(es))"
+
+        # Cuota completamente pagada
+        mora_historica = mora_generada or Decimal('0.00')
+        return mora_generada, cuota.mora_acumulada, mora_historica, f"Mora histórica: {mora_historica}"
+
+    @staticmethod
+    def _aplicar_mora_cuota(cuota: 'Cuota', ledger: CuotaLedger,
+                            as_of: Optional[date] = None) -> Tuple[Decimal, str]:
+        """Evalúa la mora de la cuota y la asigna en la sesión (sin commit)."""
+        mora_generada, mora_acumulada, mora, mensaje = MoraService.evaluar_mora_cuota(cuota, ledger, as_of)
+
+        if mora_generada != cuota.mora_generada:
+            cuota.mora_generada = mora_generada
+        if mora_acumulada != cuota.mora_acumulada:
+            cuota.mora_acumulada = mora_acumulada
+
+        return mora, mensaje
+
+    @staticmethod
+    def actualizar_mora_cuota(cuota_id: int, ledger: Optional[CuotaLedger] = None,
+                              as_of: Optional[date] = None) -> Tuple[Decimal, str]:
+        """
+        Actualiza la mora de una cuota basada en su estado (ver evaluar_mora_cuota).
+
+        Args:
+            cuota_id: ID de la cuota
+            ledger: Cuotas del préstamo ya cargadas. Si es None se cargan en una consulta.
+            as_of: Fecha de evaluación (por defecto hoy)
         """
         try:
-            cuota = Cuota.query.get(cuota_id)
+            cuota = ledger.obtener(cuota_id) if ledger is not None else db.session.get(Cuota, cuota_id)
             if not cuota:
                 return Decimal('0.00'), f"Cuota {cuota_id} no encontrada"
 
-            # REGLA 1: Si no está vencida, no hay mora
-            if not MoraService.esta_vencida(cuota.fecha_vencimiento):
-                cuota.mora_acumulada = Decimal('0.00')
-                db.session.commit()
-                return Decimal('0.00'), "Cuota no está vencida"
+            if ledger is None:
+                ledger = CuotaLedger.cargar(cuota.prestamo_id)
 
-            # REGLA 2: Verificar si la mora está CONGELADA por pago parcial
-            if MoraService.mora_congelada_por_pago_parcial(cuota):
-                cuota.mora_acumulada = Decimal('0.00')
-                db.session.commit()
-                return Decimal('0.00'), "Mora congelada por pago parcial"
-
-            # REGLA 3 y 4: Calcular mora sobre saldo pendiente
-            if cuota.saldo_pendiente and cuota.saldo_pendiente > 0:
-                
-                # Determinar desde qué cuota contar los meses
-                desde_cuota = cuota  # Por defecto, desde esta cuota
-                
-                if MoraService.es_pago_parcial(cuota):
-                    # REGLA 3: Pago parcial descongelado → contar desde la siguiente cuota
-                    siguiente_cuota = MoraService.obtener_siguiente_cuota(cuota)
-                    if siguiente_cuota:
-                        desde_cuota = siguiente_cuota
-                
-                # Calcular meses de atraso desde la cuota de referencia
-                meses_atraso = MoraService.calcular_meses_atraso_por_cuotas(cuota, desde_cuota)
-                
-                if meses_atraso <= 0:
-                    cuota.mora_acumulada = Decimal('0.00')
-                    db.session.commit()
-                    return Decimal('0.00'), "Sin meses de atraso"
-                
-                mora_nueva = MoraService.calcular_mora_cuota(
-                    cuota.saldo_pendiente,
-                    meses_atraso
-                )
-                
-                cuota.mora_generada = mora_nueva
-                cuota.mora_acumulada = mora_nueva
-                
-                db.session.commit()
-                
-                logger.info(
-                    f"Mora actualizada para cuota {cuota_id}: "
-                    f"Mora={mora_nueva}, Saldo={cuota.saldo_pendiente}, "
-                    f"Meses={meses_atraso}, Desde cuota #{desde_cuota.numero_cuota}"
-                )
-                
-                return mora_nueva, f"Mora: {mora_nueva} ({meses_atraso} mes(es))"
-            else:
-                # Cuota completamente pagada
-                mora_historica = cuota.mora_generada or Decimal('0.00')
-                return mora_historica, f"Mora histórica: {mora_historica}"
+            mora, mensaje = MoraService._aplicar_mora_cuota(cuota, ledger, as_of)
+            db.session.commit()
+
+            return mora, mensaje
 
         except Exception as exc:
+            db.session.rollback()
             logger.error(f"Error al actualizar mora de cuota {cuota_id}: {exc}")
             return Decimal('0.00'), f"Error: {str(exc)}"
 
     @staticmethod
-    def actualizar_mora_prestamo(prestamo_id: int) -> Dict[str, Any]:
+    def actualizar_mora_prestamo(prestamo_id: int, as_of: Optional[date] = None) -> Dict[str, Any]:
         """
         Actualiza la mora de todas las cuotas de un préstamo.
+        Las cuotas se cargan una sola vez (CuotaLedger) y se confirma en un único commit,
+        por lo que el número de consultas no depende del plazo.
+
+        Args:
+            prestamo_id: ID del préstamo
+            as_of: Fecha de evaluación (por defecto hoy)
         """
         try:
-            cuotas = Cuota.query.filter_by(prestamo_id=prestamo_id).all()
-            
+            as_of = as_of or date.today()
+            ledger = CuotaLedger.cargar(prestamo_id)
+
             total_mora = Decimal('0.00')
             mora_por_cuota = {}
 
-            for cuota in cuotas:
-                mora, mensaje = MoraService.actualizar_mora_cuota(cuota.cuota_id)
+            for cuota in ledger:
+                mora, mensaje = MoraService._aplicar_mora_cuota(cuota, ledger, as_of)
                 total_mora += mora
-                
+
                 # Calcular meses para mostrar en respuesta
                 desde_cuota = cuota
                 if MoraService.es_pago_parcial(cuota):
-                    siguiente = MoraService.obtener_siguiente_cuota(cuota)
+                    siguiente = MoraService.obtener_siguiente_cuota(cuota, ledger)
                     if siguiente:
                         desde_cuota = siguiente
-                
-                meses_atraso = MoraService.calcular_meses_atraso_por_cuotas(cuota, desde_cuota)
-                
+
+                meses_atraso = MoraService.calcular_meses_atraso_por_cuotas(cuota, desde_cuota, ledger, as_of)
+
                 mora_por_cuota[cuota.numero_cuota] = {
                     'mora': float(mora),
                     'mensaje': mensaje,
                     'es_pago_parcial': MoraService.es_pago_parcial(cuota),
                     'meses_atraso': meses_atraso,
-                    'mora_congelada': MoraService.mora_congelada_por_pago_parcial(cuota)
+                    'mora_congelada': MoraService.mora_congelada_por_pago_parcial(cuota, ledger, as_of)
                 }
 
+            db.session.commit()
+
             logger.info(f"Mora actualizada para préstamo {prestamo_id}: Total={total_mora}")
 
             return {
                 'prestamo_id': prestamo_id,
                 'total_mora': float(total_mora),
                 'mora_por_cuota': mora_por_cuota,
-                'total_cuotas': len(cuotas)
+                'total_cuotas': len(ledger)
             }
 
         except Exception as exc:
+            db.session.rollback()
             logger.error(f"Error al actualizar mora del préstamo {prestamo_id}: {exc}")
             return {
                 'error': str(exc),
                 'prestamo_id': prestamo_id
-            }
\ No newline at end of file
+            }
+
+    @staticmethod
+    def evaluar_mora_en_fechas(prestamo_id: int, fechas: Iterable[date]) -> Dict[str, Any]:
+        """
+        Evalúa la mora de un préstamo para varias fechas SIN modificar las cuotas.
+
+        Las cuotas se cargan una sola vez y cada fecha se evalúa en memoria, por lo que
+        sirve para reconstruir snapshots históricos (p. ej. cierre de mes). Se usan los
+        saldos actuales de las cuotas: pagos registrados después de una fecha no se revierten.
+
+        Args:
+            prestamo_id: ID del préstamo
+            fechas: Fechas de evaluación
+
+        Returns:
+            Dict con una evaluación por fecha (ordenadas ascendentemente)
+        """
+        ledger = CuotaLedger.cargar(prestamo_id)
+        evaluaciones = []
+
+        for fecha in sorted(set(fechas)):
+            total_mora = Decimal('0.00')
+            mora_por_cuota = {}
+
+            for cuota in ledger:
+                _, _, mora, mensaje = MoraService.evaluar_mora_cuota(cuota, ledger, fecha)
+                total_mora += mora
+                mora_por_cuota[cuota.numero_cuota] = {
+                    'mora': float(mora),
+                    'mensaje': mensaje
+                }
+
+            evaluaciones.append({
+                'fecha': fecha.isoformat(),
+                'total_mora': float(total_mora),
+                'mora_por_cuota': mora_por_cuota
+            })
+
+        return {
+            'prestamo_id': prestamo_id,
+            'total_cuotas': len(ledger),
+            'evaluaciones': evaluaciones
+        }
+
+    @staticmethod
+    def _consulta_cuotas_vigentes():
+        """SELECT de las columnas de cuota necesarias para evaluar mora (préstamos VIGENTES)."""
+        return (
+            db.select(
+                Cuota.cuota_id,
+                Cuota.prestamo_id,
+                Cuota.numero_cuota,
+                Cuota.fecha_vencimiento,
+                Cuota.monto_pagado,
+                Cuota.saldo_pendiente,
+                Cuota.mora_generada,
+                Cuota.mora_acumulada
+            )
+            .join(Prestamo, Prestamo.prestamo_id == Cuota.prestamo_id)
+            .where(Prestamo.estado == EstadoPrestamoEnum.VIGENTE)
+            .order_by(Cuota.prestamo_id, Cuota.numero_cuota)
+        )
+
+    @staticmethod
+    def _evaluar_filas(filas: List[Any], as_of: date) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Evalúa en memoria filas de cuotas ordenadas por (prestamo_id, numero_cuota).
+
+        Returns:
+            Tuple[número de préstamos, cambios para UPDATE masivo]
+        """
+        cambios = []
+        total_prestamos = 0
+
+        for _, grupo in groupby(filas, key=lambda f: f.prestamo_id):
+            ledger = CuotaLedger(grupo)
+            total_prestamos += 1
+
+            for cuota in ledger:
+                mora_generada, mora_acumulada, _, _ = MoraService.evaluar_mora_cuota(cuota, ledger, as_of)
+
+                if mora_generada != cuota.mora_generada or mora_acumulada != cuota.mora_acumulada:
+                    cambios.append({
+                        'cuota_id': cuota.cuota_id,
+                        'mora_generada': mora_generada,
+                        'mora_acumulada': mora_acumulada
+                    })
+
+        return total_prestamos, cambios
+
+    @staticmethod
+    def _escribir_cambios(cambios: List[Dict[str, Any]], tamano_lote: int) -> int:
+        """Aplica los cambios con UPDATEs masivos (un commit por lote). Retorna el número de lotes."""
+        lotes = 0
+        try:
+            for i in range(0, len(cambios), tamano_lote):
+                db.session.execute(update(Cuota), cambios[i:i + tamano_lote])
+                db.session.commit()
+                lotes += 1
+        except Exception as exc:
+            db.session.rollback()
+            logger.error(f"Error en actualización masiva de mora (lote {lotes + 1}): {exc}", exc_info=True)
+            raise
+        return lotes
+
+    @staticmethod
+    def recalcular_mora_cartera(tamano_lote: int = TAMANO_LOTE_ACTUALIZACION,
+                                as_of: Optional[date] = None) -> Dict[str, Any]:
+        """
+        Recalcula la mora de todas las cuotas de los préstamos VIGENTES.
+
+        A diferencia de actualizar_mora_prestamo (una transacción por préstamo),
+        carga las cuotas de la cartera en una sola consulta ordenada, evalúa las reglas
+        de mora en memoria (un CuotaLedger por préstamo) y escribe solo las filas que
+        cambiaron mediante UPDATEs masivos por lotes. El resultado es idéntico al del
+        cálculo cuota por cuota.
+
+        Args:
+            tamano_lote: Número de filas por UPDATE masivo (un commit por lote)
+            as_of: Fecha de evaluación (por defecto hoy)
+
+        Returns:
+            Dict con el resumen de la ejecución (filas evaluadas, actualizadas y filas/seg)
+        """
+        inicio = time.perf_counter()
+        hoy = as_of or date.today()
+
+        filas = db.session.execute(MoraService._consulta_cuotas_vigentes()).all()
+        total_prestamos, cambios = MoraService._evaluar_filas(filas, hoy)
+        lotes = MoraService._escribir_cambios(cambios, tamano_lote)
+
+        duracion = time.perf_counter() - inicio
+        filas_por_segundo = len(filas) / duracion if duracion > 0 else float(len(filas))
+
+        logger.info(
+            f"Recálculo de mora de cartera: {total_prestamos} préstamos, {len(filas)} cuotas evaluadas, "
+            f"{len(cambios)} actualizadas en {lotes} lote(s), {duracion:.2f}s ({filas_por_segundo:.0f} filas/s)"
+        )
+
+        return {
+            'fecha_evaluacion': hoy.isoformat(),
+            'prestamos': total_prestamos,
+            'cuotas_evaluadas': len(filas),
+            'cuotas_actualizadas': len(cambios),
+            'lotes': lotes,
+            'duracion_segundos': round(duracion, 3),
+            'filas_por_segundo': round(filas_por_segundo, 1)
+        }
+
+    @staticmethod
+    def _prestamos_con_cambio_de_estado(desde: date, hasta: date) -> List[int]:
+        """
+        IDs de préstamos VIGENTES cuya mora puede cambiar entre `desde` (ya evaluada)
+        y `hasta`:
+        - Alguna cuota venció en [desde, hasta): cambia su estado de vencida, los meses
+          de atraso de las cuotas anteriores y el congelamiento por pago parcial.
+        - La última cuota ya venció y se cruzó un nuevo bloque de 30 días.
+        - Se registraron pagos desde `desde`.
+        """
+        vigente = Prestamo.estado == EstadoPrestamoEnum.VIGENTE
+
+        por_vencimiento = db.session.execute(
+            db.select(Cuota.prestamo_id).distinct()
+            .join(Prestamo, Prestamo.prestamo_id == Cuota.prestamo_id)
+            .where(vigente, Cuota.fecha_vencimiento >= desde, Cuota.fecha_vencimiento < hasta)
+        ).scalars().all()
+
+        por_pago = db.session.execute(
+            db.select(Cuota.prestamo_id).distinct()
+            .join(Pago, Pago.cuota_id == Cuota.cuota_id)
+            .join(Prestamo, Prestamo.prestamo_id == Cuota.prestamo_id)
+            .where(vigente, Pago.fecha_pago >= desde)
+        ).scalars().all()
+
+        # Préstamos con todas las cuotas vencidas: meses extra = (días - 1) // 30
+        ultimos_vencimientos = db.session.execute(
+            db.select(Cuota.prestamo_id, func.max(Cuota.fecha_vencimiento))
+            .join(Prestamo, Prestamo.prestamo_id == Cuota.prestamo_id)
+            .where(vigente)
+            .group_by(Cuota.prestamo_id)
+            .having(func.max(Cuota.fecha_vencimiento) < desde)
+        ).all()
+
+        por_ultima_cuota = [
+            prestamo_id for prestamo_id, ultimo in ultimos_vencimientos
+            if ((hasta - ultimo).days - 1) // MoraService.DIAS_POR_MES
+            != ((desde - ultimo).days - 1) // MoraService.DIAS_POR_MES
+        ]
+
+        return sorted(set(por_vencimiento) | set(por_pago) | set(por_ultima_cuota))
+
+    @staticmethod
+    def recalcular_mora_incremental(tamano_lote: int = TAMANO_LOTE_ACTUALIZACION,
+                                    as_of: Optional[date] = None) -> Dict[str, Any]:
+        """
+        Recalcula la mora solo de los préstamos que cambiaron de estado desde la
+        última ejecución (marca de agua en ejecuciones_proceso).
+
+        La primera ejecución (sin marca de agua) hace el recálculo completo de la
+        cartera. Las siguientes solo cargan los préstamos devueltos por
+        _prestamos_con_cambio_de_estado, así que el costo diario depende de cuántas
+        cuotas cambiaron de estado y no del tamaño de la cartera.
+
+        Args:
+            tamano_lote: Número de filas por UPDATE masivo (un commit por lote)
+            as_of: Fecha de evaluación (por defecto hoy)
+
+        Returns:
+            Dict con el resumen de la ejecución
+        """
+        inicio = time.perf_counter()
+        hoy = as_of or date.today()
+
+        marca = db.session.get(EjecucionProceso, MoraService.PROCESO_MORA_INCREMENTAL)
+
+        if marca is None:
+            resultado = MoraService.recalcular_mora_cartera(tamano_lote=tamano_lote, as_of=hoy)
+            resultado.update({'modo': 'completo', 'desde': None})
+            MoraService._guardar_marca_de_agua(hoy)
+            return resultado
+
+        desde = marca.fecha_corte
+        resultado = {
+            'fecha_evaluacion': hoy.isoformat(),
+            'modo': 'incremental',
+            'desde': desde.isoformat(),
+            'prestamos': 0,
+            'cuotas_evaluadas': 0,
+            'cuotas_actualizadas': 0,
+            'lotes': 0
+        }
+
+        if hoy <= desde:
+            logger.info(f"Mora incremental: nada que procesar (marca de agua {desde}, evaluación {hoy})")
+            resultado.update({'duracion_segundos': 0.0, 'filas_por_segundo': 0.0})
+            return resultado
+
+        prestamo_ids = MoraService._prestamos_con_cambio_de_estado(desde, hoy)
+
+        filas = []
+        for i in range(0, len(prestamo_ids), tamano_lote):
+            filas.extend(db.session.execute(
+                MoraService._consulta_cuotas_vigentes()
+                .where(Cuota.prestamo_id.in_(prestamo_ids[i:i + tamano_lote]))
+            ).all())
+
+        total_prestamos, cambios = MoraService._evaluar_filas(filas, hoy)
+        lotes = MoraService._escribir_cambios(cambios, tamano_lote)
+        MoraService._guardar_marca_de_agua(hoy)
+
+        duracion = time.perf_counter() - inicio
+        filas_por_segundo = len(filas) / duracion if duracion > 0 else float(len(filas))
+
+        logger.info(
+            f"Mora incremental {desde} → {hoy}: {total_prestamos} préstamos, {len(filas)} cuotas evaluadas, "
+            f"{len(cambios)} actualizadas en {lotes} lote(s), {duracion:.2f}s"
+        )
+
+        resultado.update({
+            'prestamos': total_prestamos,
+            'cuotas_evaluadas': len(filas),
+            'cuotas_actualizadas': len(cambios),
+            'lotes': lotes,
+            'duracion_segundos': round(duracion, 3),
+            'filas_por_segundo': round(filas_por_segundo, 1)
+        })
+        return resultado
+
+    @staticmethod
+    def _guardar_marca_de_agua(fecha_corte: date) -> None:
+        """Registra la fecha evaluada por el recálculo incremental."""
+        try:
+            marca = db.session.get(EjecucionProceso, MoraService.PROCESO_MORA_INCREMENTAL)
+            if marca is None:
+                marca = EjecucionProceso(proceso=MoraService.PROCESO_MORA_INCREMENTAL, fecha_corte=fecha_corte)
+                db.session.add(marca)
+            else:
+                marca.fecha_corte = fecha_corte
+            db.session.commit()
+        except Exception as exc:
+            db.session.rollback()
+            logger.error(f"Error al guardar marca de agua de mora: {exc}", exc_info=True)
+            raise
@@ -13,7 +13,7 @@ from app.crud.pago_crud import (
     actualizar_pago
 )
 from app.services.mora_service import MoraService
-from app.services.caja_service import CajaService
+from app.services.caja_service import CajaService, CajaCerradaError
 
 logger = logging.getLogger(__name__)
     
@@ -126,6 +126,12 @@ class PagoService:
 
             fecha_pago = fecha_pago or date.today()
 
+            # Un día cerrado no admite pagos: su cuadre ya se guardó
+            try:
+                CajaService.verificar_caja_abierta(fecha_pago)
+            except CajaCerradaError as exc:
+                return None, exc.message, 409
+
             logger.info(f"Registrando pago para préstamo {prestamo_id} con fecha: {fecha_pago}")
 
             # Obtener cuotas pendientes para calcular la deuda real
@@ -254,6 +260,12 @@ class PagoService:
             except Exception as email_exc:
                 logger.error(f"Error al enviar voucher de pago: {email_exc}", exc_info=True)
 
+            # Avisar a las pantallas de cuadre conectadas (el pago ya está guardado)
+            try:
+                CajaService.notificar_pago(nuevo_pago)
+            except Exception as evento_exc:
+                logger.warning(f"No se pudo notificar el pago {nuevo_pago.pago_id} a caja: {evento_exc}")
+
             # Preparar respuesta
             respuesta = {
                 'success': True,
@@ -281,7 +293,6 @@ class PagoService:
 
             # Si el cliente entregó más dinero que lo registrado en caja, registrar el vuelto como egreso
             try:
-                from app.services.caja_service import CajaService
                 if es_efectivo:
                     vuelto_calculado = monto_entregado - monto_pagado_registrado
                     logger.warn(f"Vuelto: {vuelto_calculado}")
@@ -305,6 +316,10 @@ class PagoService:
                     logger.info(f"Préstamo {prestamo_id} marcado como CANCELADO - todas las cuotas pagadas")
                     respuesta['prestamo_cancelado'] = True
 
+            # El flujo proyectado de la cartera cambió
+            from app.services.proyeccion_service import ProyeccionService
+            ProyeccionService.invalidar_cache()
+
             logger.info(
                 f"Pago registrado: Préstamo={prestamo_id}, Caja={monto_pagado_registrado}, Mora={monto_mora_total}, "
                 f"Ajuste redondeo={ajuste_redondeo}, Detalles={len(detalles_pago)} movimientos"
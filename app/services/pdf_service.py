@@ -16,6 +16,32 @@ logger = logging.getLogger(__name__)
 class PDFService:
     """Servicio para generación de PDFs"""
     
+    @staticmethod
+    def _fila_cronograma(cuota):
+        """
+        Normaliza una cuota para la tabla del PDF.
+        Acepta cuotas de FinancialService (numero_cuota, monto_capital, fecha date, ...)
+        o el formato plano (numero, capital, interes, saldo, fecha str).
+        """
+        if 'numero_cuota' in cuota:
+            fecha = cuota['fecha_vencimiento']
+            return (
+                cuota['numero_cuota'],
+                fecha.strftime('%d/%m/%Y') if hasattr(fecha, 'strftime') else str(fecha),
+                float(cuota['monto_cuota']),
+                float(cuota['monto_capital']),
+                float(cuota['monto_interes']),
+                float(cuota['saldo_capital'])
+            )
+        return (
+            cuota['numero'],
+            cuota['fecha_vencimiento'],
+            float(cuota['monto_cuota']),
+            float(cuota['capital']),
+            float(cuota['interes']),
+            float(cuota['saldo'])
+        )
+    
     @staticmethod
     def generar_cronograma_detallado_pdf(nombre_cliente, prestamo, cronograma):
         """
@@ -24,7 +50,8 @@ class PDFService:
         Args:
             nombre_cliente: Nombre del cliente
             prestamo: Objeto Prestamo con los datos
-            cronograma: Lista de diccionarios con cronograma detallado
+            cronograma: Iterable de cuotas (lista o FinancialService.iterar_cronograma_pagos);
+                        se dibuja fila por fila sin materializarlo
             
         Returns:
             BytesIO: Buffer con el contenido del PDF
@@ -78,12 +105,13 @@ class PDFService:
                     p.setFont("Helvetica", 9)
                     y_pos = 730
                 
-                p.drawString(50, y_pos, str(cuota['numero']))
-                p.drawString(80, y_pos, cuota['fecha_vencimiento'])
-                p.drawString(170, y_pos, f"S/ {cuota['monto_cuota']:.2f}")
-                p.drawString(240, y_pos, f"S/ {cuota['capital']:.2f}")
-                p.drawString(310, y_pos, f"S/ {cuota['interes']:.2f}")
-                p.drawString(380, y_pos, f"S/ {cuota['saldo']:.2f}")
+                numero, fecha, monto_cuota, capital, interes, saldo = PDFService._fila_cronograma(cuota)
+                p.drawString(50, y_pos, str(numero))
+                p.drawString(80, y_pos, fecha)
+                p.drawString(170, y_pos, f"S/ {monto_cuota:.2f}")
+                p.drawString(240, y_pos, f"S/ {capital:.2f}")
+                p.drawString(310, y_pos, f"S/ {interes:.2f}")
+                p.drawString(380, y_pos, f"S/ {saldo:.2f}")
             
             p.showPage()
             p.save()
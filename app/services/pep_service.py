@@ -4,25 +4,339 @@ Maneja la validación de Personas Expuestas Políticamente (PEP).
 Centraliza la lógica de carga y consulta del dataset PEP.
 """
 
+import csv
+import hashlib
+import json
 import logging
+import os
+import threading
+import unicodedata
+from collections import defaultdict
+import numpy as np
 import pandas as pd
+from datetime import datetime
 from pathlib import Path
 
+from app.common.errors import ServiceUnavailableError
+
 logger = logging.getLogger(__name__)
 
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+
+class PEPNoDisponibleError(ServiceUnavailableError):
+    """El dataset PEP sigue cargándose y no estuvo listo dentro del tiempo de espera"""
+    
+    def __init__(self, message: str = "Dataset PEP aún no disponible, reintente en unos segundos"):
+        super().__init__(message)
+
+
+class IndiceNombresPEP:
+    """
+    Índice invertido de trigramas sobre los nombres del dataset PEP.
+    
+    Similitud = |trigramas comunes| / |unión| (misma métrica que pg_trgm), insensible
+    a tildes, mayúsculas y orden de nombres/apellidos. Cada consulta suma las listas
+    de postings de sus trigramas con np.bincount y elige el top-k con argpartition.
+    """
+    
+    def __init__(self, registros, version=None):
+        self.version = version
+        self.registros = registros
+        
+        postings = defaultdict(list)
+        self._tamanos = np.zeros(len(registros), dtype=np.int32)
+        for i, (nombre, *_) in enumerate(registros):
+            trigramas = self.trigramas(nombre)
+            self._tamanos[i] = len(trigramas)
+            for trigrama in trigramas:
+                postings[trigrama].append(i)
+        self._postings = {t: np.array(ids, dtype=np.int32) for t, ids in postings.items()}
+    
+    def __len__(self):
+        return len(self.registros)
+    
+    @staticmethod
+    def normalizar_nombre(nombre):
+        """Mayúsculas, sin tildes ni signos: 'José  Pérez-Díaz' -> 'JOSE PEREZ DIAZ'."""
+        texto = unicodedata.normalize('NFKD', str(nombre or ''))
+        texto = ''.join(c for c in texto if not unicodedata.combining(c)).upper()
+        return ' '.join(''.join(c if 'A' <= c <= 'Z' else ' ' for c in texto).split())
+    
+    @classmethod
+    def trigramas(cls, nombre):
+        """Trigramas por palabra con relleno, como pg_trgm ('  J', ' JU', 'JUA', 'UAN', 'AN ')."""
+        trigramas = set()
+        for palabra in cls.normalizar_nombre(nombre).split():
+            relleno = f"  {palabra} "
+            trigramas.update(relleno[i:i + 3] for i in range(len(relleno) - 2))
+        return trigramas
+    
+    def buscar(self, nombre, k=5, umbral=0.5):
+        """
+        Top-k registros más parecidos a `nombre` con similitud >= umbral.
+        
+        Returns:
+            list[dict]: nombre, dni y cargo del registro PEP, y similitud (0-1), de mayor a menor
+        """
+        trigramas = self.trigramas(nombre)
+        listas = [self._postings[t] for t in trigramas if t in self._postings]
+        if not listas or k <= 0:
+            return []
+        
+        comunes = np.bincount(np.concatenate(listas), minlength=len(self._tamanos))
+        ids = np.flatnonzero(comunes)
+        similitud = comunes[ids] / (len(trigramas) + self._tamanos[ids] - comunes[ids])
+        
+        seleccion = similitud >= umbral
+        ids, similitud = ids[seleccion], similitud[seleccion]
+        if len(ids) > k:
+            mejores = np.argpartition(-similitud, k - 1)[:k]
+            ids, similitud = ids[mejores], similitud[mejores]
+        orden = np.argsort(-similitud, kind='stable')
+        
+        return [
+            {
+                'nombre': self.registros[i][0],
+                'dni': self.registros[i][1] or None,
+                'cargo': self.registros[i][2] or None,
+                'similitud': round(float(valor), 4)
+            }
+            for i, valor in zip(ids[orden], similitud[orden])
+        ]
+
 
 class PEPService:
     """Servicio para validación de clientes PEP"""
     
-    # Cache del dataset PEP en memoria
+    # Dataset fuente (Excel) y su índice compilado: arreglo ordenado uint32 de DNIs (.npy)
+    # más un archivo sidecar con la huella del Excel del que se generó
+    DATASET_PEP_PATH = BASE_DIR / "dataset-pep" / "Autoridades_Electas.xls"
+    INDICE_PEP_PATH = BASE_DIR / "dataset-pep" / "Autoridades_Electas.dni.npy"
+    COLUMNAS_DNI = ['DNI', 'DOCUMENTO', 'NRO_DOCUMENTO', 'NUMERO_DOCUMENTO', 'DOCUMENTOIDENTIDAD']
+    COLUMNAS_NOMBRE = ['NOMBRES', 'APELLIDOPATERNO', 'APELLIDOMATERNO']
+    COLUMNAS_NOMBRE_COMPLETO = ['NOMBRE_COMPLETO', 'NOMBRE']
+    VERSION_INDICE = 1
+    
+    # Cache del dataset PEP en memoria (np.ndarray uint32 ordenado, normalmente memory-mapped)
     _dataset_pep = None
     _dataset_cargado = False
+    _origen_dataset = None
+    
+    # Ciclo de vida de la carga: la precarga corre en un hilo tras create_app
+    # y las consultas que llegan antes esperan (con timeout) a que termine
+    TIMEOUT_CONSULTA = 10.0
+    _lock_carga = threading.Lock()
+    _carga_terminada = threading.Event()
+    _hilo_carga = None
+    _error_carga = None
+    
+    # Recarga en caliente: un hilo vigila mtime/tamaño de Excel e índice; si cambian
+    # construye la nueva versión fuera del path de las consultas y la publica con un
+    # reemplazo atómico de la referencia (las consultas nunca toman este lock)
+    INTERVALO_RECARGA = 60.0
+    _lock_recarga = threading.Lock()
+    _detener_vigilancia = threading.Event()
+    _hilo_vigilancia = None
+    _version_dataset = None
+    _fecha_version = None
+    _firma_cargada = None
+    
+    # Índice de nombres (trigramas) para coincidencias aproximadas; se construye
+    # después del índice de DNIs y se reemplaza cuando cambia la versión del dataset
+    UMBRAL_SIMILITUD = 0.5
+    _indice_nombres = None
+    _lock_nombres = threading.Lock()
+    
+    # ==================== ÍNDICE COMPILADO ====================
+    
+    @staticmethod
+    def _normalizar_dni(dni):
+        """
+        Convierte un DNI a entero para el índice (los ceros a la izquierda no cuentan).
+        
+        Returns:
+            int | None: DNI numérico, o None si no es un DNI válido de hasta 8 dígitos
+        """
+        texto = str(dni).strip()
+        if texto.endswith('.0'):  # DNIs leídos por pandas como float
+            texto = texto[:-2]
+        if not texto.isdigit() or len(texto) > 8:
+            return None
+        return int(texto)
+    
+    @classmethod
+    def _ruta_metadatos(cls, indice=None):
+        indice = Path(indice or cls.INDICE_PEP_PATH)
+        return indice.with_suffix('.json')
+    
+    @classmethod
+    def _ruta_nombres(cls, indice=None):
+        indice = Path(indice or cls.INDICE_PEP_PATH)
+        return indice.with_suffix('.nombres.json')
+    
+    @staticmethod
+    def _huella_archivo(ruta, con_hash=True):
+        """Huella del Excel fuente: tamaño, mtime y (opcionalmente) SHA-256."""
+        estado = os.stat(ruta)
+        huella = {'tamano': estado.st_size, 'mtime_ns': estado.st_mtime_ns}
+        if con_hash:
+            sha = hashlib.sha256()
+            with open(ruta, 'rb') as archivo:
+                for bloque in iter(lambda: archivo.read(1 << 20), b''):
+                    sha.update(bloque)
+            huella['sha256'] = sha.hexdigest()
+        return huella
+    
+    @classmethod
+    def _leer_excel(cls, origen):
+        """
+        Lee el Excel PEP una sola vez y extrae DNIs y nombres.
+        
+        Returns:
+            tuple: (arreglo uint32 ordenado y sin duplicados de DNIs,
+                    lista de registros [nombre, dni tal cual, cargo] para el índice de nombres)
+            
+        Raises:
+            ValueError: Si el archivo no tiene ninguna columna de DNI conocida
+        """
+        df = pd.read_excel(origen)
+        
+        col_dni = next((c for c in cls.COLUMNAS_DNI if c in df.columns), None)
+        if not col_dni:
+            raise ValueError(f"No se encontró columna DNI. Columnas disponibles: {df.columns.tolist()}")
+        
+        dnis = [cls._normalizar_dni(valor) for valor in df[col_dni].dropna()]
+        dnis = np.unique(np.array([d for d in dnis if d is not None], dtype=np.uint32))
+        return dnis, cls._extraer_nombres(df, col_dni)
+    
+    @classmethod
+    def _extraer_nombres(cls, df, col_dni):
+        """Registros únicos [nombre, dni, cargo] (la misma autoridad aparece en varios periodos)."""
+        columnas = [c for c in cls.COLUMNAS_NOMBRE if c in df.columns]
+        if not columnas:
+            columnas = [c for c in cls.COLUMNAS_NOMBRE_COMPLETO if c in df.columns][:1]
+        if not columnas:
+            return []
+        
+        def _texto(valor):
+            return '' if pd.isna(valor) else str(valor).strip()
+        
+        nombres = df[columnas].apply(lambda fila: ' '.join(t for t in map(_texto, fila) if t), axis=1)
+        dnis = df[col_dni].map(_texto).str.replace(r'\.0$', '', regex=True)
+        cargos = df['CARGO'].map(_texto) if 'CARGO' in df.columns else [''] * len(df)
+        
+        registros = {}
+        for nombre, dni, cargo in zip(nombres, dnis, cargos):
+            if nombre:
+                registros.setdefault((nombre, dni), [nombre, dni, cargo])
+        return list(registros.values())
+    
+    @classmethod
+    def _escribir_indice(cls, dnis, huella, destino, nombres=None):
+        """Escribe índice y metadatos con reemplazo atómico (otros workers pueden estar leyéndolos)."""
+        destino = Path(destino)
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        
+        temporal = destino.with_name(f".{destino.name}.{os.getpid()}.tmp")
+        with open(temporal, 'wb') as archivo:
+            np.save(archivo, np.ascontiguousarray(dnis, dtype=np.uint32))
+        os.replace(temporal, destino)
+        
+        if nombres is not None:
+            ruta_nombres = cls._ruta_nombres(destino)
+            temporal = ruta_nombres.with_name(f".{ruta_nombres.name}.{os.getpid()}.tmp")
+            with open(temporal, 'w', encoding='utf-8') as archivo:
+                json.dump({'version': cls._version_de(huella), 'registros': nombres}, archivo, ensure_ascii=False)
+            os.replace(temporal, ruta_nombres)
+        
+        metadatos = {
+            'version': cls.VERSION_INDICE,
+            'origen': huella,
+            'total_registros': int(len(dnis)),
+            'fecha_compilacion': datetime.now().isoformat(timespec='seconds')
+        }
+        temporal = cls._ruta_metadatos(destino).with_name(f".{destino.stem}.{os.getpid()}.json.tmp")
+        with open(temporal, 'w', encoding='utf-8') as archivo:
+            json.dump(metadatos, archivo, indent=2)
+        os.replace(temporal, cls._ruta_metadatos(destino))
+    
+    @classmethod
+    def compilar_indice(cls, origen=None, destino=None):
+        """
+        Compila el Excel PEP a un índice binario (arreglo uint32 ordenado).
+        Paso de build: se ejecuta con `flask pep compilar` cuando cambia el dataset.
+        
+        Args:
+            origen: Ruta del Excel (por defecto DATASET_PEP_PATH)
+            destino: Ruta del índice .npy (por defecto INDICE_PEP_PATH)
+            
+        Returns:
+            dict: Resumen de la compilación (rutas y total de registros)
+        """
+        origen = Path(origen or cls.DATASET_PEP_PATH)
+        destino = Path(destino or cls.INDICE_PEP_PATH)
+        
+        dnis, nombres = cls._leer_excel(origen)
+        cls._escribir_indice(dnis, cls._huella_archivo(origen), destino, nombres)
+        
+        logger.info(f"Índice PEP compilado: {len(dnis)} DNIs, {len(nombres)} nombres -> {destino}")
+        return {
+            'origen': str(origen),
+            'destino': str(destino),
+            'total_registros': int(len(dnis)),
+            'total_nombres': len(nombres)
+        }
+    
+    @classmethod
+    def _leer_metadatos(cls, destino=None):
+        """Metadatos (sidecar) del índice compilado, o None si faltan o están corruptos."""
+        try:
+            with open(cls._ruta_metadatos(destino), encoding='utf-8') as archivo:
+                return json.load(archivo)
+        except (OSError, ValueError):
+            return None
+    
+    @staticmethod
+    def _version_de(huella):
+        """Versión del dataset: prefijo del SHA-256 del Excel de origen."""
+        sha = (huella or {}).get('sha256')
+        return sha[:12] if sha else None
+    
+    @classmethod
+    def indice_vigente(cls, origen=None, destino=None):
+        """
+        Indica si el índice compilado corresponde al Excel actual.
+        
+        Compara tamaño y mtime (barato); si difieren, confirma con el SHA-256 para
+        no recompilar cuando el archivo solo fue copiado o "tocado".
+        Sin Excel fuente, un índice existente se considera vigente.
+        """
+        origen = Path(origen or cls.DATASET_PEP_PATH)
+        destino = Path(destino or cls.INDICE_PEP_PATH)
+        
+        metadatos = cls._leer_metadatos(destino)
+        if not destino.exists() or metadatos is None:
+            return False
+        if metadatos.get('version') != cls.VERSION_INDICE:
+            return False
+        if not origen.exists():
+            return True
+        
+        registrada = metadatos.get('origen', {})
+        actual = cls._huella_archivo(origen, con_hash=False)
+        if registrada.get('tamano') == actual['tamano'] and registrada.get('mtime_ns') == actual['mtime_ns']:
+            return True
+        return registrada.get('sha256') == cls._huella_archivo(origen)['sha256']
     
     @classmethod
     def cargar_dataset_pep(cls):
         """
-        Carga el dataset PEP desde el archivo Excel.
-        Mantiene el dataset en memoria para consultas rápidas.
+        Carga el dataset PEP.
+        
+        Usa el índice compilado vía memory-map (arranque casi instantáneo y páginas
+        compartidas entre workers). Solo si el índice falta o está desactualizado
+        lee el Excel, y en ese caso intenta regenerar el índice para los demás procesos.
         
         Returns:
             bool: True si se cargó exitosamente, False en caso contrario
@@ -30,43 +344,413 @@ class PEPService:
         if cls._dataset_cargado:
             return True
         
-        try:
-            BASE_DIR = Path(__file__).resolve().parent.parent.parent
-            DATASET_PEP_PATH = BASE_DIR / "dataset-pep" / "Autoridades_Electas.xls"
+        with cls._lock_carga:
+            if cls._dataset_cargado:
+                return True
+            try:
+                return cls._cargar_dataset()
+            finally:
+                cls._carga_terminada.set()
+    
+    @classmethod
+    def _construir_dataset(cls):
+        """
+        Construye una versión del dataset sin tocar la que está publicada.
+        
+        Returns:
+            tuple: (arreglo de DNIs, origen 'indice' | 'excel', versión)
             
-            if not DATASET_PEP_PATH.exists():
-                logger.error(f"Archivo PEP no encontrado: {DATASET_PEP_PATH}")
-                return False
+        Raises:
+            FileNotFoundError: Si no hay índice vigente ni Excel
+        """
+        if cls.indice_vigente():
+            metadatos = cls._leer_metadatos()
+            dnis = np.load(cls.INDICE_PEP_PATH, mmap_mode='r')
+            return dnis, 'indice', cls._version_de(metadatos.get('origen'))
+        
+        if not cls.DATASET_PEP_PATH.exists():
+            raise FileNotFoundError(f"Archivo PEP no encontrado: {cls.DATASET_PEP_PATH}")
+        
+        logger.warning("Índice PEP ausente o desactualizado, leyendo Excel")
+        huella = cls._huella_archivo(cls.DATASET_PEP_PATH)
+        dnis, nombres = cls._leer_excel(cls.DATASET_PEP_PATH)
+        
+        try:
+            cls._escribir_indice(dnis, huella, cls.INDICE_PEP_PATH, nombres)
+        except OSError as e:
+            logger.warning(f"No se pudo regenerar el índice PEP: {e}")
+        
+        return dnis, 'excel', cls._version_de(huella)
+    
+    @classmethod
+    def _firma_archivos(cls):
+        """Firma barata (tamaño, mtime, inodo) de Excel e índice para detectar cambios."""
+        def _firma(ruta):
+            try:
+                estado = os.stat(ruta)
+            except OSError:
+                return None
+            return estado.st_size, estado.st_mtime_ns, estado.st_ino
+        
+        return _firma(cls.DATASET_PEP_PATH), _firma(cls.INDICE_PEP_PATH)
+    
+    @classmethod
+    def _publicar(cls, dnis, origen, version, firma, indice_nombres=None):
+        """Publica una versión: las consultas leen la referencia al arreglo una sola vez."""
+        if indice_nombres is not None:
+            cls._indice_nombres = indice_nombres
+        cls._dataset_pep = dnis
+        cls._origen_dataset = origen
+        cls._version_dataset = version
+        cls._fecha_version = datetime.now()
+        cls._firma_cargada = firma
+    
+    @classmethod
+    def _cargar_dataset(cls):
+        try:
+            firma = cls._firma_archivos()
+            cls._publicar(*cls._construir_dataset(), firma)
             
-            # Cargar Excel
-            df = pd.read_excel(DATASET_PEP_PATH)
+            cls._dataset_cargado = True
+            cls._error_carga = None
+            logger.info(
+                f"Dataset PEP cargado ({cls._origen_dataset}, versión {cls._version_dataset}): "
+                f"{len(cls._dataset_pep)} registros"
+            )
+            return True
             
-            # Buscar columna de DNI
-            columnas_posibles = ['DNI', 'DOCUMENTO', 'NRO_DOCUMENTO', 'NUMERO_DOCUMENTO', 'DOCUMENTOIDENTIDAD']
-            col_dni = None
+        except Exception as e:
+            cls._error_carga = str(e)
+            logger.error(f"Error al cargar dataset PEP: {e}")
+            return False
+    
+    @classmethod
+    def recargar_si_cambio(cls, forzar=False):
+        """
+        Recarga el dataset si el Excel o el índice cambiaron desde la última carga.
+        
+        Detecta cambios por tamaño/mtime/inodo y confirma por hash (versión), así un
+        archivo solo "tocado" no provoca recarga. Mientras se construye la nueva versión
+        las consultas siguen respondiendo con la anterior; si falla, se conserva.
+        
+        Args:
+            forzar: Reconstruir aunque la firma de los archivos no haya cambiado
             
-            for columna in columnas_posibles:
-                if columna in df.columns:
-                    col_dni = columna
-                    break
+        Returns:
+            dict: Resultado ('recargado', 'motivo', 'version', ...)
+        """
+        if not cls._dataset_cargado:
+            return {'recargado': False, 'motivo': 'sin_carga', 'version': None}
+        
+        if not cls._lock_recarga.acquire(blocking=False):
+            return {'recargado': False, 'motivo': 'en_curso', 'version': cls._version_dataset}
+        
+        try:
+            firma = cls._firma_archivos()
+            if not forzar and firma == cls._firma_cargada:
+                return {'recargado': False, 'motivo': 'sin_cambios', 'version': cls._version_dataset}
             
-            if not col_dni:
-                logger.error(f"No se encontró columna DNI. Columnas disponibles: {df.columns.tolist()}")
-                return False
+            dnis, origen, version = cls._construir_dataset()
+            if not forzar and version == cls._version_dataset:
+                cls._firma_cargada = firma
+                return {'recargado': False, 'motivo': 'sin_cambios', 'version': version}
             
-            # Limpiar y normalizar DNIs
-            df[col_dni] = df[col_dni].astype(str).str.strip()
+            anterior = cls._version_dataset
+            # El índice de nombres se construye aquí, fuera de las consultas, y se publica con los DNIs
+            with cls._lock_nombres:
+                indice_nombres = None
+                if cls._indice_nombres is not None:
+                    indice_nombres = cls._construir_indice_nombres(version)
+                cls._publicar(dnis, origen, version, firma, indice_nombres)
+            logger.info(f"Dataset PEP recargado: versión {anterior} -> {version} ({len(dnis)} registros)")
+            return {
+                'recargado': True,
+                'motivo': 'cambio',
+                'version_anterior': anterior,
+                'version': version,
+                'total_registros': int(len(dnis))
+            }
             
-            # Guardar en cache
-            cls._dataset_pep = set(df[col_dni].tolist())
-            cls._dataset_cargado = True
+        except Exception as e:
+            logger.error(f"Error al recargar dataset PEP, se mantiene la versión {cls._version_dataset}: {e}")
+            return {'recargado': False, 'motivo': 'error', 'error': str(e), 'version': cls._version_dataset}
+        finally:
+            cls._lock_recarga.release()
+    
+    @classmethod
+    def iniciar_vigilancia(cls, intervalo=None):
+        """
+        Lanza el hilo que revisa cada `intervalo` segundos si el dataset cambió.
+        
+        Returns:
+            threading.Thread | None: Hilo de vigilancia, o None si está deshabilitada (intervalo <= 0)
+        """
+        intervalo = cls.INTERVALO_RECARGA if intervalo is None else intervalo
+        if not intervalo or intervalo <= 0:
+            return None
+        
+        if cls._hilo_vigilancia is not None and cls._hilo_vigilancia.is_alive():
+            return cls._hilo_vigilancia
+        
+        def _vigilar():
+            while not cls._detener_vigilancia.wait(intervalo):
+                cls.recargar_si_cambio()
+        
+        cls._detener_vigilancia.clear()
+        cls._hilo_vigilancia = threading.Thread(target=_vigilar, name='pep-vigilancia', daemon=True)
+        cls._hilo_vigilancia.start()
+        return cls._hilo_vigilancia
+    
+    @classmethod
+    def detener_vigilancia(cls):
+        cls._detener_vigilancia.set()
+        if cls._hilo_vigilancia is not None:
+            cls._hilo_vigilancia.join()
+            cls._hilo_vigilancia = None
+    
+    @classmethod
+    def iniciar_precarga(cls):
+        """
+        Lanza la carga del dataset en un hilo en segundo plano (una sola vez por proceso).
+        Se llama desde create_app; el arranque del worker no espera a la carga.
+        
+        Returns:
+            threading.Thread | None: Hilo de precarga, o None si el dataset ya estaba cargado
+        """
+        if cls._dataset_cargado:
+            return None
+        
+        with cls._lock_carga:
+            if cls._hilo_carga is None or not cls._hilo_carga.is_alive():
+                cls._carga_terminada.clear()
+                cls._hilo_carga = threading.Thread(
+                    target=cls._precargar,
+                    name='pep-precarga',
+                    daemon=True
+                )
+                cls._hilo_carga.start()
+            return cls._hilo_carga
+    
+    @classmethod
+    def _precargar(cls):
+        """Carga los DNIs (libera a las consultas en espera) y luego el índice de nombres."""
+        if cls.cargar_dataset_pep():
+            try:
+                cls.obtener_indice_nombres()
+            except Exception as e:
+                logger.error(f"Error al construir índice de nombres PEP: {e}")
+    
+    @classmethod
+    def estado_carga(cls):
+        """
+        Estado de disponibilidad del dataset (para readiness checks).
+        
+        Returns:
+            str: 'listo', 'cargando', 'error' o 'pendiente'
+        """
+        if cls._dataset_cargado:
+            return 'listo'
+        if cls._hilo_carga is not None and cls._hilo_carga.is_alive():
+            return 'cargando'
+        if cls._error_carga:
+            return 'error'
+        return 'pendiente'
+    
+    @classmethod
+    def esta_listo(cls):
+        return cls._dataset_cargado
+    
+    @classmethod
+    def esperar_dataset(cls, timeout=None):
+        """
+        Garantiza que el dataset esté cargado antes de consultar.
+        
+        Si hay una precarga en curso espera hasta `timeout` segundos; si nadie inició
+        la carga (scripts, tests, CLI) la hace en el hilo actual.
+        
+        Returns:
+            bool: True si el dataset está disponible, False si la carga falló
             
-            logger.info(f"Dataset PEP cargado: {len(cls._dataset_pep)} registros")
+        Raises:
+            PEPNoDisponibleError: Si la precarga no terminó dentro del timeout
+        """
+        if cls._dataset_cargado:
             return True
+        
+        hilo = cls._hilo_carga
+        if hilo is not None and hilo.is_alive():
+            timeout = cls.TIMEOUT_CONSULTA if timeout is None else timeout
+            if not cls._carga_terminada.wait(timeout):
+                logger.warning(f"Dataset PEP no disponible tras esperar {timeout}s")
+                raise PEPNoDisponibleError()
+            return cls._dataset_cargado
+        
+        return cls.cargar_dataset_pep()
+    
+    @classmethod
+    def _contiene(cls, dni_numerico):
+        """Búsqueda binaria en el arreglo ordenado."""
+        dnis = cls._dataset_pep
+        posicion = int(np.searchsorted(dnis, dni_numerico))
+        return posicion < len(dnis) and int(dnis[posicion]) == dni_numerico
+    
+    @classmethod
+    def _contiene_lote(cls, numeros):
+        """Búsqueda binaria vectorizada: máscara booleana de pertenencia al dataset."""
+        dnis = cls._dataset_pep
+        if len(dnis) == 0 or len(numeros) == 0:
+            return np.zeros(len(numeros), dtype=bool)
+        posiciones = np.minimum(np.searchsorted(dnis, numeros), len(dnis) - 1)
+        return dnis[posiciones] == numeros
+    
+    @classmethod
+    def normalizar_lote(cls, dnis):
+        """
+        Normaliza una secuencia de DNIs para consultarlos en bloque.
+        
+        Returns:
+            tuple: (arreglo uint32 de DNIs numéricos, máscara de DNIs válidos)
+        """
+        normalizados = [cls._normalizar_dni(dni) for dni in dnis]
+        validos = np.array([n is not None for n in normalizados], dtype=bool)
+        numeros = np.array([n or 0 for n in normalizados], dtype=np.uint32)
+        return numeros, validos
+    
+    @classmethod
+    def marcar_pep_lote(cls, dnis):
+        """
+        Máscara de DNIs presentes en el dataset PEP, en una sola pasada sobre el índice.
+        Los DNIs inválidos quedan en False.
+        
+        Raises:
+            PEPNoDisponibleError: Si la precarga sigue en curso tras TIMEOUT_CONSULTA
+        """
+        numeros, validos = cls.normalizar_lote(dnis)
+        if not cls.esperar_dataset():
+            logger.warning("Dataset PEP no disponible, asumiendo no-PEP")
+            return np.zeros(len(numeros), dtype=bool), validos
+        return cls._contiene_lote(numeros) & validos, validos
+    
+    @classmethod
+    def validar_pep_lote(cls, dnis, solo_pep=False):
+        """
+        Valida un lote de DNIs contra el dataset PEP.
+        
+        Args:
+            dnis: Secuencia de DNIs (strings o números)
+            solo_pep: Si True, 'resultados' incluye únicamente los DNIs encontrados
             
-        except Exception as e:
-            logger.error(f"Error al cargar dataset PEP: {e}")
-            return False
+        Returns:
+            dict: Totales, versión del dataset y resultados por DNI
+        """
+        dnis = [str(dni).strip() for dni in dnis]
+        es_pep, validos = cls.marcar_pep_lote(dnis)
+        
+        resultados = [
+            {'dni': dni, 'es_pep': bool(pep), 'valido': bool(valido)}
+            for dni, pep, valido in zip(dnis, es_pep, validos)
+            if pep or not solo_pep
+        ]
+        return {
+            'total': len(dnis),
+            'total_pep': int(es_pep.sum()),
+            'invalidos': int((~validos).sum()),
+            'version_dataset': cls._version_dataset,
+            'resultados': resultados
+        }
+    
+    @staticmethod
+    def leer_dnis_csv(lineas):
+        """
+        Extrae DNIs (primera columna) de un CSV leído línea a línea, sin cargarlo entero.
+        Omite filas vacías y una cabecera no numérica en la primera fila.
+        
+        Args:
+            lineas: Iterable de líneas de texto (archivo, stream de request, stdin)
+            
+        Yields:
+            str: DNI tal como viene en el archivo
+        """
+        for numero, fila in enumerate(csv.reader(lineas)):
+            if not fila or not fila[0].strip():
+                continue
+            valor = fila[0].strip().lstrip('\ufeff')
+            if numero == 0 and not valor.isdigit():
+                continue
+            yield valor
+    
+    # ==================== COINCIDENCIAS POR NOMBRE ====================
+    
+    @classmethod
+    def _cargar_registros_nombres(cls, version):
+        """Registros de nombres de una versión: del sidecar compilado o, si no coincide, del Excel."""
+        try:
+            with open(cls._ruta_nombres(), encoding='utf-8') as archivo:
+                datos = json.load(archivo)
+            if datos.get('version') == version:
+                return datos['registros']
+        except (OSError, ValueError, KeyError):
+            pass
+        
+        if cls.DATASET_PEP_PATH.exists():
+            return cls._leer_excel(cls.DATASET_PEP_PATH)[1]
+        logger.warning("Sin nombres para la versión publicada del dataset PEP")
+        return []
+    
+    @classmethod
+    def _construir_indice_nombres(cls, version):
+        inicio = datetime.now()
+        indice = IndiceNombresPEP(cls._cargar_registros_nombres(version), version)
+        logger.info(
+            f"Índice de nombres PEP construido (versión {version}): {len(indice)} nombres "
+            f"en {(datetime.now() - inicio).total_seconds():.2f}s"
+        )
+        return indice
+    
+    @classmethod
+    def obtener_indice_nombres(cls):
+        """
+        Índice de nombres de la versión publicada del dataset.
+        
+        Una consulta solo construye el índice si todavía no existe ninguno. Las versiones
+        nuevas las construye recargar_si_cambio y las publica junto con los DNIs; mientras
+        tanto se sigue respondiendo con el índice anterior.
+        
+        Returns:
+            IndiceNombresPEP | None: Índice, o None si el dataset no está disponible
+        """
+        indice = cls._indice_nombres
+        if indice is not None or not cls._dataset_cargado:
+            return indice
+        
+        with cls._lock_nombres:
+            if cls._indice_nombres is None:
+                cls._indice_nombres = cls._construir_indice_nombres(cls._version_dataset)
+            return cls._indice_nombres
+    
+    @classmethod
+    def buscar_por_nombre(cls, nombre, k=5, umbral=None):
+        """
+        Coincidencias aproximadas de un nombre contra las autoridades del dataset PEP.
+        Útil cuando el DNI falta o viene mal formado en el dataset.
+        
+        Args:
+            nombre: Nombre completo a buscar (cualquier orden de nombres/apellidos)
+            k: Máximo de coincidencias a devolver
+            umbral: Similitud mínima 0-1 (por defecto UMBRAL_SIMILITUD)
+            
+        Returns:
+            list[dict]: Coincidencias ordenadas por similitud
+            
+        Raises:
+            PEPNoDisponibleError: Si la precarga sigue en curso tras TIMEOUT_CONSULTA
+        """
+        if not cls.esperar_dataset():
+            return []
+        indice = cls.obtener_indice_nombres()
+        if indice is None:
+            return []
+        return indice.buscar(nombre, k=k, umbral=cls.UMBRAL_SIMILITUD if umbral is None else umbral)
     
     @classmethod
     def validar_pep(cls, dni):
@@ -78,18 +762,18 @@ class PEPService:
             
         Returns:
             bool: True si el DNI está en el dataset PEP, False en caso contrario
+            
+        Raises:
+            PEPNoDisponibleError: Si la precarga sigue en curso tras TIMEOUT_CONSULTA
         """
-        # Cargar dataset si no está cargado
-        if not cls._dataset_cargado:
-            cls.cargar_dataset_pep()
-        
-        if not cls._dataset_cargado or cls._dataset_pep is None:
+        # Esperar la precarga (o cargar aquí si nadie la inició)
+        if not cls.esperar_dataset():
             logger.warning("Dataset PEP no disponible, asumiendo no-PEP")
             return False
         
         try:
-            dni_limpio = str(dni).strip()
-            es_pep = dni_limpio in cls._dataset_pep
+            dni_numerico = cls._normalizar_dni(dni)
+            es_pep = dni_numerico is not None and cls._contiene(dni_numerico)
             
             if es_pep:
                 logger.info(f"DNI {dni} encontrado en dataset PEP")
@@ -108,14 +792,13 @@ class PEPService:
         Returns:
             dict: Diccionario con estadísticas del dataset
         """
-        if not cls._dataset_cargado:
-            cls.cargar_dataset_pep()
-        
         return {
             'cargado': cls._dataset_cargado,
-            'total_registros': len(cls._dataset_pep) if cls._dataset_pep else 0
+            'estado': cls.estado_carga(),
+            'origen': cls._origen_dataset,
+            'version': cls._version_dataset,
+            'fecha_version': cls._fecha_version.isoformat(timespec='seconds') if cls._fecha_version else None,
+            'total_nombres': len(cls._indice_nombres) if cls._indice_nombres is not None else None,
+            'total_registros': len(cls._dataset_pep) if cls._dataset_pep is not None else 0
         }
 
-
-# Cargar dataset al importar el módulo
-PEPService.cargar_dataset_pep()
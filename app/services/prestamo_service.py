@@ -5,7 +5,7 @@ Maneja la lógica de negocio relacionada con préstamos
 from datetime import date
 from decimal import Decimal
 import logging
-from typing import Tuple, Optional, Dict, Any, List
+from typing import Tuple, Optional, Dict, Any, List, Iterable
 
 from app.common.extensions import db
 from app.models import (
@@ -17,9 +17,8 @@ from app.models import (
     Cliente
 )
 from app.crud import (
-    crear_cuotas_bulk,
     crear_declaracion,
-    crear_prestamo,
+    crear_prestamo_con_cuotas,
     obtener_cliente_por_dni,
     crear_cliente
 )
@@ -153,32 +152,35 @@ class PrestamoService:
         return modelo_declaracion, None
     
     @staticmethod
-    def crear_cuotas_desde_cronograma(prestamo_id: int, cronograma: List[Dict[str, Any]]) -> None:
+    def filas_cuotas_desde_cronograma(cronograma: Iterable[Dict[str, Any]], prestamo_id: Optional[int] = None) -> List[Dict[str, Any]]:
         """
-        Crea las cuotas en la base de datos desde un cronograma.
+        Convierte un cronograma en filas listas para un INSERT multi-fila de cuotas.
         MÓDULO 1: Incluye soporte para cuota de ajuste (es_cuota_ajuste).
         
         Args:
-            prestamo_id: ID del préstamo
-            cronograma: Lista de diccionarios con información de cuotas
+            cronograma: Iterable de cuotas (lista o FinancialService.iterar_cronograma_pagos)
+            prestamo_id: ID del préstamo (opcional si se asigna al insertar)
+            
+        Returns:
+            Lista de diccionarios con las columnas de la tabla cuotas
         """
-        cuotas_a_crear = []
-        
-        for item in cronograma:
-            cuota = Cuota(
-                prestamo_id=prestamo_id,
-                numero_cuota=item['numero_cuota'],
-                fecha_vencimiento=item['fecha_vencimiento'],
-                monto_cuota=item['monto_cuota'],
-                monto_capital=item['monto_capital'],
-                monto_interes=item['monto_interes'],
-                saldo_capital=item['saldo_capital'],
-                saldo_pendiente=item['monto_cuota'],  # Inicialmente, el saldo pendiente es el monto total de la cuota
-                es_cuota_ajuste=item.get('es_cuota_ajuste', False)  # Nuevo campo
-            )
-            cuotas_a_crear.append(cuota)
-        
-        crear_cuotas_bulk(cuotas_a_crear)
+        return [
+            {
+                'prestamo_id': prestamo_id,
+                'numero_cuota': item['numero_cuota'],
+                'fecha_vencimiento': item['fecha_vencimiento'],
+                'monto_cuota': item['monto_cuota'],
+                'monto_capital': item['monto_capital'],
+                'monto_interes': item['monto_interes'],
+                'saldo_capital': item['saldo_capital'],
+                'saldo_pendiente': item['monto_cuota'],  # Inicialmente, el saldo pendiente es el monto total de la cuota
+                'monto_pagado': Decimal('0.00'),
+                'mora_generada': Decimal('0.00'),
+                'mora_acumulada': Decimal('0.00'),
+                'es_cuota_ajuste': item.get('es_cuota_ajuste', False)
+            }
+            for item in cronograma
+        ]
     
     @staticmethod
     def registrar_prestamo_completo(
@@ -264,18 +266,23 @@ class PrestamoService:
                 declaracion_id=declaracion_id
             )
             
-            modelo_prestamo = crear_prestamo(nuevo_prestamo)
-            
-            # 6. Generar cronograma
-            cronograma = FinancialService.generar_cronograma_pagos(
-                monto_total, 
-                interes_tea, 
-                plazo, 
-                f_otorgamiento
+            # 6. Generar cronograma: las filas de cuotas salen directo del generador
+            #    y sirven también para el correo y la respuesta
+            cronograma = PrestamoService.filas_cuotas_desde_cronograma(
+                FinancialService.iterar_cronograma_pagos(
+                    monto_total, 
+                    interes_tea, 
+                    plazo, 
+                    f_otorgamiento
+                )
             )
             
-            # 7. Crear cuotas en BD
-            PrestamoService.crear_cuotas_desde_cronograma(modelo_prestamo.prestamo_id, cronograma)
+            # 7. Guardar préstamo y cuotas en la misma transacción (INSERT multi-fila)
+            modelo_prestamo = crear_prestamo_con_cuotas(nuevo_prestamo, cronograma)
+            
+            # Nuevas cuotas por cobrar: invalidar la proyección de flujo
+            from app.services.proyeccion_service import ProyeccionService
+            ProyeccionService.invalidar_cache()
             
             # 8. Enviar correo electrónico con cronograma completo y detallado
             try:
@@ -0,0 +1,188 @@
+# → Servicio de proyección de flujo de caja de la cartera
+import calendar
+import logging
+from bisect import bisect_right
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import func
+from app.common.extensions import db, cache
+from app.models import Cuota, Prestamo, EstadoPrestamoEnum
+
+logger = logging.getLogger(__name__)
+
+
+# → Proyecta los ingresos esperados de los préstamos VIGENTES
+class ProyeccionService:
+
+    AGRUPACIONES = ('mes', 'semana')
+    MAX_MESES = 36
+    CACHE_TIMEOUT = 3600  # 1 hora; además se invalida al registrar pagos
+    CACHE_VERSION_KEY = 'proyeccion:version'
+
+    @staticmethod
+    def _sumar_meses(fecha: date, meses: int) -> date:
+        """Suma meses a una fecha; si el día no existe usa el último día del mes."""
+        mes = fecha.month - 1 + meses
+        anio = fecha.year + mes // 12
+        mes = mes % 12 + 1
+        dia = min(fecha.day, calendar.monthrange(anio, mes)[1])
+        return date(anio, mes, dia)
+
+    @staticmethod
+    def _periodos(inicio: date, fin: date, agrupacion: str) -> List[Tuple[date, date]]:
+        """Periodos [desde, hasta) que cubren [inicio, fin)."""
+        periodos = []
+        if agrupacion == 'semana':
+            desde = inicio - timedelta(days=inicio.weekday())  # Lunes de la semana
+            while desde < fin:
+                hasta = desde + timedelta(days=7)
+                periodos.append((desde, hasta))
+                desde = hasta
+        else:
+            desde = inicio.replace(day=1)
+            while desde < fin:
+                hasta = ProyeccionService._sumar_meses(desde, 1)
+                periodos.append((desde, hasta))
+                desde = hasta
+        return periodos
+
+    @staticmethod
+    def _clave_periodo(desde: date, agrupacion: str) -> str:
+        if agrupacion == 'semana':
+            anio, semana, _ = desde.isocalendar()
+            return f"{anio}-S{semana:02d}"
+        return desde.strftime('%Y-%m')
+
+    @staticmethod
+    def _version_cache() -> str:
+        version = cache.get(ProyeccionService.CACHE_VERSION_KEY)
+        if version is None:
+            version = uuid.uuid4().hex
+            cache.set(ProyeccionService.CACHE_VERSION_KEY, version, timeout=0)
+        return version
+
+    @staticmethod
+    def invalidar_cache() -> None:
+        """Invalida todas las proyecciones cacheadas (cambia la versión de las claves)."""
+        try:
+            cache.set(ProyeccionService.CACHE_VERSION_KEY, uuid.uuid4().hex, timeout=0)
+        except Exception as exc:
+            logger.warning(f"No se pudo invalidar la cache de proyección: {exc}")
+
+# → Calcula la proyección (sin cache)
+    @staticmethod
+    def calcular_proyeccion(meses: int = 6, agrupacion: str = 'mes',
+                            fecha_base: Optional[date] = None) -> Dict:
+        """
+        Agrega saldo pendiente y mora pendiente de las cuotas de préstamos VIGENTES
+        por semana o mes para los próximos `meses` meses.
+
+        Una sola consulta agrupada por fecha de vencimiento; el agrupamiento en
+        periodos se hace en memoria. Las cuotas ya vencidas se reportan aparte
+        en "vencido" (cobro esperado inmediato).
+
+        Returns:
+            Dict con vencido, periodos y totales
+        """
+        hoy = fecha_base or date.today()
+        fin = ProyeccionService._sumar_meses(hoy, meses)
+
+        filas = db.session.query(
+            Cuota.fecha_vencimiento,
+            func.count(Cuota.cuota_id).label('cantidad'),
+            func.sum(Cuota.saldo_pendiente).label('saldo'),
+            func.sum(Cuota.mora_acumulada).label('mora')
+        ).join(
+            Prestamo, Prestamo.prestamo_id == Cuota.prestamo_id
+        ).filter(
+            Prestamo.estado == EstadoPrestamoEnum.VIGENTE,
+            Cuota.fecha_vencimiento < fin,
+            (Cuota.saldo_pendiente > 0) | (Cuota.mora_acumulada > 0)
+        ).group_by(Cuota.fecha_vencimiento).all()
+
+        periodos = ProyeccionService._periodos(hoy, fin, agrupacion)
+        inicios = [desde for desde, _ in periodos]
+        acumulado = [[0, Decimal('0'), Decimal('0')] for _ in periodos]
+        vencido = [0, Decimal('0'), Decimal('0')]
+
+        for fecha_vencimiento, cantidad, saldo, mora in filas:
+            if fecha_vencimiento < hoy:
+                destino = vencido
+            else:
+                destino = acumulado[bisect_right(inicios, fecha_vencimiento) - 1]
+            destino[0] += cantidad
+            destino[1] += Decimal(saldo or 0)
+            destino[2] += Decimal(mora or 0)
+
+        def _formato(cantidad, saldo, mora):
+            return {
+                'cuotas': cantidad,
+                'saldo_pendiente': float(saldo),
+                'mora_esperada': float(mora),
+                'total': float(saldo + mora)
+            }
+
+        detalle = []
+        for (desde, hasta), valores in zip(periodos, acumulado):
+            item = {
+                'periodo': ProyeccionService._clave_periodo(desde, agrupacion),
+                'desde': max(desde, hoy).isoformat(),
+                'hasta': (min(hasta, fin) - timedelta(days=1)).isoformat()
+            }
+            item.update(_formato(*valores))
+            detalle.append(item)
+
+        total_cuotas = vencido[0] + sum(v[0] for v in acumulado)
+        total_saldo = vencido[1] + sum((v[1] for v in acumulado), Decimal('0'))
+        total_mora = vencido[2] + sum((v[2] for v in acumulado), Decimal('0'))
+
+        return {
+            'fecha_base': hoy.isoformat(),
+            'fecha_fin': (fin - timedelta(days=1)).isoformat(),
+            'meses': meses,
+            'agrupacion': agrupacion,
+            'vencido': _formato(*vencido),
+            'periodos': detalle,
+            'totales': _formato(total_cuotas, total_saldo, total_mora)
+        }
+
+# → Proyección cacheada (se invalida al registrar pagos)
+    @staticmethod
+    def obtener_proyeccion(meses: int = 6, agrupacion: str = 'mes',
+                           fecha_base: Optional[date] = None) -> Tuple[Optional[Dict], Optional[str], int]:
+        """
+        Returns:
+            Tuple[proyeccion, error, status_code]
+        """
+        if agrupacion not in ProyeccionService.AGRUPACIONES:
+            return None, f"Agrupación inválida: {agrupacion}. Use 'mes' o 'semana'", 400
+
+        if meses < 1 or meses > ProyeccionService.MAX_MESES:
+            return None, f"Los meses deben estar entre 1 y {ProyeccionService.MAX_MESES}", 400
+
+        hoy = fecha_base or date.today()
+
+        try:
+            clave = f"proyeccion:{ProyeccionService._version_cache()}:{hoy.isoformat()}:{meses}:{agrupacion}"
+            proyeccion = cache.get(clave)
+            if proyeccion is not None:
+                return proyeccion, None, 200
+        except Exception as exc:
+            logger.warning(f"Cache de proyección no disponible: {exc}")
+            clave = None
+
+        try:
+            proyeccion = ProyeccionService.calcular_proyeccion(meses, agrupacion, hoy)
+        except Exception as exc:
+            logger.error(f"Error al calcular proyección de flujo: {exc}", exc_info=True)
+            return None, 'Error al calcular la proyección', 500
+
+        if clave:
+            try:
+                cache.set(clave, proyeccion, timeout=ProyeccionService.CACHE_TIMEOUT)
+            except Exception as exc:
+                logger.warning(f"No se pudo guardar la proyección en cache: {exc}")
+
+        return proyeccion, None, 200
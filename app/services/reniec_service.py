@@ -0,0 +1,247 @@
+"""
+Cliente RENIEC
+Consulta de DNIs contra la API de RENIEC (APIPERU) con:
+- Pool de conexiones persistente (requests.Session): sin handshake TCP/TLS por consulta
+- Cache TTL acotada de respuestas (las negativas se guardan poco tiempo)
+- Coalescencia de consultas: pedidos concurrentes del mismo DNI comparten una sola llamada
+- Circuit breaker / bulkhead opcional (app.common.resilience) alrededor de la llamada HTTP
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.common.resilience import CircuitBreaker, CircuitoAbiertoError, CapacidadAgotadaError
+
+logger = logging.getLogger(__name__)
+
+
+class _ConsultaEnCurso:
+    """Resultado compartido de una llamada a RENIEC en curso (single-flight)."""
+
+    def __init__(self):
+        self.terminada = threading.Event()
+        self.resultado = (None, "Error al consultar DNI: consulta interrumpida", False)
+
+
+class ReniecClient:
+    """Cliente HTTP de RENIEC con pool de conexiones, cache y coalescencia de consultas"""
+
+    def __init__(
+        self,
+        api_url: str,
+        api_key: str,
+        timeout: float = 10,
+        ttl_cache: float = 3600,
+        ttl_negativo: float = 60,
+        max_entradas: int = 10000,
+        max_conexiones: int = 10,
+        session: Optional[requests.Session] = None,
+        circuito: Optional[CircuitBreaker] = None
+    ):
+        """
+        Args:
+            api_url: URL base de la API (se le agrega /<dni>)
+            api_key: Token Bearer de APIPERU
+            timeout: Segundos de espera por consulta
+            ttl_cache: Segundos que se guarda una consulta exitosa
+            ttl_negativo: Segundos que se guarda un "DNI no encontrado"
+            max_entradas: Tamaño máximo de la cache (se descartan las menos usadas)
+            max_conexiones: Conexiones persistentes del pool
+            session: Session a usar (por defecto una propia)
+            circuito: Circuit breaker de la dependencia (las consultas cacheadas y coalescidas no lo usan)
+        """
+        self.api_url = api_url.rstrip('/')
+        self.api_key = api_key
+        self.timeout = timeout
+        self.ttl_cache = ttl_cache
+        self.ttl_negativo = ttl_negativo
+        self.max_entradas = max_entradas
+        self.circuito = circuito
+
+        self.session = session or requests.Session()
+        adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=max_conexiones)
+        self.session.mount('http://', adaptador)
+        self.session.mount('https://', adaptador)
+        self.session.headers.update({
+            "Authorization": f"Bearer {api_key}",
+            "Accept": "application/json",
+            "Content-Type": "application/json"
+        })
+
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[str, Tuple[float, Optional[Dict[str, Any]], Optional[str]]]" = OrderedDict()
+        self._en_curso: Dict[str, _ConsultaEnCurso] = {}
+        self._estadisticas = {'aciertos': 0, 'fallos': 0, 'coalescidas': 0, 'llamadas': 0}
+
+    # ==================== API PÚBLICA ====================
+
+    def consultar(self, dni: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Consulta un DNI usando cache y coalescencia.
+
+        Args:
+            dni: Número de documento de identidad
+
+        Returns:
+            Tuple[datos, error]: Diccionario normalizado del ciudadano o mensaje de error
+        """
+        datos, error, _ = self.consultar_con_estado(dni)
+        return datos, error
+
+    def consultar_con_estado(self, dni: str) -> Tuple[Optional[Dict[str, Any]], Optional[str], bool]:
+        """
+        Igual que consultar(), indicando además si el error es definitivo.
+
+        Returns:
+            Tuple[datos, error, permanente]: permanente es True cuando RENIEC respondió que
+            el DNI no existe (se cachea con ttl_negativo) y False si no hubo error o el
+            error es transitorio (timeout, conexión, 5xx, circuito abierto) y vale reintentar
+        """
+        dni = str(dni).strip()
+
+        with self._lock:
+            entrada = self._leer_cache(dni)
+            if entrada is not None:
+                self._estadisticas['aciertos'] += 1
+                return entrada
+
+            vuelo = self._en_curso.get(dni)
+            lider = vuelo is None
+            if lider:
+                vuelo = _ConsultaEnCurso()
+                self._en_curso[dni] = vuelo
+                self._estadisticas['fallos'] += 1
+            else:
+                self._estadisticas['coalescidas'] += 1
+
+        if not lider:
+            if not vuelo.terminada.wait(self.timeout + 1):
+                return None, "Tiempo de espera agotado al consultar RENIEC", False
+            datos, error, permanente = vuelo.resultado
+            return (dict(datos) if datos else None), error, permanente
+
+        try:
+            datos, error, ttl = self._consultar_protegido(dni)
+            # Solo los errores definitivos traen ttl (ttl_negativo); los transitorios vienen con None
+            permanente = error is not None and ttl is not None
+            vuelo.resultado = (dict(datos) if datos else None, error, permanente)
+            if ttl:
+                with self._lock:
+                    self._guardar_cache(dni, dict(datos) if datos else None, error, ttl)
+            return datos, error, permanente
+        finally:
+            with self._lock:
+                self._en_curso.pop(dni, None)
+            vuelo.terminada.set()
+
+    def invalidar(self, dni: Optional[str] = None) -> None:
+        """Elimina un DNI de la cache, o toda la cache si no se indica."""
+        with self._lock:
+            if dni is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(str(dni).strip(), None)
+
+    def estadisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._estadisticas, 'entradas': len(self._cache), 'en_curso': len(self._en_curso)}
+
+    def cerrar(self) -> None:
+        self.session.close()
+
+    # ==================== CACHE ====================
+
+    def _leer_cache(self, dni):
+        entrada = self._cache.get(dni)
+        if entrada is None:
+            return None
+        expira, datos, error = entrada
+        if expira <= time.monotonic():
+            del self._cache[dni]
+            return None
+        self._cache.move_to_end(dni)
+        # En cache solo hay éxitos y errores definitivos
+        return (dict(datos) if datos else None), error, error is not None
+
+    def _guardar_cache(self, dni, datos, error, ttl):
+        self._cache[dni] = (time.monotonic() + ttl, datos, error)
+        self._cache.move_to_end(dni)
+        while len(self._cache) > self.max_entradas:
+            self._cache.popitem(last=False)
+
+    # ==================== LLAMADA HTTP ====================
+
+    def _consultar_protegido(self, dni):
+        """Llama a la API a través del circuito; si está abierto o saturado falla sin esperar."""
+        if self.circuito is None:
+            return self._consultar_api(dni)
+        try:
+            # Solo los errores transitorios (ttl None) cuentan como fallo de RENIEC
+            return self.circuito.ejecutar(
+                self._consultar_api, dni,
+                es_fallo=lambda resultado: resultado[1] is not None and resultado[2] is None
+            )
+        except (CircuitoAbiertoError, CapacidadAgotadaError) as exc:
+            return None, exc.message, None
+
+    def _consultar_api(self, dni):
+        """
+        Llama a RENIEC por el pool de conexiones.
+
+        Returns:
+            tuple: (datos, error, ttl) — ttl None si el resultado no debe cachearse
+                   (errores transitorios: timeout, conexión, 5xx)
+        """
+        with self._lock:
+            self._estadisticas['llamadas'] += 1
+        try:
+            respuesta = self.session.get(f"{self.api_url}/{dni}", timeout=self.timeout)
+
+            # Verificar tipo de contenido
+            content_type = respuesta.headers.get('Content-Type', '')
+            if 'application/json' not in content_type:
+                if respuesta.status_code >= 500:
+                    return None, f"Error de conexión con RENIEC: HTTP {respuesta.status_code}", None
+                return None, "DNI no encontrado en RENIEC", self.ttl_negativo
+
+            respuesta.raise_for_status()
+            api_data = respuesta.json()
+
+            # Verificar éxito de la consulta
+            if not api_data.get("success", False):
+                mensaje = api_data.get("message", "DNI no encontrado en RENIEC")
+                return None, mensaje, self.ttl_negativo
+
+            # Normalizar datos
+            data = api_data.get('data', {})
+            datos_normalizados = {
+                'nombres': data.get('nombres', ''),
+                'apellido_paterno': data.get('apellido_paterno', ''),
+                'apellido_materno': data.get('apellido_materno', ''),
+                'nombre_completo': data.get('nombre_completo', ''),
+                'numero': data.get('numero', dni)
+            }
+            return datos_normalizados, None, self.ttl_cache
+
+        except requests.exceptions.Timeout:
+            return None, "Tiempo de espera agotado al consultar RENIEC", None
+        except requests.exceptions.HTTPError as exc:
+            if exc.response is not None and exc.response.status_code == 404:
+                return None, "DNI no encontrado en RENIEC", self.ttl_negativo
+            logger.error(f"Error HTTP de RENIEC: {exc}")
+            return None, f"Error de conexión con RENIEC: {str(exc)}", None
+        except requests.exceptions.RequestException as exc:
+            logger.error(f"Error de conexión con RENIEC: {exc}", exc_info=True)
+            return None, f"Error de conexión con RENIEC: {str(exc)}", None
+        except Exception as exc:
+            logger.error(f"Error al consultar DNI: {exc}", exc_info=True)
+            return None, f"Error al consultar DNI: {str(exc)}", None
+
+
+__all__ = ['ReniecClient']
@@ -0,0 +1,155 @@
+"""
+Benchmark - Búsqueda de Clientes por DNI y Nombre
+=================================================
+
+Mide la búsqueda de la lista de clientes (COUNT + primera página, como paginate())
+sobre una tabla de clientes sintética en PostgreSQL:
+1. Sin índices de trigramas: ILIKE '%...%' recorre toda la tabla (Seq Scan)
+2. Con los índices GIN pg_trgm de la migración 003
+
+Usa los mismos filtros que la aplicación (cliente_crud.filtro_busqueda_clientes).
+Trabaja en un esquema aparte (benchmark_busqueda) que se elimina al terminar;
+no toca la tabla clientes real. Requiere PostgreSQL con la extensión pg_trgm.
+
+Ejecutar con:
+    DATABASE_URL=postgresql://... python benchmark_busqueda_clientes.py
+    DATABASE_URL=postgresql://... python benchmark_busqueda_clientes.py --filas 1000000 --repeticiones 5
+"""
+
+import argparse
+import json
+import os
+import time
+
+from sqlalchemy import MetaData, create_engine, func, select, text
+
+from app.services import ClienteService  # noqa: F401 (orden de imports de app.crud)
+from app.models import Cliente
+from app.crud.cliente_crud import filtro_busqueda_clientes
+
+
+ESQUEMA = 'benchmark_busqueda'
+EXPRESION_BUSQUEDA = "(nombre_completo || ' ' || apellido_paterno || ' ' || coalesce(apellido_materno, ''))"
+
+# Términos típicos de la caja de búsqueda: DNI completo, parcial y nombres
+TERMINOS = ['00482913', '48291', '4829', 'ROSALES', 'maria quispe', 'QUISPE MAMANI LUZ']
+
+POBLAR = f"""
+INSERT INTO {ESQUEMA}.clientes
+    (dni, nombre_completo, apellido_paterno, apellido_materno, correo_electronico, pep, fecha_registro)
+SELECT
+    lpad(i::text, 8, '0'),
+    n.nombre || ' ' || p.apellido || ' ' || m.apellido,
+    p.apellido,
+    m.apellido,
+    'cliente' || i || '@test.com',
+    i % 997 = 0,
+    now() - (i % 3650) * interval '1 day'
+FROM generate_series(1, :filas) AS i
+CROSS JOIN LATERAL (
+    SELECT (ARRAY['JUAN','MARIA','LUZ','CARLOS','ROSA','JOSE','ANA','LUIS','CARMEN','JORGE',
+                  'PEDRO','ELENA','MIGUEL','SOFIA','DIEGO','LUCIA'])[1 + (i * 7) % 16] AS nombre
+) n
+CROSS JOIN LATERAL (
+    SELECT (ARRAY['QUISPE','FLORES','SANCHEZ','RODRIGUEZ','GARCIA','MAMANI','ROJAS','HUAMAN',
+                  'CHAVEZ','TORRES','RAMOS','ROSALES','VARGAS','CASTILLO','MENDOZA','DIAZ',
+                  'GUTIERREZ','ESPINOZA','CCAHUANA','TICONA'])[1 + (i * 13) % 20] AS apellido
+) p
+CROSS JOIN LATERAL (
+    SELECT (ARRAY['QUISPE','FLORES','SANCHEZ','RODRIGUEZ','GARCIA','MAMANI','ROJAS','HUAMAN',
+                  'CHAVEZ','TORRES','RAMOS','ROSALES','VARGAS','CASTILLO','MENDOZA','DIAZ',
+                  'GUTIERREZ','ESPINOZA','CCAHUANA','TICONA'])[1 + (i / 20 * 11) % 20] AS apellido
+) m
+"""
+
+
+def preparar(engine, filas):
+    tabla = Cliente.__table__.to_metadata(MetaData(), schema=ESQUEMA)
+    with engine.begin() as conn:
+        conn.execute(text(f'DROP SCHEMA IF EXISTS {ESQUEMA} CASCADE'))
+        conn.execute(text(f'CREATE SCHEMA {ESQUEMA}'))
+        conn.execute(text('CREATE EXTENSION IF NOT EXISTS pg_trgm'))
+        tabla.create(conn)
+        inicio = time.perf_counter()
+        conn.execute(text(POBLAR), {'filas': filas})
+        conn.execute(text(f'ANALYZE {ESQUEMA}.clientes'))
+        print(f"   {filas:,} clientes generados en {time.perf_counter() - inicio:.1f}s")
+
+
+def crear_indices(engine):
+    inicio = time.perf_counter()
+    with engine.begin() as conn:
+        conn.execute(text(f'CREATE INDEX ix_clientes_dni_trgm ON {ESQUEMA}.clientes USING gin (dni gin_trgm_ops)'))
+        conn.execute(text(
+            f'CREATE INDEX ix_clientes_busqueda_trgm ON {ESQUEMA}.clientes '
+            f'USING gin ({EXPRESION_BUSQUEDA} gin_trgm_ops)'
+        ))
+        conn.execute(text(f'ANALYZE {ESQUEMA}.clientes'))
+    print(f"   Índices GIN creados en {time.perf_counter() - inicio:.1f}s")
+
+
+def _nodos(plan):
+    yield plan['Node Type']
+    for hijo in plan.get('Plans', []):
+        yield from _nodos(hijo)
+
+
+def medir(engine, repeticiones):
+    with engine.connect() as conn:
+        conn.execute(text(f'SET search_path TO {ESQUEMA}, public'))
+        for termino in TERMINOS:
+            filtro = filtro_busqueda_clientes(termino)
+            conteo = select(func.count()).select_from(Cliente).where(filtro)
+            pagina = select(Cliente).where(filtro).order_by(Cliente.fecha_registro.desc()).limit(5)
+
+            plan = conn.execute(text('EXPLAIN (FORMAT JSON) ' + str(
+                conteo.compile(conn, compile_kwargs={'literal_binds': True})
+            ))).scalar()
+            plan = plan if isinstance(plan, list) else json.loads(plan)
+            acceso = [n for n in _nodos(plan[0]['Plan']) if 'Scan' in n]
+
+            tiempos = []
+            for _ in range(repeticiones):
+                inicio = time.perf_counter()
+                total = conn.execute(conteo).scalar()
+                conn.execute(pagina).all()
+                tiempos.append(time.perf_counter() - inicio)
+            tiempos.sort()
+            print(
+                f"   {termino!r:<22} {tiempos[len(tiempos) // 2] * 1000:9.2f} ms (mediana) | "
+                f"{total:>8,} resultados | {', '.join(dict.fromkeys(acceso))}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de búsqueda de clientes (PostgreSQL)')
+    parser.add_argument('--filas', type=int, default=1_000_000)
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--conservar', action='store_true', help=f'No eliminar el esquema {ESQUEMA}')
+    args = parser.parse_args()
+
+    url = os.environ.get('DATABASE_URL', '')
+    if not url.startswith('postgresql'):
+        raise SystemExit('DATABASE_URL debe apuntar a PostgreSQL (pg_trgm no existe en otros motores)')
+    engine = create_engine(url)
+
+    print("=" * 90)
+    print(f"  Búsqueda de clientes sobre {args.filas:,} filas")
+    print("=" * 90)
+    try:
+        preparar(engine, args.filas)
+        print("-" * 90)
+        print("  Sin índices de trigramas")
+        medir(engine, args.repeticiones)
+        print("-" * 90)
+        crear_indices(engine)
+        print("  Con índices GIN pg_trgm (migración 003)")
+        medir(engine, args.repeticiones)
+    finally:
+        if not args.conservar:
+            with engine.begin() as conn:
+                conn.execute(text(f'DROP SCHEMA IF EXISTS {ESQUEMA} CASCADE'))
+
+
+if __name__ == '__main__':
+    main()
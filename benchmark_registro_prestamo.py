@@ -0,0 +1,129 @@
+"""
+Benchmark - Registro de Préstamo con Cronograma
+===============================================
+
+Compara el guardado de un préstamo de 60 cuotas:
+1. ORM: un objeto Cuota por fila (add_all) y commits separados para préstamo y cuotas
+2. Bulk: préstamo + INSERT multi-fila de cuotas en una sola transacción
+   (crear_prestamo_con_cuotas, usado por PrestamoService.registrar_prestamo_completo)
+
+Se ejecuta sobre la configuración 'testing' (SQLite en memoria), no toca datos reales.
+
+Ejecutar con:
+    python benchmark_registro_prestamo.py
+    python benchmark_registro_prestamo.py --repeticiones 500 --plazo 60
+"""
+
+import argparse
+import time
+from datetime import date
+from decimal import Decimal
+
+from app import create_app
+from app.common.extensions import db
+from app.models import Cliente, Prestamo, Cuota
+from app.services.financial_service import FinancialService
+from app.services.prestamo_service import PrestamoService
+from app.crud import crear_prestamo_con_cuotas
+
+
+MONTO = Decimal('12000.00')
+TEA = Decimal('18.00')
+F_OTORGAMIENTO = date(2025, 1, 15)
+
+
+def nuevo_prestamo(cliente_id, plazo):
+    return Prestamo(
+        cliente_id=cliente_id,
+        monto_total=MONTO,
+        interes_tea=TEA,
+        plazo=plazo,
+        f_otorgamiento=F_OTORGAMIENTO,
+        requiere_dec_jurada=False
+    )
+
+
+def registrar_orm(cliente_id, plazo, cronograma):
+    """Camino anterior: préstamo confirmado primero, luego un objeto Cuota por fila."""
+    prestamo = nuevo_prestamo(cliente_id, plazo)
+    db.session.add(prestamo)
+    db.session.commit()
+    db.session.add_all([
+        Cuota(
+            prestamo_id=prestamo.prestamo_id,
+            numero_cuota=item['numero_cuota'],
+            fecha_vencimiento=item['fecha_vencimiento'],
+            monto_cuota=item['monto_cuota'],
+            monto_capital=item['monto_capital'],
+            monto_interes=item['monto_interes'],
+            saldo_capital=item['saldo_capital'],
+            saldo_pendiente=item['monto_cuota'],
+            es_cuota_ajuste=item.get('es_cuota_ajuste', False)
+        )
+        for item in cronograma
+    ])
+    db.session.commit()
+
+
+def registrar_bulk(cliente_id, plazo, cronograma):
+    """Camino actual: una transacción con INSERT multi-fila de cuotas."""
+    crear_prestamo_con_cuotas(
+        nuevo_prestamo(cliente_id, plazo),
+        PrestamoService.filas_cuotas_desde_cronograma(cronograma)
+    )
+
+
+def medir(nombre, funcion, cliente_id, plazo, cronograma, repeticiones):
+    db.session.query(Cuota).delete()
+    db.session.query(Prestamo).delete()
+    db.session.commit()
+    db.session.expunge_all()
+
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion(cliente_id, plazo, cronograma)
+        db.session.expunge_all()
+    duracion = time.perf_counter() - inicio
+
+    cuotas = Cuota.query.count()
+    print(
+        f"   {nombre:<6} {duracion:8.3f}s total | "
+        f"{duracion / repeticiones * 1000:7.2f} ms/préstamo | {cuotas} cuotas guardadas"
+    )
+    return duracion
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de registro de préstamo + cuotas')
+    parser.add_argument('--repeticiones', type=int, default=200)
+    parser.add_argument('--plazo', type=int, default=60)
+    args = parser.parse_args()
+
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        cliente = Cliente(
+            dni='99999999',
+            nombre_completo='Cliente Benchmark',
+            apellido_paterno='Bench',
+            apellido_materno='Mark',
+            correo_electronico='benchmark@test.com',
+            pep=False
+        )
+        db.session.add(cliente)
+        db.session.commit()
+        cliente_id = cliente.cliente_id
+
+        cronograma = FinancialService.generar_cronograma_pagos(MONTO, TEA, args.plazo, F_OTORGAMIENTO)
+
+        print("=" * 70)
+        print(f"  Registro de {args.repeticiones} préstamos de {args.plazo} cuotas")
+        print("=" * 70)
+        orm = medir('ORM', registrar_orm, cliente_id, args.plazo, cronograma, args.repeticiones)
+        bulk = medir('Bulk', registrar_bulk, cliente_id, args.plazo, cronograma, args.repeticiones)
+        print("-" * 70)
+        print(f"   Aceleración: {orm / bulk:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
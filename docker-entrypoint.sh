@@ -70,6 +70,10 @@ fi
 
 echo "Base de datos actualizada!"
 
+# Compilar índice PEP una sola vez antes de levantar los workers (lo comparten vía mmap)
+echo "Verificando índice PEP..."
+flask pep compilar --si-desactualizado || echo "⚠ No se pudo compilar el índice PEP"
+
 # Ejecutar comando pasado como argumento
 echo "Iniciando servidor..."
 exec "$@"
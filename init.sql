@@ -2,6 +2,7 @@
 -- Este archivo se ejecutará automáticamente cuando el contenedor se cree por primera vez
 -- Crear extensiones si son necesarias
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
+CREATE EXTENSION IF NOT EXISTS pg_trgm;  -- Búsqueda de clientes por DNI/nombre (migración 003)
 -- Asegurar que la base de datos use UTF-8
 SET client_encoding = 'UTF8';
 -- Mensaje de confirmación
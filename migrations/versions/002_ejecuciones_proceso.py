@@ -0,0 +1,34 @@
+"""Tabla ejecuciones_proceso (watermark de procesos batch)
+
+Revision ID: 002_ejecuciones_proceso
+Revises: 001_initial_schema
+Create Date: 2026-10-17 09:00:00.000000
+
+Guarda la última fecha evaluada por cada proceso batch. La usa el
+recálculo incremental de mora para procesar solo lo que cambió de estado
+desde la ejecución anterior.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '002_ejecuciones_proceso'
+down_revision = '001_initial_schema'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Crear tabla ejecuciones_proceso"""
+    op.create_table(
+        'ejecuciones_proceso',
+        sa.Column('proceso', sa.String(length=50), nullable=False),
+        sa.Column('fecha_corte', sa.Date(), nullable=False),
+        sa.Column('fecha_registro', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('proceso')
+    )
+
+
+def downgrade():
+    """Eliminar tabla ejecuciones_proceso"""
+    op.drop_table('ejecuciones_proceso')
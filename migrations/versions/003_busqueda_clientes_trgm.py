@@ -0,0 +1,52 @@
+"""Índices pg_trgm para la búsqueda de clientes por DNI y nombre
+
+Revision ID: 003_busqueda_clientes_trgm
+Revises: 002_ejecuciones_proceso
+Create Date: 2026-10-17 12:00:00.000000
+
+La búsqueda de clientes filtra con ILIKE '%texto%', que un índice btree no
+puede usar. Los índices GIN con gin_trgm_ops sí lo hacen (para textos de 3 o
+más caracteres):
+- ix_clientes_dni_trgm: sobre dni
+- ix_clientes_busqueda_trgm: sobre nombre y apellidos concatenados, la misma
+  expresión que cliente_crud.texto_busqueda_cliente()
+
+Se crean con CONCURRENTLY para no bloquear escrituras en tablas grandes.
+Solo aplica a PostgreSQL.
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '003_busqueda_clientes_trgm'
+down_revision = '002_ejecuciones_proceso'
+branch_labels = None
+depends_on = None
+
+EXPRESION_BUSQUEDA = "(nombre_completo || ' ' || apellido_paterno || ' ' || coalesce(apellido_materno, ''))"
+
+
+def upgrade():
+    """Crear extensión pg_trgm e índices GIN de búsqueda"""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    with op.get_context().autocommit_block():
+        op.execute(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_clientes_dni_trgm '
+            'ON clientes USING gin (dni gin_trgm_ops)'
+        )
+        op.execute(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_clientes_busqueda_trgm '
+            f'ON clientes USING gin ({EXPRESION_BUSQUEDA} gin_trgm_ops)'
+        )
+
+
+def downgrade():
+    """Eliminar índices de búsqueda (la extensión se conserva)"""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    with op.get_context().autocommit_block():
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_clientes_busqueda_trgm')
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_clientes_dni_trgm')
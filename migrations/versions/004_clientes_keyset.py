@@ -0,0 +1,62 @@
+"""Índice para la paginación por cursor de clientes
+
+Revision ID: 004_clientes_keyset
+Revises: 003_busqueda_clientes_trgm
+Create Date: 2026-10-17 14:00:00.000000
+
+Los listados de clientes paginan por cursor sobre (fecha_registro, cliente_id):
+WHERE (fecha_registro, cliente_id) < (:fecha, :id) ORDER BY ... DESC LIMIT n.
+Con este índice cada página es un recorrido corto del índice (hacia atrás o
+hacia adelante) sin importar qué tan profunda sea.
+
+La comparación por tupla es NULL cuando fecha_registro es NULL: esos clientes
+no aparecerían en ninguna página. Antes del índice se rellenan las fechas
+faltantes (con la más antigua registrada, quedan al final del listado) y la
+columna pasa a NOT NULL.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '004_clientes_keyset'
+down_revision = '003_busqueda_clientes_trgm'
+branch_labels = None
+depends_on = None
+
+# Clientes sin fecha de registro: se ordenan junto a los más antiguos
+RELLENAR_FECHAS_REGISTRO = """
+    UPDATE clientes
+    SET fecha_registro = COALESCE((SELECT MIN(fecha_registro) FROM clientes), CURRENT_TIMESTAMP)
+    WHERE fecha_registro IS NULL
+"""
+
+
+def upgrade():
+    """Rellenar fecha_registro, volverla NOT NULL y crear índice (fecha_registro, cliente_id) en clientes"""
+    op.execute(RELLENAR_FECHAS_REGISTRO)
+    with op.batch_alter_table('clientes') as batch_op:
+        batch_op.alter_column(
+            'fecha_registro', existing_type=sa.DateTime(),
+            existing_server_default=sa.text('now()'), nullable=False
+        )
+
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.create_index(
+                'ix_clientes_fecha_registro_id', 'clientes', ['fecha_registro', 'cliente_id'],
+                postgresql_concurrently=True, if_not_exists=True
+            )
+    else:
+        op.create_index('ix_clientes_fecha_registro_id', 'clientes', ['fecha_registro', 'cliente_id'])
+
+
+def downgrade():
+    """Eliminar índice de paginación (fecha_registro sigue NOT NULL, como en el esquema inicial)"""
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.drop_index(
+                'ix_clientes_fecha_registro_id', table_name='clientes',
+                postgresql_concurrently=True, if_exists=True
+            )
+    else:
+        op.drop_index('ix_clientes_fecha_registro_id', table_name='clientes')
@@ -0,0 +1,68 @@
+"""Tabla caja_resumen_diario (agregado de caja por día y medio de pago)
+
+Revision ID: 005_caja_resumen_diario
+Revises: 004_clientes_keyset
+Create Date: 2026-10-17 16:00:00.000000
+
+Los reportes de caja (resumen diario, por periodo y estadísticas) leen este
+agregado en lugar de recorrer pagos y egresos. La aplicación lo mantiene en la
+misma transacción que registra cada pago / egreso. La migración lo llena con
+el histórico; `flask caja reconstruir-resumen` lo recalcula cuando haga falta.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '005_caja_resumen_diario'
+down_revision = '004_clientes_keyset'
+branch_labels = None
+depends_on = None
+
+
+# Los egresos salen del efectivo: se acumulan en la fila EFECTIVO del día
+BACKFILL = """
+INSERT INTO caja_resumen_diario (
+    fecha, medio_pago, cantidad_pagos, monto_pagado, monto_mora, ajuste_redondeo, vuelto,
+    cantidad_egresos, monto_egresos, fecha_actualizacion
+)
+SELECT fecha, medio_pago, sum(cantidad_pagos), sum(monto_pagado), sum(monto_mora),
+       sum(ajuste_redondeo), sum(vuelto), sum(cantidad_egresos), sum(monto_egresos), now()
+FROM (
+    SELECT fecha_pago AS fecha, medio_pago, count(*) AS cantidad_pagos,
+           sum(monto_pagado) AS monto_pagado, sum(monto_mora) AS monto_mora,
+           sum(ajuste_redondeo) AS ajuste_redondeo, sum(vuelto) AS vuelto,
+           0 AS cantidad_egresos, 0 AS monto_egresos
+    FROM pagos
+    GROUP BY fecha_pago, medio_pago
+    UNION ALL
+    SELECT fecha_registro::date, 'EFECTIVO'::mediopagoenum, 0, 0, 0, 0, 0, count(*), sum(monto)
+    FROM egresos
+    GROUP BY fecha_registro::date
+) movimientos
+GROUP BY fecha, medio_pago
+"""
+
+
+def upgrade():
+    """Crear tabla caja_resumen_diario y llenarla con el histórico"""
+    op.create_table(
+        'caja_resumen_diario',
+        sa.Column('fecha', sa.Date(), nullable=False),
+        sa.Column('medio_pago', postgresql.ENUM(name='mediopagoenum', create_type=False), nullable=False),
+        sa.Column('cantidad_pagos', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('monto_pagado', sa.Numeric(precision=14, scale=2), nullable=False, server_default='0'),
+        sa.Column('monto_mora', sa.Numeric(precision=14, scale=2), nullable=False, server_default='0'),
+        sa.Column('ajuste_redondeo', sa.Numeric(precision=14, scale=2), nullable=False, server_default='0'),
+        sa.Column('vuelto', sa.Numeric(precision=14, scale=2), nullable=False, server_default='0'),
+        sa.Column('cantidad_egresos', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('monto_egresos', sa.Numeric(precision=14, scale=2), nullable=False, server_default='0'),
+        sa.Column('fecha_actualizacion', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('fecha', 'medio_pago')
+    )
+    op.execute(BACKFILL)
+
+
+def downgrade():
+    """Eliminar tabla caja_resumen_diario"""
+    op.drop_table('caja_resumen_diario')
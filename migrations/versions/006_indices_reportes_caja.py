@@ -0,0 +1,55 @@
+"""Índices para los rangos de fechas de los reportes de caja
+
+Revision ID: 006_indices_reportes_caja
+Revises: 005_caja_resumen_diario
+Create Date: 2026-10-17 17:00:00.000000
+
+Los reportes filtran pagos y egresos con rangos semiabiertos sobre la columna
+desnuda (fecha >= :inicio AND fecha < :fin), que un índice btree resuelve:
+- pagos(fecha_pago, medio_pago): rango por día y agrupación por medio de pago
+  sin leer la tabla; reemplaza a ix_pagos_fecha_pago (su prefijo)
+- egresos(fecha_registro): ya existe desde 001; se asegura en bases antiguas
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '006_indices_reportes_caja'
+down_revision = '005_caja_resumen_diario'
+branch_labels = None
+depends_on = None
+
+
+# (nombre, tabla, columnas) — también los usa la prueba de planes de ejecución
+INDICES = [
+    ('ix_pagos_fecha_pago_medio', 'pagos', ['fecha_pago', 'medio_pago']),
+    ('ix_egresos_fecha_registro', 'egresos', ['fecha_registro']),
+]
+
+
+def upgrade():
+    """Crear índices de rango de fechas (concurrentemente en PostgreSQL)"""
+    es_postgres = op.get_bind().dialect.name == 'postgresql'
+    with op.get_context().autocommit_block():
+        for nombre, tabla, columnas in INDICES:
+            op.create_index(
+                nombre, tabla, columnas,
+                postgresql_concurrently=es_postgres, if_not_exists=True
+            )
+        op.drop_index(
+            'ix_pagos_fecha_pago', table_name='pagos',
+            postgresql_concurrently=es_postgres, if_exists=True
+        )
+
+
+def downgrade():
+    """Restaurar ix_pagos_fecha_pago y eliminar el índice compuesto"""
+    es_postgres = op.get_bind().dialect.name == 'postgresql'
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_pagos_fecha_pago', 'pagos', ['fecha_pago'],
+            postgresql_concurrently=es_postgres, if_not_exists=True
+        )
+        op.drop_index(
+            'ix_pagos_fecha_pago_medio', table_name='pagos',
+            postgresql_concurrently=es_postgres, if_exists=True
+        )
@@ -0,0 +1,55 @@
+"""Tabla cierres_caja (foto inmutable del cierre diario)
+
+Revision ID: 007_cierres_caja
+Revises: 006_indices_reportes_caja
+Create Date: 2026-10-17 18:00:00.000000
+
+Reemplaza el estado de cierre que se guardaba en memoria del proceso. Cada
+cierre guarda montos esperado / real, diferencia, incidencia y el resumen del
+día por medio de pago. Reabrir marca fecha_reapertura; el índice único parcial
+garantiza un solo cierre vigente por fecha.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '007_cierres_caja'
+down_revision = '006_indices_reportes_caja'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Crear tabla cierres_caja"""
+    op.create_table(
+        'cierres_caja',
+        sa.Column('cierre_id', sa.Integer(), nullable=False),
+        sa.Column('fecha', sa.Date(), nullable=False),
+        sa.Column('monto_apertura', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('total_recaudado', sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.Column('total_egresos', sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.Column('monto_esperado', sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.Column('monto_real', sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.Column('diferencia', sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.Column('incidencia', sa.String(length=10), nullable=True),
+        sa.Column('resumen', postgresql.JSONB(), nullable=False, comment='Resumen diario al momento del cierre'),
+        sa.Column('usuario_id', sa.Integer(), nullable=True),
+        sa.Column('fecha_registro', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.Column('fecha_reapertura', sa.DateTime(), nullable=True),
+        sa.CheckConstraint("incidencia IN ('SOBRA', 'FALTA')", name='chk_cierre_incidencia'),
+        sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.usuario_id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('cierre_id')
+    )
+    op.create_index('ix_cierres_caja_fecha', 'cierres_caja', ['fecha'])
+    op.create_index(
+        'uq_cierres_caja_fecha_vigente', 'cierres_caja', ['fecha'],
+        unique=True, postgresql_where=sa.text('fecha_reapertura IS NULL')
+    )
+
+
+def downgrade():
+    """Eliminar tabla cierres_caja"""
+    op.drop_index('uq_cierres_caja_fecha_vigente', table_name='cierres_caja')
+    op.drop_index('ix_cierres_caja_fecha', table_name='cierres_caja')
+    op.drop_table('cierres_caja')
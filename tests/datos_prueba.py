@@ -0,0 +1,60 @@
+"""
+Datos de prueba compartidos por los tests
+- crear_cliente_prueba / crear_cuota_prueba: cliente con un préstamo y su primera cuota
+- cargar_migracion: importa un archivo de migrations/versions (no es un paquete)
+"""
+
+import importlib.util
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+
+from app import db
+from app.models import Cliente, Prestamo, Cuota
+
+project_root = Path(__file__).parent.parent
+
+
+def cargar_migracion(archivo):
+    """Módulo de una migración Alembic, p. ej. cargar_migracion('004_clientes_keyset.py')."""
+    ruta = project_root / 'migrations' / 'versions' / archivo
+    spec = importlib.util.spec_from_file_location(f'migracion_{ruta.stem}', ruta)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+def crear_cliente_prueba(dni, nombre_completo, correo_electronico=None, **campos):
+    """Cliente confirmado en la base; el apellido paterno es la última palabra del nombre."""
+    cliente = Cliente(
+        dni=dni,
+        nombre_completo=nombre_completo,
+        apellido_paterno=campos.pop('apellido_paterno', nombre_completo.split()[-1]),
+        correo_electronico=correo_electronico or f'{dni}@test.com',
+        **campos
+    )
+    db.session.add(cliente)
+    db.session.commit()
+    return cliente
+
+
+def crear_cuota_prueba(cliente, monto_total, plazo, monto_cuota, monto_capital, monto_interes):
+    """
+    Préstamo vigente del cliente (otorgado el 2025-01-01) con su primera cuota,
+    que vence el 2025-02-01 y está pendiente completa.
+    """
+    prestamo = Prestamo(
+        cliente_id=cliente.cliente_id, monto_total=Decimal(monto_total), interes_tea=Decimal('10.00'),
+        plazo=plazo, f_otorgamiento=date(2025, 1, 1), requiere_dec_jurada=False
+    )
+    db.session.add(prestamo)
+    db.session.flush()
+    cuota = Cuota(
+        prestamo_id=prestamo.prestamo_id, numero_cuota=1, fecha_vencimiento=date(2025, 2, 1),
+        monto_cuota=Decimal(monto_cuota), monto_capital=Decimal(monto_capital),
+        monto_interes=Decimal(monto_interes), saldo_capital=Decimal(monto_total) - Decimal(monto_capital),
+        saldo_pendiente=Decimal(monto_cuota)
+    )
+    db.session.add(cuota)
+    db.session.commit()
+    return cuota
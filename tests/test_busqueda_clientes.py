@@ -0,0 +1,86 @@
+import os
+import sys
+from pathlib import Path
+
+# Add parent directory to path to allow imports
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import unittest
+from sqlalchemy.dialects import postgresql
+from app import create_app, db
+from app.models.cliente import Cliente
+from app.services.cliente_service import ClienteService
+from app.crud.cliente_crud import (
+    filtro_busqueda_clientes,
+    texto_busqueda_cliente,
+    paginar_clientes,
+    obtener_clientes_con_prestamos_info
+)
+from tests.datos_prueba import cargar_migracion
+
+
+# → Búsqueda de clientes por DNI (parcial o completo) y por nombre/apellidos
+class BusquedaClientesTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        for dni, nombres, paterno, materno in [
+            ('12345678', 'MARIA', 'QUISPE', 'MAMANI'),
+            ('12349999', 'JUAN', 'ROSALES', None),
+            ('87654321', 'LUZ', 'QUISPE', 'FLORES'),
+            ('55500000', 'ANA', 'DEL_RIO', '50%'),
+        ]:
+            db.session.add(Cliente(
+                dni=dni,
+                nombre_completo=' '.join(p for p in (nombres, paterno, materno) if p),
+                apellido_paterno=paterno,
+                apellido_materno=materno,
+                correo_electronico=f'{dni}@test.com'
+            ))
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _dnis(self, termino):
+        return sorted(c.dni for c in Cliente.query.filter(filtro_busqueda_clientes(termino)))
+
+    def test_dni_parcial_y_completo(self):
+        self.assertEqual(self._dnis('1234'), ['12345678', '12349999'])
+        self.assertEqual(self._dnis('4321'), ['87654321'])
+        self.assertEqual(self._dnis(' 12345678 '), ['12345678'])
+        self.assertIsNone(filtro_busqueda_clientes('   '))
+
+    def test_nombre_y_apellidos_sin_importar_orden_ni_mayusculas(self):
+        self.assertEqual(self._dnis('quispe'), ['12345678', '87654321'])
+        self.assertEqual(self._dnis('mamani maria'), ['12345678'])
+        self.assertEqual(self._dnis('Rosales'), ['12349999'])
+
+    def test_comodines_se_buscan_literalmente(self):
+        self.assertEqual(self._dnis('50%'), ['55500000'])
+        self.assertEqual(self._dnis('DEL_'), ['55500000'])
+        self.assertEqual(self._dnis('L_Z'), [])
+
+    def test_paginacion_mantiene_filtro_por_dni(self):
+        self.assertEqual(paginar_clientes(dni='1234').total, 2)
+        self.assertEqual(paginar_clientes(busqueda='flores').total, 1)
+        pagina = obtener_clientes_con_prestamos_info(busqueda='quispe')
+        self.assertEqual(sorted(fila[0].dni for fila in pagina.items), ['12345678', '87654321'])
+
+    def test_expresion_coincide_con_indice_de_la_migracion(self):
+        sql = str(texto_busqueda_cliente().compile(
+            dialect=postgresql.dialect(), compile_kwargs={'literal_binds': True}
+        )).replace('clientes.', '')
+        self.assertEqual(f'({sql})', cargar_migracion('003_busqueda_clientes_trgm.py').EXPRESION_BUSQUEDA)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import os
+import sys
+from pathlib import Path
+
+# Add parent directory to path to allow imports
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import unittest
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from app import create_app, db
+from app.models import Egreso, MedioPagoEnum, CajaResumenDiario
+from app.services.caja_service import CajaService
+from app.crud.pago_crud import registrar_pago, devolver_pago
+from app.crud.caja_resumen_crud import reconstruir_resumen_caja
+from tests.datos_prueba import crear_cliente_prueba, crear_cuota_prueba
+
+
+# → Agregado caja_resumen_diario mantenido al registrar pagos y egresos
+class CajaResumenDiarioTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        cliente = crear_cliente_prueba('44556677', 'ROSA QUISPE', 'rosa@test.com')
+        cuota = crear_cuota_prueba(cliente, '3000.00', 3, '1050.00', '1000.00', '50.00')
+        self.cuota_id = cuota.cuota_id
+
+        self.dia = date(2025, 2, 3)
+        self.pagos = []
+        for monto, mora, ajuste, vuelto, medio, fecha in [
+            ('100.50', '5.00', '0.03', '9.50', MedioPagoEnum.EFECTIVO, self.dia),
+            ('200.00', '0.00', '0.00', '0.00', MedioPagoEnum.YAPE, self.dia),
+            ('50.00', '1.00', '0.00', '0.00', MedioPagoEnum.YAPE, self.dia),
+            ('80.00', '0.00', '0.00', '0.00', MedioPagoEnum.TRANSFERENCIA, self.dia + timedelta(days=1)),
+        ]:
+            pago, error = registrar_pago(
+                cuota_id=self.cuota_id, monto_pagado=Decimal(monto), monto_mora=Decimal(mora),
+                ajuste_redondeo=Decimal(ajuste), vuelto=Decimal(vuelto), medio_pago=medio, fecha_pago=fecha
+            )
+            self.assertIsNone(error)
+            self.pagos.append(pago.pago_id)
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _filas(self):
+        return {
+            (fila.fecha, fila.medio_pago.value): (fila.cantidad_pagos, fila.monto_pagado, fila.cantidad_egresos, fila.monto_egresos)
+            for fila in CajaResumenDiario.query.all()
+        }
+
+    def test_pagos_se_acumulan_por_dia_y_medio(self):
+        filas = self._filas()
+        self.assertEqual(len(filas), 3)
+        self.assertEqual(filas[(self.dia, 'YAPE')], (2, Decimal('250.00'), 0, Decimal('0')))
+
+        resumen = CajaService.obtener_resumen_diario(self.dia)['resumen']
+        self.assertEqual(resumen['cantidad_total_pagos'], 3)
+        self.assertEqual(resumen['total_recaudado'], 350.50)
+        self.assertEqual(resumen['total_mora_cobrada'], 6.00)
+        self.assertEqual(resumen['total_capital_cobrado'], 344.50)
+        self.assertEqual(resumen['total_ajuste_redondeo'], 0.03)
+        self.assertEqual(resumen['total_vueltos'], 9.50)
+
+    def test_egreso_se_acumula_en_efectivo(self):
+        CajaService.registrar_egreso(Decimal('9.50'), 'Vuelto por pago', pago_id=self.pagos[0])
+        hoy = date.today()
+        self.assertEqual(self._filas()[(hoy, 'EFECTIVO')][2:], (1, Decimal('9.50')))
+        resumen = CajaService.obtener_resumen_diario(hoy)
+        self.assertEqual(resumen['resumen']['total_egresos'], 9.50)
+
+    def test_resumen_periodo_y_devolucion(self):
+        periodo = CajaService.obtener_resumen_periodo(self.dia, self.dia + timedelta(days=6))
+        self.assertEqual(periodo['resumen_periodo']['cantidad_total_pagos'], 4)
+        self.assertEqual(periodo['resumen_periodo']['total_recaudado'], 430.50)
+        self.assertEqual([d['fecha'] for d in periodo['detalle_por_dia']], ['2025-02-03', '2025-02-04'])
+
+        ok, error = devolver_pago(self.pagos[1])
+        self.assertTrue(ok, error)
+        self.assertEqual(self._filas()[(self.dia, 'YAPE')], (1, Decimal('50.00'), 0, Decimal('0')))
+
+    def test_pago_fallido_no_altera_el_resumen(self):
+        antes = self._filas()
+        pago, error = registrar_pago(cuota_id=999, monto_pagado=Decimal('10.00'), fecha_pago=self.dia)
+        self.assertIsNone(pago)
+        pago, error = registrar_pago(cuota_id=self.cuota_id, monto_pagado=Decimal('-1.00'), fecha_pago=self.dia)
+        self.assertIsNotNone(error)
+        self.assertEqual(self._filas(), antes)
+
+    def test_reconstruir_coincide_con_lo_acumulado(self):
+        db.session.add(Egreso(monto=Decimal('20.00'), concepto='Retiro', fecha_registro=datetime(2025, 2, 3, 18, 0)))
+        db.session.commit()  # Egreso insertado sin pasar por la caja (p. ej. carga histórica)
+
+        resumen, error = reconstruir_resumen_caja()
+        self.assertIsNone(error)
+        self.assertEqual(resumen, {'dias': 2, 'filas': 3})
+        filas = self._filas()
+        self.assertEqual(filas[(self.dia, 'EFECTIVO')], (1, Decimal('100.50'), 1, Decimal('20.00')))
+
+        CajaResumenDiario.query.delete()
+        db.session.commit()
+        resumen, _ = reconstruir_resumen_caja(self.dia + timedelta(days=1), self.dia + timedelta(days=1))
+        self.assertEqual(list(self._filas()), [(self.dia + timedelta(days=1), 'TRANSFERENCIA')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+import os
+import sys
+from pathlib import Path
+
+# Add parent directory to path to allow imports
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import unittest
+from datetime import date
+from decimal import Decimal
+from app import create_app, db
+from app.models import MedioPagoEnum, CierreCaja
+from app.services.caja_service import CajaService, CajaCerradaError
+from app.services.pago_service import PagoService
+from app.crud.pago_crud import registrar_pago
+from app.crud.caja_resumen_crud import listar_resumen_caja
+from tests.datos_prueba import crear_cliente_prueba, crear_cuota_prueba
+
+
+# → Cierre de caja persistido como foto inmutable del día
+class CierreCajaTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        cliente = crear_cliente_prueba('22334455', 'LUIS TORRES', 'luis@test.com')
+        cuota = crear_cuota_prueba(cliente, '2000.00', 4, '520.00', '500.00', '20.00')
+        self.cuota_id = cuota.cuota_id
+        self.prestamo_id = cuota.prestamo_id
+
+        self.dia = date(2025, 2, 3)
+        CajaService.registrar_apertura(self.dia, Decimal('400'))
+        self._pagar('150.00', MedioPagoEnum.EFECTIVO)
+        self._pagar('100.00', MedioPagoEnum.YAPE)
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _pagar(self, monto, medio, fecha=None):
+        pago, error = registrar_pago(
+            cuota_id=self.cuota_id, monto_pagado=Decimal(monto), medio_pago=medio, fecha_pago=fecha or self.dia
+        )
+        self.assertIsNone(error)
+
+    def test_cierre_guarda_la_foto_del_dia(self):
+        cierre = CajaService.cerrar_caja(self.dia, Decimal('640.00'), usuario_id=7)
+        self.assertEqual(cierre['monto_esperado'], 650.00)
+        self.assertEqual(cierre['diferencia'], -10.00)
+        self.assertEqual(cierre['incidencia'], 'FALTA')
+        self.assertEqual(
+            sorted((m['medio_pago'], m['total']) for m in cierre['detalle_por_medio']),
+            [('EFECTIVO', 150.0), ('YAPE', 100.0)]
+        )
+        self.assertEqual(CajaService.obtener_estado_cierre(self.dia), cierre)
+        self.assertFalse(CajaService.esta_caja_abierta(self.dia))
+
+    def test_dia_cerrado_no_se_recalcula(self):
+        CajaService.cerrar_caja(self.dia, Decimal('650.00'))
+
+        resumen = CajaService.obtener_resumen_diario(self.dia)
+        self.assertIn('cierre_id', resumen)
+        self.assertEqual(resumen['resumen']['total_recaudado'], 250.00)
+        self.assertEqual(CajaService.obtener_estado_cierre(self.dia)['incidencia'], None)
+
+        with self.assertRaises(ValueError):
+            CajaService.cerrar_caja(self.dia, Decimal('700.00'))
+
+    def test_dia_cerrado_rechaza_movimientos(self):
+        hoy = date.today()
+        CajaService.registrar_apertura(hoy, Decimal('100'))
+        CajaService.cerrar_caja(hoy, Decimal('100.00'))
+        CajaService.cerrar_caja(self.dia, Decimal('650.00'))
+
+        # Pago y egreso posteriores al cierre: el resumen y la foto no deben divergir
+        pago, error = registrar_pago(
+            cuota_id=self.cuota_id, monto_pagado=Decimal('50.00'), medio_pago=MedioPagoEnum.PLIN, fecha_pago=self.dia
+        )
+        self.assertIsNone(pago)
+        self.assertIn('cerrada', error)
+        _, error, status = PagoService.registrar_pago_cuota(
+            self.prestamo_id, self.cuota_id, Decimal('50.00'), 'PLIN', fecha_pago=self.dia
+        )
+        self.assertEqual(status, 409)
+        with self.assertRaises(CajaCerradaError):
+            CajaService.registrar_egreso(Decimal('50'), 'Egreso tras el cierre')
+
+        self.assertEqual(
+            sum(fila.monto_pagado for fila in listar_resumen_caja(self.dia, self.dia)), Decimal('250.00')
+        )
+        self.assertEqual(sum(fila.monto_egresos for fila in listar_resumen_caja(hoy, hoy)), Decimal('0'))
+
+        http = self.app.test_client()
+        with http.session_transaction() as sesion:
+            sesion['usuario_id'] = 1
+        respuesta = http.post('/caja/egreso', json={'monto': 50, 'concepto': 'Egreso tras el cierre'})
+        self.assertEqual(respuesta.status_code, 409)
+
+        # Reabierta la caja vuelve a admitir movimientos
+        CajaService.abrir_caja(hoy)
+        self.assertEqual(http.post('/caja/egreso', json={'monto': 50, 'concepto': 'Egreso'}).status_code, 201)
+
+    def test_reabrir_conserva_el_historico(self):
+        primero = CajaService.cerrar_caja(self.dia, Decimal('650.00'))
+        CajaService.abrir_caja(self.dia)
+        self.assertIsNone(CajaService.obtener_estado_cierre(self.dia))
+        self.assertTrue(CajaService.esta_caja_abierta(self.dia))
+
+        self._pagar('50.00', MedioPagoEnum.PLIN)
+        self.assertEqual(CajaService.obtener_resumen_diario(self.dia)['resumen']['total_recaudado'], 300.00)
+
+        segundo = CajaService.cerrar_caja(self.dia, Decimal('700.00'))
+        self.assertNotEqual(primero['cierre_id'], segundo['cierre_id'])
+        self.assertEqual(CierreCaja.query.filter_by(fecha=self.dia).count(), 2)
+        anterior = db.session.get(CierreCaja, primero['cierre_id'])
+        self.assertIsNotNone(anterior.fecha_reapertura)
+        self.assertEqual(anterior.monto_real, Decimal('650.00'))
+
+    def test_conciliacion_del_periodo(self):
+        CajaService.cerrar_caja(self.dia, Decimal('655.00'))
+        otro_dia = date(2025, 2, 4)
+        self._pagar('20.00', MedioPagoEnum.EFECTIVO, fecha=otro_dia)
+        CajaService.cerrar_caja(otro_dia, Decimal('15.00'))
+
+        conciliacion = CajaService.obtener_cierres_periodo(date(2025, 2, 1), date(2025, 2, 28))
+        resumen = conciliacion['resumen_periodo']
+        self.assertEqual([c['fecha'] for c in conciliacion['cierres']], ['2025-02-03', '2025-02-04'])
+        self.assertEqual(resumen['dias_con_incidencia'], 2)
+        self.assertEqual(resumen['total_recaudado'], 270.00)
+        self.assertEqual((resumen['total_sobrantes'], resumen['total_faltantes']), (5.00, -5.00))
+        self.assertEqual(resumen['diferencia_neta'], 0.00)
+
+    def test_rutas_de_cierre(self):
+        http = self.app.test_client()
+        with http.session_transaction() as sesion:
+            sesion['usuario_id'] = 1
+
+        cuerpo = {'fecha': self.dia.isoformat(), 'monto_real': 650}
+        respuesta = http.post('/caja/cierre', json=cuerpo)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertIsNone(respuesta.get_json()['cierre']['incidencia'])
+        self.assertEqual(http.post('/caja/cierre', json=cuerpo).status_code, 409)
+
+        estado = http.get(f'/caja/cierre?fecha={self.dia.isoformat()}').get_json()
+        self.assertEqual(estado['cierre']['monto_real'], 650.00)
+        cierres = http.get('/caja/cierres?fecha_inicio=2025-02-01&fecha_fin=2025-02-28').get_json()
+        self.assertEqual(cierres['resumen_periodo']['dias_cerrados'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import os
+import sys
+from pathlib import Path
+
+# Add parent directory to path to allow imports
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import random
+import unittest
+from datetime import date, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+from app.services.financial_service import FinancialService
+
+
+# → El cronograma vectorizado debe ser idéntico, cuota por cuota, al escalar
+class CronogramaLoteTestCase(unittest.TestCase):
+
+    def _comparar(self, montos, teas, plazos, fechas):
+        lote = FinancialService.generar_cronogramas_lote(montos, teas, plazos, fechas)
+        self.assertEqual(len(lote), len(montos))
+        for k in range(len(montos)):
+            esperado = FinancialService.generar_cronograma_pagos(montos[k], teas[k], plazos[k], fechas[k])
+            self.assertEqual(lote.cronograma(k), esperado, f"Escenario {k}")
+        return lote
+
+    def test_escenarios_fijos(self):
+        self._comparar(
+            montos=[Decimal('12000.00'), Decimal('3000.00'), Decimal('500.00'), Decimal('1000.00'), Decimal('5350.00')],
+            teas=[Decimal('10.00'), Decimal('0.00'), Decimal('99.99'), Decimal('24.00'), Decimal('35.50')],
+            plazos=[12, 6, 60, 1, 24],
+            fechas=[date(2025, 1, 31), date(2024, 2, 29), date(2025, 12, 10), date(2025, 3, 15), date(2025, 8, 30)]
+        )
+
+    def test_escenarios_aleatorios(self):
+        aleatorio = random.Random(20251210)
+        total = 400
+        self._comparar(
+            montos=[Decimal(aleatorio.randint(100, 5000000)) / 100 for _ in range(total)],
+            teas=[Decimal(aleatorio.randint(0, 9999)) / 100 for _ in range(total)],
+            plazos=[aleatorio.randint(1, 60) for _ in range(total)],
+            fechas=[date(2024, 1, 1) + timedelta(days=aleatorio.randint(0, 900)) for _ in range(total)]
+        )
+
+    def test_escenarios_invalidos_quedan_vacios(self):
+        lote = self._comparar(
+            montos=[Decimal('0.00'), Decimal('1000.00'), Decimal('1000.00')],
+            teas=[Decimal('10.00'), Decimal('10.00'), Decimal('10.00')],
+            plazos=[12, 0, 12],
+            fechas=[date(2025, 1, 1)] * 3
+        )
+        self.assertEqual(list(lote.validos), [False, False, True])
+        self.assertIsNone(lote.resumen(0))
+        self.assertEqual(lote.resumen(2)['plazo'], 12)
+
+    def test_longitudes_distintas(self):
+        with self.assertRaises(ValueError):
+            FinancialService.generar_cronogramas_lote([Decimal('100')], [], [1], [date(2025, 1, 1)])
+
+    def test_monto_con_fraccion_de_centimo(self):
+        # El escalar arrastra la fracción (saldo 669.305); el lote la rechaza en vez de devolver []
+        with self.assertRaisesRegex(ValueError, r'escenarios \[1\]'):
+            FinancialService.generar_cronogramas_lote(
+                [Decimal('1000.00'), Decimal('1000.005')], [Decimal('10.00')] * 2, [3, 3], [date(2025, 1, 1)] * 2
+            )
+
+
+# → Las tablas memoizadas de TEM y factores deben dar los mismos valores que la fórmula directa
+class TasasMemoizadasTestCase(unittest.TestCase):
+
+    def setUp(self):
+        FinancialService.limpiar_cache_tasas()
+
+    def test_valores_identicos_a_la_formula(self):
+        for tea in ('0.00', '10.00', '24.50', '99.99'):
+            tea_decimal = Decimal(tea) / Decimal('100.00')
+            esperado = ((Decimal('1') + tea_decimal) ** (Decimal('1') / Decimal('12'))) - Decimal('1')
+            self.assertEqual(FinancialService.tea_to_tem(tea), esperado)
+
+        tem = FinancialService.tea_to_tem(Decimal('10.00'))
+        factor = (tem * (Decimal('1') + tem) ** 12) / ((Decimal('1') + tem) ** 12 - Decimal('1'))
+        esperado = (Decimal('12000.00') * factor).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        self.assertEqual(FinancialService.calcular_cuota_fija(Decimal('12000.00'), Decimal('10.00'), 12), esperado)
+
+    def test_contadores_de_aciertos(self):
+        for _ in range(5):
+            FinancialService.generar_cronograma_pagos(Decimal('5000.00'), Decimal('18.00'), 24, date(2025, 1, 10))
+
+        estadisticas = FinancialService.estadisticas_cache_tasas()
+        self.assertEqual(estadisticas['factor_capitalizacion']['misses'], 1)
+        self.assertEqual(estadisticas['factor_capitalizacion']['hits'], 4)
+        self.assertGreater(estadisticas['tem']['tasa_acierto'], 0.5)
+
+
+# → El generador de cronograma acumula totales sin recorrer la lista de nuevo
+class CronogramaStreamingTestCase(unittest.TestCase):
+
+    def test_generador_igual_a_lista_con_totales(self):
+        totales = {}
+        cuotas = list(FinancialService.iterar_cronograma_pagos(
+            Decimal('12000.00'), Decimal('10.00'), 36, date(2025, 1, 31), totales=totales
+        ))
+        self.assertEqual(
+            cuotas,
+            FinancialService.generar_cronograma_pagos(Decimal('12000.00'), Decimal('10.00'), 36, date(2025, 1, 31))
+        )
+        self.assertEqual(totales['cuotas'], 36)
+        self.assertEqual(totales['total_capital'], Decimal('12000.00'))
+        self.assertEqual(totales['total_interes'], sum(c['monto_interes'] for c in cuotas))
+        self.assertEqual(totales['total_pagado'], sum(c['monto_cuota'] for c in cuotas))
+
+    def test_pdf_consume_generador(self):
+        from types import SimpleNamespace
+        from app.services.pdf_service import PDFService
+
+        prestamo = SimpleNamespace(prestamo_id=1, monto_total=Decimal('5000.00'), interes_tea=Decimal('18.00'), plazo=60)
+        buffer = PDFService.generar_cronograma_detallado_pdf(
+            'Cliente Prueba',
+            prestamo,
+            FinancialService.iterar_cronograma_pagos(Decimal('5000.00'), Decimal('18.00'), 60, date(2025, 1, 10))
+        )
+        self.assertTrue(buffer.getvalue().startswith(b'%PDF'))
+
+
+if __name__ == '__main__':
+    unittest.main()
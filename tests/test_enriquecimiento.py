@@ -0,0 +1,152 @@
+import os
+import sys
+from pathlib import Path
+
+# Add parent directory to path to allow imports
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import json
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+import numpy as np
+from app import create_app, db
+from app.models.cliente import Cliente
+from app.services.cliente_service import ClienteService
+from app.services.pep_service import PEPService
+from app.services.enriquecimiento_service import EnriquecimientoService
+from app.common.resilience import LimitadorTasa
+
+
+class _ReniecFalso:
+    """consultar_dni_reniec_con_estado simulado: registra llamadas y concurrencia máxima."""
+
+    def __init__(self, demora=0.01, fallar=()):
+        self.demora = demora
+        self.fallar = set(fallar)
+        self.llamadas = []
+        self.en_curso = 0
+        self.max_en_curso = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, dni):
+        with self.lock:
+            self.llamadas.append(dni)
+            self.en_curso += 1
+            self.max_en_curso = max(self.max_en_curso, self.en_curso)
+        time.sleep(self.demora)
+        with self.lock:
+            self.en_curso -= 1
+        if dni.startswith('000'):
+            return None, 'No se encontraron resultados', True
+        if dni in self.fallar:
+            return None, 'Tiempo de espera agotado al consultar RENIEC', False
+        return {
+            'nombres': 'ANA', 'apellido_paterno': 'TORRES', 'apellido_materno': 'RUIZ',
+            'nombre_completo': f'ANA TORRES RUIZ {dni}', 'numero': dni
+        }, None, False
+
+
+def _marcar_pep_lote(dnis):
+    dnis = list(dnis)
+    return np.array([dni == '70000005' for dni in dnis], dtype=bool), np.ones(len(dnis), dtype=bool)
+
+
+# → Enriquecimiento masivo: concurrencia acotada, bitácora reanudable e INSERT por lotes
+class EnriquecimientoTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        self.directorio = tempfile.TemporaryDirectory()
+        self.bitacora = os.path.join(self.directorio.name, 'resultados.jsonl')
+        self.credenciales = (ClienteService.API_URL, ClienteService.API_KEY)
+        ClienteService.API_URL, ClienteService.API_KEY = 'http://reniec.local/dni', 'token'
+        self.pep = patch.object(PEPService, 'marcar_pep_lote', side_effect=_marcar_pep_lote)
+        self.pep.start()
+
+    def tearDown(self):
+        self.pep.stop()
+        ClienteService.API_URL, ClienteService.API_KEY = self.credenciales
+        self.directorio.cleanup()
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _ejecutar(self, reniec, prospectos, **opciones):
+        opciones = {'hilos': 3, 'por_segundo': 0, 'tamano_lote': 4, 'reintentos': 0, **opciones}
+        with patch.object(ClienteService, 'consultar_dni_reniec_con_estado', side_effect=reniec):
+            return EnriquecimientoService.enriquecer_prospectos(prospectos, self.bitacora, **opciones)
+
+    def test_lee_csv_con_cabecera_y_correo_opcional(self):
+        lineas = ['dni,correo\n', '70000001,ana@test.com\n', '\n', '7000002\n']
+        self.assertEqual(
+            list(EnriquecimientoService.leer_prospectos_csv(lineas)),
+            [('70000001', 'ana@test.com'), ('7000002', None)]
+        )
+
+    def test_crea_clientes_con_concurrencia_acotada(self):
+        reniec = _ReniecFalso(demora=0.02)
+        prospectos = [(f'7000000{i}', f'p{i}@test.com' if i % 2 else None) for i in range(1, 10)]
+        prospectos += [('00000001', None), ('ABC', None), ('70000001', None)]
+
+        resumen, error = self._ejecutar(reniec, prospectos)
+
+        self.assertIsNone(error)
+        self.assertEqual(resumen['creados'], 9)
+        self.assertEqual(resumen['no_encontrados'], 1)
+        self.assertEqual(resumen['invalidos'], 1)
+        self.assertEqual(len(reniec.llamadas), 10)  # El duplicado se consulta una vez
+        self.assertLessEqual(reniec.max_en_curso, 3)
+        self.assertGreater(reniec.max_en_curso, 1)
+
+        cliente = Cliente.query.filter_by(dni='70000001').first()
+        self.assertEqual(cliente.correo_electronico, 'p1@test.com')
+        self.assertEqual(Cliente.query.filter_by(dni='70000002').first().correo_electronico,
+                         '70000002@pendiente.com')
+        self.assertTrue(Cliente.query.filter_by(dni='70000005').first().pep)
+        self.assertEqual(Cliente.query.filter_by(pep=True).count(), 1)
+
+        with open(self.bitacora, encoding='utf-8') as archivo:
+            estados = [json.loads(linea)['estado'] for linea in archivo]
+        self.assertEqual(sorted(estados).count('ok'), 9)
+        self.assertIn('invalido', estados)
+
+    def test_reanuda_sin_repetir_consultas_resueltas(self):
+        prospectos = [(f'7100000{i}', None) for i in range(1, 7)]
+        reniec = _ReniecFalso(fallar={'71000003'})
+        resumen, _ = self._ejecutar(reniec, prospectos)
+        self.assertEqual(resumen['errores'], 1)
+        self.assertEqual(resumen['creados'], 5)
+
+        # Resuelto en la bitácora pero no guardado (corte antes del commit del lote)
+        Cliente.query.filter_by(dni='71000006').delete()
+        db.session.commit()
+
+        reniec = _ReniecFalso()
+        resumen, error = self._ejecutar(reniec, prospectos)
+
+        self.assertIsNone(error)
+        self.assertEqual(reniec.llamadas, ['71000003'])
+        self.assertEqual(resumen['existentes'], 4)
+        self.assertEqual(resumen['reanudados'], 1)
+        self.assertEqual(resumen['creados'], 2)
+        self.assertEqual(Cliente.query.count(), 6)
+
+    def test_limitador_de_tasa(self):
+        limitador = LimitadorTasa(50, rafaga=1)
+        inicio = time.monotonic()
+        for _ in range(6):
+            limitador.adquirir()
+        self.assertGreaterEqual(time.monotonic() - inicio, 0.09)
+
+
+if __name__ == '__main__':
+    unittest.main()
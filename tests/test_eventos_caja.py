@@ -0,0 +1,170 @@
+import os
+import sys
+from pathlib import Path
+
+# Add parent directory to path to allow imports
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import json
+import unittest
+from datetime import date
+from decimal import Decimal
+from app import create_app, db
+from app.models import MedioPagoEnum
+from app.services.caja_service import CajaService, CANAL_EVENTOS
+from app.services.pago_service import PagoService
+from app.crud.pago_crud import registrar_pago
+from app.common.eventos import BrokerMemoria, obtener_broker, formatear_sse
+from tests.datos_prueba import crear_cliente_prueba, crear_cuota_prueba
+
+
+# → Pub/sub en memoria que alimenta las pantallas conectadas
+class BrokerMemoriaTestCase(unittest.TestCase):
+
+    def test_reparte_a_todos_los_suscriptores(self):
+        broker = BrokerMemoria()
+        uno, otro = broker.suscribir('caja'), broker.suscribir('caja')
+        ajeno = broker.suscribir('otro')
+        evento = broker.publicar('caja', 'pago', {'monto': 10})
+
+        self.assertEqual(uno.siguiente(0.1), evento)
+        self.assertEqual(otro.siguiente(0.1), evento)
+        self.assertIsNone(ajeno.siguiente(0.01))
+
+        broker.cancelar(uno)
+        self.assertEqual(broker.conectados('caja'), 1)
+
+    def test_reanuda_desde_last_event_id(self):
+        broker = BrokerMemoria(historial=5)
+        ids = [broker.publicar('caja', 'pago', {'n': n})['id'] for n in range(3)]
+
+        suscripcion = broker.suscribir('caja', ultimo_id=ids[0])
+        self.assertEqual([suscripcion.siguiente(0.1)['id'] for _ in range(2)], ids[1:])
+        self.assertFalse(suscripcion.desincronizada)
+
+    def test_historial_insuficiente_pide_resincronizar(self):
+        broker = BrokerMemoria(historial=2)
+        for n in range(5):
+            broker.publicar('caja', 'pago', {'n': n})
+
+        self.assertTrue(broker.suscribir('caja', ultimo_id=1).desincronizada)
+        # Id mayor al último publicado: el proceso se reinició
+        self.assertTrue(broker.suscribir('caja', ultimo_id=99).desincronizada)
+        self.assertFalse(broker.suscribir('caja', ultimo_id=4).desincronizada)
+
+    def test_cliente_lento_no_bloquea_y_se_resincroniza(self):
+        broker = BrokerMemoria(max_pendientes=2)
+        lento = broker.suscribir('caja')
+        for n in range(5):
+            broker.publicar('caja', 'pago', {'n': n})
+
+        self.assertTrue(lento.desincronizada)
+        lento.resincronizar()
+        self.assertFalse(lento.desincronizada)
+        self.assertIsNone(lento.siguiente(0.01))
+
+    def test_formato_sse(self):
+        texto = formatear_sse({'id': 7, 'tipo': 'egreso', 'datos': {'monto': 1.5}})
+        self.assertEqual(texto, 'id: 7\nevent: egreso\ndata: {"monto": 1.5}\n\n')
+
+
+# → Pagos y egresos publicados en el canal de caja
+class EventosCajaTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app.config.update(CAJA_SSE_LATIDO=0.05, CAJA_SSE_DURACION_MAXIMA=0.2)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        cliente = crear_cliente_prueba('33445566', 'ANA QUISPE', 'ana@test.com')
+        cuota = crear_cuota_prueba(cliente, '1000.00', 2, '510.00', '500.00', '10.00')
+        self.prestamo_id = cuota.prestamo_id
+        self.cuota_id = cuota.cuota_id
+
+        self.broker = obtener_broker()
+        self.suscripcion = self.broker.suscribir(CANAL_EVENTOS)
+
+    def tearDown(self):
+        self.broker.cancelar(self.suscripcion)
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _pago(self):
+        pago, error = registrar_pago(
+            cuota_id=self.cuota_id, monto_pagado=Decimal('120.00'), monto_mora=Decimal('20.00'),
+            medio_pago=MedioPagoEnum.YAPE, fecha_pago=date(2025, 2, 3)
+        )
+        self.assertIsNone(error)
+        return pago
+
+    def test_pago_publica_fila_y_delta(self):
+        pago = self._pago()
+        CajaService.notificar_pago(pago)
+
+        evento = self.suscripcion.siguiente(0.1)
+        self.assertEqual(evento['tipo'], 'pago')
+        self.assertEqual(evento['datos']['fecha'], '2025-02-03')
+        self.assertEqual(evento['datos']['pago'], CajaService.obtener_detalle_pagos_dia(date(2025, 2, 3))[0])
+        self.assertEqual(evento['datos']['delta']['medio_pago'], 'YAPE')
+        self.assertEqual((evento['datos']['delta']['monto_pagado'], evento['datos']['delta']['monto_mora']), (120.0, 20.0))
+
+    def test_registrar_pago_cuota_publica_evento(self):
+        respuesta, error, estado = PagoService.registrar_pago_cuota(
+            self.prestamo_id, self.cuota_id, Decimal('100.00'), 'YAPE', fecha_pago=date(2025, 2, 3)
+        )
+        self.assertIsNone(error)
+        self.assertEqual(estado, 201)
+
+        evento = self.suscripcion.siguiente(0.1)
+        self.assertIsNotNone(evento)
+        self.assertEqual(evento['tipo'], 'pago')
+        self.assertEqual(evento['datos']['pago']['pago_id'], respuesta['pago_id'])
+
+    def test_egreso_y_cierre_publican(self):
+        CajaService.registrar_egreso(Decimal('5.50'), 'Vuelto')
+        evento = self.suscripcion.siguiente(0.1)
+        self.assertEqual(evento['tipo'], 'egreso')
+        self.assertEqual(evento['datos']['delta'], {'monto_egresos': 5.5})
+        self.assertEqual(evento['datos']['fecha'], date.today().isoformat())
+
+        CajaService.cerrar_caja(date(2025, 2, 3), Decimal('0'))
+        self.assertEqual(self.suscripcion.siguiente(0.1)['tipo'], 'cierre')
+        CajaService.abrir_caja(date(2025, 2, 3))
+        self.assertEqual(self.suscripcion.siguiente(0.1)['tipo'], 'reapertura')
+
+    def test_stream_sse_reanuda_con_last_event_id(self):
+        http = self.app.test_client()
+        with http.session_transaction() as sesion:
+            sesion['usuario_id'] = 1
+
+        CajaService.notificar_pago(self._pago())
+        respuesta = http.get('/caja/eventos', headers={'Last-Event-ID': '0'})
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertTrue(respuesta.mimetype.startswith('text/event-stream'))
+
+        cuerpo = respuesta.get_data(as_text=True)
+        self.assertTrue(cuerpo.startswith('retry: 3000\n\n'))
+        self.assertIn('event: pago\n', cuerpo)
+        datos = json.loads(cuerpo.split('event: pago\ndata: ', 1)[1].split('\n', 1)[0])
+        self.assertEqual(datos['pago']['cliente']['dni'], '33445566')
+        self.assertIn(': latido', cuerpo)
+        # Al cortar la conexión se libera la suscripción
+        self.assertEqual(self.broker.conectados(CANAL_EVENTOS), 1)
+
+    def test_stream_sin_historial_pide_resync(self):
+        http = self.app.test_client()
+        with http.session_transaction() as sesion:
+            sesion['usuario_id'] = 1
+
+        cuerpo = http.get('/caja/eventos', headers={'Last-Event-ID': '50'}).get_data(as_text=True)
+        self.assertIn('event: resync\n', cuerpo)
+        self.assertNotIn('event: pago', cuerpo)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import os
+import sys
+from pathlib import Path
+
+# Add parent directory to path to allow imports
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import csv
+import io
+import unittest
+from datetime import date, time
+from decimal import Decimal
+from openpyxl import load_workbook
+from app import create_app, db
+from app.models import MedioPagoEnum
+from app.services.caja_service import CajaService
+from app.crud.pago_crud import registrar_pago
+from tests.datos_prueba import crear_cliente_prueba, crear_cuota_prueba
+
+
+# → Exportación en streaming del detalle de pagos de un periodo
+class ExportacionCajaTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        cliente = crear_cliente_prueba('11223344', 'JOSÉ ÑAUPARI', 'jose@test.com')
+        cuota = crear_cuota_prueba(cliente, '5000.00', 12, '450.00', '400.00', '50.00')
+
+        # 30 pagos repartidos en enero y uno fuera del periodo
+        for i in range(30):
+            registrar_pago(
+                cuota_id=cuota.cuota_id, monto_pagado=Decimal('10.50'), monto_mora=Decimal('0.50'),
+                fecha_pago=date(2025, 1, 1 + i), hora_pago=time(9, i),
+                medio_pago=MedioPagoEnum.EFECTIVO if i % 2 else MedioPagoEnum.YAPE
+            )
+        registrar_pago(cuota_id=cuota.cuota_id, monto_pagado=Decimal('99.00'), fecha_pago=date(2025, 2, 1))
+
+        self.http = self.app.test_client()
+        with self.http.session_transaction() as sesion:
+            sesion['usuario_id'] = 1
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _url(self, **params):
+        params = {'fecha_inicio': '2025-01-01', 'fecha_fin': '2025-01-31', **params}
+        return '/caja/resumen/periodo/exportar?' + '&'.join(f'{k}={v}' for k, v in params.items())
+
+    def test_csv_por_bloques(self):
+        bloques = list(CajaService.exportar_periodo_csv(date(2025, 1, 1), date(2025, 1, 31), filas_por_bloque=8))
+        # Cabecera sola + 30 filas en bloques de 8 (8, 8, 8, 6)
+        self.assertEqual(len(bloques), 5)
+        self.assertTrue(bloques[0].startswith('\ufeff'))
+        self.assertEqual(bloques[0].strip('\ufeff\r\n').split(','), CajaService.COLUMNAS_EXPORTACION)
+
+    def test_respuesta_csv_en_streaming(self):
+        respuesta = self.http.get(self._url())
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertTrue(respuesta.is_streamed)
+        self.assertIn('attachment; filename="caja_2025-01-01_2025-01-31.csv"', respuesta.headers['Content-Disposition'])
+
+        filas = list(csv.DictReader(io.StringIO(respuesta.get_data(as_text=True).lstrip('\ufeff'))))
+        self.assertEqual(len(filas), 30)
+        self.assertEqual(filas[0]['fecha_pago'], '2025-01-01')
+        self.assertEqual(filas[0]['cliente'], 'JOSÉ ÑAUPARI')
+        self.assertEqual(filas[0]['medio_pago'], 'YAPE')
+        self.assertEqual((filas[0]['monto_pagado'], filas[0]['monto_capital']), ('10.50', '10.00'))
+        self.assertEqual([f['fecha_pago'] for f in filas], sorted(f['fecha_pago'] for f in filas))
+
+    def test_respuesta_xlsx(self):
+        respuesta = self.http.get(self._url(formato='xlsx'))
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertTrue(respuesta.is_streamed)
+
+        hoja = load_workbook(io.BytesIO(respuesta.get_data()), read_only=True)['Pagos']
+        filas = list(hoja.iter_rows(values_only=True))
+        self.assertEqual(list(filas[0]), CajaService.COLUMNAS_EXPORTACION)
+        self.assertEqual(len(filas), 31)
+        self.assertEqual(filas[1][4], '11223344')
+
+    def test_parametros_invalidos(self):
+        self.assertEqual(self.http.get(self._url(formato='pdf')).status_code, 400)
+        self.assertEqual(self.http.get(self._url(fecha_fin='2024-12-31')).status_code, 400)
+        self.assertEqual(self.http.get('/caja/resumen/periodo/exportar').status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
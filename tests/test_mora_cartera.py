@@ -0,0 +1,213 @@
+import os
+import sys
+from pathlib import Path
+
+# Add parent directory to path to allow imports
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import unittest
+from datetime import date, timedelta
+from decimal import Decimal
+from app import create_app, db
+from app.models.cliente import Cliente
+from app.models.prestamo import Prestamo, EstadoPrestamoEnum
+from app.models.cuota import Cuota
+from app.models.ejecucion_proceso import EjecucionProceso
+from sqlalchemy import event
+from app.services.mora_service import MoraService, CuotaLedger
+
+
+# → El recálculo masivo de cartera debe dar exactamente lo mismo que el cálculo cuota por cuota
+class MoraCarteraTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.hoy = date.today()
+        self.prestamos = []
+
+        # (días desde el otorgamiento, plazo, pagos parciales {numero_cuota: monto}, cuotas pagadas)
+        escenarios = [
+            (20, 6, {}, set()),                      # Sin cuotas vencidas
+            (95, 6, {}, set()),                      # 3 cuotas vencidas
+            (95, 6, {1: Decimal('100.00')}, set()),  # Pago parcial ya descongelado
+            (45, 6, {1: Decimal('50.00')}, set()),   # Pago parcial congelado
+            (400, 3, {}, set()),                     # Vencido más allá de la última cuota
+            (125, 6, {2: Decimal('10.00')}, {1}),    # Primera pagada, parcial en la segunda
+        ]
+
+        for i, (dias, plazo, parciales, pagadas) in enumerate(escenarios):
+            cliente = Cliente(
+                dni=f'4000000{i}',
+                nombre_completo=f'Cliente {i}',
+                apellido_paterno='Prueba',
+                apellido_materno='Mora',
+                correo_electronico=f'cliente{i}@test.com',
+                pep=False
+            )
+            db.session.add(cliente)
+            db.session.flush()
+
+            prestamo = Prestamo(
+                cliente_id=cliente.cliente_id,
+                monto_total=Decimal('3000.00'),
+                interes_tea=Decimal('10.00'),
+                plazo=plazo,
+                f_otorgamiento=self.hoy - timedelta(days=dias),
+                estado=EstadoPrestamoEnum.VIGENTE,
+                requiere_dec_jurada=False
+            )
+            db.session.add(prestamo)
+            db.session.flush()
+
+            for numero in range(1, plazo + 1):
+                pagado = Decimal('0.00')
+                saldo = Decimal('515.37')
+                if numero in pagadas:
+                    pagado, saldo = saldo, Decimal('0.00')
+                elif numero in parciales:
+                    pagado = parciales[numero]
+                    saldo = saldo - pagado
+
+                db.session.add(Cuota(
+                    prestamo_id=prestamo.prestamo_id,
+                    numero_cuota=numero,
+                    fecha_vencimiento=prestamo.f_otorgamiento + timedelta(days=30 * numero),
+                    monto_cuota=Decimal('515.37'),
+                    monto_capital=Decimal('490.00'),
+                    monto_interes=Decimal('25.37'),
+                    saldo_capital=Decimal('0.00'),
+                    monto_pagado=pagado,
+                    saldo_pendiente=saldo,
+                    mora_generada=Decimal('0.00'),
+                    mora_acumulada=Decimal('0.00')
+                ))
+            self.prestamos.append(prestamo.prestamo_id)
+
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _snapshot(self):
+        db.session.expire_all()
+        return {
+            c.cuota_id: (c.mora_generada, c.mora_acumulada)
+            for c in Cuota.query.order_by(Cuota.cuota_id).all()
+        }
+
+    def _reiniciar_mora(self):
+        Cuota.query.update({'mora_generada': Decimal('0.00'), 'mora_acumulada': Decimal('0.00')})
+        db.session.commit()
+
+    def test_recalculo_cartera_identico_al_calculo_por_cuota(self):
+        resultado = MoraService.recalcular_mora_cartera(tamano_lote=4)
+        masivo = self._snapshot()
+
+        self._reiniciar_mora()
+        for prestamo_id in self.prestamos:
+            MoraService.actualizar_mora_prestamo(prestamo_id)
+        por_cuota = self._snapshot()
+
+        self.assertEqual(masivo, por_cuota)
+        self.assertEqual(resultado['prestamos'], len(self.prestamos))
+        self.assertEqual(resultado['cuotas_evaluadas'], len(masivo))
+        self.assertGreater(resultado['cuotas_actualizadas'], 0)
+        self.assertTrue(any(acumulada > 0 for _, acumulada in masivo.values()))
+
+    def test_recalculo_es_idempotente(self):
+        MoraService.recalcular_mora_cartera()
+        segundo = MoraService.recalcular_mora_cartera()
+        self.assertEqual(segundo['cuotas_actualizadas'], 0)
+
+    def _contar_consultas(self, funcion, *args):
+        consultas = []
+
+        def _registrar(conn, cursor, statement, parameters, context, executemany):
+            consultas.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', _registrar)
+        try:
+            db.session.expire_all()
+            funcion(*args)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', _registrar)
+        return len([c for c in consultas if c.lstrip().upper().startswith('SELECT')])
+
+    def test_consultas_por_prestamo_no_dependen_del_plazo(self):
+        # Préstamo de 6 cuotas vs préstamo de 3 cuotas: mismas consultas SELECT
+        consultas_6 = self._contar_consultas(MoraService.actualizar_mora_prestamo, self.prestamos[1])
+        consultas_3 = self._contar_consultas(MoraService.actualizar_mora_prestamo, self.prestamos[4])
+        self.assertEqual(consultas_6, consultas_3)
+        self.assertEqual(consultas_6, 1)
+
+    def test_ledger_siguiente_y_desde(self):
+        ledger = CuotaLedger.cargar(self.prestamos[1])
+        primera = next(iter(ledger))
+        self.assertEqual(ledger.siguiente(primera).numero_cuota, 2)
+        self.assertEqual([c.numero_cuota for c in ledger.desde(ledger.siguiente(primera))], [2, 3, 4, 5, 6])
+        self.assertIsNone(ledger.siguiente(ledger.desde(primera)[-1]))
+
+    def test_evaluacion_en_fechas_no_modifica_y_coincide(self):
+        prestamo_id = self.prestamos[2]
+        fechas = [self.hoy - timedelta(days=60), self.hoy - timedelta(days=30), self.hoy]
+        antes = self._snapshot()
+
+        resultado = MoraService.evaluar_mora_en_fechas(prestamo_id, fechas)
+        self.assertEqual(self._snapshot(), antes)
+        self.assertEqual([e['fecha'] for e in resultado['evaluaciones']], [f.isoformat() for f in fechas])
+
+        for fecha, evaluacion in zip(fechas, resultado['evaluaciones']):
+            self._reiniciar_mora()
+            esperado = MoraService.actualizar_mora_prestamo(prestamo_id, as_of=fecha)
+            self.assertEqual(evaluacion['total_mora'], esperado['total_mora'])
+
+        self.assertLess(resultado['evaluaciones'][0]['total_mora'], resultado['evaluaciones'][-1]['total_mora'])
+
+    def test_dias_atraso_con_fecha_explicita(self):
+        vencimiento = date(2024, 1, 9)
+        self.assertEqual(MoraService.calcular_dias_atraso(vencimiento, as_of=date(2024, 1, 9)), 0)
+        self.assertEqual(MoraService.calcular_dias_atraso(vencimiento, as_of=date(2024, 1, 20)), 11)
+
+    def test_incremental_coincide_con_recalculo_completo(self):
+        # Primera ejecución sin marca de agua: recálculo completo
+        primera = MoraService.recalcular_mora_incremental(as_of=self.hoy - timedelta(days=40))
+        self.assertEqual(primera['modo'], 'completo')
+
+        # Avanzar día a día procesando solo lo que cambió
+        for dias in range(39, -1, -1):
+            resultado = MoraService.recalcular_mora_incremental(as_of=self.hoy - timedelta(days=dias))
+            self.assertEqual(resultado['modo'], 'incremental')
+        incremental = self._snapshot()
+
+        self._reiniciar_mora()
+        MoraService.recalcular_mora_cartera(as_of=self.hoy)
+        self.assertEqual(incremental, self._snapshot())
+
+        marca = db.session.get(EjecucionProceso, MoraService.PROCESO_MORA_INCREMENTAL)
+        self.assertEqual(marca.fecha_corte, self.hoy)
+
+    def test_incremental_sin_cambios_no_evalua_cuotas(self):
+        MoraService.recalcular_mora_incremental(as_of=self.hoy)
+        repetido = MoraService.recalcular_mora_incremental(as_of=self.hoy)
+        self.assertEqual(repetido['cuotas_evaluadas'], 0)
+
+        # Un día después solo se cargan los préstamos con cambios de estado
+        siguiente = MoraService.recalcular_mora_incremental(as_of=self.hoy + timedelta(days=1))
+        self.assertLess(siguiente['prestamos'], len(self.prestamos))
+
+    def test_comando_cli(self):
+        runner = self.app.test_cli_runner()
+        resultado = runner.invoke(args=['mora', 'recalcular', '--tamano-lote', '10'])
+        self.assertEqual(resultado.exit_code, 0, resultado.output)
+        self.assertIn('filas/s', resultado.output)
+
+
+if __name__ == '__main__':
+    unittest.main()
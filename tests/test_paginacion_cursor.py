@@ -0,0 +1,168 @@
+import os
+import sys
+from pathlib import Path
+
+# Add parent directory to path to allow imports
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import unittest
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from sqlalchemy import MetaData, text
+from app import create_app, db
+from app.models.cliente import Cliente
+from app.models.prestamo import Prestamo
+from app.services.cliente_service import ClienteService
+from app.common.errors import ValidationError
+from app.crud.cliente_crud import listar_clientes_cursor, listar_clientes_con_prestamos_cursor
+from tests.datos_prueba import cargar_migracion
+
+
+# → Paginación por cursor (keyset) sobre (fecha_registro, cliente_id)
+class PaginacionCursorTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        base = datetime(2025, 1, 1, 9, 0, 0)
+        for i in range(23):
+            # Varios clientes comparten fecha para probar el desempate por cliente_id
+            db.session.add(Cliente(
+                dni=f'{60000000 + i}',
+                nombre_completo=f'CLIENTE {"PAR" if i % 2 == 0 else "IMPAR"} {i}',
+                apellido_paterno='PRUEBA',
+                apellido_materno='CURSOR',
+                correo_electronico=f'c{i}@test.com',
+                fecha_registro=base + timedelta(days=i // 3)
+            ))
+        db.session.commit()
+
+        self.esperado = [c.cliente_id for c in Cliente.query.order_by(
+            Cliente.fecha_registro.desc(), Cliente.cliente_id.desc()
+        )]
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_recorre_todo_hacia_adelante_y_hacia_atras(self):
+        vistos, cursor, paginas = [], None, []
+        while True:
+            pagina = listar_clientes_cursor(cursor=cursor, por_pagina=5)
+            paginas.append([c.cliente_id for c in pagina.items])
+            vistos.extend(paginas[-1])
+            if not pagina.has_next:
+                break
+            cursor = pagina.siguiente_cursor
+        self.assertEqual(vistos, self.esperado)
+        self.assertEqual(len(paginas), 5)
+        self.assertFalse(listar_clientes_cursor(por_pagina=5).has_prev)
+
+        # Desde la última página, "anterior" devuelve las mismas páginas en orden inverso
+        anteriores = []
+        while pagina.has_prev:
+            pagina = listar_clientes_cursor(cursor=pagina.anterior_cursor, por_pagina=5)
+            anteriores.append([c.cliente_id for c in pagina.items])
+        self.assertEqual(anteriores, paginas[-2::-1])
+
+    def test_filtro_y_total(self):
+        pagina = listar_clientes_cursor(por_pagina=4, busqueda='impar', total='exacto')
+        self.assertEqual(pagina.total, 11)
+        self.assertFalse(pagina.total_estimado)
+        segunda = listar_clientes_cursor(cursor=pagina.siguiente_cursor, por_pagina=4, busqueda='impar')
+        self.assertIsNone(segunda.total)
+        self.assertTrue(all('IMPAR' in c.nombre_completo for c in pagina.items + segunda.items))
+
+    def test_cursor_alterado_se_rechaza(self):
+        cursor = listar_clientes_cursor(por_pagina=5).siguiente_cursor
+        with self.assertRaises(ValidationError):
+            listar_clientes_cursor(cursor=cursor[:-2] + 'xx')
+
+    def test_agregados_de_prestamos_solo_de_la_pagina(self):
+        cliente = db.session.get(Cliente, self.esperado[0])
+        for monto in ('1000.00', '2500.00'):
+            db.session.add(Prestamo(
+                cliente_id=cliente.cliente_id, monto_total=Decimal(monto), interes_tea=Decimal('10.00'),
+                plazo=6, f_otorgamiento=date(2025, 1, 15), requiere_dec_jurada=False
+            ))
+        db.session.commit()
+
+        pagina = listar_clientes_con_prestamos_cursor(por_pagina=3)
+        self.assertEqual([fila[0].cliente_id for fila in pagina.items], self.esperado[:3])
+        self.assertEqual(Decimal(pagina.items[0][1]), Decimal('3500.00'))
+        self.assertEqual(pagina.items[0][2], 2)
+        self.assertEqual(pagina.items[1][2], 0)
+
+    def test_api_clientes(self):
+        cliente_http = self.app.test_client()
+        respuesta = cliente_http.get('/api/v1/clientes?limite=10&total=exacto')
+        self.assertEqual(respuesta.status_code, 200)
+        datos = respuesta.get_json()
+        self.assertEqual(len(datos['items']), 10)
+        self.assertEqual(datos['total'], 23)
+        self.assertIsNone(datos['anterior_cursor'])
+
+        siguiente = cliente_http.get(f"/api/v1/clientes?limite=10&cursor={datos['siguiente_cursor']}").get_json()
+        self.assertEqual([c['cliente_id'] for c in siguiente['items']], self.esperado[10:20])
+
+        self.assertEqual(cliente_http.get('/api/v1/clientes?cursor=basura').status_code, 400)
+        self.assertEqual(cliente_http.get('/api/v1/clientes?limite=0').status_code, 400)
+        self.assertEqual(cliente_http.get('/api/v1/clientes?total=todo').status_code, 400)
+
+
+# → Clientes heredados sin fecha_registro: la migración 004 los rellena para que el cursor los alcance
+class ClientesSinFechaRegistroTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        # Tabla con el esquema anterior (fecha_registro admitía NULL)
+        legado = Cliente.__table__.to_metadata(MetaData())
+        legado.c.fecha_registro.nullable = True
+        legado.create(db.engine)
+        db.create_all()
+
+        # INSERT directo: con el ORM un None deja actuar al server_default
+        db.session.execute(Cliente.__table__.insert(), [{
+            'dni': f'{70000000 + i}', 'nombre_completo': f'CLIENTE {i}', 'apellido_paterno': 'PRUEBA',
+            'correo_electronico': f'n{i}@test.com', 'pep': False,
+            'fecha_registro': datetime(2025, 1, 1 + i) if i % 2 else None
+        } for i in range(6)])
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _recorrer(self):
+        vistos, cursor = [], None
+        while True:
+            pagina = listar_clientes_cursor(cursor=cursor, por_pagina=2)
+            vistos.extend(c.cliente_id for c in pagina.items)
+            if not pagina.has_next:
+                return vistos
+            cursor = pagina.siguiente_cursor
+
+    def test_migracion_rellena_fechas_y_el_cursor_ve_a_todos(self):
+        self.assertFalse(Cliente.__table__.c.fecha_registro.nullable)
+        # Regresión: con fechas NULL la comparación por tupla pierde clientes
+        self.assertEqual(self._recorrer(), [6, 4, 2])
+
+        db.session.execute(text(cargar_migracion('004_clientes_keyset.py').RELLENAR_FECHAS_REGISTRO))
+        db.session.commit()
+        self.assertEqual(Cliente.query.filter(Cliente.fecha_registro.is_(None)).count(), 0)
+
+        # Los que no tenían fecha quedan con la más antigua: al final, desempatados por id
+        self.assertEqual(self._recorrer(), [6, 4, 5, 3, 2, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
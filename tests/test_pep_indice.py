@@ -0,0 +1,510 @@
+import os
+import sys
+from pathlib import Path
+
+# Add parent directory to path to allow imports
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+from app import create_app, db, iniciar_tareas_segundo_plano
+from app.common.config import TestingConfig
+from app.models.cliente import Cliente
+from app.services.pep_service import PEPService, PEPNoDisponibleError, IndiceNombresPEP
+from app.services.cliente_service import ClienteService
+
+
+# → Dataset PEP temporal (Excel + índice) aislado del dataset real
+class PEPDatasetTemporalTestCase(unittest.TestCase):
+
+    ATRIBUTOS = [
+        'DATASET_PEP_PATH', 'INDICE_PEP_PATH', '_dataset_pep', '_dataset_cargado', '_origen_dataset',
+        '_hilo_carga', '_error_carga', '_version_dataset', '_fecha_version', '_firma_cargada',
+        '_indice_nombres'
+    ]
+
+    def setUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+        base = Path(self.directorio.name)
+        self.origen = base / 'pep.xlsx'
+        self.destino = base / 'pep.dni.npy'
+        self._escribir_excel(['12345678', '87654321', '01234567', 'SIN DNI', None])
+
+        self._original = {atributo: getattr(PEPService, atributo) for atributo in self.ATRIBUTOS}
+        PEPService.DATASET_PEP_PATH = self.origen
+        PEPService.INDICE_PEP_PATH = self.destino
+        self._reiniciar()
+
+    def tearDown(self):
+        for atributo, valor in self._original.items():
+            setattr(PEPService, atributo, valor)
+        self.directorio.cleanup()
+
+    def _escribir_excel(self, dnis):
+        pd.DataFrame({'NOMBRE': ['X'] * len(dnis), 'DNI': dnis}).to_excel(self.origen, index=False)
+
+    def _reiniciar(self):
+        PEPService._dataset_pep = None
+        PEPService._dataset_cargado = False
+        PEPService._origen_dataset = None
+        PEPService._hilo_carga = None
+        PEPService._error_carga = None
+        PEPService._version_dataset = None
+        PEPService._fecha_version = None
+        PEPService._firma_cargada = None
+        PEPService._indice_nombres = None
+
+
+# → El dataset PEP se consulta desde un índice binario compilado (mmap + búsqueda binaria)
+class PEPIndiceTestCase(PEPDatasetTemporalTestCase):
+
+    def test_indice_compilado_ordenado_y_consultable(self):
+        resultado = PEPService.compilar_indice()
+        self.assertEqual(resultado['total_registros'], 3)
+
+        dnis = np.load(self.destino)
+        self.assertEqual(dnis.dtype, np.uint32)
+        self.assertTrue(np.all(dnis[:-1] < dnis[1:]))
+
+        self.assertTrue(PEPService.cargar_dataset_pep())
+        self.assertEqual(PEPService.get_estadisticas()['origen'], 'indice')
+        self.assertIsInstance(PEPService._dataset_pep, np.memmap)
+
+        self.assertTrue(PEPService.validar_pep('12345678'))
+        self.assertTrue(PEPService.validar_pep(' 01234567 '))
+        self.assertTrue(PEPService.validar_pep('1234567'))
+        self.assertFalse(PEPService.validar_pep('11111111'))
+        self.assertFalse(PEPService.validar_pep('99999999'))
+        self.assertFalse(PEPService.validar_pep('ABC'))
+
+    def test_indice_desactualizado_usa_excel_y_lo_regenera(self):
+        PEPService.compilar_indice()
+        self._escribir_excel(['12345678', '44444444'])
+        os.utime(self.origen, ns=(1, 1))
+        self.assertFalse(PEPService.indice_vigente())
+
+        self.assertTrue(PEPService.cargar_dataset_pep())
+        self.assertEqual(PEPService.get_estadisticas()['origen'], 'excel')
+        self.assertTrue(PEPService.validar_pep('44444444'))
+        self.assertFalse(PEPService.validar_pep('87654321'))
+
+        # El índice quedó regenerado para el próximo proceso
+        self.assertTrue(PEPService.indice_vigente())
+        self._reiniciar()
+        PEPService.cargar_dataset_pep()
+        self.assertEqual(PEPService.get_estadisticas()['origen'], 'indice')
+        self.assertTrue(PEPService.validar_pep('44444444'))
+
+    def test_mismo_contenido_con_otro_mtime_sigue_vigente(self):
+        PEPService.compilar_indice()
+        os.utime(self.origen, ns=(1, 1))
+        self.assertTrue(PEPService.indice_vigente())
+
+    def test_indice_sin_excel_se_considera_vigente(self):
+        PEPService.compilar_indice()
+        self.origen.unlink()
+        self.assertTrue(PEPService.cargar_dataset_pep())
+        self.assertTrue(PEPService.validar_pep('87654321'))
+
+    def test_comando_cli(self):
+        app = create_app('testing')
+        runner = app.test_cli_runner()
+        resultado = runner.invoke(args=[
+            'pep', 'compilar', '--origen', str(self.origen), '--destino', str(self.destino)
+        ])
+        self.assertEqual(resultado.exit_code, 0, resultado.output)
+        self.assertIn('3 DNIs', resultado.output)
+
+        resultado = runner.invoke(args=[
+            'pep', 'compilar', '--origen', str(self.origen), '--destino', str(self.destino),
+            '--si-desactualizado'
+        ])
+        self.assertIn('vigente', resultado.output)
+
+
+# → La carga del dataset ocurre fuera del import: precarga en segundo plano con readiness
+class PEPPrecargaTestCase(PEPDatasetTemporalTestCase):
+
+    def _carga_lenta(self):
+        liberar = threading.Event()
+        original = PEPService._cargar_dataset.__func__
+
+        def _cargar(cls):
+            liberar.wait(5)
+            return original(cls)
+
+        return liberar, patch.object(PEPService, '_cargar_dataset', classmethod(_cargar))
+
+    def test_sin_precarga_no_hay_dataset_hasta_la_primera_consulta(self):
+        PEPService.compilar_indice()
+        self.assertEqual(PEPService.estado_carga(), 'pendiente')
+        self.assertFalse(PEPService.esta_listo())
+
+        self.assertTrue(PEPService.validar_pep('87654321'))
+        self.assertEqual(PEPService.estado_carga(), 'listo')
+
+    def test_consulta_durante_precarga_espera_con_timeout(self):
+        PEPService.compilar_indice()
+        liberar, parche = self._carga_lenta()
+        with parche:
+            hilo = PEPService.iniciar_precarga()
+            self.assertEqual(PEPService.estado_carga(), 'cargando')
+            self.assertIs(PEPService.iniciar_precarga(), hilo)
+
+            with self.assertRaises(PEPNoDisponibleError):
+                PEPService.esperar_dataset(timeout=0.05)
+
+            liberar.set()
+            self.assertTrue(PEPService.esperar_dataset(timeout=5))
+            hilo.join(5)
+
+        self.assertEqual(PEPService.estado_carga(), 'listo')
+        self.assertTrue(PEPService.validar_pep('12345678'))
+
+    def test_error_de_carga_queda_reportado(self):
+        self.origen.unlink()
+        hilo = PEPService.iniciar_precarga()
+        hilo.join(5)
+        self.assertEqual(PEPService.estado_carga(), 'error')
+        self.assertFalse(PEPService.validar_pep('12345678'))
+
+    def test_endpoint_readiness(self):
+        PEPService.compilar_indice()
+        app = create_app('testing')
+        cliente = app.test_client()
+
+        respuesta = cliente.get('/api/v1/clientes/pep/estado')
+        self.assertEqual(respuesta.status_code, 503)
+        self.assertEqual(respuesta.get_json()['estado'], 'pendiente')
+
+        PEPService.cargar_dataset_pep()
+        respuesta = cliente.get('/api/v1/clientes/pep/estado')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.get_json()['total_registros'], 3)
+
+    def test_create_app_no_arranca_hilos(self):
+        # Los comandos CLI también pasan por create_app: los hilos solo se inician en el servidor
+        with patch.object(TestingConfig, 'PEP_PRECARGA', True), \
+                patch.object(TestingConfig, 'PEP_INTERVALO_RECARGA', 60), \
+                patch.object(PEPService, 'INTERVALO_RECARGA', PEPService.INTERVALO_RECARGA), \
+                patch.object(PEPService, 'iniciar_precarga') as precarga, \
+                patch.object(PEPService, 'iniciar_vigilancia', return_value=None) as vigilancia:
+            app = create_app('testing')
+            precarga.assert_not_called()
+            vigilancia.assert_not_called()
+
+            iniciar_tareas_segundo_plano(app)
+            precarga.assert_called_once()
+            vigilancia.assert_called_once()
+
+
+# → Recarga en caliente: nueva versión construida fuera de las consultas y publicada atómicamente
+class PEPRecargaTestCase(PEPDatasetTemporalTestCase):
+
+    def setUp(self):
+        super().setUp()
+        PEPService.compilar_indice()
+        PEPService.cargar_dataset_pep()
+        self.version_inicial = PEPService.get_estadisticas()['version']
+
+    def _actualizar_excel(self, dnis):
+        self._escribir_excel(dnis)
+        os.utime(self.origen, ns=(2, 2))
+
+    def test_version_reportada_en_estadisticas(self):
+        estadisticas = PEPService.get_estadisticas()
+        self.assertEqual(len(estadisticas['version']), 12)
+        self.assertIsNotNone(estadisticas['fecha_version'])
+
+    def test_sin_cambios_no_reconstruye(self):
+        with patch.object(PEPService, '_construir_dataset') as construir:
+            resultado = PEPService.recargar_si_cambio()
+        construir.assert_not_called()
+        self.assertEqual(resultado['motivo'], 'sin_cambios')
+
+    def test_archivo_modificado_publica_nueva_version(self):
+        self._actualizar_excel(['12345678', '55555555'])
+
+        resultado = PEPService.recargar_si_cambio()
+        self.assertTrue(resultado['recargado'])
+        self.assertEqual(resultado['version_anterior'], self.version_inicial)
+        self.assertNotEqual(PEPService.get_estadisticas()['version'], self.version_inicial)
+        self.assertTrue(PEPService.validar_pep('55555555'))
+        self.assertFalse(PEPService.validar_pep('87654321'))
+
+        # El índice regenerado queda vigente: la siguiente revisión no hace nada
+        self.assertEqual(PEPService.recargar_si_cambio()['motivo'], 'sin_cambios')
+
+    def test_archivo_tocado_con_mismo_contenido_no_recarga(self):
+        os.utime(self.origen, ns=(3, 3))
+        resultado = PEPService.recargar_si_cambio()
+        self.assertFalse(resultado['recargado'])
+        self.assertEqual(resultado['version'], self.version_inicial)
+
+    def test_consultas_no_esperan_a_la_recarga(self):
+        self._actualizar_excel(['12345678', '55555555'])
+        liberar = threading.Event()
+        leer_original = PEPService._leer_excel.__func__
+
+        def _leer_lento(cls, origen):
+            liberar.wait(5)
+            return leer_original(cls, origen)
+
+        resultados = []
+        with patch.object(PEPService, '_leer_excel', classmethod(_leer_lento)):
+            hilo = threading.Thread(target=lambda: resultados.append(PEPService.recargar_si_cambio()))
+            hilo.start()
+            try:
+                # Mientras se reconstruye, se responde con la versión anterior sin bloquear
+                self.assertTrue(PEPService.validar_pep('87654321'))
+                self.assertEqual(PEPService.recargar_si_cambio()['motivo'], 'en_curso')
+            finally:
+                liberar.set()
+                hilo.join(5)
+
+        self.assertTrue(resultados[0]['recargado'])
+        self.assertTrue(PEPService.validar_pep('55555555'))
+
+    def test_error_al_recargar_conserva_la_version_publicada(self):
+        self.origen.unlink()
+        self.destino.unlink()
+        resultado = PEPService.recargar_si_cambio()
+        self.assertEqual(resultado['motivo'], 'error')
+        self.assertEqual(PEPService.get_estadisticas()['version'], self.version_inicial)
+        self.assertTrue(PEPService.validar_pep('12345678'))
+
+    def test_vigilancia_detecta_el_cambio(self):
+        self._actualizar_excel(['66666666'])
+        PEPService.iniciar_vigilancia(intervalo=0.05)
+        try:
+            for _ in range(100):
+                if PEPService.get_estadisticas()['version'] != self.version_inicial:
+                    break
+                threading.Event().wait(0.05)
+        finally:
+            PEPService.detener_vigilancia()
+        self.assertTrue(PEPService.validar_pep('66666666'))
+
+
+# → Validación PEP en lote (API/CLI) y revalidación masiva de la tabla clientes
+class PEPLoteTestCase(PEPDatasetTemporalTestCase):
+
+    def setUp(self):
+        super().setUp()
+        PEPService.compilar_indice()
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        # (dni, pep actual): 12345678 y 01234567 están en el dataset
+        for dni, pep in [('12345678', False), ('01234567', True), ('22222222', True), ('33333333', False)]:
+            db.session.add(Cliente(
+                dni=dni,
+                nombre_completo=f'Cliente {dni}',
+                apellido_paterno='Prueba',
+                apellido_materno='Lote',
+                correo_electronico=f'{dni}@test.com',
+                pep=pep
+            ))
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+        super().tearDown()
+
+    def _flags(self):
+        db.session.expire_all()
+        return {c.dni: c.pep for c in Cliente.query.all()}
+
+    def test_lote_coincide_con_validacion_individual(self):
+        dnis = ['12345678', '87654321', '1234567', '99999999', 'ABC', '']
+        resultado = PEPService.validar_pep_lote(dnis)
+
+        self.assertEqual(
+            [r['es_pep'] for r in resultado['resultados']],
+            [PEPService.validar_pep(dni) for dni in dnis]
+        )
+        self.assertEqual(resultado['total_pep'], 3)
+        self.assertEqual(resultado['invalidos'], 2)
+
+    def test_endpoint_json(self):
+        respuesta = self.app.test_client().post(
+            '/api/v1/clientes/validar-pep/lote',
+            json={'dnis': ['12345678', '99999999'], 'solo_pep': True}
+        )
+        self.assertEqual(respuesta.status_code, 200)
+        datos = respuesta.get_json()
+        self.assertEqual(datos['total'], 2)
+        self.assertEqual([r['dni'] for r in datos['resultados']], ['12345678'])
+
+    def test_endpoint_csv_en_streaming(self):
+        cuerpo = 'dni,nombre\n12345678,A\n99999999,B\n\n87654321,C\n'
+        respuesta = self.app.test_client().post(
+            '/api/v1/clientes/validar-pep/lote',
+            data=cuerpo.encode('utf-8'),
+            content_type='text/csv'
+        )
+        self.assertEqual(respuesta.status_code, 200)
+        datos = respuesta.get_json()
+        self.assertEqual(datos['total'], 3)
+        self.assertEqual(datos['total_pep'], 2)
+
+    def test_endpoint_respeta_maximo(self):
+        self.app.config['PEP_LOTE_MAX_DNIS'] = 2
+        respuesta = self.app.test_client().post(
+            '/api/v1/clientes/validar-pep/lote',
+            json={'dnis': ['1', '2', '3']}
+        )
+        self.assertEqual(respuesta.status_code, 413)
+
+    def test_revalidacion_masiva_solo_marca_por_defecto(self):
+        resumen, error = ClienteService.revalidar_pep_cartera(tamano_lote=1)
+        self.assertIsNone(error)
+        self.assertEqual(resumen['marcados'], 1)
+        self.assertEqual(resumen['desmarcados'], 0)
+        self.assertEqual(resumen['pep_fuera_del_dataset'], 1)
+        self.assertEqual(
+            self._flags(),
+            {'12345678': True, '01234567': True, '22222222': True, '33333333': False}
+        )
+
+    def test_revalidacion_masiva_con_desmarcado(self):
+        resumen, error = ClienteService.revalidar_pep_cartera(desmarcar=True)
+        self.assertIsNone(error)
+        self.assertEqual(resumen['desmarcados'], 1)
+        self.assertEqual(
+            self._flags(),
+            {'12345678': True, '01234567': True, '22222222': False, '33333333': False}
+        )
+
+        # Segunda pasada sin cambios
+        resumen, _ = ClienteService.revalidar_pep_cartera(desmarcar=True)
+        self.assertEqual((resumen['marcados'], resumen['desmarcados']), (0, 0))
+
+    def test_comandos_cli(self):
+        runner = self.app.test_cli_runner()
+        resultado = runner.invoke(args=['pep', 'validar-lote', '-'], input='12345678\n55555555\n')
+        self.assertEqual(resultado.exit_code, 0, resultado.output)
+        self.assertIn('12345678,1,1', resultado.output)
+        self.assertIn('55555555,0,1', resultado.output)
+
+        resultado = runner.invoke(args=['pep', 'revalidar-clientes'])
+        self.assertEqual(resultado.exit_code, 0, resultado.output)
+        self.assertIn('Marcados como PEP: 1', resultado.output)
+
+
+# → Coincidencias aproximadas por nombre (índice de trigramas) para registros sin DNI utilizable
+class PEPNombresTestCase(PEPDatasetTemporalTestCase):
+
+    def setUp(self):
+        super().setUp()
+        pd.DataFrame({
+            'NOMBRES': ['JOSÉ LUIS', 'MARÍA ELENA', 'JOSÉ LUIS', 'CARLOS'],
+            'APELLIDOPATERNO': ['PÉREZ', 'QUISPE', 'PÉREZ', 'RAMOS'],
+            'APELLIDOMATERNO': ['DÍAZ', 'MAMANI', 'DÍAZ', None],
+            'DOCUMENTOIDENTIDAD': ['12345678', None, '12345678', 'S/N'],
+            'CARGO': ['ALCALDE', 'REGIDOR', 'ALCALDE', 'CONSEJERO'],
+        }).to_excel(self.origen, index=False)
+
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+        super().tearDown()
+
+    def test_trigramas_ignoran_tildes_y_orden(self):
+        self.assertEqual(
+            IndiceNombresPEP.trigramas('Pérez Díaz, José Luis'),
+            IndiceNombresPEP.trigramas('JOSE LUIS PEREZ DIAZ')
+        )
+
+    def test_busqueda_top_k_ordenada(self):
+        resultado = PEPService.compilar_indice()
+        self.assertEqual(resultado['total_nombres'], 3)  # Duplicado por periodo eliminado
+
+        coincidencias = PEPService.buscar_por_nombre('Maria Elena Quispe Mamani')
+        self.assertEqual(coincidencias[0]['nombre'], 'MARÍA ELENA QUISPE MAMANI')
+        self.assertIsNone(coincidencias[0]['dni'])
+        self.assertEqual(coincidencias[0]['similitud'], 1.0)
+
+        parecidos = PEPService.buscar_por_nombre('Jose Perez Diaz', k=1, umbral=0.3)
+        self.assertEqual(len(parecidos), 1)
+        self.assertEqual(parecidos[0]['cargo'], 'ALCALDE')
+        self.assertLess(parecidos[0]['similitud'], 1.0)
+
+        self.assertEqual(PEPService.buscar_por_nombre('Ana Torres Vega'), [])
+
+    def test_indice_de_nombres_sigue_a_la_version(self):
+        PEPService.compilar_indice()
+        PEPService.cargar_dataset_pep()
+        self.assertEqual(PEPService.obtener_indice_nombres().version, PEPService._version_dataset)
+
+        pd.DataFrame({'NOMBRES': ['ROSA'], 'APELLIDOPATERNO': ['FLORES'], 'APELLIDOMATERNO': ['CHAVEZ'],
+                      'DOCUMENTOIDENTIDAD': ['77777777']}).to_excel(self.origen, index=False)
+        os.utime(self.origen, ns=(4, 4))
+        self.assertTrue(PEPService.recargar_si_cambio()['recargado'])
+
+        self.assertEqual(PEPService.get_estadisticas()['total_nombres'], 1)
+        self.assertEqual(PEPService.buscar_por_nombre('Rosa Flores Chavez')[0]['dni'], '77777777')
+
+    def test_recarga_publica_el_indice_con_los_dnis(self):
+        PEPService.compilar_indice()
+        PEPService.cargar_dataset_pep()
+        anterior = PEPService.obtener_indice_nombres()
+
+        pd.DataFrame({'NOMBRES': ['ROSA'], 'APELLIDOPATERNO': ['FLORES'], 'APELLIDOMATERNO': ['CHAVEZ'],
+                      'DOCUMENTOIDENTIDAD': ['77777777']}).to_excel(self.origen, index=False)
+        os.utime(self.origen, ns=(4, 4))
+        self.assertTrue(PEPService.recargar_si_cambio()['recargado'])
+        self.assertIsNot(PEPService._indice_nombres, anterior)
+        self.assertEqual(PEPService._indice_nombres.version, PEPService._version_dataset)
+
+        # Con un índice publicado las consultas nunca lo construyen (ni leen el Excel)
+        PEPService._version_dataset = 'otra-version'
+        with patch.object(PEPService, '_cargar_registros_nombres', side_effect=AssertionError('en la consulta')):
+            self.assertEqual(PEPService.buscar_por_nombre('Rosa Flores Chavez')[0]['dni'], '77777777')
+
+    def test_screening_de_cartera_y_endpoint(self):
+        PEPService.compilar_indice()
+        for dni, nombre in [('12345678', 'PEREZ DIAZ JOSE LUIS'), ('40404040', 'QUISPE MAMANI MARIA ELENA'),
+                            ('50505050', 'TORRES VEGA ANA')]:
+            db.session.add(Cliente(dni=dni, nombre_completo=nombre, apellido_paterno='-',
+                                   correo_electronico=f'{dni}@test.com', pep=False))
+        db.session.commit()
+
+        resumen, error = ClienteService.buscar_coincidencias_nombre_pep(k=2)
+        self.assertIsNone(error)
+        self.assertEqual(resumen['total_clientes'], 3)
+        por_dni = {c['dni']: c['candidatos'] for c in resumen['coincidencias']}
+        self.assertEqual(set(por_dni), {'12345678', '40404040'})
+        self.assertTrue(por_dni['12345678'][0]['mismo_dni'])
+        self.assertFalse(por_dni['40404040'][0]['mismo_dni'])
+
+        respuesta = self.app.test_client().get('/api/v1/clientes/pep/buscar-nombre?nombre=Carlos%20Ramos')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.get_json()['coincidencias'][0]['dni'], 'S/N')
+
+        respuesta = self.app.test_client().get('/api/v1/clientes/pep/buscar-nombre?nombre=x&k=0')
+        self.assertEqual(respuesta.status_code, 400)
+
+        resultado = self.app.test_cli_runner().invoke(args=['pep', 'screening-nombres', '--k', '1'])
+        self.assertEqual(resultado.exit_code, 0, resultado.output)
+        self.assertIn('40404040,QUISPE MAMANI MARIA ELENA,0,MARÍA ELENA QUISPE MAMANI', resultado.output)
+
+
+if __name__ == '__main__':
+    unittest.main()
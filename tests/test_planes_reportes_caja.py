@@ -0,0 +1,85 @@
+import os
+import sys
+from pathlib import Path
+
+# Add parent directory to path to allow imports
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import unittest
+from datetime import date, datetime
+from sqlalchemy import func, text
+from app import create_app, db
+from app.models import Pago, Egreso
+from app.services.caja_service import CajaService
+from app.crud.caja_resumen_crud import (
+    filtro_rango_fechas,
+    consulta_pagos_por_dia,
+    consulta_egresos_por_dia
+)
+from tests.datos_prueba import cargar_migracion
+
+
+# → Los filtros de fechas de los reportes de caja deben poder usar los índices
+class PlanesReportesCajaTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        # Los índices viven en las migraciones, no en los modelos
+        for nombre, tabla, columnas in cargar_migracion('006_indices_reportes_caja.py').INDICES:
+            db.session.execute(text(f"CREATE INDEX IF NOT EXISTS {nombre} ON {tabla} ({', '.join(columnas)})"))
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _plan(self, query):
+        """Detalle de EXPLAIN QUERY PLAN (SQLite) para una query ORM."""
+        conexion = db.session.connection()
+        sql = query.statement.compile(dialect=conexion.dialect)
+        parametros = tuple(sql.params[nombre] for nombre in sql.positiontup)
+        filas = conexion.exec_driver_sql(f'EXPLAIN QUERY PLAN {sql}', parametros).all()
+        return ' | '.join(fila[-1] for fila in filas)
+
+    def test_rango_semiabierto(self):
+        desde, hasta = filtro_rango_fechas(Egreso.fecha_registro, date(2025, 3, 1), date(2025, 3, 31))
+        self.assertEqual(desde.right.value, datetime(2025, 3, 1))
+        self.assertEqual(hasta.right.value, datetime(2025, 4, 1))
+        self.assertEqual(hasta.operator.__name__, 'lt')
+
+        desde, hasta = filtro_rango_fechas(Pago.fecha_pago, date(2025, 3, 1), date(2025, 3, 1))
+        self.assertEqual((desde.right.value, hasta.right.value), (date(2025, 3, 1), date(2025, 3, 2)))
+        self.assertEqual(filtro_rango_fechas(Pago.fecha_pago), [])
+
+    def test_pagos_por_rango_usan_indice_compuesto(self):
+        plan = self._plan(consulta_pagos_por_dia(date(2025, 1, 1), date(2025, 12, 31)))
+        self.assertIn('SEARCH pagos USING INDEX ix_pagos_fecha_pago_medio (fecha_pago>? AND fecha_pago<?)', plan)
+        self.assertNotIn('SCAN pagos', plan)
+
+        detalle = db.session.query(Pago).filter(Pago.fecha_pago == date(2025, 1, 1))
+        self.assertIn('ix_pagos_fecha_pago_medio', self._plan(detalle))
+
+    def test_egresos_por_rango_usan_indice(self):
+        plan = self._plan(consulta_egresos_por_dia(date(2025, 1, 1), date(2025, 1, 31)))
+        self.assertIn('SEARCH egresos USING INDEX ix_egresos_fecha_registro (fecha_registro>? AND fecha_registro<?)', plan)
+
+    def test_func_date_sobre_la_columna_no_usa_indice(self):
+        # Regresión: envolver la columna en una función obliga a recorrer la tabla
+        no_sargable = db.session.query(func.sum(Egreso.monto)).filter(
+            func.date(Egreso.fecha_registro) == date(2025, 1, 1)
+        )
+        self.assertIn('SCAN egresos', self._plan(no_sargable))
+
+    def test_reportes_siguen_respondiendo(self):
+        resumen = CajaService.obtener_resumen_periodo(date(2025, 1, 1), date(2025, 1, 31))
+        self.assertEqual(resumen['resumen_periodo']['cantidad_total_pagos'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import os
+import sys
+from pathlib import Path
+
+# Add parent directory to path to allow imports
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import unittest
+from datetime import date, timedelta
+from decimal import Decimal
+from app import create_app, db
+from app.models.cliente import Cliente
+from app.models.prestamo import Prestamo, EstadoPrestamoEnum
+from app.models.cuota import Cuota
+from app.services.proyeccion_service import ProyeccionService
+
+
+# → La proyección de flujo agrega saldo y mora pendiente por periodo
+class ProyeccionFlujoTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.hoy = date(2026, 3, 15)
+
+        for i, (estado, dias_otorgamiento) in enumerate([
+            (EstadoPrestamoEnum.VIGENTE, 70),     # 2 cuotas vencidas
+            (EstadoPrestamoEnum.VIGENTE, 5),
+            (EstadoPrestamoEnum.CANCELADO, 5),    # No debe proyectarse
+        ]):
+            cliente = Cliente(
+                dni=f'5000000{i}',
+                nombre_completo=f'Cliente {i}',
+                apellido_paterno='Prueba',
+                apellido_materno='Flujo',
+                correo_electronico=f'flujo{i}@test.com',
+                pep=False
+            )
+            db.session.add(cliente)
+            db.session.flush()
+
+            prestamo = Prestamo(
+                cliente_id=cliente.cliente_id,
+                monto_total=Decimal('1200.00'),
+                interes_tea=Decimal('10.00'),
+                plazo=12,
+                f_otorgamiento=self.hoy - timedelta(days=dias_otorgamiento),
+                estado=estado,
+                requiere_dec_jurada=False
+            )
+            db.session.add(prestamo)
+            db.session.flush()
+
+            for numero in range(1, 13):
+                db.session.add(Cuota(
+                    prestamo_id=prestamo.prestamo_id,
+                    numero_cuota=numero,
+                    fecha_vencimiento=prestamo.f_otorgamiento + timedelta(days=30 * numero),
+                    monto_cuota=Decimal('105.50'),
+                    monto_capital=Decimal('100.00'),
+                    monto_interes=Decimal('5.50'),
+                    saldo_capital=Decimal('0.00'),
+                    monto_pagado=Decimal('0.00'),
+                    saldo_pendiente=Decimal('105.50'),
+                    mora_generada=Decimal('1.00') if numero == 1 else Decimal('0.00'),
+                    mora_acumulada=Decimal('1.00') if numero == 1 else Decimal('0.00')
+                ))
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _esperado(self, fin):
+        cuotas = Cuota.query.join(Prestamo).filter(
+            Prestamo.estado == EstadoPrestamoEnum.VIGENTE,
+            Cuota.fecha_vencimiento < fin
+        ).all()
+        return len(cuotas), float(sum(c.saldo_pendiente + c.mora_acumulada for c in cuotas))
+
+    def test_totales_mensuales(self):
+        proyeccion = ProyeccionService.calcular_proyeccion(meses=3, agrupacion='mes', fecha_base=self.hoy)
+        cuotas, total = self._esperado(date(2026, 6, 15))
+
+        self.assertEqual(proyeccion['totales']['cuotas'], cuotas)
+        self.assertAlmostEqual(proyeccion['totales']['total'], total, places=2)
+        self.assertEqual(proyeccion['vencido']['cuotas'], 2)
+        self.assertAlmostEqual(proyeccion['vencido']['mora_esperada'], 1.00, places=2)
+        self.assertEqual([p['periodo'] for p in proyeccion['periodos']], ['2026-03', '2026-04', '2026-05', '2026-06'])
+        self.assertEqual(proyeccion['periodos'][0]['desde'], '2026-03-15')
+        self.assertEqual(proyeccion['periodos'][-1]['hasta'], '2026-06-14')
+        self.assertEqual(
+            sum(p['cuotas'] for p in proyeccion['periodos']) + proyeccion['vencido']['cuotas'],
+            proyeccion['totales']['cuotas']
+        )
+
+    def test_agrupacion_semanal(self):
+        proyeccion = ProyeccionService.calcular_proyeccion(meses=2, agrupacion='semana', fecha_base=self.hoy)
+        self.assertTrue(all('-S' in p['periodo'] for p in proyeccion['periodos']))
+        cuotas, _ = self._esperado(date(2026, 5, 15))
+        self.assertEqual(proyeccion['totales']['cuotas'], cuotas)
+
+    def test_cache_se_invalida(self):
+        primera, _, _ = ProyeccionService.obtener_proyeccion(3, 'mes', self.hoy)
+
+        Cuota.query.update({'saldo_pendiente': Decimal('0.00'), 'mora_acumulada': Decimal('0.00')})
+        db.session.commit()
+
+        cacheada, _, _ = ProyeccionService.obtener_proyeccion(3, 'mes', self.hoy)
+        self.assertEqual(cacheada, primera)
+
+        ProyeccionService.invalidar_cache()
+        nueva, _, _ = ProyeccionService.obtener_proyeccion(3, 'mes', self.hoy)
+        self.assertEqual(nueva['totales']['cuotas'], 0)
+
+    def test_parametros_invalidos(self):
+        _, error, status = ProyeccionService.obtener_proyeccion(0, 'mes')
+        self.assertEqual(status, 400)
+        _, error, status = ProyeccionService.obtener_proyeccion(3, 'anio')
+        self.assertEqual(status, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import os
+import sys
+from pathlib import Path
+
+# Add parent directory to path to allow imports
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import unittest
+from unittest.mock import patch
+from datetime import date
+from decimal import Decimal
+from sqlalchemy import event
+from app import create_app, db
+from app.models.prestamo import Prestamo
+from app.models.cuota import Cuota
+from app.services.email_service import EmailService
+from app.services.financial_service import FinancialService
+from app.services.prestamo_service import PrestamoService
+from app.crud import crear_prestamo_con_cuotas
+from tests.datos_prueba import crear_cliente_prueba
+
+
+# → El préstamo y todas sus cuotas se guardan en una sola transacción con un INSERT multi-fila
+class RegistroPrestamoTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        self.cliente = crear_cliente_prueba('50000001', 'Cliente Registro', 'registro@test.com', pep=False)
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _nuevo_prestamo(self, plazo):
+        return Prestamo(
+            cliente_id=self.cliente.cliente_id,
+            monto_total=Decimal('12000.00'),
+            interes_tea=Decimal('18.00'),
+            plazo=plazo,
+            f_otorgamiento=date(2025, 1, 15),
+            requiere_dec_jurada=False
+        )
+
+    def _filas(self, plazo):
+        cronograma = FinancialService.generar_cronograma_pagos(
+            Decimal('12000.00'), Decimal('18.00'), plazo, date(2025, 1, 15)
+        )
+        return cronograma, PrestamoService.filas_cuotas_desde_cronograma(cronograma)
+
+    def test_registro_completo_inserta_cuotas_en_un_solo_insert(self):
+        inserts = []
+
+        def _registrar(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith('INSERT INTO CUOTAS'):
+                inserts.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', _registrar)
+        try:
+            # El registro consume el generador: la lista intermedia no se arma
+            with patch.object(EmailService, 'enviar_cronograma_completo', return_value=True) as correo, \
+                    patch.object(FinancialService, 'generar_cronograma_pagos',
+                                 side_effect=AssertionError('cronograma materializado')):
+                respuesta, error, status = PrestamoService.registrar_prestamo_completo(
+                    dni=self.cliente.dni,
+                    correo_electronico=self.cliente.correo_electronico,
+                    monto_total=Decimal('12000.00'),
+                    interes_tea=Decimal('18.00'),
+                    plazo=60,
+                    f_otorgamiento=date(2025, 1, 15)
+                )
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', _registrar)
+
+        self.assertIsNone(error)
+        self.assertEqual(status, 201)
+        self.assertEqual(len(inserts), 1)
+
+        cuotas = Cuota.query.filter_by(prestamo_id=respuesta['prestamo']['prestamo_id']) \
+            .order_by(Cuota.numero_cuota).all()
+        self.assertEqual([c.numero_cuota for c in cuotas], list(range(1, 61)))
+        for cuota, item in zip(cuotas, respuesta['cronograma']):
+            self.assertEqual(float(cuota.monto_cuota), item['monto_cuota'])
+            self.assertEqual(cuota.saldo_pendiente, cuota.monto_cuota)
+            self.assertEqual(cuota.mora_acumulada, Decimal('0.00'))
+
+        # El correo recibe las mismas filas que se insertaron
+        esperado, _ = self._filas(60)
+        enviado = correo.call_args.args[2]
+        self.assertEqual([c['monto_cuota'] for c in enviado], [c['monto_cuota'] for c in esperado])
+
+    def test_numero_cuota_duplicado_revierte_el_prestamo(self):
+        _, filas = self._filas(6)
+        filas[-1]['numero_cuota'] = filas[0]['numero_cuota']
+
+        with self.assertRaises(Exception):
+            crear_prestamo_con_cuotas(self._nuevo_prestamo(6), filas)
+
+        self.assertEqual(Prestamo.query.count(), 0)
+        self.assertEqual(Cuota.query.count(), 0)
+
+    def test_monto_cuota_no_positivo_revierte_el_prestamo(self):
+        _, filas = self._filas(6)
+        filas[2]['monto_cuota'] = Decimal('0.00')
+
+        with self.assertRaises(Exception):
+            crear_prestamo_con_cuotas(self._nuevo_prestamo(6), filas)
+
+        self.assertEqual(Prestamo.query.count(), 0)
+        self.assertEqual(Cuota.query.count(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+import os
+import sys
+from pathlib import Path
+
+# Add parent directory to path to allow imports
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from app.services.reniec_service import ReniecClient
+from app.services.cliente_service import ClienteService
+
+
+class _StubReniec(BaseHTTPRequestHandler):
+    """Servidor local que imita APIPERU: /<dni> -> JSON, '00000000' no existe, '99999999' falla."""
+
+    protocol_version = 'HTTP/1.1'  # Keep-alive para comprobar reutilización de conexiones
+
+    def do_GET(self):
+        servidor = self.server
+        dni = self.path.rstrip('/').rsplit('/', 1)[-1]
+        with servidor.lock:
+            servidor.llamadas.append(dni)
+            servidor.conexiones.add(self.client_address)
+        time.sleep(servidor.demora)
+
+        if dni == '99999999':
+            estado, cuerpo = 503, {'success': False, 'message': 'Servicio no disponible'}
+        elif dni == '00000000':
+            estado, cuerpo = 200, {'success': False, 'message': 'No se encontraron resultados'}
+        else:
+            estado, cuerpo = 200, {'success': True, 'data': {
+                'numero': dni, 'nombres': 'JUAN', 'apellido_paterno': 'PEREZ',
+                'apellido_materno': 'GARCIA', 'nombre_completo': 'JUAN PEREZ GARCIA'
+            }}
+
+        contenido = json.dumps(cuerpo).encode('utf-8')
+        self.send_response(estado)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(contenido)))
+        self.end_headers()
+        self.wfile.write(contenido)
+
+    def log_message(self, *args):
+        pass
+
+
+# → Cliente RENIEC con pool de conexiones, cache TTL y coalescencia, probado contra un stub local
+class ReniecClientTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.servidor = ThreadingHTTPServer(('127.0.0.1', 0), _StubReniec)
+        self.servidor.lock = threading.Lock()
+        self.servidor.llamadas = []
+        self.servidor.conexiones = set()
+        self.servidor.demora = 0
+        self.hilo = threading.Thread(target=self.servidor.serve_forever, daemon=True)
+        self.hilo.start()
+
+        self.url = f'http://127.0.0.1:{self.servidor.server_address[1]}/v2/reniec/dni'
+        self.cliente = ReniecClient(self.url, 'token-prueba', timeout=5, ttl_negativo=0.2)
+
+    def tearDown(self):
+        self.cliente.cerrar()
+        self.servidor.shutdown()
+        self.servidor.server_close()
+
+    def test_consulta_exitosa_y_cacheada(self):
+        datos, error = self.cliente.consultar('12345678')
+        self.assertIsNone(error)
+        self.assertEqual(datos['nombre_completo'], 'JUAN PEREZ GARCIA')
+
+        # Modificar el resultado no contamina la cache
+        datos['correo_electronico'] = 'x@test.com'
+        cacheado, _ = self.cliente.consultar('12345678')
+        self.assertNotIn('correo_electronico', cacheado)
+
+        self.assertEqual(self.servidor.llamadas, ['12345678'])
+        self.assertEqual(self.cliente.estadisticas()['aciertos'], 1)
+
+    def test_reutiliza_la_conexion(self):
+        for dni in ['11111111', '22222222', '33333333', '44444444']:
+            self.cliente.consultar(dni)
+        self.assertEqual(len(self.servidor.llamadas), 4)
+        self.assertEqual(len(self.servidor.conexiones), 1)
+
+    def test_negativo_cacheado_brevemente(self):
+        _, error = self.cliente.consultar('00000000')
+        self.assertEqual(error, 'No se encontraron resultados')
+        self.cliente.consultar('00000000')
+        self.assertEqual(len(self.servidor.llamadas), 1)
+
+        time.sleep(0.25)
+        self.cliente.consultar('00000000')
+        self.assertEqual(len(self.servidor.llamadas), 2)
+
+    def test_errores_transitorios_no_se_cachean(self):
+        _, error = self.cliente.consultar('99999999')
+        self.assertIn('RENIEC', error)
+        self.cliente.consultar('99999999')
+        self.assertEqual(len(self.servidor.llamadas), 2)
+
+    def test_distingue_errores_definitivos_de_transitorios(self):
+        # El mensaje de APIPERU no dice "no encontrado": la clasificación no depende del texto
+        self.assertEqual(self.cliente.consultar_con_estado('00000000'), (None, 'No se encontraron resultados', True))
+        self.assertEqual(self.cliente.consultar_con_estado('00000000')[2], True)  # Desde la cache
+        self.assertEqual(self.cliente.consultar_con_estado('99999999')[2], False)
+        self.assertEqual(self.cliente.consultar_con_estado('12345678')[1:], (None, False))
+
+    def test_consultas_concurrentes_comparten_una_llamada(self):
+        self.servidor.demora = 0.2
+        resultados = []
+
+        def _consultar():
+            resultados.append(self.cliente.consultar('55555555'))
+
+        hilos = [threading.Thread(target=_consultar) for _ in range(10)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join(5)
+
+        self.assertEqual(self.servidor.llamadas, ['55555555'])
+        self.assertEqual(len(resultados), 10)
+        self.assertTrue(all(datos['numero'] == '55555555' and error is None for datos, error in resultados))
+        self.assertEqual(self.cliente.estadisticas()['coalescidas'], 9)
+
+    def test_servicio_usa_cliente_compartido(self):
+        original = (ClienteService.API_URL, ClienteService.API_KEY, ClienteService._cliente_reniec)
+        ClienteService.API_URL, ClienteService.API_KEY = self.url, 'token-prueba'
+        ClienteService._cliente_reniec = None
+        try:
+            ClienteService.consultar_dni_reniec('66666666')
+            datos, error = ClienteService.consultar_dni_reniec('66666666')
+            self.assertIsNone(error)
+            self.assertEqual(datos['numero'], '66666666')
+            self.assertEqual(self.servidor.llamadas, ['66666666'])
+            ClienteService._cliente_reniec.cerrar()
+        finally:
+            ClienteService.API_URL, ClienteService.API_KEY, ClienteService._cliente_reniec = original
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,190 @@
+import os
+import sys
+from pathlib import Path
+
+# Add parent directory to path to allow imports
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import threading
+import time
+import unittest
+from decimal import Decimal
+from unittest.mock import patch, MagicMock
+import requests
+from app import create_app
+from app.common.resilience import (
+    CircuitBreaker, CircuitoAbiertoError, CapacidadAgotadaError, obtener_circuito
+)
+from app.services.reniec_service import ReniecClient
+from app.services.flow_service import FlowService
+
+
+def _fallar():
+    raise requests.exceptions.ConnectionError('sin conexión')
+
+
+# → Circuit breaker + bulkhead: fallo rápido, sondeo semiabierto y tope de concurrencia
+class CircuitBreakerTestCase(unittest.TestCase):
+
+    def test_se_abre_tras_fallos_consecutivos_y_falla_rapido(self):
+        circuito = CircuitBreaker('prueba', umbral_fallos=3, tiempo_apertura=60)
+        llamada = MagicMock(side_effect=_fallar)
+        for _ in range(3):
+            with self.assertRaises(requests.exceptions.ConnectionError):
+                circuito.ejecutar(llamada)
+
+        self.assertEqual(circuito.estado, CircuitBreaker.ABIERTO)
+        with self.assertRaises(CircuitoAbiertoError) as contexto:
+            circuito.ejecutar(llamada)
+        self.assertEqual(contexto.exception.status_code, 503)
+        self.assertEqual(llamada.call_count, 3)
+
+        metricas = circuito.metricas()
+        self.assertEqual(metricas['fallos'], 3)
+        self.assertEqual(metricas['rechazadas_abierto'], 1)
+        self.assertEqual(metricas['aperturas'], 1)
+
+    def test_un_exito_reinicia_los_fallos_consecutivos(self):
+        circuito = CircuitBreaker('prueba', umbral_fallos=2)
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            circuito.ejecutar(_fallar)
+        circuito.ejecutar(lambda: 'ok')
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            circuito.ejecutar(_fallar)
+        self.assertEqual(circuito.estado, CircuitBreaker.CERRADO)
+
+    def test_sondeo_semiabierto_cierra_o_reabre(self):
+        circuito = CircuitBreaker('prueba', umbral_fallos=1, tiempo_apertura=0.05)
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            circuito.ejecutar(_fallar)
+        time.sleep(0.06)
+        self.assertEqual(circuito.estado, CircuitBreaker.SEMIABIERTO)
+
+        # Un sondeo fallido lo reabre
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            circuito.ejecutar(_fallar)
+        self.assertEqual(circuito.estado, CircuitBreaker.ABIERTO)
+
+        # Un sondeo exitoso lo cierra
+        time.sleep(0.06)
+        self.assertEqual(circuito.ejecutar(lambda: 'ok'), 'ok')
+        self.assertEqual(circuito.estado, CircuitBreaker.CERRADO)
+
+    def test_semiabierto_admite_un_solo_sondeo(self):
+        circuito = CircuitBreaker('prueba', umbral_fallos=1, tiempo_apertura=0.05)
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            circuito.ejecutar(_fallar)
+        time.sleep(0.06)
+
+        liberar = threading.Event()
+        sondeo = threading.Thread(target=circuito.ejecutar, args=(liberar.wait, 2))
+        sondeo.start()
+        time.sleep(0.05)
+        with self.assertRaises(CircuitoAbiertoError):
+            circuito.ejecutar(lambda: 'ok')
+        liberar.set()
+        sondeo.join(2)
+        self.assertEqual(circuito.estado, CircuitBreaker.CERRADO)
+
+    def test_bulkhead_rechaza_sin_bloquear_cuando_no_hay_cupo(self):
+        circuito = CircuitBreaker('prueba', max_concurrentes=2, espera_cupo=0)
+        liberar = threading.Event()
+        hilos = [threading.Thread(target=circuito.ejecutar, args=(liberar.wait, 2)) for _ in range(2)]
+        for hilo in hilos:
+            hilo.start()
+        time.sleep(0.05)
+
+        inicio = time.monotonic()
+        with self.assertRaises(CapacidadAgotadaError):
+            circuito.ejecutar(lambda: 'ok')
+        self.assertLess(time.monotonic() - inicio, 0.1)
+        self.assertEqual(circuito.metricas()['en_curso'], 2)
+
+        liberar.set()
+        for hilo in hilos:
+            hilo.join(2)
+        self.assertEqual(circuito.ejecutar(lambda: 'ok'), 'ok')
+        metricas = circuito.metricas()
+        self.assertEqual(metricas['rechazadas_capacidad'], 1)
+        self.assertEqual(metricas['en_curso'], 0)
+        # El rechazo por capacidad no cuenta como fallo de la dependencia
+        self.assertEqual(metricas['fallos'], 0)
+
+    def test_llamada_lenta_y_resultado_fallido_cuentan_como_fallo(self):
+        circuito = CircuitBreaker('prueba', umbral_fallos=2, latencia_lenta=0.02)
+        self.assertEqual(circuito.ejecutar(time.sleep, 0.03), None)
+        self.assertEqual(circuito.ejecutar(lambda: 503, es_fallo=lambda estado: estado >= 500), 503)
+
+        metricas = circuito.metricas()
+        self.assertEqual(metricas['lentas'], 1)
+        self.assertEqual(metricas['fallos'], 2)
+        self.assertEqual(metricas['estado'], CircuitBreaker.ABIERTO)
+
+
+# → RENIEC y Flow usan el circuito de su dependencia
+class IntegracionCircuitosTestCase(unittest.TestCase):
+
+    def test_reniec_devuelve_error_sin_llamar_con_circuito_abierto(self):
+        circuito = CircuitBreaker('reniec', umbral_fallos=2, tiempo_apertura=60)
+        sesion = MagicMock()
+        sesion.headers = {}
+        sesion.get.side_effect = requests.exceptions.Timeout()
+        cliente = ReniecClient('http://reniec.local/dni', 'token', session=sesion, circuito=circuito)
+
+        for dni in ['11111111', '22222222']:
+            _, error = cliente.consultar(dni)
+            self.assertIn('Tiempo de espera', error)
+        _, error = cliente.consultar('33333333')
+
+        self.assertIn('no disponible temporalmente', error)
+        self.assertEqual(sesion.get.call_count, 2)
+
+    def test_reniec_dni_inexistente_no_abre_el_circuito(self):
+        circuito = CircuitBreaker('reniec', umbral_fallos=1)
+        respuesta = MagicMock(status_code=404, headers={'Content-Type': 'text/html'})
+        sesion = MagicMock()
+        sesion.headers = {}
+        sesion.get.return_value = respuesta
+        cliente = ReniecClient('http://reniec.local/dni', 'token', session=sesion, circuito=circuito)
+
+        _, error = cliente.consultar('44444444')
+        self.assertEqual(error, 'DNI no encontrado en RENIEC')
+        self.assertEqual(circuito.estado, CircuitBreaker.CERRADO)
+
+    def test_flow_responde_503_con_circuito_abierto(self):
+        app = create_app('testing')
+        app.config.update(FLOW_API_KEY='api', FLOW_SECRET_KEY='secreto')
+        circuito = obtener_circuito('flow')
+        circuito.configurar(umbral_fallos=2, tiempo_apertura=60)
+        circuito.reiniciar()
+        try:
+            with app.app_context(), patch('app.services.flow_service.requests.get') as get:
+                get.return_value = MagicMock(status_code=502, text='')
+                for _ in range(2):
+                    _, _, status = FlowService.obtener_estado_pago('tok')
+                    self.assertEqual(status, 502)
+
+                datos, error, status = FlowService.obtener_estado_pago('tok')
+                self.assertIsNone(datos)
+                self.assertEqual(status, 503)
+                self.assertEqual(get.call_count, 2)
+
+                _, _, status = FlowService.crear_orden_pago(
+                    'ORD-1', 'Cuota 1', Decimal('100'), 'a@test.com', 'YAPE', 1, 1, 'http://c', 'http://r'
+                )
+                self.assertEqual(status, 503)
+        finally:
+            circuito.reiniciar()
+
+    def test_endpoint_de_metricas(self):
+        app = create_app('testing')
+        respuesta = app.test_client().get('/api/v1/dependencias/circuitos')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertIn('reniec', respuesta.get_json())
+        self.assertIn('flow', respuesta.get_json())
+
+
+if __name__ == '__main__':
+    unittest.main()
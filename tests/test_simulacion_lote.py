@@ -0,0 +1,75 @@
+import os
+import sys
+from pathlib import Path
+
+# Add parent directory to path to allow imports
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import json
+import unittest
+from decimal import Decimal
+from app import create_app
+
+
+# → Endpoint de simulación en lote: mismos resúmenes que la simulación individual
+class SimulacionLoteTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.escenarios = [
+            {'monto': 12000.00, 'plazo': plazo, 'tea': tea}
+            for plazo in (1, 6, 12, 24) for tea in (0, 10.0, 35.5)
+        ]
+
+    @staticmethod
+    def _numerico(cronograma):
+        campos = ('monto_cuota', 'monto_capital', 'monto_interes', 'saldo_capital')
+        return [{k: Decimal(v) if k in campos else v for k, v in c.items()} for c in cronograma]
+
+    def test_resumen_igual_a_simulacion_individual(self):
+        respuesta = self.client.post('/api/v1/financial/simular-cronogramas', json={
+            'escenarios': self.escenarios,
+            'incluir_cronograma': True
+        })
+        self.assertEqual(respuesta.status_code, 200)
+        resultados = respuesta.get_json()['escenarios']
+        self.assertEqual(len(resultados), len(self.escenarios))
+
+        for escenario, resultado in zip(self.escenarios, resultados):
+            individual = self.client.post('/api/v1/financial/simular-cronograma', json=escenario).get_json()
+            for campo in ('total_intereses', 'total_a_pagar', 'cuota_regular', 'tem'):
+                self.assertEqual(resultado['resumen'][campo], individual['resumen'][campo], (escenario, campo))
+            self.assertEqual(self._numerico(resultado['cronograma']), self._numerico(individual['cronograma']))
+
+    def test_sin_cronograma_por_defecto(self):
+        respuesta = self.client.post('/api/v1/financial/simular-cronogramas', json={'escenarios': self.escenarios[:2]})
+        self.assertNotIn('cronograma', respuesta.get_json()['escenarios'][0])
+
+    def test_stream_ndjson(self):
+        respuesta = self.client.post('/api/v1/financial/simular-cronogramas', json={
+            'escenarios': self.escenarios,
+            'stream': True
+        })
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.mimetype, 'application/x-ndjson')
+        lineas = [json.loads(l) for l in respuesta.get_data(as_text=True).splitlines()]
+        self.assertEqual([l['indice'] for l in lineas], list(range(len(self.escenarios))))
+
+    def test_tope_de_escenarios(self):
+        self.app.config['SIMULACION_LOTE_MAX_ESCENARIOS'] = 5
+        respuesta = self.client.post('/api/v1/financial/simular-cronogramas', json={'escenarios': self.escenarios})
+        self.assertEqual(respuesta.status_code, 413)
+
+    def test_escenario_invalido(self):
+        respuesta = self.client.post('/api/v1/financial/simular-cronogramas', json={
+            'escenarios': [{'monto': 1000, 'plazo': 12}, {'monto': 1000, 'plazo': 61}]
+        })
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertEqual(respuesta.get_json()['indice'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,11 +2,14 @@
 WSGI Entry Point
 Punto de entrada para servidores WSGI (gunicorn, uwsgi, etc.)
 """
-from app import create_app
+from app import create_app, iniciar_tareas_segundo_plano
 
 # Crear la aplicación Flask
 application = create_app()
 app = application
 
+# Precarga / recarga en caliente del dataset PEP (solo en el servidor, no en comandos CLI)
+iniciar_tareas_segundo_plano(application)
+
 if __name__ == '__main__':
     application.run()